@@ -6,9 +6,13 @@ from typing import Union, Optional
 from PIL import Image, ImageDraw, ImageFont, ImageChops
 
 from ResourceManager import FontManager, ImageManager
+from bin.render_metrics import render_metrics
 from rich_text_render.RichTextRenderer import RichTextRenderer, DrawOptions, TextAlignment
 from rich_text_render.VirtualTextBox import TextObject, ImageObject, RenderItem
 
+# 文字层元数据中页脚遭遇组编号的 role 标记
+ENCOUNTER_NUMBER_ROLE = 'encounter_group_number'
+
 
 def generate_random_braille(size, seed=None, dot_color=(0, 0, 0, 255)):
     """
@@ -119,6 +123,11 @@ class Card:
         self.is_mirror = is_mirror  # 是否背面
         self.rich_renderer = RichTextRenderer(font_manager, image_manager, self.image, lang=font_manager.lang)
         self.last_render_list: list[RenderItem] = []
+        # 插画贴图记录 (原图, 区域, 调整模式, 变换参数)，导出时按目标分辨率重新贴图
+        self.art_placement = None
+        # 页脚遭遇组编号的绘制参数与渲染项，导出多个副本时只重新排版编号
+        self.footer_encounter_style = None
+        self.footer_encounter_items: list[RenderItem] = []
 
     def copy_circle_to_image(self, reference_image: Image, source_params, target_params):
         """
@@ -191,6 +200,7 @@ class Card:
 
         return result_img
 
+    @render_metrics.timed('compose')
     def paste_image(self, img, region, resize_mode='stretch', transparent_list=None, extension=0):
         """
         在指定区域粘贴图片
@@ -236,12 +246,14 @@ class Card:
                 self.image.paste(img, (region[0], region[1]), img)
             else:
                 self.image.paste(img, (region[0], region[1]))
+            return img, (region[0], region[1])
 
         except Exception as e:
             # 打印异常栈
             traceback.print_exc()
             print(f"贴图失败: {str(e)}")
 
+    @render_metrics.timed('compose')
     def paste_image_with_transform(self, img, region, transform_params):
         """
         在指定区域粘贴图片，支持缩放、裁剪、旋转、镜像翻转和相对region中心点的偏移
@@ -325,10 +337,58 @@ class Card:
                 self.image.paste(processed_img, (paste_x, paste_y), processed_img)
             else:
                 self.image.paste(processed_img, (paste_x, paste_y))
+            return processed_img, (paste_x, paste_y)
 
         except Exception as e:
             print(f"图片变换粘贴失败: {str(e)}")
 
+    def paste_art(self, img, region, resize_mode='cover', transform_params=None):
+        """
+        粘贴卡牌插画并记录贴图参数，供 render_art_layer 在其他分辨率下重放
+
+        :param img: 插画原图
+        :param region: 目标区域 (x, y, width, height)
+        :param resize_mode: 同 paste_image；transform_params 不为空时忽略
+        :param transform_params: 自定义布局参数，同 paste_image_with_transform
+        """
+        if transform_params is not None:
+            pasted = self.paste_image_with_transform(img, region, transform_params)
+        else:
+            pasted = self.paste_image(img, region, resize_mode)
+        if pasted is not None:
+            self.art_placement = (img, tuple(region), resize_mode, transform_params)
+            # 实际贴上的图片与位置，原比例重放时直接复用，无需再次缩放原图
+            self._pasted_art = pasted
+
+    def render_art_layer(self, scale_x: float = 1.0, scale_y: float = 1.0) -> Optional[Image.Image]:
+        """
+        在透明画布上按缩放比例重放插画贴图，插画直接从原图缩放到目标分辨率。
+        比例为 1 时与卡牌上的插画像素一致。
+
+        :return: RGBA 图层（尺寸为卡牌尺寸乘以比例），没有插画时返回 None
+        """
+        if self.art_placement is None:
+            return None
+        img, region, resize_mode, transform_params = self.art_placement
+        layer = Card.__new__(Card)
+        layer.image = Image.new('RGBA', (round(self.width * scale_x), round(self.height * scale_y)), (0, 0, 0, 0))
+        if scale_x == 1.0 and scale_y == 1.0:
+            pasted_img, position = self._pasted_art
+            layer.image.paste(pasted_img, position, pasted_img if pasted_img.mode == 'RGBA' else None)
+            return layer.image
+        x, y, width, height = region
+        scaled_region = (round(x * scale_x), round(y * scale_y), round(width * scale_x), round(height * scale_y))
+        if transform_params is not None:
+            # 裁剪量以原图像素计，无需换算；缩放与偏移按目标比例放大
+            offset = transform_params.get('offset', {'x': 0, 'y': 0})
+            scaled_params = dict(transform_params)
+            scaled_params['scale'] = transform_params.get('scale', 1.0) * scale_x
+            scaled_params['offset'] = {'x': offset.get('x', 0) * scale_x, 'y': offset.get('y', 0) * scale_y}
+            Card.paste_image_with_transform(layer, img, scaled_region, scaled_params)
+        else:
+            Card.paste_image(layer, img, scaled_region, resize_mode)
+        return layer.image
+
     def draw_centered_text(
             self, position,
             text,
@@ -1490,6 +1550,7 @@ class Card:
         #    但由于我们已经处理了背景，所以可以直接粘贴，使用alpha通道作为mask
         self.image.paste(blended_crop, position, mask=overlay_img.split()[3])
 
+    @render_metrics.timed('footer')
     def set_footer_information(self,
                                illustrator: str,
                                footer_copyright: str,
@@ -1640,15 +1701,17 @@ class Card:
                 effects=effects
             )
         if encounter_text:
-            self.draw_centered_text(
-                position=(pos_right_encounter_group_number[0], pos_right_encounter_group_number[1] + 9),
-                text=encounter_text,
-                font_name='收藏信息字体',
-                font_size=20,
-                font_color=font_color,
-                opacity=opacity,
-                effects=effects
-            )
+            self.footer_encounter_style = {
+                'position': (pos_right_encounter_group_number[0], pos_right_encounter_group_number[1] + 9),
+                'font_name': '收藏信息字体',
+                'font_size': 20,
+                'font_color': font_color,
+                'opacity': opacity,
+                'effects': effects,
+            }
+            start = len(self.last_render_list)
+            self.draw_centered_text(text=encounter_text, **self.footer_encounter_style)
+            self.footer_encounter_items = self.last_render_list[start:]
         if footer_icon_copy:
             self.paste_image(
                 footer_icon_copy,
@@ -1741,12 +1804,44 @@ class Card:
                 effects=effects
             )
 
+    def render_encounter_group_number(self, encounter_group_number: str) -> list[dict]:
+        """
+        按页脚样式在空白图层上重新排版遭遇组编号，返回对应的文字层元数据（不修改卡图）
+
+        调用方需保证字体管理器的语言与生成本卡时一致。
+        """
+        style = getattr(self, 'footer_encounter_style', None)
+        if style is None or not encounter_group_number:
+            return []
+        saved = (self.rich_renderer, self.last_render_list)
+        layer = Image.new('RGBA', self.image.size, (0, 0, 0, 0))
+        self.rich_renderer = RichTextRenderer(self.font_manager, self.image_manager, layer, lang=self.font_manager.lang)
+        self.last_render_list = []
+        try:
+            self.draw_centered_text(text=encounter_group_number, **style)
+            return self._render_items_metadata(self.last_render_list, encounter=True)
+        finally:
+            self.rich_renderer, self.last_render_list = saved
+
     def get_text_layer_metadata(self):
         """获取文字层元数据"""
-        text_layer_metadata = []
         if not hasattr(self, "last_render_list"):
             return
+        encounter_ids = {id(item) for item in getattr(self, 'footer_encounter_items', ())}
+        text_layer_metadata = []
         for item in self.last_render_list:
+            text_layer_metadata.extend(self._render_items_metadata([item], encounter=id(item) in encounter_ids))
+        return text_layer_metadata
+
+    @staticmethod
+    def _render_items_metadata(render_items: list[RenderItem], encounter: bool = False) -> list[dict]:
+        """
+        渲染项转为文字层元数据
+
+        :param encounter: 是否为页脚遭遇组编号（标记 role，导出副本时替换）
+        """
+        text_layer_metadata = []
+        for item in render_items:
             if isinstance(item.obj, TextObject):
                 text_layer_metadata.append({
                     "text": item.obj.text,
@@ -1775,4 +1870,8 @@ class Card:
                     "width": item.obj.width,
                     "height": item.obj.height,
                 })
+            else:
+                continue
+            if encounter:
+                text_layer_metadata[-1]["role"] = ENCOUNTER_NUMBER_ROLE
         return text_layer_metadata
@@ -1,14 +1,21 @@
 import enum
 import json
 import math
+import os
+import threading
 import time
-from typing import Dict, Any, Tuple, TypeVar, Type, Union, TYPE_CHECKING
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, List, Optional, Tuple, TypeVar, Type, Union, TYPE_CHECKING
 
 import numpy as np
-from PIL import Image, ImageFont, ImageDraw, ImageEnhance, ImageColor
+from PIL import Image, ImageFont, ImageDraw, ImageColor, ImageFilter
 
-from export_helper.LamaCleaner import LamaCleaner
+from Card import ENCOUNTER_NUMBER_ROLE
+from export_helper.LamaCleaner import DEFAULT_MAX_IN_FLIGHT, LamaCleaner
+from export_helper.bleed_cache import BleedCache
 from enhanced_draw import EnhancedDraw
+from bin.render_metrics import render_metrics
 
 if TYPE_CHECKING:
     from bin.workspace_manager import WorkspaceManager
@@ -51,7 +58,45 @@ class BleedModel(enum.Enum):
     LAMA = "LaMa模型出血"  # LaMa模型出血
 
 
-# --- 2. 导出助手类实现 ---
+# --- 2. 导出字体缓存 ---
+
+# 进程级导出字体缓存：(字体文件路径, 字号) -> 字体对象，所有 ExportHelper 实例共用。
+# 导出字号随 DPI 放大，与预览字号不同，FontManager 按访问频次准入的缓存很少收录它们。
+EXPORT_FONT_CACHE_LIMIT = 128
+_export_font_cache: 'OrderedDict[Tuple[str, int], ImageFont.FreeTypeFont]' = OrderedDict()
+_export_font_lock = threading.Lock()
+
+
+def get_export_font(font_manager, font_name: str, font_size: int) -> Optional[ImageFont.FreeTypeFont]:
+    """按字体文件路径与字号获取字体，同一 (字体, 字号) 在进程内只加载一次"""
+    font_path = font_manager.get_font_path(font_name)
+    if font_path is None:
+        # 找不到字体时沿用 FontManager 的处理（记录日志并返回 None）
+        return font_manager.get_font(font_name, font_size)
+
+    cache_key = (font_path, font_size)
+    with _export_font_lock:
+        font = _export_font_cache.get(cache_key)
+        if font is not None:
+            _export_font_cache.move_to_end(cache_key)
+            return font
+
+    font = ImageFont.truetype(font_path, font_size)
+    with _export_font_lock:
+        _export_font_cache[cache_key] = font
+        _export_font_cache.move_to_end(cache_key)
+        while len(_export_font_cache) > EXPORT_FONT_CACHE_LIMIT:
+            _export_font_cache.popitem(last=False)
+    return font
+
+
+def clear_export_font_cache():
+    """清空导出字体缓存（字体文件被替换时使用）"""
+    with _export_font_lock:
+        _export_font_cache.clear()
+
+
+# --- 3. 导出助手类实现 ---
 
 class ExportHelper:
     """
@@ -60,6 +105,8 @@ class ExportHelper:
     """
     # 毫米/英寸转换比
     MM_PER_INCH = 25.4
+    # 高 DPI 重贴插画时，插画蒙版向内收缩的像素数（300 DPI 下），避开 LANCZOS 放大时边框与插画混合的过渡带
+    NATIVE_ART_MASK_INSET = 3
 
     # 预设的规格尺寸 (宽, 高)，单位 mm
     SPECIFICATIONS: Dict[ExportSize, Tuple[float, float]] = {
@@ -117,15 +164,22 @@ class ExportHelper:
         self.brightness: float = float(config.get("brightness", 1.0))
         self.gamma: float = float(config.get("gamma", 1.0))
 
+        # 高于 300 DPI 时，插画区域直接从原图缩放到目标分辨率，而不是随底图一起放大
+        self.native_art: bool = bool(config.get("native_art", True))
+
         # 预计算最终的像素尺寸
         self.pixel_width, self.pixel_height = self.calculate_pixel_dimensions(self.dpi, self.bleed, self.size)
 
-        # 创建出血客户端
-        self.lama_cleaner = LamaCleaner(
-            base_url=self.workspace_manager.config.get('lama_baseurl', 'http://localhost:8080'),
+        # 出血客户端（同一服务的导出任务共用连接池与在途请求上限）
+        self.lama_baseurl: str = self.workspace_manager.config.get('lama_baseurl', 'http://localhost:8080').rstrip('/')
+        self.lama_cleaner = LamaCleaner.shared(
+            self.lama_baseurl,
+            max_in_flight=self.workspace_manager.config.get('lama_max_in_flight', DEFAULT_MAX_IN_FLIGHT),
         )
-        # 字体缓存：缓存已加载的字体对象，避免重复加载
-        self._font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        # LaMa 出血结果缓存（底图未变化时不再请求 lama-cleaner）
+        self.bleed_cache = self._create_bleed_cache()
+        # 加载失败的字体（名称, 字号）-> 默认字体，避免同一次导出重复告警
+        self._font_fallbacks: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
 
     def _parse_enum(self, value: Any, enum_class: Type[T], param_name: str) -> T:
         """一个通用的帮助函数，用于将输入值转换为指定的枚举类型。"""
@@ -190,6 +244,7 @@ class ExportHelper:
             "bleed_mm": self.bleed.value,
             "bleed_mode": self.bleed_mode.value,
             "bleed_model": self.bleed_model.value,
+            "native_art": self.native_art,
             "spec_name": self.size.value,
         }
         if self.format == ExportFormat.JPG:
@@ -221,15 +276,54 @@ class ExportHelper:
         )
         return summary
 
+    def _create_bleed_cache(self) -> Optional[BleedCache]:
+        """创建 LaMa 出血缓存（镜像出血在本地计算，比读写缓存更快，不使用缓存）"""
+        if self.bleed_model != BleedModel.LAMA:
+            return None
+        workspace_path = getattr(self.workspace_manager, 'workspace_path', None)
+        if not workspace_path:
+            return None
+        return BleedCache(os.path.join(workspace_path, '.cache', 'bleed'))
+
+    def _cached_lama(self, operation: str, image: Image.Image, target_size: Tuple[int, int],
+                     compute: Callable[..., Image.Image], params: Optional[Dict[str, Any]] = None,
+                     lama_kwargs: Optional[Dict[str, Any]] = None) -> Image.Image:
+        """
+        按输入像素与参数查找出血缓存，未命中时调用 lama-cleaner 并写入缓存
+
+        :param compute: 以 lama_kwargs 为关键字参数调用 lama-cleaner
+        :param params: 影响结果的其他参数（如角落遮罩）
+        :param lama_kwargs: 覆盖默认值的 LaMa 表单参数；缓存键包含服务器地址与实际发送的表单参数
+        """
+        lama_kwargs = lama_kwargs or {}
+        if self.bleed_cache is None:
+            return compute(**lama_kwargs)
+        key_params = dict(params or {}, lama_baseurl=self.lama_baseurl,
+                          lama_form=LamaCleaner.build_form_data(lama_kwargs))
+        key = BleedCache.make_key(image, operation, target_size, self.bleed_model.name, key_params)
+        cached = self.bleed_cache.get(key)
+        if cached is not None:
+            return cached
+        result = compute(**lama_kwargs)
+        self.bleed_cache.put(key, result)
+        return result
+
+    @render_metrics.timed('export_lama')
     def _call_lama_cleaner(self, image: Image, target_width: int, target_height: int) -> Image.Image:
         if self.bleed_model == BleedModel.LAMA:
-            return self.lama_cleaner.outpaint_extend(
-                original_image=image,
-                target_width=target_width,
-                target_height=target_height
+            return self._cached_lama(
+                'outpaint', image, (target_width, target_height),
+                lambda **kwargs: self.lama_cleaner.outpaint_extend(
+                    original_image=image,
+                    target_width=target_width,
+                    target_height=target_height,
+                    **kwargs
+                )
             )
         else:
-            # 镜像
+            # 镜像；出血图由导出流程独占，尺寸已符合时直接沿用，不再整图复制
+            if image.size == (target_width, target_height):
+                return image
             return self.lama_cleaner.outpaint_mirror_extend(
                 original_image=image,
                 target_width=target_width,
@@ -303,7 +397,19 @@ class ExportHelper:
                 submit_index += 1
         return card_map
 
-    def _bleeding(self, card_json: dict, card_map: Image.Image) -> Image:
+    @staticmethod
+    def _bleed_offset(before: Tuple[int, int], after: Tuple[int, int]) -> Tuple[int, int]:
+        """一次居中扩展/裁剪后，原图左上角在结果中的位置（与 LamaCleaner 的居中规则一致）"""
+        return tuple((a - b) // 2 if a >= b else -((b - a) // 2) for b, a in zip(before, after))
+
+    @render_metrics.timed('export_bleed')
+    def _bleed_card(self, card_json: dict, card_map: Image.Image) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        出血处理
+
+        :return: (出血后的底图, 原卡牌左上角在出血底图中的位置)
+        """
+        original_size = card_map.size
         # 判断为拉伸并计算最终像素尺寸
         # 对于调查员小卡，固定物理尺寸为 41x63mm（不受用户规格影响）
         if card_json.get('type', '') == '调查员小卡':
@@ -322,6 +428,8 @@ class ExportHelper:
         if card_json.get('use_external_image', 0) != 1:
             # 标准出血
             card_map = self._standard_bleeding(card_json, card_map)
+        standard_offset = self._bleed_offset(original_size, card_map.size)
+        standard_size = card_map.size
         # 二次出血
         if self._is_horizontal(card_map):
             card_map = self._call_lama_cleaner(card_map, height, width)
@@ -336,37 +444,49 @@ class ExportHelper:
             draw = ImageDraw.Draw(mask_optimized)
             # 在左上角0,0的位置画一个30的黑色矩形
             draw.rectangle([0, 0, 30, 30], fill=(255, 255, 255))
-            card_map = self.lama_cleaner.inpaint(
-                image=card_map,
-                mask=mask_optimized
+            source = card_map
+            card_map = self._cached_lama(
+                'corner', source, source.size,
+                lambda **kwargs: self.lama_cleaner.inpaint(image=source, mask=mask_optimized, **kwargs),
+                params={'mask': [0, 0, 30, 30]}
             )
 
-        return card_map
+        final_offset = self._bleed_offset(standard_size, card_map.size)
+        return card_map, (standard_offset[0] + final_offset[0], standard_offset[1] + final_offset[1])
+
+    def _submit_bleeding(self, card_json: dict, card_map: Image.Image) -> Future:
+        """
+        LaMa 出血在客户端后台线程中执行，调用方可以在等待推理时继续渲染另一面；
+        镜像出血在本地计算，直接同步完成
+        """
+        if self.bleed_model == BleedModel.LAMA:
+            return self.lama_cleaner.submit(self._bleed_card, card_json, card_map)
+        future = Future()
+        try:
+            future.set_result(self._bleed_card(card_json, card_map))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def _load_font(self, font_name: str, font_size: int) -> ImageFont.FreeTypeFont:
         """
-        加载字体，使用缓存机制避免重复加载相同的字体+大小组合
+        加载字体，使用进程级缓存，多次导出共用已加载的字体+大小组合
 
         :param font_name: 字体名称
         :param font_size: 字体大小
         :return: PIL字体对象
         """
         cache_key = (font_name, font_size)
+        if cache_key in self._font_fallbacks:
+            return self._font_fallbacks[cache_key]
 
-        # 检查缓存中是否已存在
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
-
-        # 加载字体并缓存
         try:
-            font = self.workspace_manager.creator.font_manager.get_font(font_name, font_size)
-            self._font_cache[cache_key] = font
-            return font
+            return get_export_font(self.workspace_manager.creator.font_manager, font_name, font_size)
         except Exception as e:
             print(f"警告：无法加载字体 {font_name} 大小 {font_size}，使用默认字体: {e}")
             # 使用默认字体作为备选
             default_font = ImageFont.load_default()
-            self._font_cache[cache_key] = default_font
+            self._font_fallbacks[cache_key] = default_font
             return default_font
 
     @staticmethod
@@ -404,17 +524,70 @@ class ExportHelper:
                 sanitized.append(cfg)
         return sanitized
 
-    def _draw_text_layer(self, card_map: Image.Image, text_layer: list[dict[str, any]]) -> Image.Image:
+    @render_metrics.timed('export_text_layer')
+    def _draw_text_layer(self, card_map: Image.Image, text_layer: list[dict[str, any]],
+                         art_card=None, art_offset: Tuple[int, int] = (0, 0)) -> Image.Image:
         """
         绘制文字层
         :param card_map: 卡片图像
         :param text_layer: 文字层元数据列表
+        :param art_card: 生成底图的 Card 对象，提供时按目标分辨率重贴插画
+        :param art_offset: 卡牌左上角在出血底图中的位置
         """
         # 注意：DPI 目标尺寸的缩放在本方法内进行。即使没有文字层（如玩家卡背/遭遇
         # 卡背等纯图片卡），也必须执行缩放，否则卡背会停留在默认 300 DPI 尺寸，
         # 在 DPI>300 时无法跟随正面尺寸。因此这里仅将空值归一化为列表，不再提前返回。
         if not text_layer:
             text_layer = []
+        card_map, text_offset = self._scale_card_map(card_map, art_card, art_offset)
+        card_map = self._stamp_text_items(card_map, text_layer, text_offset)
+        return self._finish_text_layer(card_map)
+
+    def _draw_text_layer_copies(self, card_map: Image.Image, text_layer: list[dict[str, any]],
+                                encounter_layers: List[list[dict[str, any]]],
+                                art_card=None, art_offset: Tuple[int, int] = (0, 0)) -> List[Image.Image]:
+        """
+        绘制只有页脚遭遇组编号不同的多个副本：底图只缩放一次，其余文字只绘制一次
+
+        :param encounter_layers: 每个副本的遭遇组编号文字层元数据
+        :return: 每个副本的图像
+        """
+        if not text_layer:
+            text_layer = []
+        shared_layer = [item for item in text_layer if item.get('role') != ENCOUNTER_NUMBER_ROLE]
+        card_map, text_offset = self._scale_card_map(card_map, art_card, art_offset)
+
+        if all(self._is_plain_text_item(item) for layer in encounter_layers for item in layer):
+            # 编号是无特效的普通文字（最后绘制，与其他文字不重叠），直接盖在共用底图上
+            card_map = self._stamp_text_items(card_map, shared_layer, text_offset)
+            return [
+                self._finish_text_layer(self._stamp_text_items(card_map.copy(), layer, text_offset))
+                for layer in encounter_layers
+            ]
+
+        # 带特效或半透明的编号与同组文字一起计算特效，逐个副本绘制文字层
+        return [
+            self._finish_text_layer(self._stamp_text_items(card_map.copy(), shared_layer + layer, text_offset))
+            for layer in encounter_layers
+        ]
+
+    def _is_plain_text_item(self, text_info: dict[str, any]) -> bool:
+        """是否为走快速路径（不透明、无特效）的文字项"""
+        if text_info.get('type') == 'image':
+            return False
+        try:
+            opacity = max(0, min(100, int(text_info.get('opacity', 100))))
+        except (ValueError, TypeError):
+            opacity = 100
+        return opacity == 100 and not self._prepare_effects(text_info.get('effects'))
+
+    def _scale_card_map(self, card_map: Image.Image, art_card=None,
+                        art_offset: Tuple[int, int] = (0, 0)) -> Tuple[Image.Image, Tuple[float, float, float]]:
+        """
+        将出血底图缩放到目标分辨率（按需重贴插画）
+
+        :return: (缩放后的图像, (DPI缩放比例, 文字x偏移, 文字y偏移))
+        """
         # 计算DPI缩放比例
         dpi_scale_factor = self.dpi / 300.0
         # 计算出血偏移量
@@ -426,10 +599,13 @@ class ExportHelper:
             target_width, target_height = self.pixel_width, self.pixel_height
         bleed_offset = (int((width - 739) / 2) * dpi_scale_factor, (int((height - 1049) / 2)) * dpi_scale_factor)
         # 先将card_map缩放到目标分辨率
+        bled_map = card_map
         if self._is_horizontal(card_map):
             card_map = card_map.resize((target_height, target_width), Image.Resampling.LANCZOS)
         else:
             card_map = card_map.resize((target_width, target_height), Image.Resampling.LANCZOS)
+        if art_card is not None and self.native_art:
+            card_map = self._paste_native_art(bled_map, card_map, art_card, art_offset)
 
         if self._is_horizontal(card_map):
             bleed_offset_x = bleed_offset[1]
@@ -437,7 +613,16 @@ class ExportHelper:
         else:
             bleed_offset_x = bleed_offset[0]
             bleed_offset_y = bleed_offset[1]
+        return card_map, (dpi_scale_factor, bleed_offset_x, bleed_offset_y)
+
+    def _stamp_text_items(self, card_map: Image.Image, text_layer: list[dict[str, any]],
+                          text_offset: Tuple[float, float, float]) -> Image.Image:
+        """
+        在已缩放的底图上绘制文字层元数据中的文字与图片项
 
+        :param text_offset: _scale_card_map 返回的 (DPI缩放比例, 文字x偏移, 文字y偏移)
+        """
+        dpi_scale_factor, bleed_offset_x, bleed_offset_y = text_offset
         # 性能优化：收集所有文本项后批量渲染
         enhanced_text_items = []  # [(position, text, font, fill, opacity, effects), ...]
         fast_text_items = []  # 无特效的快速路径 [(x, y, text, font, fill, border_width, border_color), ...]
@@ -542,7 +727,10 @@ class ExportHelper:
                     card_map.paste(img, (x, y), img)
                 else:
                     card_map.paste(img, (x, y))
+        return card_map
 
+    def _finish_text_layer(self, card_map: Image.Image) -> Image.Image:
+        """拉伸模式下将绘制完文字的图像缩放到最终尺寸"""
         if self.bleed_mode == BleedMode.STRETCH:
             if self._is_horizontal(card_map):
                 card_map = card_map.resize((self.pixel_height, self.pixel_width), Image.Resampling.LANCZOS)
@@ -550,66 +738,149 @@ class ExportHelper:
                 card_map = card_map.resize((self.pixel_width, self.pixel_height), Image.Resampling.LANCZOS)
         return card_map
 
+    @render_metrics.timed('export_native_art')
+    def _paste_native_art(self, bled_map: Image.Image, scaled_map: Image.Image, art_card,
+                          art_offset: Tuple[int, int]) -> Image.Image:
+        """
+        将放大后底图中的插画区域替换为从原图直接缩放到目标分辨率的插画。
+
+        只替换 300 DPI 底图中仍与插画像素完全一致的区域（未被牌框、图标、出血牌框覆盖），
+        并向内收缩 NATIVE_ART_MASK_INSET 像素后柔和过渡，牌框等界面元素保持不变。
+        """
+        if getattr(art_card, 'art_placement', None) is None:
+            return scaled_map
+        scale_x = scaled_map.width / bled_map.width
+        scale_y = scaled_map.height / bled_map.height
+        if scale_x <= 1.0 and scale_y <= 1.0:
+            return scaled_map
+
+        base_art = art_card.render_art_layer()
+        offset_x, offset_y = art_offset
+        base_region = bled_map.crop((offset_x, offset_y, offset_x + base_art.width, offset_y + base_art.height))
+        art_pixels = np.asarray(base_art)
+        matched = np.all(np.asarray(base_region.convert('RGBA')) == art_pixels, axis=2) & (art_pixels[..., 3] == 255)
+        if not matched.any():
+            return scaled_map
+
+        mask = Image.fromarray(matched.astype(np.uint8) * 255, 'L')
+        mask = mask.filter(ImageFilter.MinFilter(self.NATIVE_ART_MASK_INSET * 2 + 1))
+        native_art = art_card.render_art_layer(scale_x, scale_y)
+        mask = mask.resize(native_art.size, Image.Resampling.BILINEAR)
+
+        box = (round(offset_x * scale_x), round(offset_y * scale_y))
+        target = scaled_map.crop((box[0], box[1], box[0] + native_art.width, box[1] + native_art.height))
+        scaled_map.paste(Image.composite(native_art.convert(target.mode), target, mask), box)
+        return scaled_map
+
     def _clear_font_cache(self):
         """清除字体缓存"""
-        self._font_cache.clear()
+        self._font_fallbacks.clear()
+        clear_export_font_cache()
+
+    @staticmethod
+    def _build_adjustment_lut(brightness: float = 1.0, gamma: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将亮度与伽马合并为 256 项查找表（取整方式与 ImageEnhance / 原 float32 伽马计算一致）
+
+        :return: (颜色通道查找表, 透明通道查找表)，透明通道不受亮度影响，只做伽马
+        """
+        values = np.arange(256, dtype=np.float32)
+        color = values
+        if not math.isclose(brightness, 1.0):
+            color = np.clip(np.trunc(np.float32(brightness) * color), 0, 255)
+        alpha = values
+        if not math.isclose(gamma, 1.0):
+            def apply_gamma(channel):
+                channel = np.power(channel.astype(np.float32) / 255.0, gamma)
+                return np.clip(channel, 0, 1) * 255
+
+            color = apply_gamma(color)
+            alpha = apply_gamma(alpha)
+        return color.astype(np.uint8), alpha.astype(np.uint8)
 
     @staticmethod
+    @render_metrics.timed('export_adjust')
     def _apply_image_adjustments(image: Image.Image, saturation: float = 1.0,
                                  brightness: float = 1.0, gamma: float = 1.0) -> Image.Image:
         """
         应用饱和度、亮度和伽马调整到图像
 
+        亮度与伽马合并为一张查找表，经 Image.point 一次完成，不再生成整图浮点数组。
+
         :param image: 输入的PIL图像
         :param saturation: 饱和度调整因子 (1.0表示不变)
         :param brightness: 亮度调整因子 (1.0表示不变)
         :param gamma: 伽马调整因子 (1.0表示不变)
         :return: 调整后的图像
         """
-        # 应用饱和度调整
-        if not math.isclose(saturation, 1.0):
-            enhancer = ImageEnhance.Color(image)
-            image = enhancer.enhance(saturation)
-
-        # 应用亮度调整
-        if not math.isclose(brightness, 1.0):
-            enhancer = ImageEnhance.Brightness(image)
-            image = enhancer.enhance(brightness)
-
-        # 应用伽马调整
-        if not math.isclose(gamma, 1.0):
-            # 将图像转换为numpy数组进行处理
-            img_array = np.array(image, dtype=np.float32) / 255.0
-            # 应用伽马校正
-            img_array = np.power(img_array, gamma)
-            # 将值限制在0-1范围内
-            img_array = np.clip(img_array, 0, 1)
-            # 转换回0-255范围并创建图像
-            img_array = (img_array * 255).astype(np.uint8)
-            image = Image.fromarray(img_array)
+        adjust_saturation = not math.isclose(saturation, 1.0)
+        adjust_lut = not (math.isclose(brightness, 1.0) and math.isclose(gamma, 1.0))
+        if not adjust_saturation and not adjust_lut:
+            return image
+
+        if image.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+            image = image.convert('RGBA')
+
+        # 饱和度：与灰度图（整数亮度公式）做线性混合，透明通道保持不变；灰度图没有饱和度
+        if adjust_saturation and image.mode in ('RGB', 'RGBA'):
+            gray_mode = 'LA' if image.mode == 'RGBA' else 'L'
+            image = Image.blend(image.convert(gray_mode).convert(image.mode), image, saturation)
+
+        # 亮度 + 伽马：一次查表
+        if adjust_lut:
+            color_lut, alpha_lut = ExportHelper._build_adjustment_lut(brightness, gamma)
+            table = []
+            for band in image.getbands():
+                table.extend((alpha_lut if band == 'A' else color_lut).tolist())
+            image = image.point(table)
 
         return image
 
     def export_card(self, card_path: str):
         """导出"""
-        card_json = self.workspace_manager.get_file_content(card_path)
+        card_json = self.workspace_manager.read_card(card_path)
         if card_json is None:
             raise ValueError("无效的卡路径")
-        card_json = json.loads(card_json)
+        return self._export_card_json(card_json)[0]
+
+    def _export_card_json(self, card_json: Dict[str, Any],
+                          encounter_group_numbers: Optional[List[str]] = None) -> List[Image.Image]:
+        """
+        导出单面卡牌JSON
+
+        :param encounter_group_numbers: 各副本的遭遇组编号（卡牌只渲染一次），为None时只导出一张
+        :return: 每个副本的图像
+        """
         card_json = self.workspace_manager.creator._preprocessing_json(card_json)
-        card_layer = self.workspace_manager.generate_card_image(card_json, False)
-        card_map = self.workspace_manager.generate_card_image(card_json, True)
-        card_map_image = self._bleeding(card_json, card_map.image)
-        # 绘制文字层
-        text_layer = card_layer.get_text_layer_metadata()
-        card_map_image = self._draw_text_layer(card_map_image, text_layer)
-        card_map_image = self._apply_image_adjustments(
-            card_map_image,
-            saturation=self.saturation,
-            brightness=self.brightness,
-            gamma=self.gamma
-        )
-        return card_map_image
+        with render_metrics.span('export_card', card_type=str(card_json.get('type', ''))):
+            card_layer = self.workspace_manager.generate_card_image(card_json, False)
+            card_map = self.workspace_manager.generate_card_image(card_json, True)
+            card_map_image, art_offset = self._bleed_card(card_json, card_map.image)
+            # 绘制文字层
+            text_layer = card_layer.get_text_layer_metadata()
+            card_map_images = self._draw_copies(card_map_image, text_layer, card_layer, card_json,
+                                                encounter_group_numbers, card_map, art_offset)
+            return [
+                self._apply_image_adjustments(
+                    card_map_image,
+                    saturation=self.saturation,
+                    brightness=self.brightness,
+                    gamma=self.gamma
+                )
+                for card_map_image in card_map_images
+            ]
+
+    def _draw_copies(self, card_map_image: Image.Image, text_layer: Optional[list[dict[str, any]]], card_layer,
+                     card_json: Dict[str, Any], encounter_group_numbers: Optional[List[str]],
+                     art_card=None, art_offset: Tuple[int, int] = (0, 0)) -> List[Image.Image]:
+        """绘制文字层；给出多个遭遇组编号时第一个副本沿用渲染结果，其余副本只重新排版编号"""
+        if encounter_group_numbers is None:
+            return [self._draw_text_layer(card_map_image, text_layer, art_card, art_offset)]
+        encounter_layers = [[item for item in text_layer or [] if item.get('role') == ENCOUNTER_NUMBER_ROLE]]
+        for encounter_group_number in encounter_group_numbers[1:]:
+            encounter_layers.append(self.workspace_manager.render_encounter_group_number(
+                card_layer, card_json, encounter_group_number))
+        return self._draw_text_layer_copies(card_map_image, text_layer, encounter_layers, art_card, art_offset)
 
     # 在ExportHelper类中添加以下方法
 
@@ -623,11 +894,44 @@ class ExportHelper:
         Returns:
             dict: 包含'front'和'back'键的字典，值为PIL.Image对象
         """
-        card_json = self.workspace_manager.get_file_content(card_path)
+        card_json = self.workspace_manager.read_card(card_path)
         if card_json is None:
             raise ValueError("无效的卡路径")
-        card_json = json.loads(card_json)
+        return self._export_double_sided_json(card_json)[0]
+
+    def export_card_copies(self, card_path: str,
+                           encounter_group_numbers: List[str]) -> List[Union[Image.Image, Dict[str, Image.Image]]]:
+        """
+        导出只有正面页脚遭遇组编号不同的多个副本（经典模式编号）
+
+        卡牌只渲染和出血一次，其余副本只重新绘制页脚编号。
+
+        Args:
+            card_path: 卡牌文件路径
+            encounter_group_numbers: 各副本的遭遇组编号，如 ["11/20", "12/20", "13/20"]
 
+        Returns:
+            每个副本的导出结果，格式与 export_card_auto 相同
+        """
+        card_json = self.workspace_manager.read_card(card_path)
+        if card_json is None:
+            raise ValueError("无效的卡路径")
+        if not encounter_group_numbers:
+            return []
+        card_json['encounter_group_number'] = encounter_group_numbers[0]
+
+        if card_json.get('version', '') == '2.0':
+            return self._export_double_sided_json(card_json, encounter_group_numbers)
+        return self._export_card_json(card_json, encounter_group_numbers)
+
+    def _export_double_sided_json(self, card_json: Dict[str, Any],
+                                  encounter_group_numbers: Optional[List[str]] = None) -> List[Dict[str, Image.Image]]:
+        """
+        导出双面卡牌JSON
+
+        :param encounter_group_numbers: 各副本的正面遭遇组编号（卡牌只渲染一次，各副本共用背面），为None时只导出一张
+        :return: 每个副本的 {'front', 'back'}
+        """
         # 检查版本号判断是否为双面卡牌
         version = card_json.get('version', '')
         if version != '2.0':
@@ -639,20 +943,12 @@ class ExportHelper:
 
         # 处理正面
         print("正在处理正面卡牌...")
-        front_layer = self.workspace_manager.generate_card_image(card_json, False)
-        front_map = self.workspace_manager.generate_card_image(card_json, True)
-        front_map_image = self._bleeding(card_json, front_map.image)
-
-        # 绘制正面文字层
-        front_text_layer = front_layer.get_text_layer_metadata()
-        front_map_image = self._draw_text_layer(front_map_image, front_text_layer)
-        front_map_image = self._apply_image_adjustments(
-            front_map_image,
-            saturation=self.saturation,
-            brightness=self.brightness,
-            gamma=self.gamma
-        )
-        result['front'] = front_map_image
+        with render_metrics.span('export_card', card_type=str(card_json.get('type', ''))):
+            front_layer = self.workspace_manager.generate_card_image(card_json, False)
+            front_map = self.workspace_manager.generate_card_image(card_json, True)
+            front_text_layer = front_layer.get_text_layer_metadata()
+            # 正面出血请求发出后先渲染背面，最后再取回结果绘制文字
+            front_bleeding = self._submit_bleeding(card_json, front_map.image)
 
         # 处理背面
         back_json = card_json.get('back', None)
@@ -688,25 +984,42 @@ class ExportHelper:
             except Exception:
                 pass
 
-            back_layer = self.workspace_manager.generate_card_image(back_json, False)
-            back_map = self.workspace_manager.generate_card_image(back_json, True)
-            back_map_image = self._bleeding(back_json, back_map.image)
-
-            # 绘制背面文字层
-            back_text_layer = back_layer.get_text_layer_metadata()
-            back_map_image = self._draw_text_layer(back_map_image, back_text_layer)
-            back_map_image = self._apply_image_adjustments(
-                back_map_image,
-                saturation=self.saturation,
-                brightness=self.brightness,
-                gamma=self.gamma
-            )
+            with render_metrics.span('export_card', card_type=str(back_json.get('type', ''))):
+                back_layer = self.workspace_manager.generate_card_image(back_json, False)
+                back_map = self.workspace_manager.generate_card_image(back_json, True)
+                back_map_image, back_art_offset = self._bleed_card(back_json, back_map.image)
+
+                # 绘制背面文字层
+                back_text_layer = back_layer.get_text_layer_metadata()
+                back_map_image = self._draw_text_layer(back_map_image, back_text_layer, back_map, back_art_offset)
+                back_map_image = self._apply_image_adjustments(
+                    back_map_image,
+                    saturation=self.saturation,
+                    brightness=self.brightness,
+                    gamma=self.gamma
+                )
             result['back'] = back_map_image
         else:
             print("警告：双面卡牌缺少背面数据")
             result['back'] = None
 
-        return result
+        with render_metrics.span('export_card', card_type=str(card_json.get('type', ''))):
+            front_map_image, front_art_offset = front_bleeding.result()
+
+            # 绘制正面文字层
+            front_map_images = self._draw_copies(front_map_image, front_text_layer, front_layer, card_json,
+                                                 encounter_group_numbers, front_map, front_art_offset)
+            front_map_images = [
+                self._apply_image_adjustments(
+                    front_map_image,
+                    saturation=self.saturation,
+                    brightness=self.brightness,
+                    gamma=self.gamma
+                )
+                for front_map_image in front_map_images
+            ]
+
+        return [{'front': front_map_image, 'back': result['back']} for front_map_image in front_map_images]
 
     def export_card_auto(self, card_path: str) -> Union[Image.Image, Dict[str, Image.Image]]:
         """
@@ -718,10 +1031,9 @@ class ExportHelper:
         Returns:
             单面卡牌返回Image对象，双面卡牌返回包含'front'和'back'的字典
         """
-        card_json = self.workspace_manager.get_file_content(card_path)
+        card_json = self.workspace_manager.read_card(card_path)
         if card_json is None:
             raise ValueError("无效的卡路径")
-        card_json = json.loads(card_json)
 
         # 检查版本号判断是否为双面卡牌
         version = card_json.get('version', '')
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import Optional, Dict, Tuple
 import time
 import threading
+import logging
 
 from PIL import Image, ImageFont
 
@@ -384,13 +385,17 @@ class ImageManager:
             if img:
                 # 缓存到内存
                 self.image_map[key] = img
-                logger_manager.info(f"[ImageManager] 懒加载图片: {image_name} (key: {key})")
+                logger_manager.debug("[ImageManager] 懒加载图片: %s (key: %s)", image_name, key, category='render')
                 return img
 
-        # 找不到，打印调试信息
-        logger_manager.info(f"[ImageManager] 找不到图片: {image_name} (key: {key})")
-        logger_manager.info(f"[ImageManager] 可用的英文键示例: {list(self.available_images.keys())[:5]}")
-        logger_manager.info(f"[ImageManager] 可用的中文键示例: {list(self.name_mapping.keys())[:5]}")
+        # 找不到，打印调试信息（同名缺图只限流记录，示例键列表仅在 DEBUG 下计算）
+        logger_manager.info("[ImageManager] 找不到图片: %s (key: %s)", image_name, key,
+                            category='render', key=('image-miss', key), interval=30.0)
+        if logger_manager.is_enabled_for(logging.DEBUG, category='render'):
+            logger_manager.debug("[ImageManager] 可用的英文键示例: %s", list(self.available_images.keys())[:5],
+                                 category='render')
+            logger_manager.debug("[ImageManager] 可用的中文键示例: %s", list(self.name_mapping.keys())[:5],
+                                 category='render')
 
         return None
 
@@ -439,7 +444,7 @@ class ImageManager:
         # 规范化路径（处理 .. 和 . 等）
         actual_path = os.path.normpath(actual_path)
 
-        logger_manager.info(f"[ImageManager] 尝试加载图片: {actual_path}")
+        logger_manager.debug("[ImageManager] 尝试加载图片: %s", actual_path, category='render')
 
         # 尝试打开图片
         if os.path.exists(actual_path):
@@ -450,12 +455,13 @@ class ImageManager:
                         img = img.convert('RGBA')
                     # 复制到内存，确保原文件可以安全关闭
                     img_copy = img.copy()
-                logger_manager.info(f"[ImageManager] 成功加载图片: {actual_path}")
+                logger_manager.debug("[ImageManager] 成功加载图片: %s", actual_path, category='render')
                 return img_copy
             except Exception as e:
                 logger_manager.info(f"[ImageManager] 打开图片失败 {actual_path}: {str(e)}")
         else:
-            logger_manager.info(f"[ImageManager] 图片文件不存在: {actual_path}")
+            logger_manager.info("[ImageManager] 图片文件不存在: %s", actual_path,
+                                category='render', key=('image-src-miss', actual_path), interval=30.0)
 
         # 文件不存在或打开失败，返回默认的灰色矩形
         return self._create_default_image()
@@ -469,7 +475,7 @@ class ImageManager:
         :return: PIL.Image对象
         """
         img = Image.new('RGB', (width, height), color)
-        logger_manager.info(f"[ImageManager] 创建默认图片: {width}x{height}, 颜色: {color}")
+        logger_manager.debug("[ImageManager] 创建默认图片: %sx%s, 颜色: %s", width, height, color, category='render')
         return img
 
 
@@ -490,11 +496,15 @@ class FontManager:
         self.font_folder = get_resource_path(font_folder)
         self.additional_font_folders = []  # 额外字体目录列表
         self.language_configs = {}
-        self.lang = None
-        self.silence = False  # 静默模式
+        # 当前语言与静默模式按线程保存，并行渲染不同语言的卡牌时互不干扰；
+        # 未设置过的线程使用初始化时的默认值
+        self._local = threading.local()
+        self._default_lang = None
+        self._default_silence = False
         self.font_cache_limit = FONT_CACHE_LIMIT
         self._font_access_counts: Dict[Tuple[str, int], int] = {}
         self._font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self._font_lock = threading.Lock()
         self.text_box_cache_limit = TEXT_BOX_CACHE_LIMIT
         self._text_box_cache_file = os.path.join(config_dir_manager.get_global_config_dir(), TEXT_BOX_CACHE_FILE)
         self._text_box_cache: Dict[str, Tuple[str, int, str, int, int]] = {}
@@ -516,9 +526,28 @@ class FontManager:
         self._load_language_configs()
         # 设置默认语言
         self.set_lang(lang)
+        self._default_lang = self.lang
         # 加载文本盒缓存
         self._load_text_box_cache()
 
+    @property
+    def lang(self) -> Optional[str]:
+        """当前线程的语言"""
+        return getattr(self._local, 'lang', self._default_lang)
+
+    @lang.setter
+    def lang(self, value: Optional[str]):
+        self._local.lang = value
+
+    @property
+    def silence(self) -> bool:
+        """当前线程是否为静默模式"""
+        return getattr(self._local, 'silence', self._default_silence)
+
+    @silence.setter
+    def silence(self, value: bool):
+        self._local.silence = value
+
     def add_font_folder(self, folder: str):
         """添加额外的字体目录，并重新加载字体"""
         try:
@@ -574,7 +603,7 @@ class FontManager:
                     self.font_map[key] = font_path
                     loaded_count += 1
 
-                    logger_manager.info(f"[FontManager] #{loaded_count}: {filename} (key: {key}) 来自 {folder}")
+                    logger_manager.debug("[FontManager] #%s: %s (key: %s) 来自 %s", loaded_count, filename, key, folder)
 
             logger_manager.info(f"[FontManager] 成功加载 {loaded_count} 个字体")
             if self.font_map:
@@ -771,23 +800,26 @@ class FontManager:
         if font_path is None:
             return None
 
-        self._font_access_counts[font_key] = self._font_access_counts.get(font_key, 0) + 1
-
-        if font_key in self._font_cache:
-            logger_manager.info(f"[FontManager] 缓存命中 {font_name} (大小: {size})")
-            return self._font_cache[font_key]
+        with self._font_lock:
+            self._font_access_counts[font_key] = self._font_access_counts.get(font_key, 0) + 1
+            font_obj = self._font_cache.get(font_key)
+        if font_obj is not None:
+            logger_manager.debug("[FontManager] 缓存命中 %s (大小: %s)", font_name, size, category='render')
+            return font_obj
 
         try:
             font_obj = ImageFont.truetype(font_path, size)
-            self._maybe_cache_font(font_key, font_obj)
+            with self._font_lock:
+                self._maybe_cache_font(font_key, font_obj)
             return font_obj
         except Exception as e:
             if not self.silence:
-                logger_manager.info(f"[FontManager] 无法加载字体 {font_name} (大小: {size}): {str(e)}")
+                logger_manager.info("[FontManager] 无法加载字体 %s (大小: %s): %s", font_name, size, e,
+                                    category='render', key=('font-load-failed', font_name), interval=30.0)
             return None
 
     def _maybe_cache_font(self, font_key: Tuple[str, int], font_obj: ImageFont.FreeTypeFont):
-        """记录访问后，将高频字体加入缓存并控制容量"""
+        """记录访问后，将高频字体加入缓存并控制容量（调用方持有 _font_lock）"""
         if self.font_cache_limit <= 0:
             return
 
@@ -847,9 +879,12 @@ class FontManager:
 
         # 找不到
         if not self.silence:
-            logger_manager.info(f"[FontManager] 找不到字体: {font_name} (key: {key})")
-            logger_manager.info(f"[FontManager] 可用的英文键: {list(self.font_map.keys())}")
-            logger_manager.info(f"[FontManager] 可用的中文键: {list(self.name_mapping.keys())}")
+            logger_manager.info("[FontManager] 找不到字体: %s (key: %s)", font_name, key,
+                                category='render', key=('font-miss', key), interval=30.0)
+            if logger_manager.is_enabled_for(logging.DEBUG, category='render'):
+                logger_manager.debug("[FontManager] 可用的英文键: %s", list(self.font_map.keys()), category='render')
+                logger_manager.debug("[FontManager] 可用的中文键: %s", list(self.name_mapping.keys()),
+                                     category='render')
 
         return None
 
@@ -1051,7 +1086,7 @@ class FontManager:
             height = int(bbox[3] - bbox[1])
         except Exception as e:
             if not self.silence:
-                logger_manager.info(f"[FontManager] 计算文本盒失败: {e}")
+                logger_manager.info("[FontManager] 计算文本盒失败: %s", e, category='render', interval=30.0)
             return 0, 0
 
         self._store_text_box_cache_entry(key_hash, resolved_font_name, font_size, text, width, height)
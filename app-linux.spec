@@ -28,6 +28,11 @@ a = Analysis(
         'PyQt6.QtWebEngineWidgets',
         # pywebview 平台模块
         'webview.platforms.qt',
+        # watchdog 按平台动态加载监听后端
+        'watchdog.observers.inotify',
+        'watchdog.observers.inotify_buffer',
+        'watchdog.observers.inotify_c',
+        'watchdog.observers.polling',
     ],
     hookspath=[],
     hooksconfig={},
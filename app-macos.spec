@@ -53,6 +53,10 @@ hidden_imports = [
     'cloudinary',
     'pydantic',
     'pydantic_core',
+    # watchdog 按平台动态加载监听后端
+    'watchdog.observers.fsevents',
+    '_watchdog_fsevents',
+    'watchdog.observers.polling',
 ] + flask_submodules + jinja2_submodules + werkzeug_submodules + webview_submodules + cv2_submodules
 
 # 数据文件
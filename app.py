@@ -27,14 +27,36 @@ if not IS_ANDROID:
         action='store_true',
         help='强制执行 DLL 解锁，忽略标记文件（仅 Windows）'
     )
+    parser.add_argument(
+        '--startup',
+        type=str,
+        default='lazy',
+        choices=['lazy', 'eager'],
+        help='启动模式：lazy 延迟导入并在后台预热字体/图片资源；eager 打开工作空间时同步初始化'
+    )
+    parser.add_argument(
+        '--startup-report',
+        action='store_true',
+        help='记录导入耗时与首个窗口显示耗时（类似 python -X importtime），写入日志'
+    )
     args = parser.parse_args()
     DEBUG_MODE = args.debug
     IMAGE_MODE = args.mode
     FORCE_UNLOCK = args.force_unlock
+    STARTUP_MODE = args.startup
+    STARTUP_REPORT = args.startup_report
 else:
     DEBUG_MODE = False
     IMAGE_MODE = 'normal'
     FORCE_UNLOCK = False
+    STARTUP_MODE = 'lazy'
+    STARTUP_REPORT = False
+
+startup_profiler = None
+if STARTUP_REPORT:
+    from bin.startup_profiler import StartupProfiler
+
+    startup_profiler = StartupProfiler().install()
 
 # 在最开始处添加
 if hasattr(sys, '_MEIPASS'):  # 打包模式
@@ -46,11 +68,22 @@ if hasattr(sys, '_MEIPASS'):  # 打包模式
     sys.stderr = sys.stdout
 
 os.environ['APP_MODE'] = IMAGE_MODE
+os.environ['APP_STARTUP_MODE'] = STARTUP_MODE
 
 from server import app
 
 app.window = None
 
+
+def _report_startup():
+    """首个窗口显示后输出启动耗时报告"""
+    if startup_profiler is None:
+        return
+    startup_profiler.mark_first_window()
+    startup_profiler.uninstall()
+    from bin.logger import logger_manager
+    logger_manager.info(startup_profiler.format_report())
+
 if __name__ == '__main__':
     try:
         import webview
@@ -65,6 +98,8 @@ if __name__ == '__main__':
         )
 
         app.window = window
+        if startup_profiler is not None:
+            window.events.shown += _report_startup
         webview.start(debug=DEBUG_MODE)
 
     except Exception as e:
@@ -12,7 +12,12 @@ a = Analysis(
         ('cardback', 'cardback'),
         ('templates', 'templates'),
     ],
-    hiddenimports=[],
+    hiddenimports=[
+        # watchdog 按平台动态加载监听后端
+        'watchdog.observers.read_directory_changes',
+        'watchdog.observers.winapi',
+        'watchdog.observers.polling',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,7 @@
+"""
+性能基准与渲染回归工具
+
+在仓库根目录运行，例如::
+
+    python -m benchmarks.bench_render --output bench.json
+"""
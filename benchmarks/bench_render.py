@@ -0,0 +1,327 @@
+"""
+渲染/导出性能基准
+
+对黄金语料逐卡测量：渲染延迟（generate_card_image + JPEG 编码）、字号试排次数、
+进程峰值内存，以及 ExportHelper.export_card_auto 与 PNPExporter 的导出吞吐。
+全部使用镜像出血，离线且结果可复现。
+
+用法::
+
+    python -m benchmarks.bench_render --output bench.json
+    python -m benchmarks.bench_render --baseline bench.json --threshold 0.2
+
+对比模式下发现回归时退出码为 1。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks import corpus
+
+SCHEMA_VERSION = 1
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """进程峰值常驻内存（字节）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    except Exception:
+        return None
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        'min_ms': round(min(samples) * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'runs': len(samples),
+    }
+
+
+def _layout_trials(render_metrics) -> int:
+    return int(sum(item['sum'] for item in render_metrics.snapshot()['counts']
+                   if item['name'] == 'text_fit_trials'))
+
+
+def _render_once(workspace, name: str):
+    """按 /api/generate-card 的路径渲染一次，返回 (卡牌类型, 是否成功)"""
+    card_json = json.loads(workspace.get_file_content(name))
+    corpus.reset_random_state()
+    images = []
+    if card_json.get('version', '') == '2.0':
+        result = workspace.generate_double_sided_card_image(card_json)
+        if result:
+            images = [card.image for card in result.values() if card is not None]
+    else:
+        card = workspace.generate_card_image(card_json)
+        if card is not None:
+            images = [card.image]
+    for image in images:
+        buffer = io.BytesIO()
+        image.convert('RGB').save(buffer, format='JPEG', quality=95)
+    return card_json.get('type', ''), bool(images)
+
+
+def bench_render(workspace, names: List[str], repeat: int, warmup: int) -> Dict[str, Any]:
+    from bin.render_metrics import render_metrics
+
+    results = {}
+    for name in names:
+        for _ in range(warmup):
+            _render_once(workspace, name)
+
+        samples = []
+        trials = 0
+        card_type, ok = '', False
+        for run in range(repeat):
+            render_metrics.reset()
+            started = time.perf_counter()
+            card_type, ok = _render_once(workspace, name)
+            samples.append(time.perf_counter() - started)
+            if run == 0:
+                trials = _layout_trials(render_metrics)
+            if not ok:
+                break
+
+        entry = {'type': card_type, 'status': 'ok' if ok else 'error'}
+        if ok:
+            entry.update(_summarize(samples))
+            entry['layout_trials'] = trials
+        peak = peak_rss_bytes()
+        entry['peak_rss_mb'] = round(peak / 1048576, 1) if peak else None
+        results[name] = entry
+    return results
+
+
+def bench_export(workspace, names: List[str], repeat: int) -> Dict[str, Any]:
+    from ExportHelper import ExportHelper
+
+    helper = ExportHelper(dict(corpus.EXPORT_PARAMS), workspace)
+    results = {}
+    total_time = 0.0
+    exported = 0
+    for name in names:
+        samples = []
+        status = 'ok'
+        for _ in range(repeat):
+            corpus.reset_random_state()
+            started = time.perf_counter()
+            try:
+                result = helper.export_card_auto(name)
+            except Exception as e:
+                status = f'error: {e}'
+                break
+            samples.append(time.perf_counter() - started)
+            if result is None:
+                status = 'error'
+                break
+        entry = {'status': status}
+        if status == 'ok':
+            entry.update(_summarize(samples))
+            total_time += sum(samples)
+            exported += len(samples)
+        results[name] = entry
+    return {
+        'cards': results,
+        'cards_per_second': round(exported / total_time, 3) if total_time else None,
+    }
+
+
+def bench_pnp(workspace, names: List[str]) -> Dict[str, Any]:
+    from bin.pnp_exporter import PNPExporter
+
+    double_sided = [name for name in names
+                    if json.loads(workspace.get_file_content(name)).get('version', '') == '2.0']
+    if not double_sided:
+        return {'status': 'skipped', 'reason': '语料中没有双面卡牌'}
+
+    output_dir = tempfile.mkdtemp(prefix='arkham-bench-pnp-')
+    try:
+        exporter = PNPExporter(dict(corpus.EXPORT_PARAMS), workspace)
+        corpus.reset_random_state()
+        started = time.perf_counter()
+        result = exporter.export_pnp(
+            [{'filename': name} for name in double_sided],
+            os.path.join(output_dir, 'bench.pdf'),
+            mode='single_card'
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    cards_exported = result.get('cards_exported', 0) if result.get('success') else 0
+    return {
+        'status': 'ok' if result.get('success') else f"error: {result.get('error', '')}",
+        'cards': len(double_sided),
+        'cards_exported': cards_exported,
+        'seconds': round(elapsed, 3),
+        'cards_per_second': round(cards_exported / elapsed, 3) if elapsed and cards_exported else None,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+            min_delta_ms: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    与基线比较，返回回归列表
+
+    延迟类指标以中位数比较，只有同时超过相对阈值和绝对阈值（min_delta_ms）才算回归；
+    试排次数是确定性的，任何增加都算回归；吞吐下降超过阈值算回归。
+    """
+    regressions = []
+
+    def check_latency(section: str, name: str, now: Dict, before: Dict):
+        if now.get('status') != 'ok' or before.get('status') != 'ok':
+            if before.get('status') == 'ok':
+                regressions.append({'section': section, 'card': name, 'metric': 'status',
+                                    'baseline': 'ok', 'current': now.get('status')})
+            return
+        old, new = before['median_ms'], now['median_ms']
+        if new > old * (1 + threshold) and new - old >= min_delta_ms:
+            regressions.append({'section': section, 'card': name, 'metric': 'median_ms',
+                                'baseline': old, 'current': new,
+                                'ratio': round(new / old, 3) if old else None})
+
+    for name, now in current.get('render', {}).items():
+        before = baseline.get('render', {}).get(name)
+        if not before:
+            continue
+        check_latency('render', name, now, before)
+        if now.get('layout_trials', 0) > before.get('layout_trials', 0) and before.get('status') == 'ok':
+            regressions.append({'section': 'render', 'card': name, 'metric': 'layout_trials',
+                                'baseline': before['layout_trials'], 'current': now['layout_trials']})
+
+    for name, now in current.get('export', {}).get('cards', {}).items():
+        before = baseline.get('export', {}).get('cards', {}).get(name)
+        if before:
+            check_latency('export', name, now, before)
+
+    for section in ('export', 'pnp'):
+        old = baseline.get(section, {}).get('cards_per_second')
+        new = current.get(section, {}).get('cards_per_second')
+        if old and new is not None and new < old / (1 + threshold):
+            regressions.append({'section': section, 'card': None, 'metric': 'cards_per_second',
+                                'baseline': old, 'current': new})
+
+    old_rss = baseline.get('meta', {}).get('peak_rss_mb')
+    new_rss = current.get('meta', {}).get('peak_rss_mb')
+    if old_rss and new_rss and new_rss > old_rss * (1 + threshold):
+        regressions.append({'section': 'meta', 'card': None, 'metric': 'peak_rss_mb',
+                            'baseline': old_rss, 'current': new_rss})
+    return regressions
+
+
+def run(args) -> Dict[str, Any]:
+    corpus.ensure_import_path()
+    from bin.render_metrics import render_metrics
+
+    workspace_path = corpus.prepare_workspace(args.corpus)
+    try:
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            workspace = corpus.open_workspace(workspace_path)
+            render_metrics.set_enabled(True)
+            names = corpus.list_corpus(args.corpus, args.filter)
+
+            started = time.perf_counter()
+            report = {'render': bench_render(workspace, names, args.repeat, args.warmup)}
+            if not args.skip_export:
+                report['export'] = bench_export(workspace, names, args.export_repeat)
+            if not args.skip_pnp:
+                report['pnp'] = bench_pnp(workspace, names)
+            elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workspace_path, ignore_errors=True)
+
+    peak = peak_rss_bytes()
+    report['meta'] = {
+        'schema': SCHEMA_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cards': len(names),
+        'repeat': args.repeat,
+        'bleed_model': corpus.EXPORT_PARAMS['bleed_model'],
+        'dpi': corpus.EXPORT_PARAMS['dpi'],
+        'total_seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak / 1048576, 1) if peak else None,
+    }
+    return report
+
+
+def _print_summary(report: Dict[str, Any], regressions: Optional[List[Dict[str, Any]]]):
+    print(f"{'card':<40} {'type':<10} {'median ms':>10} {'trials':>7}")
+    for name, entry in report['render'].items():
+        median = f"{entry['median_ms']:.1f}" if entry.get('status') == 'ok' else entry.get('status')
+        print(f"{name:<40} {entry.get('type', ''):<10} {median:>10} {entry.get('layout_trials', '-'):>7}")
+    if 'export' in report:
+        print(f"export_card_auto: {report['export']['cards_per_second']} cards/s")
+    if 'pnp' in report:
+        print(f"PNPExporter: {report['pnp'].get('cards_per_second')} cards/s ({report['pnp'].get('status')})")
+    print(f"peak RSS: {report['meta']['peak_rss_mb']} MB, total {report['meta']['total_seconds']} s")
+    if regressions is not None:
+        if regressions:
+            print(f"发现 {len(regressions)} 项回归:")
+            for item in regressions:
+                print(f"  [{item['section']}] {item['card'] or '-'} {item['metric']}: "
+                      f"{item['baseline']} -> {item['current']}")
+        else:
+            print("与基线相比没有回归")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='卡牌渲染/导出性能基准')
+    parser.add_argument('--corpus', default=None, help='语料目录（默认 benchmarks/corpus）')
+    parser.add_argument('--filter', default=None, help='只运行文件名包含该子串的卡牌')
+    parser.add_argument('--repeat', type=int, default=3, help='每张卡的渲染次数')
+    parser.add_argument('--warmup', type=int, default=1, help='每张卡的预热次数（不计时）')
+    parser.add_argument('--export-repeat', type=int, default=1, help='每张卡的导出次数')
+    parser.add_argument('--skip-export', action='store_true', help='跳过 ExportHelper 导出基准')
+    parser.add_argument('--skip-pnp', action='store_true', help='跳过 PNPExporter 基准')
+    parser.add_argument('--output', default=None, help='结果 JSON 输出路径（默认输出到标准输出）')
+    parser.add_argument('--baseline', default=None, help='基线 JSON 路径，指定后进入对比模式')
+    parser.add_argument('--threshold', type=float, default=0.2, help='相对回归阈值（默认 0.2 即 20%%）')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='延迟回归的最小绝对差值')
+    parser.add_argument('--verbose', action='store_true', help='保留渲染过程中的打印输出')
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        report['regressions'] = regressions
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        _print_summary(report, regressions)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+黄金卡牌语料
+
+benchmarks/corpus/ 下的 .card 覆盖 CardCreator.create_card 分派的全部卡牌类型，
+以及中英文长正文、重特效、v2.0 双面卡和大尺寸插画。插画由固定种子生成，不随仓库提交。
+"""
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CORPUS_DIR = Path(__file__).resolve().parent / 'corpus'
+
+# 插画文件名 -> 尺寸（宽, 高）
+ART_SIZES = {
+    'art/large_art.png': (4000, 3000),
+    'art/portrait.png': (1200, 1800),
+}
+ART_SEED = 20240601
+
+# 覆盖全局/工作空间配置中会影响渲染结果的字段，保证不同机器输出一致
+DETERMINISTIC_CONFIG = {
+    'footer_copyright': '',
+    'footer_icon_dir': '',
+    'encounter_groups_dir': '',
+    # 基准与回归只使用镜像出血，不访问 LaMa 服务
+    'lama_baseurl': 'http://127.0.0.1:9',
+}
+
+# 镜像出血的导出参数（离线、确定性）
+EXPORT_PARAMS = {
+    'format': 'PNG',
+    'size': '63.5mm × 88.9mm (2.5″ × 3.5″)',
+    'dpi': 300,
+    'bleed': 2,
+    'bleed_mode': '裁剪',
+    'bleed_model': '镜像出血',
+    'quality': 95,
+    'saturation': 1.0,
+    'brightness': 1.0,
+    'gamma': 1.0,
+}
+
+
+def ensure_import_path():
+    """保证从任意目录运行时都能导入仓库根目录下的模块"""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def list_corpus(corpus_dir: Optional[str] = None, pattern: Optional[str] = None) -> List[str]:
+    """返回语料中的卡牌文件名（按文件名排序），pattern 为子串过滤"""
+    directory = Path(corpus_dir) if corpus_dir else CORPUS_DIR
+    names = sorted(p.name for p in directory.glob('*.card'))
+    if pattern:
+        names = [name for name in names if pattern in name]
+    return names
+
+
+def load_card(name: str, corpus_dir: Optional[str] = None) -> Dict:
+    directory = Path(corpus_dir) if corpus_dir else CORPUS_DIR
+    with open(directory / name, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate_art(workspace_path: str):
+    """按固定种子生成插画（渐变 + 噪点，保证缩放/出血有真实的像素负载）"""
+    import numpy as np
+    from PIL import Image
+
+    for relative_path, (width, height) in ART_SIZES.items():
+        target = os.path.join(workspace_path, relative_path)
+        if os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # 逐通道用 uint8/uint16 计算，避免生成插画本身抬高基准测得的峰值内存
+        rng = np.random.default_rng(ART_SEED + width)
+        x = np.linspace(0, 200, width).astype(np.uint16)[None, :]
+        y = np.linspace(0, 200, height).astype(np.uint16)[:, None]
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        for channel, gradient in enumerate((x, y, (x + y) // 2)):
+            noise = rng.integers(0, 48, size=(height, width), dtype=np.uint8)
+            pixels[..., channel] = gradient + noise
+        Image.fromarray(pixels, 'RGB').save(target)
+
+
+def prepare_workspace(corpus_dir: Optional[str] = None, workspace_path: Optional[str] = None) -> str:
+    """复制语料到临时工作空间并生成插画，返回工作空间路径"""
+    source = Path(corpus_dir) if corpus_dir else CORPUS_DIR
+    if workspace_path is None:
+        workspace_path = tempfile.mkdtemp(prefix='arkham-golden-')
+    os.makedirs(workspace_path, exist_ok=True)
+    for name in list_corpus(str(source)):
+        shutil.copyfile(source / name, os.path.join(workspace_path, name))
+    generate_art(workspace_path)
+    return workspace_path
+
+
+def open_workspace(workspace_path: str):
+    """以 eager 模式创建 WorkspaceManager，并固定影响渲染的配置项"""
+    ensure_import_path()
+    os.environ.setdefault('APP_STARTUP_MODE', 'eager')
+    from bin.workspace_manager import WorkspaceManager
+
+    workspace = WorkspaceManager(workspace_path)
+    workspace._ensure_card_resources()
+    workspace.config = dict(workspace.config, **DETERMINISTIC_CONFIG)
+    return workspace
+
+
+def reset_random_state():
+    """部分装饰元素使用 random，渲染前重置以保证可复现"""
+    random.seed(0)
@@ -0,0 +1,288 @@
+"""
+像素级渲染回归检查
+
+将黄金语料分别经 WorkspaceManager.generate_card_image（预览渲染）与
+ExportHelper.export_card_auto（镜像出血导出）渲染，记录每张图的像素摘要和文字层元数据摘要。
+对 RichTextRenderer / VirtualTextBox / EnhancedDraw 做缓存或向量化改造前后各跑一次，
+即可确认输出没有变化。无需启动 Flask 服务。
+
+用法::
+
+    # 在改动前记录基准（参考图与摘要写入 golden 目录）
+    python -m benchmarks.render_hash record --golden .render-golden
+    # 改动后检查；默认逐像素精确比较，不一致时输出 参考图|当前图|差异 拼接图
+    python -m benchmarks.render_hash check --golden .render-golden --diff-dir render-diff
+    # 允许轻微差异（平均通道差 <= 0.5 且变化像素占比 <= 0.1%）
+    python -m benchmarks.render_hash check --golden .render-golden --tolerance 0.5 --max-changed-ratio 0.001
+
+检查失败时退出码为 1。
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from benchmarks import corpus
+
+MANIFEST_NAME = 'manifest.json'
+IMAGES_DIR = 'images'
+
+
+def image_digest(image) -> str:
+    """像素摘要：包含模式与尺寸，避免不同尺寸的相同字节被视为一致"""
+    digest = hashlib.sha256(f'{image.mode}:{image.size[0]}x{image.size[1]}:'.encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def text_layer_digest(text_layer: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """文字层元数据摘要（图片项以像素摘要代替）"""
+    if text_layer is None:
+        return None
+    normalized = []
+    for item in text_layer:
+        item = dict(item)
+        if item.get('type') == 'image' and item.get('image') is not None:
+            item['image'] = image_digest(item['image'])
+        normalized.append(item)
+    payload = json.dumps(normalized, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _target_key(card_name: str, target: str) -> str:
+    stem = os.path.splitext(card_name)[0]
+    return f'{stem}.{target}'
+
+
+def _safe_filename(key: str) -> str:
+    return re.sub(r'[^\w.\-]', '_', key) + '.png'
+
+
+def render_targets(workspace, names: List[str]) -> Iterator[Tuple[str, Any, Optional[List[Dict[str, Any]]], Optional[str]]]:
+    """
+    逐个产出 (key, PIL 图像或 None, 文字层元数据, 错误信息)
+
+    每张卡产出预览渲染（render-front/render-back）与导出结果（export-front/export-back）。
+    """
+    from ExportHelper import ExportHelper
+
+    helper = ExportHelper(dict(corpus.EXPORT_PARAMS), workspace)
+    for name in names:
+        card_json = json.loads(workspace.get_file_content(name))
+        corpus.reset_random_state()
+        try:
+            if card_json.get('version', '') == '2.0':
+                result = workspace.generate_double_sided_card_image(card_json) or {}
+                sides = [('front', result.get('front')), ('back', result.get('back'))]
+            else:
+                sides = [('front', workspace.generate_card_image(card_json))]
+            for side, card in sides:
+                key = _target_key(name, f'render-{side}')
+                if card is None:
+                    yield key, None, None, '渲染失败'
+                else:
+                    yield key, card.image, card.get_text_layer_metadata(), None
+        except Exception as e:
+            yield _target_key(name, 'render-front'), None, None, str(e)
+
+        corpus.reset_random_state()
+        try:
+            exported = helper.export_card_auto(name)
+            if isinstance(exported, dict):
+                exported_sides = [('front', exported.get('front')), ('back', exported.get('back'))]
+            else:
+                exported_sides = [('front', exported)]
+            for side, image in exported_sides:
+                key = _target_key(name, f'export-{side}')
+                if image is None:
+                    yield key, None, None, '导出失败'
+                else:
+                    yield key, image, None, None
+        except Exception as e:
+            yield _target_key(name, 'export-front'), None, None, str(e)
+
+
+def pixel_diff(reference, current) -> Dict[str, Any]:
+    """逐像素差异统计：最大/平均通道差与变化像素占比"""
+    if reference.size != current.size:
+        return {'size_mismatch': True, 'reference_size': list(reference.size), 'current_size': list(current.size)}
+    mode = 'RGBA' if 'A' in reference.getbands() or 'A' in current.getbands() else 'RGB'
+    ref = np.asarray(reference.convert(mode), dtype=np.int16)
+    cur = np.asarray(current.convert(mode), dtype=np.int16)
+    delta = np.abs(ref - cur)
+    changed = delta.max(axis=2) > 0
+    return {
+        'size_mismatch': False,
+        'max_channel_diff': int(delta.max()),
+        'mean_channel_diff': float(delta.mean()),
+        'changed_ratio': float(changed.mean()),
+    }
+
+
+def save_diff_image(reference, current, path: str):
+    """保存 参考图 | 当前图 | 差异（放大 8 倍）的横向拼接图"""
+    ref = reference.convert('RGB')
+    cur = current.convert('RGB')
+    width = max(ref.width, cur.width)
+    height = max(ref.height, cur.height)
+    if ref.size == cur.size:
+        delta = np.abs(np.asarray(ref, dtype=np.int16) - np.asarray(cur, dtype=np.int16))
+        heat = np.clip(delta.max(axis=2) * 8, 0, 255).astype(np.uint8)
+        diff = Image.merge('RGB', (Image.fromarray(heat), Image.new('L', ref.size), Image.new('L', ref.size)))
+    else:
+        diff = Image.new('RGB', (width, height), (255, 0, 255))
+
+    canvas = Image.new('RGB', (width * 3, height), (255, 255, 255))
+    canvas.paste(ref, (0, 0))
+    canvas.paste(cur, (width, 0))
+    canvas.paste(diff, (width * 2, 0))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    canvas.save(path)
+
+
+def record(workspace, names: List[str], golden_dir: str) -> Dict[str, Any]:
+    images_dir = os.path.join(golden_dir, IMAGES_DIR)
+    if os.path.isdir(images_dir):
+        shutil.rmtree(images_dir)
+    os.makedirs(images_dir, exist_ok=True)
+
+    entries = {}
+    for key, image, text_layer, error in render_targets(workspace, names):
+        if error:
+            entries[key] = {'error': error}
+            continue
+        filename = _safe_filename(key)
+        image.save(os.path.join(images_dir, filename))
+        entries[key] = {
+            'image': image_digest(image),
+            'mode': image.mode,
+            'size': list(image.size),
+            'text_layer': text_layer_digest(text_layer),
+            'file': f'{IMAGES_DIR}/{filename}',
+        }
+
+    manifest = {'export_params': corpus.EXPORT_PARAMS, 'targets': entries}
+    with open(os.path.join(golden_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def check(workspace, names: List[str], golden_dir: str, tolerance: Optional[float] = None,
+          max_changed_ratio: float = 0.0, diff_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    与 golden 目录比较
+
+    tolerance 为 None 时要求像素摘要完全一致；否则允许平均通道差不超过 tolerance
+    且变化像素占比不超过 max_changed_ratio。文字层元数据始终要求完全一致。
+    """
+    with open(os.path.join(golden_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+        expected = json.load(f)['targets']
+
+    results = {}
+    for key, image, text_layer, error in render_targets(workspace, names):
+        reference = expected.get(key)
+        if reference is None:
+            results[key] = {'status': 'new'}
+            continue
+        if error or 'error' in reference:
+            same = bool(error) and error == reference.get('error')
+            results[key] = {'status': 'ok' if same else 'error', 'error': error,
+                            'expected_error': reference.get('error')}
+            continue
+
+        entry = {'status': 'ok'}
+        if text_layer_digest(text_layer) != reference.get('text_layer'):
+            entry['status'] = 'text_layer_changed'
+
+        if image_digest(image) != reference['image']:
+            with Image.open(os.path.join(golden_dir, reference['file'])) as ref_img:
+                ref_img = ref_img.copy()
+            diff = pixel_diff(ref_img, image)
+            entry['diff'] = diff
+            within = (
+                tolerance is not None
+                and not diff['size_mismatch']
+                and diff['mean_channel_diff'] <= tolerance
+                and diff['changed_ratio'] <= max_changed_ratio
+            )
+            if within:
+                # 容差内的像素差异不改变状态（文字层变化仍计为失败）
+                entry['within_tolerance'] = True
+            else:
+                entry['status'] = 'pixels_changed'
+                if diff_dir:
+                    diff_path = os.path.join(diff_dir, _safe_filename(key))
+                    save_diff_image(ref_img, image, diff_path)
+                    entry['diff_image'] = diff_path
+        results[key] = entry
+
+    stems = {os.path.splitext(name)[0] for name in names}
+    for key in expected:
+        if key not in results and key.rsplit('.', 1)[0] in stems:
+            results[key] = {'status': 'missing'}
+
+    failures = {key: entry for key, entry in results.items() if entry['status'] not in ('ok', 'new')}
+    return {'results': results, 'failures': len(failures), 'checked': len(results)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='像素级渲染回归检查')
+    parser.add_argument('command', choices=['record', 'check'])
+    parser.add_argument('--golden', default='.render-golden', help='参考图与摘要目录')
+    parser.add_argument('--corpus', default=None, help='语料目录（默认 benchmarks/corpus）')
+    parser.add_argument('--filter', default=None, help='只处理文件名包含该子串的卡牌')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='允许的平均通道差（0-255），不指定则要求逐像素一致')
+    parser.add_argument('--max-changed-ratio', type=float, default=0.0,
+                        help='配合 --tolerance，允许变化的像素占比')
+    parser.add_argument('--diff-dir', default=None, help='输出差异拼接图的目录')
+    parser.add_argument('--output', default=None, help='检查结果 JSON 输出路径')
+    parser.add_argument('--verbose', action='store_true', help='保留渲染过程中的打印输出')
+    args = parser.parse_args(argv)
+
+    corpus.ensure_import_path()
+    workspace_path = corpus.prepare_workspace(args.corpus)
+    try:
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            workspace = corpus.open_workspace(workspace_path)
+            names = corpus.list_corpus(args.corpus, args.filter)
+            if args.command == 'record':
+                os.makedirs(args.golden, exist_ok=True)
+                report = record(workspace, names, args.golden)
+            else:
+                report = check(workspace, names, args.golden, args.tolerance,
+                               args.max_changed_ratio, args.diff_dir)
+    finally:
+        shutil.rmtree(workspace_path, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.command == 'record':
+        targets = report['targets']
+        errors = sum(1 for entry in targets.values() if 'error' in entry)
+        print(f"已记录 {len(targets)} 个渲染目标（其中 {errors} 个渲染失败）到 {args.golden}")
+        return 0
+
+    for key, entry in sorted(report['results'].items()):
+        if entry['status'] not in ('ok', 'new'):
+            detail = entry.get('diff') or entry.get('error') or ''
+            print(f"✗ {key}: {entry['status']} {detail}")
+    print(f"检查 {report['checked']} 个渲染目标，{report['failures']} 个不一致")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
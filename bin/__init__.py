@@ -22,17 +22,24 @@ bin - 后端核心业务逻辑模块
 __version__ = "2.9.0"
 __author__ = "Arkham Horror DIY Team"
 
-# 导出主要组件以便外部访问
-from .file_manager import QuickStart
-from .deck_exporter import DeckExporter
-from .tts_card_converter import TTSCardConverter
-from .content_package_manager import ContentPackageManager
-from .config_directory_manager import ConfigDirectoryManager
-
-__all__ = [
-    'QuickStart',
-    'DeckExporter',
-    'TTSCardConverter',
-    'ContentPackageManager',
-    'ConfigDirectoryManager',
-]
+import importlib
+
+# 导出主要组件以便外部访问（按需导入：导入 bin.xxx 子模块时不再连带加载全部组件）
+_LAZY_EXPORTS = {
+    'QuickStart': '.file_manager',
+    'DeckExporter': '.deck_exporter',
+    'TTSCardConverter': '.tts_card_converter',
+    'ContentPackageManager': '.content_package_manager',
+    'ConfigDirectoryManager': '.config_directory_manager',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
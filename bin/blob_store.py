@@ -0,0 +1,210 @@
+"""
+卡牌插画内容寻址存储
+
+开启后（工作空间配置 card_art_storage = "blob"），保存卡牌时 picture_base64 / external_image 等字段中的
+内嵌图片被解码写入 <工作空间>/.assets/<sha256前两位>/<sha256>，卡牌 JSON 中只保留形如
+"blob:sha256:<hex>" 的引用。相同插画只存一份；读取元数据、扫描、导出时不再搬运数 MB 的 base64 文本。
+
+渲染时由 WorkspaceManager.get_card_base64 透明解析引用；发给编辑器或导出到工作空间之外时用
+inline_card 还原为 data URL，保证卡牌文件可移植。data URL 声明的 MIME 与文件头推断结果不同时
+（如 SVG），声明的 MIME 保存在同目录的 <sha256>.mime 中，还原时原样使用。
+"""
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+from bin.logger import logger_manager
+
+BLOB_DIR_NAME = '.assets'
+BLOB_REF_PREFIX = 'blob:sha256:'
+# 内嵌图片所在字段（正面与 back 等嵌套对象中同名字段都会处理）
+ART_FIELDS = ('picture_base64', 'external_image')
+# 小于该长度的 base64 文本保持内嵌
+MIN_EXTERNALIZE_LENGTH = 4096
+
+# 文件头 -> MIME，用于还原 data URL
+_MAGIC_MIME = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+)
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+def guess_mime(data: bytes) -> str:
+    for magic, mime in _MAGIC_MIME:
+        if data.startswith(magic):
+            return mime
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+
+def parse_data_url(value: str) -> Optional[Tuple[Optional[str], bytes]]:
+    """
+    解码 base64 data URL 或裸 base64 文本（严格校验字符集与填充）
+
+    :return: (声明的 MIME，裸 base64 为 None, 二进制数据)；内容无效时返回 None
+    """
+    mime = None
+    payload = value
+    if value.startswith('data:'):
+        header, sep, payload = value[len('data:'):].partition(',')
+        params = header.split(';')
+        if not sep or 'base64' not in params[1:]:
+            return None
+        mime = params[0].strip().lower() or None
+    try:
+        return mime, base64.b64decode(''.join(payload.split()), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def decode_data_url(value: str) -> Optional[bytes]:
+    """解码 data URL 或裸 base64 文本，失败返回 None"""
+    parsed = parse_data_url(value)
+    return parsed[1] if parsed is not None else None
+
+
+class BlobStore:
+    """工作空间内的内容寻址插画存储"""
+
+    def __init__(self, workspace_root: str):
+        self.workspace_root = workspace_root
+        self.blob_dir = os.path.join(workspace_root, BLOB_DIR_NAME)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    @staticmethod
+    def _digest(ref: str) -> Optional[str]:
+        if not is_blob_ref(ref):
+            return None
+        digest = ref[len(BLOB_REF_PREFIX):]
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            return None
+        return digest
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再改名，避免并发写入或中断产生半个文件
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put(self, data: bytes, mime: Optional[str] = None) -> str:
+        """
+        写入二进制数据（已存在则跳过），返回引用
+
+        :param mime: 声明的 MIME，与文件头推断结果不同时另行保存
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            self._write_atomic(path, data)
+        if mime and mime != guess_mime(data) and not os.path.exists(path + '.mime'):
+            self._write_atomic(path + '.mime', mime.encode('ascii', 'ignore'))
+        return BLOB_REF_PREFIX + digest
+
+    def get(self, ref: str) -> Optional[bytes]:
+        """按引用读取二进制数据，引用无效或文件缺失时返回 None"""
+        digest = self._digest(ref)
+        if digest is None:
+            return None
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                return f.read()
+        except OSError:
+            logger_manager.warning(f"插画引用对应的文件不存在: {ref}")
+            return None
+
+    def get_mime(self, ref: str, data: bytes) -> str:
+        """引用的 MIME：优先使用保存时声明的 MIME，否则按文件头推断"""
+        digest = self._digest(ref)
+        if digest is not None:
+            try:
+                with open(self._blob_path(digest) + '.mime', 'r', encoding='ascii') as f:
+                    mime = f.read().strip()
+                if mime:
+                    return mime
+            except (OSError, ValueError):
+                pass
+        return guess_mime(data)
+
+    def to_data_url(self, ref: str) -> Optional[str]:
+        data = self.get(ref)
+        if data is None:
+            return None
+        return f"data:{self.get_mime(ref, data)};base64,{base64.b64encode(data).decode('ascii')}"
+
+    def externalize_card(self, card_json: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """
+        将内嵌插画写入存储并替换为引用（原对象不修改）
+
+        :return: (新的卡牌JSON, 替换的字段数)
+        """
+        count = 0
+
+        def visit(node):
+            nonlocal count
+            if isinstance(node, dict):
+                result = {}
+                for key, value in node.items():
+                    if key in ART_FIELDS and isinstance(value, str) and not is_blob_ref(value) \
+                            and len(value) >= MIN_EXTERNALIZE_LENGTH:
+                        parsed = parse_data_url(value)
+                        if parsed is not None and parsed[1]:
+                            result[key] = self.put(parsed[1], parsed[0])
+                            count += 1
+                            continue
+                        if parsed is None:
+                            logger_manager.warning(f"插画字段 {key} 不是有效的 base64 数据，保持内嵌")
+                    result[key] = visit(value)
+                return result
+            if isinstance(node, list):
+                return [visit(item) for item in node]
+            return node
+
+        return visit(card_json), count
+
+    def inline_card(self, card_json: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """
+        将引用还原为 data URL（原对象不修改），缺失的引用保持原样
+
+        :return: (新的卡牌JSON, 还原的字段数)
+        """
+        count = 0
+
+        def visit(node):
+            nonlocal count
+            if isinstance(node, dict):
+                result = {}
+                for key, value in node.items():
+                    if key in ART_FIELDS and is_blob_ref(value):
+                        data_url = self.to_data_url(value)
+                        if data_url is not None:
+                            result[key] = data_url
+                            count += 1
+                            continue
+                    result[key] = visit(value)
+                return result
+            if isinstance(node, list):
+                return [visit(item) for item in node]
+            return node
+
+        return visit(card_json), count
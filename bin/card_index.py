@@ -0,0 +1,301 @@
+"""
+工作空间卡牌元数据索引
+
+在 .cache/card_index.sqlite3 中保存每张 .card 的常用字段（类型、名称、职阶、遭遇组、编号、数量、
+语言、版本、是否双面），按 mtime+size 判断是否需要重新解析。遭遇组列表、内容包、编号、导出等
+功能可以直接查询索引，而不必逐个打开（可能内嵌数 MB base64 插画的）卡牌文件。
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bin.logger import logger_manager
+
+INDEX_FILENAME = 'card_index.sqlite3'
+# 表结构变化时递增，旧索引会被重建
+SCHEMA_VERSION = 1
+
+# 可筛选的字段（查询参数名 -> 列名）
+FILTER_COLUMNS = {
+    'type': 'type',
+    'name': 'name',
+    'class': 'class',
+    'encounter_group': 'encounter_group',
+    'card_number': 'card_number',
+    'language': 'language',
+    'version': 'version',
+}
+SORT_COLUMNS = ('path', 'name', 'type', 'class', 'encounter_group', 'card_number', 'mtime')
+
+_COLUMNS = ('path', 'mtime', 'size', 'type', 'name', 'class', 'encounter_group', 'card_number',
+            'quantity', 'language', 'version', 'has_back', 'error')
+
+
+def extract_card_metadata(card_json: Dict[str, Any]) -> Dict[str, Any]:
+    """从卡牌JSON中提取索引字段"""
+
+    def text(value) -> Optional[str]:
+        if value is None or value == '':
+            return None
+        return str(value)
+
+    quantity = card_json.get('quantity')
+    try:
+        quantity = int(quantity) if quantity not in (None, '') else None
+    except (TypeError, ValueError):
+        quantity = None
+
+    return {
+        'type': text(card_json.get('type')),
+        'name': text(card_json.get('name')),
+        'class': text(card_json.get('class')),
+        'encounter_group': text(card_json.get('encounter_group')),
+        'card_number': text(card_json.get('card_number')),
+        'quantity': quantity,
+        'language': text(card_json.get('language')),
+        'version': text(card_json.get('version')),
+        'has_back': bool(card_json.get('back')),
+    }
+
+
+class CardIndex:
+    """卡牌元数据索引（SQLite，线程安全）"""
+
+    def __init__(self, workspace_root: str, decode: Optional[Callable[[bytes], Tuple[str, str]]] = None):
+        """
+        :param decode: 卡牌文件解码函数（返回 (文本, 编码)），WorkspaceManager 传入 decode_text 以支持
+                       BOM 与 GBK 卡牌；不传时按 UTF-8（可带 BOM）解码
+        """
+        self.workspace_root = workspace_root
+        self._decode = decode or (lambda raw: (raw.decode('utf-8-sig'), 'utf-8-sig'))
+        self.cache_dir = os.path.join(workspace_root, '.cache')
+        self.db_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # ---------- 连接与表结构 ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(self.cache_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError:
+            pass
+        if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS cards')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cards (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                type TEXT,
+                name TEXT,
+                class TEXT,
+                encounter_group TEXT,
+                card_number TEXT,
+                quantity INTEGER,
+                language TEXT,
+                version TEXT,
+                has_back INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cards_type ON cards(type)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cards_encounter_group ON cards(encounter_group)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_cards_class ON cards(class)')
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- 写入 ----------
+
+    def _read_card(self, rel_path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            with open(os.path.join(self.workspace_root, rel_path), 'rb') as f:
+                raw = f.read()
+            text, _ = self._decode(raw)
+            data = json.loads(text)
+            if not isinstance(data, dict):
+                return None, '卡牌内容不是JSON对象'
+            return data, None
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            return None, str(e)
+
+    def _row(self, rel_path: str, stat_result: os.stat_result,
+             card_json: Optional[Dict[str, Any]], error: Optional[str]) -> Tuple:
+        metadata = extract_card_metadata(card_json) if card_json is not None else {}
+        return (
+            rel_path, stat_result.st_mtime, stat_result.st_size,
+            metadata.get('type'), metadata.get('name'), metadata.get('class'),
+            metadata.get('encounter_group'), metadata.get('card_number'), metadata.get('quantity'),
+            metadata.get('language'), metadata.get('version'), int(metadata.get('has_back', False)),
+            error,
+        )
+
+    def update_card(self, rel_path: str, card_json: Optional[Dict[str, Any]] = None,
+                    stat_result: Optional[os.stat_result] = None) -> bool:
+        """
+        更新单张卡牌的索引
+
+        :param card_json: 调用方已解析的内容（如编辑器保存时），不传则读取文件
+        :return: 文件不存在时删除索引并返回False
+        """
+        try:
+            if stat_result is None:
+                stat_result = os.stat(os.path.join(self.workspace_root, rel_path))
+        except OSError:
+            self.remove(rel_path)
+            return False
+
+        error = None
+        if card_json is None:
+            card_json, error = self._read_card(rel_path)
+        row = self._row(rel_path, stat_result, card_json, error)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"INSERT OR REPLACE INTO cards ({', '.join(_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(_COLUMNS))})", row)
+            conn.commit()
+        return True
+
+    def remove(self, rel_path: str):
+        """删除单张卡牌的索引"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM cards WHERE path = ?', (rel_path,))
+            conn.commit()
+
+    def remove_prefix(self, dir_rel: str):
+        """删除目录下所有卡牌的索引"""
+        prefix = dir_rel.rstrip('/\\') + os.sep
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM cards WHERE substr(path, 1, ?) = ?', (len(prefix), prefix))
+            conn.commit()
+
+    def sync(self, card_files: Iterable[str], stats: Optional[Dict[str, os.stat_result]] = None) -> int:
+        """
+        使索引与给定的卡牌文件列表一致：只重新解析新增或mtime/size变化的文件，删除已不存在的条目
+
+        :return: 重新解析的文件数
+        """
+        stats = stats or {}
+        card_files = list(card_files)
+        with self._lock:
+            conn = self._connect()
+            known = {row['path']: (row['mtime'], row['size'])
+                     for row in conn.execute('SELECT path, mtime, size FROM cards')}
+
+        rows = []
+        for rel_path in card_files:
+            stat_result = stats.get(rel_path)
+            if stat_result is None:
+                try:
+                    stat_result = os.stat(os.path.join(self.workspace_root, rel_path))
+                except OSError:
+                    continue
+            cached = known.get(rel_path)
+            if cached and abs(cached[0] - stat_result.st_mtime) < 1e-6 and cached[1] == stat_result.st_size:
+                continue
+            card_json, error = self._read_card(rel_path)
+            rows.append(self._row(rel_path, stat_result, card_json, error))
+
+        removed = set(known) - set(card_files)
+        with self._lock:
+            conn = self._connect()
+            if rows:
+                conn.executemany(f"INSERT OR REPLACE INTO cards ({', '.join(_COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+            if removed:
+                conn.executemany('DELETE FROM cards WHERE path = ?', [(p,) for p in removed])
+            conn.commit()
+
+        if rows or removed:
+            logger_manager.debug(f"卡牌索引已同步: 更新 {len(rows)}，删除 {len(removed)}", category='io')
+        return len(rows)
+
+    # ---------- 查询 ----------
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, search: Optional[str] = None,
+              path_prefix: Optional[str] = None, has_back: Optional[bool] = None,
+              sort: str = 'path', descending: bool = False,
+              offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        按条件分页查询
+
+        :param filters: 精确匹配的字段，键见 FILTER_COLUMNS；值为列表时匹配任一值
+        :param search: 名称子串（不区分大小写）
+        :param path_prefix: 只返回该目录下的卡牌
+        :return: {'total', 'offset', 'limit', 'items'}
+        """
+        where, params = [], []
+        for key, value in (filters or {}).items():
+            column = FILTER_COLUMNS.get(key)
+            if column is None or value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if search:
+            where.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f'%{escaped}%')
+        if path_prefix and path_prefix not in ('.', './'):
+            prefix = path_prefix.replace('/', os.sep).rstrip(os.sep) + os.sep
+            where.append('substr(path, 1, ?) = ?')
+            params.extend([len(prefix), prefix])
+        if has_back is not None:
+            where.append('has_back = ?')
+            params.append(int(bool(has_back)))
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+        sort_column = sort if sort in SORT_COLUMNS else 'path'
+        order_sql = f"ORDER BY {sort_column} {'DESC' if descending else 'ASC'}, path ASC"
+        offset = max(0, int(offset))
+        limit = max(1, int(limit))
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f'SELECT COUNT(*) FROM cards {where_sql}', params).fetchone()[0]
+            rows = conn.execute(f'SELECT * FROM cards {where_sql} {order_sql} LIMIT ? OFFSET ?',
+                                params + [limit, offset]).fetchall()
+
+        items = []
+        for row in rows:
+            item = dict(row)
+            item['has_back'] = bool(item['has_back'])
+            items.append(item)
+        return {'total': total, 'offset': offset, 'limit': limit, 'items': items}
+
+    def get_card(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute('SELECT * FROM cards WHERE path = ?', (rel_path,)).fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        item['has_back'] = bool(item['has_back'])
+        return item
+
+    def distinct_values(self, column: str) -> List[str]:
+        """某个字段的全部取值（如全部遭遇组），已排序且不含空值"""
+        column = FILTER_COLUMNS.get(column)
+        if column is None:
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                f'SELECT DISTINCT {column} FROM cards WHERE {column} IS NOT NULL ORDER BY {column}'
+            ).fetchall()
+        return [row[0] for row in rows]
@@ -7,23 +7,25 @@ from datetime import datetime
 
 from bin.card2arkhamdb import Card2ArkhamDBConverter
 from bin import card_numbering
-from bin.pnp_exporter import PNPExporter
 from bin.tts_script_generator import TtsScriptGenerator
 
 
 class ContentPackageManager:
     """内容包管理类，负责处理内容包的导出功能"""
 
-    def __init__(self, content_package_data: Dict[str, Any], workspace_manager):
+    def __init__(self, content_package_data: Dict[str, Any], workspace_manager,
+                 package_path: Optional[str] = None):
         """
         初始化内容包管理器
 
         Args:
             content_package_data: 内容包JSON对象
             workspace_manager: 工作空间管理器对象
+            package_path: 内容包文件相对路径（用于区分各内容包的PNP导出缓存）
         """
         self.content_package = content_package_data
         self.workspace_manager = workspace_manager
+        self.package_path = package_path
         self.logs = []  # 日志记录
         self.tts_generator = TtsScriptGenerator(workspace_manager=self.workspace_manager)
 
@@ -90,9 +92,9 @@ class ContentPackageManager:
                 self._add_log(f"卡牌文件不存在: {card_filename}")
                 return None
 
-            with open(card_path, 'r', encoding='utf-8') as f:
-                card_data = json.load(f)
-
+            card_data = self.workspace_manager.read_card(card_filename)
+            if card_data is None:
+                self._add_log(f"读取卡牌JSON失败 {card_filename}: 内容无效")
             return card_data
 
         except Exception as e:
@@ -660,7 +662,7 @@ class ContentPackageManager:
                 self._add_log(f"遭遇组图片不存在: {encounter_group}")
                 return ""
 
-            # 读取图片并转换为base64
+            # 读取原图并转换为base64（前端会保存并上传该数据，不能使用列表用的缩略图）
             image_data = self.workspace_manager.get_image_as_base64(
                 os.path.join(encounter_groups_dir, encounter_group + '.png')
             )
@@ -890,9 +892,13 @@ class ContentPackageManager:
             )
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-            # 创建PNP导出器，传递日志回调
+            # 创建PNP导出器，传递日志回调（reportlab/ExportHelper 较重，首次导出时才导入）
+            # 每个内容包使用独立的增量导出缓存，未变化的卡牌不再重新渲染
+            from bin.pnp_exporter import PNPExporter
+            meta_info = self.content_package.get("meta", {})
+            cache_name = self.package_path or meta_info.get("code") or meta_info.get("name")
             pnp_exporter = PNPExporter(export_params, self.workspace_manager, task_id=task_id,
-                                       log_callback=log_callback)
+                                       log_callback=log_callback, cache_name=cache_name)
 
             # 执行导出
             result = pnp_exporter.export_pnp(
@@ -2,18 +2,34 @@ import logging
 import os
 import platform
 import sys
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 from bin.config_directory_manager import config_dir_manager
 
+# 分类日志默认级别：热路径分类默认 INFO，DEBUG 消息在格式化前即被丢弃
+DEFAULT_CATEGORY_LEVELS = {
+    'render': logging.INFO,
+    'io': logging.INFO,
+}
+
+# 环境变量覆盖分类级别，格式: "render=DEBUG,export=WARNING"
+CATEGORY_LEVELS_ENV = 'ARKHAM_LOG_LEVELS'
+
+# 采样/限流状态最多保留的分组键数量，超出后淘汰最久未使用的键
+SAMPLE_KEY_LIMIT = 1024
+
 
 class LoggerManager:
     """日志管理器，提供统一的日志记录功能"""
 
     _instance = None
     _logger = None
+    _category_loggers = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -23,6 +39,8 @@ class LoggerManager:
     def __init__(self):
         if self._logger is None:
             self._setup_logger()
+        if self._category_loggers is None:
+            self._setup_categories()
 
     def _setup_logger(self):
         """设置日志系统"""
@@ -105,39 +123,134 @@ class LoggerManager:
             self._logger.warning(f"无法初始化文件日志系统: {e}")
             self._logger.warning("回退到仅控制台日志模式")
 
+    def _setup_categories(self):
+        """初始化分类日志（Arkham.<category> 子 logger，沿用根 handler）"""
+        self._category_loggers = {}
+        self._sample_lock = threading.Lock()
+        self._sample_counts = OrderedDict()
+        self._throttle_state = OrderedDict()
+
+        levels = dict(DEFAULT_CATEGORY_LEVELS)
+        levels.update(self._parse_category_levels(os.environ.get(CATEGORY_LEVELS_ENV, '')))
+        for category, level in levels.items():
+            self.set_category_level(category, level)
+
+    @staticmethod
+    def _parse_category_levels(spec: str) -> dict:
+        """解析 "render=DEBUG,export=WARNING" 形式的分类级别配置"""
+        levels = {}
+        for part in spec.split(','):
+            if '=' not in part:
+                continue
+            category, level_name = part.split('=', 1)
+            level = logging.getLevelName(level_name.strip().upper())
+            if category.strip() and isinstance(level, int):
+                levels[category.strip()] = level
+        return levels
+
+    def _get_category_logger(self, category=None):
+        """获取分类 logger，未指定分类时返回根 logger"""
+        if not category or self._logger is None:
+            return self._logger
+        category_logger = self._category_loggers.get(category)
+        if category_logger is None:
+            category_logger = self._logger.getChild(category)
+            self._category_loggers[category] = category_logger
+        return category_logger
+
+    def set_category_level(self, category, level):
+        """设置分类日志级别，level 可为 logging 常量或级别名"""
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        category_logger = self._get_category_logger(category)
+        if category_logger is not None and isinstance(level, int):
+            category_logger.setLevel(level)
+
+    def is_enabled_for(self, level, category=None):
+        """判断指定级别是否会被记录，用于在热路径中跳过昂贵的参数计算"""
+        category_logger = self._get_category_logger(category)
+        return category_logger is not None and category_logger.isEnabledFor(level)
+
+    def _should_emit(self, message, key, every, interval):
+        """采样/限流判定，返回 (是否输出, 被抑制条数)"""
+        if every is None and interval is None:
+            return True, 0
+
+        sample_key = key if key is not None else message
+        with self._sample_lock:
+            if every is not None:
+                count = self._sample_counts.get(sample_key, 0) + 1
+                self._remember(self._sample_counts, sample_key, count)
+                if (count - 1) % max(1, int(every)) != 0:
+                    return False, 0
+                return True, 0
+
+            now = time.monotonic()
+            last_time, suppressed = self._throttle_state.get(sample_key, (None, 0))
+            if last_time is not None and now - last_time < interval:
+                self._remember(self._throttle_state, sample_key, (last_time, suppressed + 1))
+                return False, 0
+            self._remember(self._throttle_state, sample_key, (now, 0))
+            return True, suppressed
+
+    @staticmethod
+    def _remember(state, sample_key, value):
+        """写入采样状态并按 LRU 限制键数量（调用方持有 _sample_lock）"""
+        state[sample_key] = value
+        state.move_to_end(sample_key)
+        while len(state) > SAMPLE_KEY_LIMIT:
+            state.popitem(last=False)
+
+    def _log(self, level, message, args, category=None, key=None, every=None, interval=None, **kwargs):
+        """
+        统一的日志出口
+        :param args: %-风格的延迟格式化参数，仅在确实输出时才会格式化
+        :param category: 日志分类（Arkham.<category>），可单独设置级别
+        :param key: 采样/限流的分组键，默认使用消息模板
+        :param every: 采样输出，每 N 条只记录 1 条
+        :param interval: 限流输出，同一分组键在 interval 秒内只记录 1 条
+        """
+        category_logger = self._get_category_logger(category)
+        if category_logger is None or not category_logger.isEnabledFor(level):
+            return
+
+        emit, suppressed = self._should_emit(message, key, every, interval)
+        if not emit:
+            return
+        if suppressed:
+            message = f"{message} (已抑制 {suppressed} 条)"
+
+        # stacklevel=3：记录调用方的文件名与行号，而不是本包装器
+        kwargs.setdefault('stacklevel', 3)
+        category_logger.log(level, message, *args, **kwargs)
+
     def get_logger(self):
         """获取logger实例"""
         return self._logger
 
-    def debug(self, message):
+    def debug(self, message, *args, **kwargs):
         """记录DEBUG级别日志"""
-        if self._logger:
-            self._logger.debug(message)
+        self._log(logging.DEBUG, message, args, **kwargs)
 
-    def info(self, message):
+    def info(self, message, *args, **kwargs):
         """记录INFO级别日志"""
-        if self._logger:
-            self._logger.info(message)
+        self._log(logging.INFO, message, args, **kwargs)
 
-    def warning(self, message):
+    def warning(self, message, *args, **kwargs):
         """记录WARNING级别日志"""
-        if self._logger:
-            self._logger.warning(message)
+        self._log(logging.WARNING, message, args, **kwargs)
 
-    def error(self, message, exc_info=False):
+    def error(self, message, *args, exc_info=False, **kwargs):
         """记录ERROR级别日志"""
-        if self._logger:
-            self._logger.error(message, exc_info=exc_info)
+        self._log(logging.ERROR, message, args, exc_info=exc_info, **kwargs)
 
-    def critical(self, message, exc_info=False):
+    def critical(self, message, *args, exc_info=False, **kwargs):
         """记录CRITICAL级别日志"""
-        if self._logger:
-            self._logger.critical(message, exc_info=exc_info)
+        self._log(logging.CRITICAL, message, args, exc_info=exc_info, **kwargs)
 
-    def exception(self, message):
+    def exception(self, message, *args, **kwargs):
         """记录异常信息（包含堆栈）"""
-        if self._logger:
-            self._logger.exception(message)
+        self._log(logging.ERROR, message, args, exc_info=True, **kwargs)
 
 
 # 全局日志管理器实例
@@ -0,0 +1,303 @@
+"""
+PNP 增量导出缓存
+
+每个内容包一个缓存目录（<工作空间>/.cache/pnp_cache/<内容包>/）：
+- entries/<任务键>.json：一张卡牌（经典模式含全部副本）的正反面图片摘要与尺寸。任务键由卡牌 JSON、引用素材的
+  修改时间与导出范围计算；导出范围由渲染指纹（渲染代码与字体/图片/语言配置等资源）、影响渲染的工作空间配置
+  与导出参数（DPI、出血、出血模型、尺寸、图片调整等）计算
+- images/<摘要>.png：处理后的卡图（图片模式使用）
+- streams/<摘要>.<编码>：已编码的 PDF 图片流（PDF 模式使用，编码标记区分图片格式与压缩参数）
+- runs/<导出标识>：进行中的导出的标记文件，修改时间即导出开始时间
+
+重新导出时内容未变化的卡牌不再渲染，PDF 直接复用已编码的图片流。每次导出成功后清理（按条目修改时间 LRU，
+读取条目时刷新修改时间）：
+- 同一导出范围内本次未用到的条目（卡牌已修改或移出内容包）
+- 渲染指纹不同、或超过 max_age 未使用的条目（其他 DPI、参数组合的条目保留到过期为止）
+- 不再被任何条目引用的图片与图片流
+进行中的其他导出开始之后写入或读取过的文件一律保留，并发导出同一内容包时不会删除彼此正在使用的文件。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from PIL import Image
+
+# 缓存条目格式变化、或渲染结果变化而渲染指纹检测不到时（例如改动了不在渲染指纹路径内的模块）必须递增，
+# 旧条目随之失效
+PNP_CACHE_VERSION = 2
+# 只影响 PNP 排版/编码、不影响卡图像素的导出参数，不计入任务键
+NON_RENDER_PARAMS = frozenset({
+    'pnp_workers', 'pnp_max_in_flight', 'pnp_image_format', 'pnp_jpeg_quality', 'pnp_flate_level', 'pnp_cache',
+    'prefix',
+})
+# 影响卡牌渲染的工作空间配置
+RENDER_CONFIG_FIELDS = ('encounter_groups_dir', 'footer_copyright', 'footer_icon_dir')
+# 不影响卡图的卡牌字段（范围模式按数量复制同一张图片）
+NON_RENDER_CARD_FIELDS = frozenset({'quantity'})
+# 未使用的条目保留时间（秒）
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+# 超过此时间的导出标记视为异常退出遗留，不再保护其文件（秒）
+STALE_RUN_AGE = 6 * 3600
+
+
+def render_fingerprint(paths: Iterable[str]) -> str:
+    """
+    渲染指纹：各路径（文件或目录，目录递归，跳过 __pycache__）下文件的相对路径、修改时间与字节数
+
+    :param paths: 渲染代码、字体、图片、语言配置等路径，不存在的路径同样计入
+    """
+    digest = hashlib.sha256(f'v{PNP_CACHE_VERSION}'.encode('utf-8'))
+    for path in sorted(set(paths)):
+        digest.update(f'{path}\0'.encode('utf-8', 'surrogateescape'))
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    digest.update(f'{os.path.relpath(file_path, path)}\0{_stat(file_path)}\0'.encode(
+                        'utf-8', 'surrogateescape'))
+        else:
+            digest.update(f'{_stat(path)}\0'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat_result = os.stat(path)
+        return stat_result.st_mtime_ns, stat_result.st_size
+    except OSError:
+        return None
+
+
+class PNPExportCache:
+    """单个内容包的PNP导出缓存（写入使用临时文件 + os.replace）"""
+
+    def __init__(self, cache_dir: str, config: Optional[Dict[str, Any]] = None,
+                 export_params: Optional[Dict[str, Any]] = None, render: str = '', max_age: float = DEFAULT_MAX_AGE):
+        """
+        :param config: 工作空间配置（只取 RENDER_CONFIG_FIELDS）
+        :param export_params: 导出参数（忽略 NON_RENDER_PARAMS）
+        :param render: 渲染指纹（render_fingerprint）
+        :param max_age: 其他导出范围的条目未使用多久后删除（秒）
+        """
+        self.cache_dir = cache_dir
+        self.render = render
+        self.scope = self.make_scope(config, export_params or {}, render)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._used_keys: Set[str] = set()
+        self._run_path: Optional[str] = None
+        self._started_ns = time.time_ns()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_scope(config: Optional[Dict[str, Any]], export_params: Dict[str, Any], render: str) -> str:
+        """导出范围：渲染指纹、影响渲染的工作空间配置与导出参数"""
+        meta = json.dumps({
+            'version': PNP_CACHE_VERSION,
+            'render': render,
+            'config': {field: (config or {}).get(field) for field in RENDER_CONFIG_FIELDS},
+            'params': {k: v for k, v in export_params.items() if k not in NON_RENDER_PARAMS},
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(meta.encode('utf-8')).hexdigest()[:16]
+
+    def make_key(self, card_data: Dict[str, Any], encounter_group_numbers: Optional[List[str]],
+                 assets: Iterable[Tuple[str, Optional[Tuple[int, int]]]]) -> str:
+        """
+        :param encounter_group_numbers: 经典模式各副本的遭遇组编号，范围模式为 None
+        :param assets: 卡牌引用的素材 (相对路径, (mtime_ns, 字节数) 或 None 表示不存在)
+        """
+        meta = json.dumps({
+            'scope': self.scope,
+            'card': {k: v for k, v in card_data.items() if k not in NON_RENDER_CARD_FIELDS},
+            'encounter_group_numbers': encounter_group_numbers,
+            'assets': sorted([path, list(stat) if stat else None] for path, stat in assets),
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(meta.encode('utf-8')).hexdigest()
+
+    def begin_run(self) -> None:
+        """登记进行中的导出（其他导出清理缓存时保留本次开始后用到的文件）"""
+        path = os.path.join(self.cache_dir, 'runs', f'{os.getpid()}-{uuid.uuid4().hex[:8]}')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb'):
+                pass
+            # 以文件系统时间为准，与条目修改时间可比
+            self._started_ns = os.stat(path).st_mtime_ns
+            self._run_path = path
+        except OSError as e:
+            print(f"登记PNP导出失败: {e}")
+
+    def end_run(self) -> None:
+        """结束导出，删除标记文件"""
+        if self._run_path is not None:
+            self._remove(self._run_path)
+            self._run_path = None
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, 'entries', key + '.json')
+
+    def image_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'images', digest + '.png')
+
+    def _stream_path(self, digest: str, encoding: str) -> str:
+        return os.path.join(self.cache_dir, 'streams', f'{digest}.{encoding}')
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取条目并标记为本次使用，缺失或损坏时返回 None
+
+        :return: 每个副本一项 {'front': 图片信息, 'back': 图片信息}，图片信息含 digest/width/height/color_space
+        """
+        with self._lock:
+            self._used_keys.add(key)
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                copies = json.load(f)['copies']
+            # 刷新修改时间（LRU）
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return copies
+
+    def put(self, key: str, copies: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._used_keys.add(key)
+        data = json.dumps({'version': PNP_CACHE_VERSION, 'scope': self.scope, 'render': self.render, 'copies': copies},
+                          ensure_ascii=False).encode('utf-8')
+        self._write(self._entry_path(key), data)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def has_image(self, digest: str) -> bool:
+        return os.path.isfile(self.image_path(digest))
+
+    def save_image(self, digest: str, image: Image.Image) -> str:
+        """保存卡图（已存在则跳过），返回路径"""
+        path = self.image_path(digest)
+        if not os.path.exists(path):
+            self._write(path, image, suffix='.png')
+        return path
+
+    def read_stream(self, digest: str, encoding: str) -> Optional[bytes]:
+        try:
+            with open(self._stream_path(digest, encoding), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write_stream(self, digest: str, encoding: str, data: bytes) -> None:
+        """保存已编码的PDF图片流（已存在则跳过）"""
+        path = self._stream_path(digest, encoding)
+        if not os.path.exists(path):
+            self._write(path, data)
+
+    def _write(self, path: str, content, suffix: str = '') -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-', suffix=suffix)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    if isinstance(content, Image.Image):
+                        # 缓存只在本机读取，使用低压缩级别
+                        content.save(f, format='PNG', compress_level=1)
+                    else:
+                        f.write(content)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"写入PNP导出缓存失败: {e}")
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """
+        清理缓存（规则见模块说明），进行中的导出中最早的开始时间之后修改过的文件不删除
+
+        :return: (删除的条目数, 删除的图片/图片流文件数)
+        """
+        cutoff_ns = self._protect_since_ns()
+        expire_ns = time.time_ns() - int(self.max_age * 1e9)
+        removed_entries = 0
+        referenced = set()
+        entries_dir = os.path.join(self.cache_dir, 'entries')
+        for name in self._list_dir(entries_dir):
+            path = os.path.join(entries_dir, name)
+            mtime_ns = self._mtime_ns(path)
+            if mtime_ns is None:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                key = name[:-len('.json')] if name.endswith('.json') else None
+                stale = key is None or entry.get('version') != PNP_CACHE_VERSION or (
+                    key not in self._used_keys and (
+                        entry.get('scope') == self.scope or entry.get('render') != self.render
+                        or mtime_ns < expire_ns))
+                digests = [info['digest'] for copy in entry['copies'] for info in copy.values()]
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                stale, digests = True, []
+            if stale and mtime_ns < cutoff_ns:
+                removed_entries += self._remove(path)
+            else:
+                referenced.update(digests)
+
+        removed_files = 0
+        for sub_dir in ('images', 'streams'):
+            directory = os.path.join(self.cache_dir, sub_dir)
+            for name in self._list_dir(directory):
+                path = os.path.join(directory, name)
+                if name.split('.', 1)[0] not in referenced and (self._mtime_ns(path) or cutoff_ns) < cutoff_ns:
+                    removed_files += self._remove(path)
+        return removed_entries, removed_files
+
+    def _protect_since_ns(self) -> int:
+        """进行中的导出（含本次）中最早的开始时间，遗留的过期标记顺带删除"""
+        since_ns = self._started_ns
+        runs_dir = os.path.join(self.cache_dir, 'runs')
+        stale_ns = time.time_ns() - int(STALE_RUN_AGE * 1e9)
+        for name in self._list_dir(runs_dir):
+            path = os.path.join(runs_dir, name)
+            mtime_ns = self._mtime_ns(path)
+            if mtime_ns is None:
+                continue
+            if mtime_ns < stale_ns:
+                self._remove(path)
+            else:
+                since_ns = min(since_ns, mtime_ns)
+        return since_ns
+
+    @staticmethod
+    def _mtime_ns(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _list_dir(directory: str) -> List[str]:
+        try:
+            return os.listdir(directory)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
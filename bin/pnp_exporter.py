@@ -6,12 +6,15 @@ PNP (Print and Play) PDF导出模块
 2. 打印纸模式：按指定纸张规格排版，带切割辅助线
 """
 
-import json
+import hashlib
 import os
 import re
 import shutil
+import sys
 import tempfile
 import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
@@ -21,6 +24,21 @@ from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
 from ExportHelper import ExportHelper
+from ResourceManager import get_resource_path
+from bin.config_directory_manager import config_dir_manager
+from bin.pnp_export_cache import PNPExportCache, render_fingerprint
+from bin.pnp_image_store import PDFImageStore, DEFAULT_PDF_IMAGE_FORMAT, DEFAULT_JPEG_QUALITY, DEFAULT_FLATE_LEVEL
+from export_helper.bleed_cache import image_digest
+
+# 默认并行渲染线程数（不超过CPU核数）
+DEFAULT_MAX_WORKERS = 4
+# 临时PNG的压缩级别（临时文件随后被图片导出重新编码）
+TEMP_PNG_COMPRESS_LEVEL = 1
+# 计入导出缓存渲染指纹的代码与资源（相对资源目录）
+RENDER_RESOURCE_PATHS = (
+    'Card.py', 'card_cdapter.py', 'create_card.py', 'enhanced_draw.py', 'ExportHelper.py', 'ResourceManager.py',
+    'bin/pnp_exporter.py', 'export_helper', 'rich_text_render', 'fonts', 'images', 'cardback',
+)
 
 
 class PNPExporter:
@@ -34,7 +52,7 @@ class PNPExporter:
     }
 
     def __init__(self, export_params: Dict[str, Any], workspace_manager, task_id: Optional[str] = None,
-                 log_callback=None):
+                 log_callback=None, cache_name: Optional[str] = None):
         """
         初始化PNP导出器
 
@@ -43,12 +61,14 @@ class PNPExporter:
             workspace_manager: 工作空间管理器
             task_id: 任务ID，用于实时日志更新
             log_callback: 日志回调函数，用于实时更新日志
+            cache_name: 增量导出缓存名称（通常为内容包路径），为空时不使用导出缓存
         """
         self.export_params = export_params
         self.workspace_manager = workspace_manager
         self.logs = []
         self.task_id = task_id
         self.log_callback = log_callback
+        self.cache_name = cache_name
 
         # 创建ExportHelper实例
         self.export_helper = ExportHelper(export_params, workspace_manager)
@@ -56,6 +76,87 @@ class PNPExporter:
         # 遭遇组模式: 'classic' (经典模式-独立编号) 或 'range' (范围模式-复制图片)
         self.encounter_group_mode = export_params.get('encounter_group_mode', 'range')
 
+        # 并行渲染线程数与已渲染未写出的卡牌上限（每张卡牌含正反两张图）
+        self.max_workers = max(1, int(export_params.get('pnp_workers') or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)))
+        self.max_in_flight = max(1, int(export_params.get('pnp_max_in_flight') or self.max_workers * 2))
+
+        # PDF模式下卡图直接编码进内存中的图片存储（不写临时PNG），由 export_pnp 创建
+        self.image_store: Optional[PDFImageStore] = None
+        # 增量导出缓存，由 export_pnp 按 cache_name 打开（导出参数 pnp_cache 为 False 时不使用）
+        self.export_cache: Optional[PNPExportCache] = None
+
+    def _create_image_store(self) -> PDFImageStore:
+        """按导出参数创建PDF图片存储（pnp_image_format: flate/jpeg，pnp_jpeg_quality，pnp_flate_level）"""
+        flate_level = self.export_params.get('pnp_flate_level')
+        return PDFImageStore(
+            image_format=self.export_params.get('pnp_image_format') or DEFAULT_PDF_IMAGE_FORMAT,
+            jpeg_quality=int(self.export_params.get('pnp_jpeg_quality') or DEFAULT_JPEG_QUALITY),
+            flate_level=DEFAULT_FLATE_LEVEL if flate_level is None else int(flate_level),
+        )
+
+    def _open_export_cache(self) -> Optional[PNPExportCache]:
+        """打开当前内容包的导出缓存（<工作空间>/.cache/pnp_cache/<内容包>）"""
+        if not self.cache_name or not self.export_params.get('pnp_cache', True):
+            return None
+        safe_name = re.sub(r'[^\w\-]+', '_', os.path.splitext(os.path.basename(self.cache_name))[0])[:48]
+        name_hash = hashlib.sha1(self.cache_name.encode('utf-8')).hexdigest()[:8]
+        cache_dir = self.workspace_manager._get_absolute_path(
+            os.path.join('.cache', 'pnp_cache', f'{safe_name}_{name_hash}'))
+        self._add_log(f"使用导出缓存: {cache_dir}")
+        export_cache = PNPExportCache(cache_dir, self.workspace_manager.config, self.export_params,
+                                      render=render_fingerprint(self._render_fingerprint_paths()))
+        export_cache.begin_run()
+        return export_cache
+
+    @staticmethod
+    def _render_fingerprint_paths() -> List[str]:
+        """影响卡图渲染的代码与资源：渲染模块、内置字体/图片/卡背、用户字体与语言配置（打包版本以可执行文件代替源码）"""
+        paths = [get_resource_path(path) for path in RENDER_RESOURCE_PATHS]
+        paths.append(config_dir_manager.get_user_font_dir())
+        paths.append(config_dir_manager.get_language_config_file_path())
+        if getattr(sys, 'frozen', False):
+            paths.append(sys.executable)
+        return paths
+
+    def _card_asset_stats(self, card_data: Dict[str, Any]) -> List[Tuple[str, Optional[Tuple[int, int]]]]:
+        """
+        卡牌引用的工作空间素材及其 (mtime_ns, 字节数)：*_path 字段、遭遇组图标与默认页脚图标，不存在的素材为 None
+        """
+        config = self.workspace_manager.config or {}
+        encounter_groups_dir = config.get('encounter_groups_dir')
+        paths = set()
+
+        def visit(node):
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if isinstance(value, str) and value:
+                        if key.endswith('_path'):
+                            paths.add(value)
+                        elif key == 'encounter_group' and encounter_groups_dir:
+                            paths.add(os.path.join(encounter_groups_dir, value + '.png'))
+                    else:
+                        visit(value)
+            elif isinstance(node, list):
+                for item in node:
+                    visit(item)
+
+        visit(card_data)
+        if config.get('footer_icon_dir'):
+            paths.add(config['footer_icon_dir'])
+
+        stats = []
+        for path in paths:
+            try:
+                stat_result = os.stat(self.workspace_manager._get_absolute_path(path))
+                stats.append((path, (stat_result.st_mtime_ns, stat_result.st_size)))
+            except (OSError, ValueError):
+                stats.append((path, None))
+        return stats
+
+    def _job_cache_key(self, card_data: Dict[str, Any], encounter_group_numbers: Optional[List[str]]) -> str:
+        """导出任务在导出缓存中的键"""
+        return self.export_cache.make_key(card_data, encounter_group_numbers, self._card_asset_stats(card_data))
+
     def _add_log(self, message: str) -> None:
         """添加日志"""
         self.logs.append(message)
@@ -154,23 +255,18 @@ class PNPExporter:
         self._add_log(f"创建临时目录: {temp_dir}")
         return temp_dir
 
-    def _export_card_images(
-            self,
-            cards: List[Dict[str, Any]],
-            temp_dir: str
-    ) -> List[Dict[str, Any]]:
+    def _plan_export_jobs(self, cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        导出所有卡牌图片到临时目录
+        读取卡牌数据并生成导出任务（每张卡牌一个任务，经典模式下包含全部副本），按内容包顺序编号
 
         Args:
             cards: 卡牌列表
-            temp_dir: 临时目录路径
 
         Returns:
-            导出结果列表，每项包含卡牌信息和导出的图片路径
+            导出任务列表
         """
-        exported_cards = []
-        card_export_index = 0  # 用于生成唯一的文件名索引
+        jobs = []
+        export_index = 0  # 用于生成唯一的文件名索引
 
         for i, card_meta in enumerate(cards):
             try:
@@ -215,7 +311,8 @@ class PNPExporter:
                         except Exception:
                             pass
 
-                    # 为每个quantity生成独立的卡牌
+                    # 为每个quantity生成独立的卡牌（卡牌只渲染一次，各副本只重新绘制页脚编号）
+                    copies = []
                     for copy_idx in range(quantity):
                         # 克隆卡牌数据以避免修改原数据
                         card_data_copy = card_data.copy()
@@ -232,147 +329,271 @@ class PNPExporter:
 
                         card_data_copy['encounter_group_number'] = new_encounter_group_number
 
-                        self._add_log(
-                            f"  → 生成第 {copy_idx + 1}/{quantity} 张，遭遇组编号: {new_encounter_group_number}")
-
-                        # 导出这张独立编号的卡牌
-                        result = self._export_single_card_with_data(
-                            card_filename, card_data_copy, card_name,
-                            card_export_index, temp_dir
-                        )
-
-                        if result:
+                        copies.append({
+                            'index': export_index,
+                            'card_meta': {'filename': card_filename},
+                            'card_data': card_data_copy,
                             # quantity设为1，因为这是独立导出的单张卡
-                            result['quantity'] = 1
-                            result['card_data'] = card_data_copy
-                            exported_cards.append(result)
-                            card_export_index += 1
+                            'quantity': 1,
+                            'progress': f"  → 生成第 {copy_idx + 1}/{quantity} 张，遭遇组编号: {new_encounter_group_number}",
+                        })
+                        export_index += 1
 
+                    if not copies:
+                        continue
+                    job = {
+                        'card_filename': card_filename,
+                        'card_name': card_name,
+                        'encounter_group_numbers': [c['card_data']['encounter_group_number'] for c in copies],
+                        'copies': copies,
+                    }
                 else:
                     # 范围模式：使用原有的复制逻辑
-                    result = self.export_helper.export_card_auto(card_filename)
+                    job = {
+                        'card_filename': card_filename,
+                        'card_name': card_name,
+                        'encounter_group_numbers': None,
+                        'copies': [{
+                            'index': export_index,
+                            'card_meta': card_meta,
+                            'card_data': card_data,
+                            'quantity': quantity,
+                            'progress': None,
+                        }],
+                    }
+                    export_index += 1
+
+                if self.export_cache is not None:
+                    job['cache_key'] = self._job_cache_key(card_data, job['encounter_group_numbers'])
+                jobs.append(job)
 
-                    # 检查是否为双面卡牌
-                    if isinstance(result, dict):
-                        # 双面卡牌
-                        front_image = result.get('front')
-                        back_image = result.get('back')
+            except Exception as e:
+                self._add_log(f"✗ 导出卡牌 {i + 1} 失败: {e}")
+                import traceback
+                self._add_log(f"  详细错误: {traceback.format_exc()}")
+                continue
 
-                        if not front_image or not back_image:
-                            self._add_log(f"✗ 错误: 卡牌 {card_name} 缺少正面或背面图片！")
-                            continue
+        return jobs
 
-                        # 保存图片
-                        front_path, back_path = self._save_card_images(
-                            front_image, back_image, card_name, card_export_index, temp_dir
-                        )
+    def _render_export_job(self, job: Dict[str, Any]) -> List[Any]:
+        """
+        渲染并出血一个导出任务（在工作线程中执行，不写入最终结果）
 
-                        exported_cards.append({
-                            'card_meta': card_meta,
-                            'card_data': card_data,
-                            'card_name': card_name,
-                            'card_number': card_number,
-                            'quantity': quantity,
-                            'front_path': front_path,
-                            'back_path': back_path,
-                            'is_double_sided': True
-                        })
+        Returns:
+            每个副本的 ExportHelper.export_card_auto 格式结果；命中导出缓存时为 _load_cached_job 的结果
+        """
+        if job.get('cache_key') is not None:
+            cached = self._load_cached_job(job)
+            if cached is not None:
+                return cached
+        if job['encounter_group_numbers'] is None:
+            return [self.export_helper.export_card_auto(job['card_filename'])]
+        return self.export_helper.export_card_copies(job['card_filename'], job['encounter_group_numbers'])
+
+    def _load_cached_job(self, job: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取导出任务的缓存结果（PDF模式读取当前编码的图片流，图片模式使用缓存中的PNG），缺少任一文件时返回None
 
-                        card_export_index += 1
-                        self._add_log(f"✓ 成功导出双面卡牌: {card_name}")
+        Returns:
+            每个副本一项 {'cached': True, 'front': 图片信息, 'back': 图片信息}
+        """
+        copies = self.export_cache.get(job['cache_key'])
+        if copies is None or len(copies) != len(job['copies']):
+            return None
+        results = []
+        try:
+            for copy in copies:
+                result = {'cached': True}
+                for side in ('front', 'back'):
+                    info = copy[side]
+                    if self.image_store is not None:
+                        stream = self.export_cache.read_stream(info['digest'], self.image_store.encoding)
+                        if stream is None:
+                            return None
+                        result[side] = dict(info, stream=stream)
                     else:
-                        # 单面卡牌 - 这不应该发生，因为我们要求所有卡牌都是双面的
-                        self._add_log(f"✗ 错误: 卡牌 {card_name} 只有单面，无法导出PNP！")
+                        if not self.export_cache.has_image(info['digest']):
+                            return None
+                        result[side] = dict(info, path=self.export_cache.image_path(info['digest']))
+                results.append(result)
+        except (KeyError, TypeError):
+            return None
+        return results
+
+    def _write_export_job(self, job: Dict[str, Any], future: Future, temp_dir: str) -> List[Dict[str, Any]]:
+        """
+        取回渲染结果并保存到图片存储或临时目录（只在写入线程中按顺序调用）
+
+        Returns:
+            导出结果字典列表（每个副本一项），失败的副本不计入
+        """
+        card_name = job['card_name']
+        try:
+            results = future.result()
+        except Exception as e:
+            self._add_log(f"✗ 导出卡牌 {card_name} 失败: {e}")
+            import traceback
+            self._add_log(f"  详细错误: {traceback.format_exc()}")
+            return []
+
+        cache_hit = bool(results) and isinstance(results[0], dict) and bool(results[0].get('cached'))
+        cache_copies = []
+        exported = []
+        for copy, result in zip(job['copies'], results):
+            if copy['progress']:
+                self._add_log(copy['progress'])
+            try:
+                # 检查是否为双面卡牌
+                if not isinstance(result, dict):
+                    # 单面卡牌 - 这不应该发生，因为我们要求所有卡牌都是双面的
+                    self._add_log(f"✗ 错误: 卡牌 {card_name} 只有单面，无法导出PNP！")
+                    continue
+
+                if cache_hit:
+                    images = self._use_cached_images(result)
+                else:
+                    front_image = result.get('front')
+                    back_image = result.get('back')
+                    if not front_image or not back_image:
+                        self._add_log(f"✗ 错误: 卡牌 {card_name} 缺少正面或背面图片！")
                         continue
 
+                    images, cache_copy = self._store_card_images(
+                        front_image, back_image, card_name, copy['index'], temp_dir
+                    )
+                    cache_copies.append(cache_copy)
             except Exception as e:
-                self._add_log(f"✗ 导出卡牌 {i + 1} 失败: {e}")
+                self._add_log(f"✗ 导出卡牌 {card_name} 失败: {e}")
                 import traceback
                 self._add_log(f"  详细错误: {traceback.format_exc()}")
                 continue
 
+            exported.append({
+                'card_meta': copy['card_meta'],
+                'card_data': copy['card_data'],
+                'card_name': card_name,
+                'card_number': copy['card_data'].get('card_number', ''),
+                'quantity': copy['quantity'],
+                **images,
+                'is_double_sided': True
+            })
+
+        if job.get('cache_key') is not None:
+            self.export_cache.record(cache_hit)
+            # 全部副本成功时才写入缓存条目
+            if not cache_hit and len(cache_copies) == len(job['copies']):
+                self.export_cache.put(job['cache_key'], cache_copies)
+
+        if job['encounter_group_numbers'] is None and exported:
+            self._add_log(f"✓ 成功导出双面卡牌: {card_name}" + ("（使用缓存）" if cache_hit else ""))
+        return exported
+
+    def _export_card_images(
+            self,
+            cards: List[Dict[str, Any]],
+            temp_dir: str
+    ) -> List[Dict[str, Any]]:
+        """
+        导出所有卡牌图片到图片存储（PDF模式）或临时目录
+
+        工作线程并行渲染和出血，当前线程作为唯一的写入者按顺序保存图片并记录结果；
+        已渲染未保存的任务数不超过 max_in_flight，限制内存占用（经典模式的一个任务包含该卡牌全部副本）。
+
+        Args:
+            cards: 卡牌列表
+            temp_dir: 临时目录路径
+
+        Returns:
+            导出结果列表，每项包含卡牌信息和导出的图片键（front_image/back_image）或路径（front_path/back_path）
+        """
+        jobs = self._plan_export_jobs(cards)
+        if not jobs:
+            return []
+
+        self._add_log(f"共 {len(jobs)} 个导出任务，并行渲染线程数: {self.max_workers}")
+        exported_cards = []
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pnp_export') as executor:
+            for job in jobs:
+                # 达到上限时先写出最早的任务，再提交新任务
+                while len(pending) >= self.max_in_flight:
+                    exported_cards.extend(self._write_export_job(*pending.popleft(), temp_dir))
+                pending.append((job, executor.submit(self._render_export_job, job)))
+
+            while pending:
+                exported_cards.extend(self._write_export_job(*pending.popleft(), temp_dir))
+
         return exported_cards
 
     def _read_card_json(self, card_filename: str) -> Optional[Dict[str, Any]]:
         """读取卡牌JSON数据"""
         try:
-            card_content = self.workspace_manager.get_file_content(card_filename)
-            if not card_content:
-                return None
-            return json.loads(card_content)
+            return self.workspace_manager.read_card(card_filename)
         except Exception as e:
             self._add_log(f"读取卡牌JSON失败 {card_filename}: {e}")
             return None
 
-    def _export_single_card_with_data(
+    def _orient_card_images(
+            self,
+            front_image: Image.Image,
+            back_image: Image.Image,
+            card_name: str
+    ) -> Tuple[Image.Image, Image.Image]:
+        """横向卡牌旋转为纵向：正面逆时针旋转90度，背面顺时针旋转90度"""
+        if front_image.width > front_image.height:
+            front_image = front_image.rotate(90, expand=True)
+            back_image = back_image.rotate(-90, expand=True)
+            self._add_log(f"卡牌 {card_name} 为横向，已旋转")
+        return front_image, back_image
+
+    def _store_card_images(
             self,
-            card_filename: str,
-            card_data: Dict[str, Any],
+            front_image: Image.Image,
+            back_image: Image.Image,
             card_name: str,
             index: int,
             temp_dir: str
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
         """
-        使用修改后的卡牌数据导出单张卡牌
-
-        Args:
-            card_filename: 原始卡牌文件名（用于获取模板等信息）
-            card_data: 修改后的卡牌数据（包含新的encounter_group_number）
-            card_name: 卡牌名称
-            index: 卡牌索引（用于文件名）
-            temp_dir: 临时目录
+        保存一个副本的正反面图片：PDF模式编码进图片存储（相同图片只保留一份），
+        图片模式保存为PNG（启用导出缓存时直接保存到缓存目录）
 
         Returns:
-            导出结果字典，失败返回None
+            (导出结果中的图片字段, 导出缓存条目中该副本的图片信息；未启用导出缓存时为None)
         """
-        try:
-            # 创建临时文件保存修改后的卡牌数据
-            temp_card_file = os.path.join(temp_dir, f"temp_card_{index}.json")
-            with open(temp_card_file, 'w', encoding='utf-8') as f:
-                json.dump(card_data, f, ensure_ascii=False, indent=2)
-
-            # 使用ExportHelper导出这张卡牌
-            result = self.export_helper.export_card_auto(temp_card_file)
-
-            # 删除临时文件
-            try:
-                os.remove(temp_card_file)
-            except Exception:
-                pass
-
-            # 检查是否为双面卡牌
-            if isinstance(result, dict):
-                front_image = result.get('front')
-                back_image = result.get('back')
-
-                if not front_image or not back_image:
-                    self._add_log(f"✗ 错误: 卡牌 {card_name} 缺少正面或背面图片！")
-                    return None
-
-                # 保存图片
-                front_path, back_path = self._save_card_images(
-                    front_image, back_image, card_name, index, temp_dir
-                )
-
-                return {
-                    'card_meta': {'filename': card_filename},
-                    'card_data': card_data,
-                    'card_name': card_name,
-                    'card_number': card_data.get('card_number', ''),
-                    'quantity': 1,  # 单张卡
-                    'front_path': front_path,
-                    'back_path': back_path,
-                    'is_double_sided': True
-                }
+        if self.image_store is None and self.export_cache is None:
+            front_path, back_path = self._save_card_images(front_image, back_image, card_name, index, temp_dir)
+            return {'front_path': front_path, 'back_path': back_path}, None
+
+        front_image, back_image = self._orient_card_images(front_image, back_image, card_name)
+        images = {}
+        cache_copy = {}
+        for side, image in (('front', front_image), ('back', back_image)):
+            digest = image_digest(image)
+            if self.image_store is not None:
+                images[f'{side}_image'] = self.image_store.add(image, digest)
+                info = self.image_store.image_info(digest)
+                if self.export_cache is not None:
+                    self.export_cache.write_stream(
+                        digest, self.image_store.encoding, self.image_store.stream_content(digest))
             else:
-                self._add_log(f"✗ 错误: 卡牌 {card_name} 只有单面，无法导出PNP！")
-                return None
-
-        except Exception as e:
-            self._add_log(f"✗ 导出单张卡牌失败: {e}")
-            import traceback
-            self._add_log(f"  详细错误: {traceback.format_exc()}")
-            return None
+                images[f'{side}_path'] = self.export_cache.save_image(digest, image)
+                info = {'width': image.width, 'height': image.height,
+                        'color_space': PDFImageStore.color_space(image)}
+            cache_copy[side] = dict(info, digest=digest)
+        return images, (cache_copy if self.export_cache is not None else None)
+
+    def _use_cached_images(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """将 _load_cached_job 读取的一个副本登记到图片存储，返回导出结果中的图片字段"""
+        images = {}
+        for side in ('front', 'back'):
+            info = result[side]
+            if self.image_store is not None:
+                images[f'{side}_image'] = self.image_store.add_encoded(info['digest'], info, info['stream'])
+            else:
+                images[f'{side}_path'] = info['path']
+        return images
 
     def _save_card_images(
             self,
@@ -395,14 +616,7 @@ class PNPExporter:
         Returns:
             (正面图片路径, 背面图片路径)
         """
-        # 检查是否为横向卡牌
-        is_landscape = front_image.width > front_image.height
-
-        if is_landscape:
-            # 横向卡牌：正面逆时针旋转90度，背面顺时针旋转90度
-            front_image = front_image.rotate(90, expand=True)
-            back_image = back_image.rotate(-90, expand=True)
-            self._add_log(f"卡牌 {card_name} 为横向，已旋转")
+        front_image, back_image = self._orient_card_images(front_image, back_image, card_name)
 
         # 生成文件名（使用索引确保唯一性和排序）
         safe_name = "".join(c for c in card_name if c.isalnum() or c in (' ', '-', '_')).strip()
@@ -413,11 +627,37 @@ class PNPExporter:
         back_path = os.path.join(temp_dir, back_filename)
 
         # 保存图片
-        front_image.save(front_path, 'PNG')
-        back_image.save(back_path, 'PNG')
+        # 临时文件只在本次导出中读取一次，使用低压缩级别
+        front_image.save(front_path, 'PNG', compress_level=TEMP_PNG_COMPRESS_LEVEL)
+        back_image.save(back_path, 'PNG', compress_level=TEMP_PNG_COMPRESS_LEVEL)
 
         return front_path, back_path
 
+    def _card_image_size(self, card_info: Dict[str, Any], side: str) -> Tuple[int, int]:
+        """卡牌某一面图片的像素尺寸，side 为 'front' 或 'back'"""
+        key = card_info.get(f'{side}_image')
+        if key is not None:
+            return self.image_store.size(key)
+        with Image.open(card_info[f'{side}_path']) as im:
+            return im.size
+
+    def _draw_card_image(
+            self,
+            c: canvas.Canvas,
+            card_info: Dict[str, Any],
+            side: str,
+            x: float,
+            y: float,
+            width: float,
+            height: float
+    ) -> None:
+        """绘制卡牌某一面图片，图片存储中的图片在同一PDF中只嵌入一次"""
+        key = card_info.get(f'{side}_image')
+        if key is not None:
+            self.image_store.draw(c, key, x, y, width, height)
+        else:
+            c.drawImage(card_info[f'{side}_path'], x, y, width=width, height=height)
+
     def _sort_cards_by_number(self, exported_cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         按card_number排序卡牌
@@ -455,15 +695,10 @@ class PNPExporter:
             if quantity is None:
                 quantity = 1
 
-            front_path = card_info['front_path']
-            back_path = card_info['back_path']
-
             # 根据quantity生成对应数量的副本
             for copy_num in range(quantity):
                 # 读取图片获取尺寸
-                from PIL import Image as PILImage
-                with PILImage.open(front_path) as front_img:
-                    width_px, height_px = front_img.size
+                width_px, height_px = self._card_image_size(card_info, 'front')
 
                 # 转换为mm（假设DPI为300）
                 dpi = self.export_params.get('dpi', 300)
@@ -474,11 +709,11 @@ class PNPExporter:
                 c.setPageSize((width_mm * mm, height_mm * mm))
 
                 # 添加正面
-                c.drawImage(front_path, 0, 0, width=width_mm * mm, height=height_mm * mm)
+                self._draw_card_image(c, card_info, 'front', 0, 0, width_mm * mm, height_mm * mm)
                 c.showPage()
 
                 # 添加背面
-                c.drawImage(back_path, 0, 0, width=width_mm * mm, height=height_mm * mm)
+                self._draw_card_image(c, card_info, 'back', 0, 0, width_mm * mm, height_mm * mm)
                 c.showPage()
 
         c.save()
@@ -510,10 +745,7 @@ class PNPExporter:
         if not exported_cards:
             raise ValueError("没有卡牌可以导出")
 
-        first_card = exported_cards[0]
-        from PIL import Image as PILImage
-        with PILImage.open(first_card['front_path']) as card_img:
-            card_width_px, card_height_px = card_img.size
+        card_width_px, card_height_px = self._card_image_size(exported_cards[0], 'front')
 
         # 转换为mm
         dpi = self.export_params.get('dpi', 300)
@@ -644,14 +876,9 @@ class PNPExporter:
             # 注意：PDF坐标系是左下角为原点，所以y坐标需要从下往上计算
             y = paper_height_mm - start_y - (row + 1) * card_height_mm - row * card_gap_mm
 
-            # 获取图片路径
-            image_path = card_info['front_path'] if side == 'front' else card_info['back_path']
-
             # 读取实际图片尺寸（像素）并转换为mm（按导出DPI）
             try:
-                from PIL import Image as PILImage
-                with PILImage.open(image_path) as im:
-                    iw_px, ih_px = im.size
+                iw_px, ih_px = self._card_image_size(card_info, side)
             except Exception:
                 iw_px, ih_px = int(card_width_mm * self.export_helper.dpi / 25.4), int(card_height_mm * self.export_helper.dpi / 25.4)
 
@@ -663,7 +890,7 @@ class PNPExporter:
             draw_x = x + (card_width_mm - iw_mm) / 2
             draw_y = y + (card_height_mm - ih_mm) / 2
 
-            c.drawImage(image_path, draw_x * mm, draw_y * mm, width=iw_mm * mm, height=ih_mm * mm)
+            self._draw_card_image(c, card_info, side, draw_x * mm, draw_y * mm, iw_mm * mm, ih_mm * mm)
 
             # 判断是否在边缘，只在边缘卡牌绘制外侧裁剪线（按实际卡牌尺寸绘制）
             is_left_edge = (col == 0)
@@ -807,8 +1034,7 @@ class PNPExporter:
                 card_name = card_info.get('card_name', 'Unknown')
 
                 # 读取图片并复制到内存
-                from PIL import Image as PILImage
-                with PILImage.open(front_path) as f_img, PILImage.open(back_path) as b_img:
+                with Image.open(front_path) as f_img, Image.open(back_path) as b_img:
                     front_img = f_img.copy()
                     back_img = b_img.copy()
 
@@ -900,6 +1126,14 @@ class PNPExporter:
 
         return filename
 
+    def _collect_export_cache(self) -> None:
+        """导出成功后清理导出缓存中本次未用到的条目和文件"""
+        if self.export_cache is None:
+            return
+        removed_entries, removed_files = self.export_cache.collect_garbage()
+        if removed_entries or removed_files:
+            self._add_log(f"清理导出缓存: {removed_entries} 个过期条目，{removed_files} 个文件")
+
     def export_pnp(
             self,
             cards: List[Dict[str, Any]],
@@ -924,8 +1158,10 @@ class PNPExporter:
             self._add_log(f"开始导出 (模式: {mode})...")
             self._add_log(f"总卡牌数: {len(cards)}")
 
-            # 1. 创建临时目录
+            # 1. 创建临时目录（图片模式使用）；PDF模式的卡图直接编码进内存中的图片存储
             temp_dir = self._create_temp_directory()
+            self.image_store = self._create_image_store() if mode in ('single_card', 'print_sheet') else None
+            self.export_cache = self._open_export_cache()
 
             try:
                 # 2. 导出所有卡牌图片
@@ -936,6 +1172,12 @@ class PNPExporter:
                     raise ValueError("没有成功导出任何卡牌图片")
 
                 self._add_log(f"成功导出 {len(exported_cards)} 张卡牌图片")
+                if self.export_cache is not None:
+                    self._add_log(f"导出缓存: {self.export_cache.hits} 张卡牌未变化，重新渲染 {self.export_cache.misses} 张")
+                if self.image_store is not None:
+                    self._add_log(
+                        f"PDF图片 ({self.image_store.image_format}): {len(self.image_store)} 张不重复图片，"
+                        f"复用 {self.image_store.reused} 次，共 {self.image_store.encoded_bytes() / 1024 / 1024:.1f} MB")
 
                 # 3. 按card_number排序
                 exported_cards = self._sort_cards_by_number(exported_cards)
@@ -945,6 +1187,7 @@ class PNPExporter:
                 if mode == 'images':
                     # 图片导出模式
                     self._export_images_mode(exported_cards, output_path)
+                    self._collect_export_cache()
                     return {
                         'success': True,
                         'mode': 'images',
@@ -960,6 +1203,7 @@ class PNPExporter:
                 else:
                     raise ValueError(f"不支持的导出模式: {mode}")
 
+                self._collect_export_cache()
                 self._add_log("导出成功！")
 
                 return {
@@ -971,7 +1215,11 @@ class PNPExporter:
                 }
 
             finally:
-                # 5. 清理临时目录
+                # 5. 释放图片存储与导出缓存并清理临时目录
+                self.image_store = None
+                if self.export_cache is not None:
+                    self.export_cache.end_run()
+                    self.export_cache = None
                 try:
                     shutil.rmtree(temp_dir)
                     self._add_log(f"清理临时目录: {temp_dir}")
@@ -0,0 +1,226 @@
+"""
+PNP PDF 图片对象存储
+
+渲染好的卡图在内存中直接编码为 PDF 图片流（Flate 或 JPEG，每张只编码一次），不再经由临时 PNG 中转。
+图片按像素内容哈希去重：相同的卡背只编码一次，在 PDF 中是同一个 XObject，每页只引用它。
+
+直接登记预编码的图片流依赖 reportlab 的内部接口（Canvas._setXObjects、PDFDocument.Reference/addForm、
+PDFImageXObject 的 streamContent/_filters 等）。首次绘制前用一张 1x1 图片实际生成一次 PDF 检查这些接口，
+不可用时退回公开的 Canvas.drawImage（由 reportlab 重新编码图片，结果正确但更慢、文件可能更大）。
+"""
+import io
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
+from reportlab.pdfbase import pdfdoc
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from bin.logger import logger_manager
+from export_helper.bleed_cache import image_digest
+
+PDF_IMAGE_FORMATS = ('flate', 'jpeg')
+DEFAULT_PDF_IMAGE_FORMAT = 'flate'
+DEFAULT_JPEG_QUALITY = 90
+DEFAULT_FLATE_LEVEL = 6
+
+# draw 直接登记图片对象时用到的 reportlab 内部接口
+REPORTLAB_INTERNALS = (
+    (pdf_canvas, '_digester'),
+    (pdf_canvas.Canvas, '_setXObjects'),
+    (pdfdoc.PDFDocument, 'getXObjectName'),
+    (pdfdoc.PDFDocument, 'Reference'),
+    (pdfdoc.PDFDocument, 'addForm'),
+    (pdfdoc.PDFImageXObject, 'format'),
+)
+
+_direct_draw_supported: Optional[bool] = None
+_probe_lock = threading.Lock()
+
+
+def direct_draw_supported() -> bool:
+    """当前 reportlab 是否支持直接登记预编码的图片流（结果缓存）"""
+    global _direct_draw_supported
+    with _probe_lock:
+        if _direct_draw_supported is None:
+            _direct_draw_supported = _probe_direct_draw()
+            if not _direct_draw_supported:
+                logger_manager.warning("reportlab 内部接口不兼容，PNP PDF 图片改用 drawImage 绘制")
+        return _direct_draw_supported
+
+
+def _probe_direct_draw() -> bool:
+    """用 1x1 图片绘制两次，检查输出中只有一个图片对象且流内容与滤镜未被改写"""
+    if not all(hasattr(owner, name) for owner, name in REPORTLAB_INTERNALS):
+        return False
+    try:
+        store = PDFImageStore()
+        key = store.add(Image.new('RGB', (1, 1), (1, 2, 3)))
+        buffer = io.BytesIO()
+        c = pdf_canvas.Canvas(buffer)
+        store._draw_direct(c, key, 0, 0, 1, 1)
+        store._draw_direct(c, key, 10, 10, 1, 1)
+        c.save()
+    except Exception:
+        return False
+    pdf = buffer.getvalue()
+    return (pdf.count(b'/Subtype /Image') == 1 and b'/Filter [ /FlateDecode ]' in pdf
+            and store.stream_content(key) in pdf)
+
+
+class PDFImageStore:
+    """按内容去重的 PDF 图片对象存储（线程安全）"""
+
+    def __init__(self, image_format: str = DEFAULT_PDF_IMAGE_FORMAT, jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 flate_level: int = DEFAULT_FLATE_LEVEL):
+        """
+        :param image_format: 'flate'（无损，默认）或 'jpeg'
+        :param jpeg_quality: JPEG 质量（1-95）
+        :param flate_level: Flate 压缩级别（0-9）
+        """
+        image_format = (image_format or DEFAULT_PDF_IMAGE_FORMAT).lower()
+        if image_format == 'jpg':
+            image_format = 'jpeg'
+        if image_format not in PDF_IMAGE_FORMATS:
+            raise ValueError(f"不支持的PDF图片格式: {image_format}")
+        if not 1 <= jpeg_quality <= 95:
+            raise ValueError(f"JPEG质量必须在 1-95 之间: {jpeg_quality}")
+        if not 0 <= flate_level <= 9:
+            raise ValueError(f"Flate压缩级别必须在 0-9 之间: {flate_level}")
+
+        self.image_format = image_format
+        self.jpeg_quality = jpeg_quality
+        self.flate_level = flate_level
+        self._images: Dict[str, pdfdoc.PDFImageXObject] = {}
+        # drawImage 回退路径使用的图片读取器
+        self._readers: Dict[str, ImageReader] = {}
+        self._lock = threading.Lock()
+        # 重复图片命中次数
+        self.reused = 0
+
+    @property
+    def encoding(self) -> str:
+        """编码标记（格式与压缩参数），相同标记的图片流可以直接复用"""
+        if self.image_format == 'jpeg':
+            return f'jpeg{self.jpeg_quality}'
+        return f'flate{self.flate_level}'
+
+    @staticmethod
+    def color_space(image: Image.Image) -> str:
+        return 'DeviceGray' if image.mode == 'L' else 'DeviceRGB'
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._images
+
+    def add(self, image: Image.Image, digest: Optional[str] = None) -> str:
+        """
+        编码图片（内容已存在则跳过），返回图片键（像素摘要）
+
+        :param digest: 已计算的 image_digest(image)
+        """
+        key = digest or image_digest(image)
+        with self._lock:
+            if key in self._images:
+                self.reused += 1
+                return key
+        image_obj = self._encode(image)
+        with self._lock:
+            self._images.setdefault(key, image_obj)
+        return key
+
+    def add_encoded(self, key: str, info: Dict[str, Any], stream: bytes) -> str:
+        """
+        登记已按本存储编码参数编码的图片流（来自导出缓存）
+
+        :param info: image_info 返回的图片信息
+        """
+        with self._lock:
+            if key in self._images:
+                self.reused += 1
+                return key
+            self._images[key] = self._make_image_obj(info['width'], info['height'], info['color_space'], stream)
+        return key
+
+    def image_info(self, key: str) -> Dict[str, Any]:
+        """图片信息 {'width', 'height', 'color_space'}"""
+        image_obj = self._images[key]
+        return {'width': image_obj.width, 'height': image_obj.height, 'color_space': image_obj.colorSpace}
+
+    def stream_content(self, key: str) -> bytes:
+        """已编码的图片流"""
+        return self._images[key].streamContent
+
+    def size(self, key: str) -> Tuple[int, int]:
+        """图片像素尺寸 (宽, 高)"""
+        image_obj = self._images[key]
+        return image_obj.width, image_obj.height
+
+    def encoded_bytes(self) -> int:
+        """全部图片流的字节数"""
+        return sum(len(image_obj.streamContent) for image_obj in self._images.values())
+
+    def draw(self, c: pdf_canvas.Canvas, key: str, x: float, y: float, width: float, height: float) -> None:
+        """
+        在画布上绘制图片，同一画布中相同的键只登记一个 XObject
+
+        reportlab 内部接口不可用时退回 drawImage（按像素内容去重，图片流由 reportlab 重新编码）。
+        """
+        if direct_draw_supported():
+            self._draw_direct(c, key, x, y, width, height)
+        else:
+            c.drawImage(self._reader(key), x, y, width=width, height=height)
+
+    def _draw_direct(self, c: pdf_canvas.Canvas, key: str, x: float, y: float, width: float, height: float) -> None:
+        # 以与 Canvas.drawImage 相同的规则（按文件名）命名并预先登记对象，drawImage 随后直接复用它
+        name = pdf_canvas._digester(f'{key}None')
+        reg_name = c._doc.getXObjectName(name)
+        if reg_name not in c._doc.idToObject:
+            image_obj = self._images[key]
+            image_obj.name = name
+            c._setXObjects(image_obj)
+            c._doc.Reference(image_obj, reg_name)
+            c._doc.addForm(name, image_obj)
+        c.drawImage(key, x, y, width=width, height=height)
+
+    def _reader(self, key: str) -> ImageReader:
+        """由已编码的图片流还原出 ImageReader（JPEG 流由 reportlab 原样嵌入）"""
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is None:
+                image_obj = self._images[key]
+                if image_obj._filters == ('DCTDecode',):
+                    reader = ImageReader(io.BytesIO(image_obj.streamContent))
+                else:
+                    mode = 'L' if image_obj.colorSpace == 'DeviceGray' else 'RGB'
+                    reader = ImageReader(Image.frombytes(mode, (image_obj.width, image_obj.height),
+                                                         zlib.decompress(image_obj.streamContent)))
+                self._readers[key] = reader
+            return reader
+
+    def _encode(self, image: Image.Image) -> pdfdoc.PDFImageXObject:
+        # 与 reportlab 读取图片文件时一致：灰度保持，其余模式转为 RGB（丢弃透明通道）
+        if image.mode != 'L':
+            image = image.convert('RGB')
+
+        if self.image_format == 'jpeg':
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=self.jpeg_quality)
+            stream = buffer.getvalue()
+        else:
+            stream = zlib.compress(image.tobytes(), self.flate_level)
+        return self._make_image_obj(image.width, image.height, self.color_space(image), stream)
+
+    def _make_image_obj(self, width: int, height: int, color_space: str, stream: bytes) -> pdfdoc.PDFImageXObject:
+        image_obj = pdfdoc.PDFImageXObject(None)
+        image_obj.width = width
+        image_obj.height = height
+        image_obj.bitsPerComponent = 8
+        image_obj.colorSpace = color_space
+        image_obj.streamContent = stream
+        image_obj._filters = ('DCTDecode',) if self.image_format == 'jpeg' else ('FlateDecode',)
+        return image_obj
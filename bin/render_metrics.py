@@ -0,0 +1,247 @@
+"""
+渲染阶段耗时统计
+
+按阶段（stage）与卡牌类型（card_type）聚合耗时直方图，供 /api/metrics 以 JSON 或
+Prometheus 文本格式输出。默认关闭，关闭时 span() 返回共享的空上下文，几乎没有开销；
+可通过环境变量 ARKHAM_RENDER_METRICS=1 或 render_metrics.set_enabled(True) 开启。
+
+用法::
+
+    with render_metrics.span('art_paste'):
+        ...
+    render_metrics.observe_count('text_fit_trials', trials)
+
+指定 card_type 的 span（create_card、export_card、encode 等）记录包含嵌套阶段的总耗时；
+其余阶段记录扣除嵌套阶段后的自身耗时（如 art_paste 不含其中的 compose），各阶段之和不超过总耗时。
+"""
+import contextlib
+import functools
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+METRICS_ENV = 'ARKHAM_RENDER_METRICS'
+
+# 耗时直方图桶（秒）
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 计数直方图桶（如字号二分查找的试排次数）
+COUNT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+_NOOP = contextlib.nullcontext()
+
+
+class _Histogram:
+    """累积直方图（与 Prometheus histogram 语义一致）"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': {str(bound): n for bound, n in zip(self.buckets, self.counts)},
+        }
+
+
+class _Span:
+    """单次计时，退出时写入直方图"""
+
+    __slots__ = ('_metrics', '_stage', '_card_type', '_started', '_pushed', '_nested')
+
+    def __init__(self, metrics: 'RenderMetrics', stage: str, card_type: Optional[str]):
+        self._metrics = metrics
+        self._stage = stage
+        self._card_type = card_type
+        self._pushed = False
+        # 嵌套阶段的累计耗时
+        self._nested = 0.0
+
+    def __enter__(self):
+        stack = self._metrics._card_type_stack()
+        if self._card_type is not None:
+            stack.append(self._card_type)
+            self._pushed = True
+        elif stack:
+            self._card_type = stack[-1]
+        self._metrics._span_stack().append(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        spans = self._metrics._span_stack()
+        spans.pop()
+        if spans:
+            spans[-1]._nested += elapsed
+        if self._pushed:
+            self._metrics._card_type_stack().pop()
+            # 总耗时 span 包含嵌套阶段
+            recorded = elapsed
+        else:
+            recorded = max(0.0, elapsed - self._nested)
+        self._metrics.observe(self._stage, recorded, card_type=self._card_type)
+        return False
+
+
+class RenderMetrics:
+    """渲染耗时统计器（进程内单例，线程安全）"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get(METRICS_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (stage, card_type) -> _Histogram
+        self._durations: Dict[Tuple[str, str], _Histogram] = {}
+        # (name, card_type) -> _Histogram
+        self._counts: Dict[Tuple[str, str], _Histogram] = {}
+        self._started_at = time.time()
+
+    # ---------- 开关 ----------
+    def set_enabled(self, enabled: bool):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+            self._started_at = time.time()
+
+    # ---------- 采集 ----------
+    def _card_type_stack(self) -> List[str]:
+        stack = getattr(self._local, 'card_types', None)
+        if stack is None:
+            stack = self._local.card_types = []
+        return stack
+
+    def _span_stack(self) -> List['_Span']:
+        spans = getattr(self._local, 'spans', None)
+        if spans is None:
+            spans = self._local.spans = []
+        return spans
+
+    def span(self, stage: str, card_type: Optional[str] = None):
+        """
+        计时上下文。card_type 为空时继承外层 span 的卡牌类型，
+        使嵌套阶段（文字排版、特效等）也能按卡牌类型区分。
+        """
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, stage, card_type)
+
+    def timed(self, stage: str):
+        """方法装饰器版本的 span()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, stage, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, stage: str, seconds: float, card_type: Optional[str] = None):
+        """记录一次阶段耗时（秒）"""
+        if not self.enabled:
+            return
+        key = (stage, card_type or '')
+        with self._lock:
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = _Histogram(DURATION_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_count(self, name: str, value: int, card_type: Optional[str] = None):
+        """记录一次计数型观测值（如试排次数）"""
+        if not self.enabled:
+            return
+        if card_type is None:
+            stack = self._card_type_stack()
+            card_type = stack[-1] if stack else ''
+        key = (name, card_type)
+        with self._lock:
+            histogram = self._counts.get(key)
+            if histogram is None:
+                histogram = self._counts[key] = _Histogram(COUNT_BUCKETS)
+            histogram.observe(value)
+
+    # ---------- 输出 ----------
+    def snapshot(self) -> dict:
+        """JSON 友好的聚合结果"""
+        with self._lock:
+            stages = [
+                {'stage': stage, 'card_type': card_type, **histogram.to_dict()}
+                for (stage, card_type), histogram in self._durations.items()
+            ]
+            counts = [
+                {'name': name, 'card_type': card_type, **histogram.to_dict()}
+                for (name, card_type), histogram in self._counts.items()
+            ]
+            started_at = self._started_at
+        stages.sort(key=lambda item: item['sum'], reverse=True)
+        counts.sort(key=lambda item: (item['name'], item['card_type']))
+        return {
+            'enabled': self.enabled,
+            'since': started_at,
+            'stages': stages,
+            'counts': counts,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（exposition format 0.0.4）"""
+        lines = [f'arkham_render_metrics_enabled {1 if self.enabled else 0}']
+        with self._lock:
+            durations = sorted(self._durations.items())
+            counts = sorted(self._counts.items())
+        if durations:
+            lines.append('# HELP arkham_render_stage_seconds Render/export stage duration in seconds.')
+            lines.append('# TYPE arkham_render_stage_seconds histogram')
+            for (stage, card_type), histogram in durations:
+                labels = f'stage="{_escape(stage)}",card_type="{_escape(card_type)}"'
+                lines.extend(_format_histogram('arkham_render_stage_seconds', labels, histogram))
+        if counts:
+            lines.append('# HELP arkham_render_count Per-render counters such as text fit trials.')
+            lines.append('# TYPE arkham_render_count histogram')
+            for (name, card_type), histogram in counts:
+                labels = f'name="{_escape(name)}",card_type="{_escape(card_type)}"'
+                lines.extend(_format_histogram('arkham_render_count', labels, histogram))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_histogram(metric: str, labels: str, histogram: _Histogram) -> List[str]:
+    lines = []
+    for bound, n in zip(histogram.buckets, histogram.counts):
+        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {n}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{metric}_sum{{{labels}}} {histogram.total}')
+    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+# 全局实例
+render_metrics = RenderMetrics()
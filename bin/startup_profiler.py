@@ -0,0 +1,116 @@
+"""
+启动耗时分析
+
+提供类似 ``python -X importtime`` 的导入耗时统计（打包后的程序无法传入 -X 参数），
+以及从进程启动到首个窗口显示的耗时记录。由 app.py 的 --startup-report 参数启用。
+"""
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """包装原始 loader，记录 exec_module 的累计与自身耗时"""
+
+    def __init__(self, loader, fullname: str, profiler: 'StartupProfiler'):
+        self._loader = loader
+        self._fullname = fullname
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._fullname)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._fullname)
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """导入耗时统计器（安装到 sys.meta_path 首位，委托其余 finder 查找模块）"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_window_at: Optional[float] = None
+        # 模块名 -> (自身耗时, 累计耗时)，单位秒
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self._stack: List[list] = []
+        self._local = threading.local()
+        self._installed = False
+
+    # ---------- 安装/卸载 ----------
+    def install(self):
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+        return self
+
+    def uninstall(self):
+        if self._installed:
+            try:
+                sys.meta_path.remove(self)
+            except ValueError:
+                pass
+            self._installed = False
+
+    # ---------- MetaPathFinder ----------
+    def find_spec(self, fullname, path, target=None):
+        # 只统计主线程的导入，避免后台预热线程打乱嵌套关系
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        if getattr(self._local, 'finding', False):
+            return None
+
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+    def _enter(self, fullname: str):
+        self._stack.append([fullname, time.perf_counter(), 0.0])
+
+    def _exit(self, fullname: str):
+        name, started, child_time = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        self.timings[name] = (cumulative - child_time, cumulative)
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    # ---------- 报告 ----------
+    def mark_first_window(self):
+        """记录首个窗口显示的时间点"""
+        if self.first_window_at is None:
+            self.first_window_at = time.perf_counter()
+
+    def format_report(self, top: int = 30) -> str:
+        """生成启动报告（按累计耗时排序的前 top 个模块）"""
+        lines = ["启动耗时报告"]
+        if self.first_window_at is not None:
+            lines.append(f"首个窗口显示: {(self.first_window_at - self.started_at) * 1000:.0f} ms")
+        total_imports = sum(self_time for self_time, _ in self.timings.values())
+        lines.append(f"导入模块数: {len(self.timings)}，导入总耗时: {total_imports * 1000:.0f} ms")
+        lines.append(f"{'self [us]':>10} | {'cumulative':>10} | module")
+
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (self_time, cumulative) in ranked[:top]:
+            lines.append(f"{self_time * 1e6:>10.0f} | {cumulative * 1e6:>10.0f} | {name}")
+        return "\n".join(lines)
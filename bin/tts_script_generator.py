@@ -226,6 +226,8 @@ class TtsScriptGenerator:
         if not wm or not isinstance(rel_path, str) or not rel_path:
             return None
         try:
+            if hasattr(wm, 'read_card'):
+                return wm.read_card(rel_path)
             # best-effort resolve absolute path
             abs_path = None
             if hasattr(wm, '_get_absolute_path'):
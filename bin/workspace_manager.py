@@ -1,14 +1,17 @@
 import base64
-import hashlib
+import codecs
 import io
 import json
 import mimetypes
 import os
 import re
 import sys
+import tempfile
 import threading
 import time
 import traceback
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Union, Tuple, TYPE_CHECKING
 from concurrent.futures import ThreadPoolExecutor
 from queue import Queue
@@ -20,92 +23,553 @@ from bin.deck_exporter import DeckExporter
 from bin.logger import logger_manager
 from bin.tts_card_converter import TTSCardConverter
 from bin.content_package_manager import ContentPackageManager
-from Card import Card
 
-# 导入卡牌生成相关模块
+# 可选的更快 JSON 解析（未安装时使用标准库）
 try:
-    from ResourceManager import FontManager, ImageManager
-    from create_card import CardCreator
+    import orjson
 
-    CARD_GENERATION_AVAILABLE = True
+    def _json_loads(text: str) -> Any:
+        return orjson.loads(text)
+
+    JSON_BACKEND = 'orjson'
 except ImportError:
-    CARD_GENERATION_AVAILABLE = False
-    print("警告: 无法导入卡牌生成模块，卡牌生成功能将不可用")
+    _json_loads = json.loads
+    JSON_BACKEND = 'json'
+
+if TYPE_CHECKING:
+    from Card import Card
+
+# 启动模式：lazy（默认）在后台线程预热字体/图片管理器，首次使用时若未就绪则同步等待；
+# eager 在构造 WorkspaceManager 时同步初始化（旧行为）
+STARTUP_MODE_ENV = 'APP_STARTUP_MODE'
+
+# 卡牌生成相关模块（Card/create_card 会连带导入 OpenCV、富文本渲染器等重模块，按需导入）
+CARD_GENERATION_AVAILABLE = None
+# 已导入的 (FontManager, ImageManager, CardCreator, Card)
+_card_generation_classes: Optional[Tuple[type, type, type, type]] = None
+
+
+def _load_card_generation_modules() -> Optional[Tuple[type, type, type, type]]:
+    """按需导入卡牌生成模块，返回 (FontManager, ImageManager, CardCreator, Card)，不可用时返回None"""
+    global CARD_GENERATION_AVAILABLE, _card_generation_classes
+    if CARD_GENERATION_AVAILABLE is not None:
+        return _card_generation_classes
+    try:
+        from ResourceManager import FontManager, ImageManager
+        from create_card import CardCreator
+        from Card import Card
+
+        _card_generation_classes = (FontManager, ImageManager, CardCreator, Card)
+        CARD_GENERATION_AVAILABLE = True
+    except ImportError:
+        CARD_GENERATION_AVAILABLE = False
+        logger_manager.warning("无法导入卡牌生成模块，卡牌生成功能将不可用")
+    return _card_generation_classes
+
+
+# === 卡牌 JSON 解析缓存 ===
+# 一次读取文件字节，按 BOM / UTF-8 快速判断编码（失败再回退 GBK），用可选的 orjson 解析，
+# 并以 (路径, mtime_ns, size) 为键缓存解析结果。PNP 导出、内容包上传、TTS 脚本生成等流程
+# 会在多个阶段重复读取同一张卡牌，命中缓存时不再读盘和解析数 MB 的 base64 文本。
+
+# 文本文件回退编码（UTF-8 失败后依次尝试）
+TEXT_FALLBACK_ENCODINGS = ('gbk', 'gb2312')
+# 卡牌JSON缓存条目数与总字节数上限（按文件大小估算），超出后淘汰最久未使用的条目
+CARD_JSON_CACHE_MAX_ENTRIES = 512
+CARD_JSON_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def decode_text(raw: bytes) -> Tuple[str, str]:
+    """
+    解码文本文件内容
+
+    :return: (文本, 使用的编码)
+    :raises UnicodeDecodeError: 所有编码均失败
+    """
+    if raw.startswith(codecs.BOM_UTF8):
+        return raw[len(codecs.BOM_UTF8):].decode('utf-8'), 'utf-8-sig'
+    try:
+        return raw.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError as e:
+        last_error = e
+    for encoding in TEXT_FALLBACK_ENCODINGS:
+        try:
+            return raw.decode(encoding), encoding
+        except UnicodeDecodeError as e:
+            last_error = e
+    raise last_error
+
+
+def copy_json(value: Any) -> Any:
+    """复制 JSON 容器（字符串等不可变值直接共享），比 copy.deepcopy 快得多"""
+    if isinstance(value, dict):
+        return {key: copy_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_json(item) for item in value]
+    return value
+
+
+class CardJsonCache:
+    """按 (路径, mtime_ns, size) 校验的卡牌 JSON 解析缓存（线程安全，LRU 淘汰）"""
+
+    def __init__(self, max_entries: int = CARD_JSON_CACHE_MAX_ENTRIES, max_bytes: int = CARD_JSON_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Tuple[int, int, Any]]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, abs_path: str) -> Optional[Any]:
+        """
+        读取并解析 JSON 文件，返回可修改的副本
+
+        :return: 文件不存在、编码或 JSON 无效时返回 None
+        """
+        try:
+            stat_result = os.stat(abs_path)
+        except OSError:
+            self.invalidate(abs_path)
+            return None
+
+        key = os.path.normcase(os.path.abspath(abs_path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat_result.st_mtime_ns and entry[1] == stat_result.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy_json(entry[2])
+            self.misses += 1
+
+        try:
+            with open(abs_path, 'rb') as f:
+                raw = f.read()
+            text, _ = decode_text(raw)
+            data = _json_loads(text)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            logger_manager.warning(f"读取卡牌JSON失败 {abs_path}: {e}")
+            self.invalidate(abs_path)
+            return None
+
+        # 读取过程中文件被改写时不缓存，下次重新读取
+        try:
+            if os.stat(abs_path).st_mtime_ns == stat_result.st_mtime_ns:
+                self._store(key, stat_result.st_mtime_ns, stat_result.st_size, data)
+        except OSError:
+            pass
+        return copy_json(data)
+
+    def _store(self, key: str, mtime_ns: int, size: int, data: Any):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (mtime_ns, size, data)
+            self._total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted[1]
+
+    def invalidate(self, abs_path: str):
+        """移除单个文件的缓存；传入目录时移除其下全部条目"""
+        key = os.path.normcase(os.path.abspath(abs_path))
+        prefix = key.rstrip(os.sep) + os.sep
+        with self._lock:
+            for cached_key in [k for k in self._entries if k == key or k.startswith(prefix)]:
+                self._total_bytes -= self._entries.pop(cached_key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'backend': JSON_BACKEND,
+            }
 
 
 # === 新增: 分层扫描架构核心类 ===
 
 class CacheManager:
-    """缓存管理器: 负责缓存验证与持久化(使用mtime验证)"""
+    """
+    卡牌类型缓存: 文件树、后台扫描与文件操作共用的唯一缓存(使用mtime+size验证)
+
+    持久化为快照 .cache/file_cache.json + 追加写日志 .cache/file_cache.journal：
+    - save_cache 只把自上次保存以来的变更追加到日志，耗时与工作空间大小无关；
+    - 日志条目超过阈值时压缩：先写临时文件再 os.replace 为新快照，然后重置日志；
+    - 快照与日志都带 generation，压缩中途退出时旧日志不会被重放到新快照上；
+      日志末尾被截断的行在加载时忽略，任何时候都不会读到写了一半的缓存。
+    """
+
+    SNAPSHOT_NAME = 'file_cache.json'
+    JOURNAL_NAME = 'file_cache.journal'
+    # 旧版 WorkspaceManager 单独维护的缓存文件，加载时删除
+    LEGACY_CACHE_NAME = 'card_types.json'
+    # 日志条目数超过 max(该值, 缓存条目数) 时压缩
+    JOURNAL_COMPACT_MIN = 2000
 
     def __init__(self, workspace_root: str):
         self.workspace_root = workspace_root
         self.cache_dir = os.path.join(workspace_root, '.cache')
-        self.cache_file = os.path.join(self.cache_dir, 'file_cache.json')
+        self.cache_file = os.path.join(self.cache_dir, self.SNAPSHOT_NAME)
+        self.journal_file = os.path.join(self.cache_dir, self.JOURNAL_NAME)
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._journal_ops = 0
+        # 尚未写入日志的变更
+        self._pending: List[Dict[str, Any]] = []
+        self._needs_compaction = False
         self._cache = self._load_cache()
-        self._lock = threading.Lock()
+
+    # ---------- 加载 ----------
 
     def _load_cache(self) -> Dict:
-        """加载缓存数据"""
-        if not os.path.exists(self.cache_file):
-            return {'files': {}}
+        """加载快照并重放日志"""
+        cache = {'files': {}}
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and isinstance(data.get('files'), dict):
+                    cache = {'files': data['files']}
+                    self._generation = int(data.get('generation', 0))
+            except Exception as e:
+                logger_manager.warning(f"缓存加载失败: {e}")
+                self._needs_compaction = True
 
-        try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger_manager.warning(f"缓存加载失败: {e}")
-            return {'files': {}}
+        self._replay_journal(cache['files'])
+        self._remove_legacy_cache()
+        return cache
 
-    def get_cached_card_type(self, file_path: str) -> Optional[str]:
-        """获取缓存的card_type(含mtime验证)"""
-        rel_path = os.path.relpath(file_path, self.workspace_root)
+    def _replay_journal(self, files: Dict[str, Dict]):
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError as e:
+            logger_manager.warning(f"缓存日志读取失败: {e}")
+            self._needs_compaction = True
+            return
+
+        header = self._parse_journal_line(lines[0]) if lines else None
+        if not header or header.get('generation') != self._generation:
+            # 属于旧快照的日志（压缩过程中退出），已包含在当前快照中
+            self._needs_compaction = True
+            return
+
+        for line in lines[1:]:
+            op = self._parse_journal_line(line)
+            if op is None:
+                # 末尾未写完的行
+                self._needs_compaction = True
+                break
+            self._apply(files, op)
+            self._journal_ops += 1
 
-        with self._lock:
-            cached = self._cache['files'].get(rel_path)
-            if not cached:
-                return None
+    @staticmethod
+    def _parse_journal_line(line: str) -> Optional[Dict]:
+        if not line.endswith('\n'):
+            return None
+        try:
+            op = json.loads(line)
+        except ValueError:
+            return None
+        return op if isinstance(op, dict) else None
 
-            # mtime验证
+    def _remove_legacy_cache(self):
+        legacy = os.path.join(self.cache_dir, self.LEGACY_CACHE_NAME)
+        if os.path.exists(legacy):
             try:
-                current_mtime = os.stat(file_path).st_mtime
-                if abs(current_mtime - cached.get('mtime', 0)) < 1e-6:
-                    return cached.get('card_type')
+                os.remove(legacy)
+                logger_manager.info("已移除旧版卡牌类型缓存 card_types.json")
             except OSError:
                 pass
 
+    # ---------- 变更 ----------
+
+    @staticmethod
+    def _apply(files: Dict[str, Dict], op: Dict[str, Any]):
+        """应用一条变更（加载时重放与内存修改共用）"""
+        kind = op.get('op')
+        if kind == 'set':
+            files[op['path']] = {'card_type': op.get('card_type'), 'mtime': op.get('mtime', 0),
+                                 'size': op.get('size')}
+        elif kind == 'del':
+            path = op['path']
+            prefix = path + os.sep
+            files.pop(path, None)
+            for key in [k for k in files if k.startswith(prefix)]:
+                del files[key]
+        elif kind == 'move':
+            old, new = op['old'], op['new']
+            old_prefix = old + os.sep
+            moved = {}
+            for key in [k for k in files if k == old or k.startswith(old_prefix)]:
+                moved[new + key[len(old):]] = files.pop(key)
+            files.update(moved)
+        elif kind == 'clear':
+            files.clear()
+
+    def _record(self, op: Dict[str, Any]):
+        """修改内存缓存并记录待写入日志的变更（调用方持有锁）"""
+        self._apply(self._cache['files'], op)
+        self._pending.append(op)
+
+    def _rel_path(self, file_path: str) -> str:
+        if not os.path.isabs(file_path):
+            file_path = os.path.join(self.workspace_root, file_path)
+        return os.path.relpath(file_path, self.workspace_root)
+
+    def get_cached_entry(self, file_path: str, stat_result: Optional[os.stat_result] = None) -> Optional[Dict]:
+        """
+        获取仍然有效的缓存条目(mtime与size均未变化)，无缓存或已失效时返回None
+
+        :param stat_result: 调用方已有的stat结果，传入可避免重复stat
+        """
+        rel_path = self._rel_path(file_path)
+
+        with self._lock:
+            cached = self._cache['files'].get(rel_path)
+        if not cached:
             return None
 
-    def update_cache(self, file_path: str, card_type: Optional[str]):
+        try:
+            if stat_result is None:
+                stat_result = os.stat(os.path.join(self.workspace_root, rel_path))
+        except OSError:
+            return None
+
+        if abs(stat_result.st_mtime - cached.get('mtime', 0)) >= 1e-6:
+            return None
+        # 旧版本缓存没有记录size，仅按mtime验证
+        cached_size = cached.get('size')
+        if cached_size is not None and cached_size != stat_result.st_size:
+            return None
+        return cached
+
+    def get_cached_card_type(self, file_path: str, stat_result: Optional[os.stat_result] = None) -> Optional[str]:
+        """获取缓存的card_type(含mtime/size验证)"""
+        cached = self.get_cached_entry(file_path, stat_result)
+        return cached.get('card_type') if cached else None
+
+    def update_cache(self, file_path: str, card_type: Optional[str],
+                     stat_result: Optional[os.stat_result] = None):
         """更新缓存"""
-        rel_path = os.path.relpath(file_path, self.workspace_root)
+        rel_path = self._rel_path(file_path)
 
         try:
-            mtime = os.stat(file_path).st_mtime
+            if stat_result is None:
+                stat_result = os.stat(os.path.join(self.workspace_root, rel_path))
 
             with self._lock:
-                self._cache['files'][rel_path] = {
-                    'card_type': card_type,
-                    'mtime': mtime
-                }
+                self._record({'op': 'set', 'path': rel_path, 'card_type': card_type,
+                              'mtime': stat_result.st_mtime, 'size': stat_result.st_size})
         except OSError as e:
             logger_manager.warning(f"更新缓存失败 {file_path}: {e}")
 
-    def save_cache(self):
-        """持久化缓存到磁盘"""
-        os.makedirs(self.cache_dir, exist_ok=True)
+    def remove(self, path: str):
+        """移除文件的缓存；为目录时移除其下全部条目"""
+        rel_path = self._rel_path(path)
+        with self._lock:
+            self._record({'op': 'del', 'path': rel_path})
 
+    def move(self, old_path: str, new_path: str):
+        """重命名/移动后迁移缓存条目（文件或目录；mtime与size不变，条目仍然有效）"""
+        old_rel, new_rel = self._rel_path(old_path), self._rel_path(new_path)
+        if old_rel == new_rel:
+            return
         with self._lock:
-            try:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(self._cache, f, indent=2)
-            except Exception as e:
-                logger_manager.error(f"缓存保存失败: {e}")
+            self._record({'op': 'move', 'old': old_rel, 'new': new_rel})
 
     def clear_cache(self):
         """清空缓存"""
         with self._lock:
             self._cache = {'files': {}}
+            self._pending = []
+            self._needs_compaction = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache['files'])
+
+    # ---------- 持久化 ----------
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未持久化的修改"""
+        return bool(self._pending) or self._needs_compaction
+
+    def save_cache(self):
+        """持久化缓存：追加日志，日志过长时压缩为新快照"""
+        with self._lock:
+            if not self.dirty:
+                return
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                threshold = max(self.JOURNAL_COMPACT_MIN, len(self._cache['files']))
+                if self._needs_compaction or not os.path.exists(self.cache_file) \
+                        or self._journal_ops + len(self._pending) > threshold:
+                    self._compact()
+                else:
+                    self._append_journal()
+            except Exception as e:
+                logger_manager.error(f"缓存保存失败: {e}")
+
+    def _append_journal(self):
+        new_journal = self._journal_ops == 0 and not os.path.exists(self.journal_file)
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            if new_journal:
+                f.write(json.dumps({'generation': self._generation}) + '\n')
+            for op in self._pending:
+                f.write(json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_ops += len(self._pending)
+        self._pending = []
+
+    def _compact(self):
+        """写入新快照（临时文件 + os.replace）并重置日志"""
+        generation = self._generation + 1
+        _atomic_write_text(
+            self.cache_file,
+            json.dumps({'generation': generation, 'files': self._cache['files']},
+                       ensure_ascii=False, separators=(',', ':'))
+        )
+        _atomic_write_text(self.journal_file, json.dumps({'generation': generation}) + '\n')
+        self._generation = generation
+        self._journal_ops = 0
+        self._pending = []
+        self._needs_compaction = False
+        logger_manager.debug(f"卡牌类型缓存已压缩: {len(self._cache['files'])} 条记录", category='io')
+
+
+def _atomic_write_text(path: str, text: str):
+    """写入同目录临时文件后 os.replace，读取方只会看到旧文件或完整的新文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ScanQueue:
+    """
+    扫描队列: 普通deque + 优先队列(OrderedDict) + 待扫描集合
+
+    取出、移除均为O(1)(普通deque惰性删除)；按可见路径提升优先级时通过目录前缀索引直接定位文件，
+    不再遍历整个队列。已提升的文件再次可见时只调整顺序，不会重复入队；文件取出或移除后同步从
+    前缀索引中删除。
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None):
+        self._normal = deque()
+        self._priority: 'OrderedDict[str, None]' = OrderedDict()
+        self._pending = set()
+        # 规范化目录前缀/文件路径 -> 该前缀下尚未扫描的文件（保持入队顺序）
+        self._prefix_index: Dict[str, Dict[str, None]] = {}
+        for path in paths or []:
+            self.append(path)
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        """统一为正斜杠、去掉开头的'./'与结尾的'/'，提升跨平台匹配准确性"""
+        path = path.replace('\\', '/')
+        while path.startswith('./'):
+            path = path[2:]
+        return path.strip('/') if path != '.' else ''
+
+    @classmethod
+    def _prefixes(cls, path: str) -> List[str]:
+        parts = cls.normalize(path).split('/')
+        return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+    def append(self, path: str):
+        if path in self._pending:
+            return
+        self._pending.add(path)
+        self._normal.append(path)
+        for prefix in self._prefixes(path):
+            self._prefix_index.setdefault(prefix, {})[path] = None
+
+    def _remove(self, path: str):
+        """从待扫描集合、优先队列与前缀索引中移除（普通deque中的项在取出时跳过）"""
+        self._pending.discard(path)
+        self._priority.pop(path, None)
+        for prefix in self._prefixes(path):
+            paths = self._prefix_index.get(prefix)
+            if paths is not None:
+                paths.pop(path, None)
+                if not paths:
+                    del self._prefix_index[prefix]
+
+    def pop(self) -> Optional[str]:
+        """取出下一项（优先队列优先），队列为空时返回None"""
+        if self._priority:
+            path, _ = self._priority.popitem(last=False)
+            self._remove(path)
+            return path
+        while self._normal:
+            path = self._normal.popleft()
+            if path in self._pending:
+                self._remove(path)
+                return path
+        return None
+
+    def discard(self, paths):
+        """从队列中移除"""
+        for path in paths:
+            if path in self._pending:
+                self._remove(path)
+
+    def clear(self):
+        self._normal.clear()
+        self._priority.clear()
+        self._pending.clear()
+        self._prefix_index.clear()
+
+    def prioritize(self, visible_paths: List[str]) -> int:
+        """将可见路径（目录或文件）下尚未扫描的文件移到队列最前，返回提升的文件数"""
+        promoted = {}
+        for visible_path in visible_paths:
+            for path in self._prefix_index.get(self.normalize(visible_path), ()):
+                promoted[path] = None
+        # 最近一次报告的可见项排在最前，组内保持原有顺序；已在优先队列中的项只移动位置
+        for path in reversed(list(promoted)):
+            self._priority[path] = None
+            self._priority.move_to_end(path, last=False)
+        return len(promoted)
+
+    def __iter__(self):
+        """按出队顺序遍历尚未扫描的路径"""
+        seen = set(self._priority)
+        yield from self._priority
+        for path in self._normal:
+            if path in self._pending and path not in seen:
+                seen.add(path)
+                yield path
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
 
 
 class ScanProgressTracker:
@@ -141,7 +605,7 @@ class ScanProgressTracker:
                 'status': 'scanning',
                 'progress': {'total': 0, 'scanned': 0, 'percentage': 0.0},
                 'data': [],
-                'queue': initial_queue,  # 相对路径
+                'queue': ScanQueue(initial_queue),  # 相对路径
                 'error_count': 0
             }
 
@@ -152,11 +616,16 @@ class ScanProgressTracker:
                     scan['progress']['scanned'] = update.get('scanned', 0)
                     scan['progress']['total'] = update.get('total', 0)
                     scan['progress']['percentage'] = update.get('percentage', 0.0)
-                    scan['data'].append(update.get('data', {}))
+                    # 'items' 为批量结果（如缓存命中），'data' 为单个文件结果
+                    items = update.get('items')
+                    if items is None:
+                        items = [update.get('data', {})]
+                    scan['data'].extend(items)
 
                     # 错误追踪
-                    if update.get('data', {}).get('error'):
-                        scan['error_count'] += 1
+                    errors = sum(1 for item in items if item.get('error'))
+                    if errors:
+                        scan['error_count'] += errors
                         total = scan['progress']['total']
                         if total > 0 and (scan['error_count'] / total) > 0.1:
                             logger_manager.warning(
@@ -174,18 +643,78 @@ class ScanProgressTracker:
 
         return scan_id
 
+    # 扫描过程中缓存增量落盘的最小间隔（秒）
+    CACHE_SAVE_INTERVAL = 2.0
+
+    @staticmethod
+    def _scan_item(rel_path: str, card_type: Optional[str], stat_result: Optional[os.stat_result],
+                   error: Optional[Dict]) -> Dict:
+        """构造单个文件的扫描结果"""
+        return {
+            'path': rel_path,
+            'card_type': card_type,
+            'level': rel_path.count(os.sep) + 1,
+            'mtime': stat_result.st_mtime if stat_result else 0,
+            'size': stat_result.st_size if stat_result else 0,
+            'error': error
+        }
+
     def _run_scan(self, scan_id: str, scanner, progress_callback, complete_callback):
-        """执行扫描任务（以共享队列为唯一数据源，支持优先级动态调整）"""
+        """
+        执行扫描任务（以共享队列为唯一数据源，支持优先级动态调整）
+
+        先对队列中所有文件stat并校验缓存，命中项作为一次批量结果推送；
+        只有mtime/size变化或未缓存的文件才会被打开读取。缓存在扫描过程中增量保存。
+        """
         try:
             # 读取总量
             with self._lock:
                 scan = self._scans.get(scan_id)
                 if not scan:
                     return
-                total = len(scan.get('queue', []))
+                queued = list(scan['queue'])
+                total = len(queued)
                 scan['progress']['total'] = total
 
+            cache_manager = scanner.cache_manager
+
+            # 第一阶段：stat校验缓存（优先复用构建目录树时的stat结果）
+            stats: Dict[str, Optional[os.stat_result]] = {}
+            hits = []
+            for rel_path in queued:
+                abs_path = os.path.join(scanner.workspace_root, rel_path)
+                stat_result = scanner.get_walk_stat(rel_path)
+                if stat_result is None:
+                    try:
+                        stat_result = os.stat(abs_path)
+                    except OSError:
+                        stat_result = None
+                stats[rel_path] = stat_result
+                if stat_result is None:
+                    continue
+                cached = cache_manager.get_cached_entry(abs_path, stat_result)
+                if cached is not None:
+                    hits.append(self._scan_item(rel_path, cached.get('card_type'), stat_result, None))
+
             scanned = 0
+            if hits:
+                hit_paths = {item['path'] for item in hits}
+                with self._lock:
+                    scan = self._scans.get(scan_id)
+                    if not scan or scan.get('cancelled'):
+                        return
+                    scan['queue'].discard(hit_paths)
+                scanned = len(hits)
+                progress_callback({
+                    'items': hits,
+                    'scanned': scanned,
+                    'total': total,
+                    'percentage': (scanned / total * 100) if total > 0 else 0
+                })
+                logger_manager.debug(f"扫描 {scan_id} 缓存命中 {scanned}/{total}", category='io')
+
+            # 第二阶段：逐个读取未命中的文件
+            last_save = time.monotonic()
             while True:
                 # 取下一项（受优先级调整影响）
                 with self._lock:
@@ -194,78 +723,102 @@ class ScanProgressTracker:
                         break
                     if scan.get('cancelled'):
                         break
-                    queue = scan.get('queue', [])
-                    if not queue:
+                    rel_path = scan['queue'].pop()
+                    if rel_path is None:
                         break
-                    rel_path = queue.pop(0)
 
                 abs_path = os.path.join(scanner.workspace_root, rel_path)
                 result = scanner._extract_card_type_with_error(abs_path)
-                if not result.get('error'):
-                    scanner.cache_manager.update_cache(abs_path, result.get('card_type'))
 
-                try:
-                    stat_info = os.stat(abs_path)
-                    mtime = stat_info.st_mtime
-                    size = stat_info.st_size
-                except OSError:
-                    mtime = 0
-                    size = 0
+                stat_result = stats.get(rel_path)
+                if stat_result is None:
+                    try:
+                        stat_result = os.stat(abs_path)
+                    except OSError:
+                        stat_result = None
+                if not result.get('error') and stat_result is not None:
+                    cache_manager.update_cache(abs_path, result.get('card_type'), stat_result)
 
                 scanned += 1
-                level = min(5, rel_path.count(os.sep) + 1)
                 progress_callback({
-                    'data': {
-                        'path': rel_path,
-                        'card_type': result.get('card_type'),
-                        'level': level,
-                        'mtime': mtime,
-                        'size': size,
-                        'error': result.get('error')
-                    },
+                    'data': self._scan_item(rel_path, result.get('card_type'), stat_result, result.get('error')),
                     'scanned': scanned,
                     'total': total,
                     'percentage': (scanned / total * 100) if total > 0 else 0
                 })
 
+                # 增量保存缓存，扫描中断时已读取的结果不会丢失
+                if cache_manager.dirty and time.monotonic() - last_save >= self.CACHE_SAVE_INTERVAL:
+                    cache_manager.save_cache()
+                    last_save = time.monotonic()
+
                 # 节流避免占用
                 if scanned % 200 == 0:
                     time.sleep(0.02)
 
-            # 扫描完成后持久化两套缓存
+            # 扫描结束后保存剩余修改
             try:
-                scanner.cache_manager.save_cache()
+                if cache_manager.dirty:
+                    cache_manager.save_cache()
             except Exception as e:
                 logger_manager.warning(f"文件类型缓存保存失败: {e}")
-            # 兼容旧缓存：尽量写入 WorkspaceManager 的 card_types.json
-            try:
-                # 使用 WorkspaceManager 的更新接口可能不可见，这里仅确保目录存在
-                cache_dir = os.path.join(scanner.workspace_root, '.cache')
-                os.makedirs(cache_dir, exist_ok=True)
-            except Exception:
-                pass
 
             complete_callback()
+
+            # 类型扫描完成后同步卡牌元数据索引（只解析变化的文件，不阻塞扫描完成状态）
+            card_index = getattr(scanner, 'card_index', None)
+            if card_index is not None:
+                with self._lock:
+                    scan = self._scans.get(scan_id)
+                    cancelled = not scan or scan.get('cancelled')
+                if not cancelled:
+                    try:
+                        card_index.sync(queued, stats)
+                    except Exception as e:
+                        logger_manager.warning(f"卡牌索引同步失败: {e}")
         except Exception as e:
             logger_manager.error(f"扫描失败: {e}", exc_info=True)
 
-    def get_progress(self, scan_id: str) -> Dict:
-        """获取扫描进度"""
+    def get_progress(self, scan_id: str, cursor: Optional[int] = None, limit: int = 200) -> Dict:
+        """
+        获取扫描进度快照
+
+        :param cursor: 上次轮询返回的next_cursor；指定时只返回此后产生的结果（最多limit条），
+                       不指定时返回最近limit条（兼容旧的轮询方式）
+        :return: {'status', 'progress', 'data', 'next_cursor'}，扫描不存在时返回{'error': ...}
+        """
         with self._lock:
-            return self._scans.get(scan_id, {'error': 'Scan not found'})
+            scan = self._scans.get(scan_id)
+            if scan is None:
+                return {'error': 'Scan not found'}
+            results = scan['data']
+            if cursor is None:
+                data = results[-limit:] if limit else []
+                next_cursor = len(results)
+            else:
+                start = max(0, min(cursor, len(results)))
+                data = results[start:start + limit]
+                next_cursor = start + len(data)
+            return {
+                'status': scan['status'],
+                'progress': dict(scan['progress']),
+                'data': data,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor < len(results)
+            }
 
     def cancel_scan(self, scan_id: str):
         with self._lock:
             if scan_id in self._scans:
                 self._scans[scan_id]['cancelled'] = True
-                self._scans[scan_id]['queue'] = []
+                self._scans[scan_id]['queue'].clear()
                 self._scans[scan_id]['status'] = 'cancelled'
 
     def cancel_all(self):
         with self._lock:
             for sid, scan in self._scans.items():
                 scan['cancelled'] = True
-                scan['queue'] = []
+                scan['queue'].clear()
                 scan['status'] = 'cancelled'
 
     def prioritize_visible_nodes(self, scan_id: str, visible_paths: List[str]):
@@ -273,31 +826,17 @@ class ScanProgressTracker:
         with self._lock:
             if scan_id not in self._scans:
                 return
+            promoted = self._scans[scan_id]['queue'].prioritize(visible_paths)
 
-            scan_data = self._scans[scan_id]
-            scan_queue = scan_data.get('queue', [])
-
-            # 统一路径分隔符为正斜杠，提升跨平台匹配准确性
-            def norm(p: str) -> str:
-                return p.replace('\\', '/').lstrip('./')
-            normalized_queue = [norm(p) for p in scan_queue]
-            normalized_visible = [norm(p) for p in visible_paths]
-
-            # 收集可见路径下的所有文件
-            priority_set = set()
-            for visible_path in normalized_visible:
-                for idx, file_path in enumerate(normalized_queue):
-                    if file_path.startswith(visible_path):
-                        priority_set.add(idx)
+        logger_manager.info(f"优先扫描 {promoted} 个可见文件 (scan {scan_id})")
 
-            # 将可见节点移到队列前端
-            if priority_set:
-                # 按原相对顺序重建：优先项 + 其他项
-                prioritized = [scan_queue[i] for i in sorted(priority_set)]
-                others = [p for j, p in enumerate(scan_queue) if j not in priority_set]
-                scan_data['queue'] = prioritized + others
 
-            logger_manager.info(f"优先扫描 {len(priority_set)} 个可见文件 (scan {scan_id})")
+@dataclass
+class WorkspaceWalkResult:
+    """一次工作空间遍历的结果"""
+    tree: List[Dict[str, Any]] = field(default_factory=list)  # 目录树（已排序）
+    card_files: List[str] = field(default_factory=list)  # .card相对路径，广度优先层序
+    stats: Dict[str, os.stat_result] = field(default_factory=dict)  # .card相对路径 -> stat结果
 
 
 class WorkspaceScanner:
@@ -309,164 +848,274 @@ class WorkspaceScanner:
     # 预编译正则表达式
     _TYPE_RE = re.compile(r'"type"\s*:\s*"([^"]+)"')
 
-    def __init__(self, workspace_root: str):
+    def __init__(self, workspace_root: str, card_index=None, cache_manager: Optional[CacheManager] = None):
         self.workspace_root = workspace_root
-        self.cache_manager = CacheManager(workspace_root)
+        # 由 WorkspaceManager 传入共享的缓存；单独使用时自行加载
+        self.cache_manager = cache_manager or CacheManager(workspace_root)
+        # 可选的卡牌元数据索引（CardIndex），后台扫描结束后同步
+        self.card_index = card_index
+        # 最近一次遍历结果，按include_hidden区分；目录树与扫描队列共用同一次遍历
+        self._walk_results: Dict[bool, WorkspaceWalkResult] = {}
+
+    def walk(self, include_hidden: bool = False, refresh: bool = False) -> 'WorkspaceWalkResult':
+        """
+        单次os.scandir广度优先遍历工作空间，同时得到目录树、.card队列与stat元数据
 
-    def scan_structure(self, include_hidden: bool = False, include_card_type: bool = False) -> Dict:
-        """快速扫描目录结构
-        :param include_hidden: 是否包含隐藏文件
-        :param include_card_type: 是否包含卡牌类型（将尽可能使用缓存，避免重新解析）
+        结果缓存在扫描器实例上，同一请求内scan_structure与collect_card_files不会重复遍历。
+        不限制目录深度；通过(st_dev, st_ino)跳过符号链接造成的目录环。
         """
-        return self._build_tree_recursive(
-            self.workspace_root,
-            include_hidden=include_hidden,
-            include_card_type=include_card_type
-        )
+        if not refresh and include_hidden in self._walk_results:
+            return self._walk_results[include_hidden]
 
-    def scan_card_types_async(self, callback):
-        """异步扫描card_type字段(广度优先分批)"""
-        # 按层级分批扫描
-        for level in range(1, 6):  # 最多扫描5层
-            files = self._collect_json_files_by_level(self.workspace_root, level)
-            total = len(files)
+        result = self.walk_subtree('', include_hidden)
+        self._walk_results[include_hidden] = result
+        return result
 
-            for i, file_path in enumerate(files):
-                result = self._extract_card_type_with_error(file_path)
+    def seed_walk(self, result: 'WorkspaceWalkResult', include_hidden: bool = False):
+        """使用外部维护的遍历结果（如文件树模型的快照），避免再次遍历磁盘"""
+        self._walk_results[include_hidden] = result
 
-                # 更新缓存
-                if not result.get('error'):
-                    self.cache_manager.update_cache(file_path, result.get('card_type'))
+    def walk_subtree(self, dir_rel: str = '', include_hidden: bool = False,
+                     max_depth: Optional[int] = None) -> 'WorkspaceWalkResult':
+        """
+        遍历工作空间内的某个目录（相对路径，''为根目录），不使用缓存
+
+        节点key为相对路径，同一文件在多次遍历之间保持不变。
+
+        :param max_depth: 只展开该层数的目录（1 为仅列出该目录的直接子项）；更深的目录节点标记
+                          lazy=True、children为空，并用 has_children 表示是否有子项。card_files
+                          只包含已展开部分的卡牌。None 表示不限制。
+        """
+        tree: List[Dict[str, Any]] = []
+        card_files: List[str] = []
+        stats: Dict[str, os.stat_result] = {}
+        visited_dirs = set()
+
+        start_path = os.path.join(self.workspace_root, dir_rel) if dir_rel else self.workspace_root
+        try:
+            start_stat = os.stat(start_path)
+            visited_dirs.add((start_stat.st_dev, start_stat.st_ino))
+        except OSError:
+            pass
+
+        # (绝对路径, 相对路径, 层级, 子项列表, 展开深度)
+        start_level = dir_rel.count(os.sep) + 2 if dir_rel else 1
+        pending = deque([(start_path, dir_rel, start_level, tree, 1)])
+        while pending:
+            dir_path, dir_rel, level, items, depth = pending.popleft()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except PermissionError:
+                logger_manager.warning(f"权限拒绝: {dir_path}")
+                continue
+            except OSError as e:
+                logger_manager.error(f"构建目录树失败 {dir_path}: {e}")
+                continue
+
+            subdirs = []
+            for entry in entries:
+                if not include_hidden and entry.name.startswith('.'):
+                    continue
+
+                relative_path = os.path.join(dir_rel, entry.name) if dir_rel else entry.name
+                item_key = relative_path
+
+                # 获取文件元数据(每个条目一次stat)
+                try:
+                    stat_info = entry.stat()
+                except OSError:
+                    stat_info = None
+                mtime = stat_info.st_mtime if stat_info else 0
 
-                # 获取文件元数据
                 try:
-                    stat_info = os.stat(file_path)
-                    mtime = stat_info.st_mtime
-                    size = stat_info.st_size
+                    is_dir = entry.is_dir()
+                    is_file = not is_dir and entry.is_file()
                 except OSError:
-                    mtime = 0
-                    size = 0
-
-                # 回调推送数据
-                callback({
-                    'data': {
-                        'path': os.path.relpath(file_path, self.workspace_root),
-                        'card_type': result.get('card_type'),
+                    continue
+
+                if is_dir:
+                    if stat_info is not None:
+                        dir_id = (stat_info.st_dev, stat_info.st_ino)
+                        if dir_id in visited_dirs:
+                            continue
+                        visited_dirs.add(dir_id)
+                    node = {
+                        'label': entry.name,
+                        'key': item_key,
+                        'type': 'directory',
+                        'path': relative_path,
                         'level': level,
                         'mtime': mtime,
-                        'size': size,
-                        'error': result.get('error')
-                    },
-                    'scanned': i + 1,
-                    'total': total,
-                    'percentage': ((i + 1) / total * 100) if total > 0 else 0
-                })
-
-            # 批次推送(每200个文件短暂休眠，减少CPU抖动)
-            if (i + 1) % 200 == 0:
-                time.sleep(0.02)
+                        'size': 0,  # 目录大小设为0
+                        'children': []
+                    }
+                    items.append(node)
+                    subdirs.append((node, entry.path))
 
-            # 每层扫描完成后短暂休眠
-            time.sleep(0.05)
+                elif is_file:
+                    file_type = self._get_file_type(entry.name)
+                    item_info = {
+                        'label': entry.name,
+                        'key': item_key,
+                        'type': file_type,
+                        'path': relative_path,
+                        'level': level,
+                        'mtime': mtime,
+                        'size': stat_info.st_size if stat_info else 0
+                    }
+                    if file_type == 'card':
+                        item_info['card_type'] = None
+                        card_files.append(relative_path)
+                        if stat_info is not None:
+                            stats[relative_path] = stat_info
+                    items.append(item_info)
 
-        # 扫描完成后持久化缓存
-        self.cache_manager.save_cache()
+            items[:] = self._sort_items(items)
+            # 子目录按显示顺序入队，保证.card队列为广度优先且同层按显示顺序
+            subdirs.sort(key=lambda pair: pair[0]['label'].lower())
+            for node, sub_path in subdirs:
+                if max_depth is not None and depth >= max_depth:
+                    node['lazy'] = True
+                    node['has_children'] = self._has_visible_children(sub_path, include_hidden)
+                    continue
+                pending.append((sub_path, node['path'], level + 1, node['children'], depth + 1))
 
-    def _build_tree_recursive(
-        self,
-        path: str,
-        include_hidden: bool = False,
-        include_card_type: bool = True,
-        level: int = 1
-    ) -> List[Dict[str, Any]]:
-        """递归构建目录树(支持include_card_type参数)"""
-        items = []
+        return WorkspaceWalkResult(tree, card_files, stats)
 
+    @staticmethod
+    def _has_visible_children(dir_path: str, include_hidden: bool) -> bool:
+        """目录是否有（可见）子项，找到第一个即返回"""
         try:
-            with os.scandir(path) as entries:
-                for entry in entries:
-                    if not include_hidden and entry.name.startswith('.'):
-                        continue
+            with os.scandir(dir_path) as it:
+                return any(include_hidden or not entry.name.startswith('.') for entry in it)
+        except OSError:
+            return False
 
-                    relative_path = os.path.relpath(entry.path, self.workspace_root)
-                    item_key = f"{relative_path}_{int(time.time() * 1000000)}"
+    def list_directory(self, dir_rel: str = '', include_hidden: bool = False,
+                       offset: int = 0, limit: int = 200, depth: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        懒加载文件树：只遍历指定目录下 depth 层，按 _sort_items 规则排序后分页返回直接子项
 
-                    # 获取文件元数据(一次性stat调用)
-                    try:
-                        stat_info = entry.stat()
-                        mtime = stat_info.st_mtime
-                        size = stat_info.st_size
-                    except OSError:
-                        mtime = 0
-                        size = 0
-
-                    if entry.is_dir():
-                        # 处理目录
-                        children = self._build_tree_recursive(
-                            entry.path,
-                            include_hidden,
-                            include_card_type,
-                            level + 1
-                        )
-                        children = self._sort_items(children)
-
-                        items.append({
-                            'label': entry.name,
-                            'key': item_key,
-                            'type': 'directory',
-                            'path': relative_path,
-                            'level': level,
-                            'mtime': mtime,
-                            'size': 0,  # 目录大小设为0
-                            'children': children
-                        })
-
-                    elif entry.is_file():
-                        # 处理文件
-                        file_type = self._get_file_type(entry.name)
-                        item_info = {
-                            'label': entry.name,
-                            'key': item_key,
-                            'type': file_type,
-                            'path': relative_path,
-                            'level': level,
-                            'mtime': mtime,
-                            'size': size
-                        }
+        耗时只与该目录（及展开的层级）的大小有关，与整个工作空间大小无关。卡牌类型只取已验证的
+        缓存，未命中的为 None（由后台扫描补充）。展开的下层目录每层最多保留 limit 个子项，
+        被截断的目录带 children_total 与 has_more。
 
-                        # 当文件类型为card时,提取card_type
-                        if file_type == 'card':
-                            if include_card_type:
-                                # 尝试从缓存加载
-                                cached = self.cache_manager.get_cached_card_type(entry.path)
-                                if cached:
-                                    item_info['card_type'] = cached
-                                else:
-                                    result = self._extract_card_type_with_error(entry.path)
-                                    item_info['card_type'] = result.get('card_type')
-                                    if result.get('error'):
-                                        item_info['error'] = result['error']
-                            else:
-                                item_info['card_type'] = None
-
-                        items.append(item_info)
+        :param dir_rel: 相对工作空间的目录，''或'.'为根目录
+        :return: {'path', 'items', 'total', 'offset', 'limit', 'has_more'}，目录不存在时返回None
+        """
+        dir_rel = os.path.normpath(dir_rel.replace('\\', '/')) if dir_rel else ''
+        if dir_rel in ('', '.'):
+            dir_rel = ''
+        abs_dir = os.path.join(self.workspace_root, dir_rel) if dir_rel else self.workspace_root
+        if dir_rel == '..' or dir_rel.startswith('..' + os.sep) or os.path.isabs(dir_rel) \
+                or not os.path.isdir(abs_dir):
+            return None
 
-        except PermissionError:
-            logger_manager.warning(f"权限拒绝: {path}")
-        except Exception as e:
-            logger_manager.error(f"构建目录树失败 {path}: {e}")
+        offset = max(0, int(offset))
+        limit = max(1, int(limit))
+        result = self.walk_subtree(dir_rel, include_hidden, max_depth=max(1, int(depth)))
+
+        items = result.tree
+        total = len(items)
+        page = items[offset:offset + limit]
+        self._truncate_children(page, limit)
+        self._fill_card_types(page, result.stats, read_missing=False)
+        return {
+            'path': dir_rel or '.',
+            'items': page,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'has_more': offset + len(page) < total,
+        }
 
-        return self._sort_items(items)
+    @classmethod
+    def _truncate_children(cls, items: List[Dict[str, Any]], limit: int):
+        for item in items:
+            if item['type'] != 'directory':
+                continue
+            children = item['children']
+            if len(children) > limit:
+                item['children_total'] = len(children)
+                item['has_more'] = True
+                del children[limit:]
+            cls._truncate_children(children, limit)
+
+    def scan_structure(self, include_hidden: bool = False, include_card_type: bool = False) -> Dict:
+        """快速扫描目录结构
+        :param include_hidden: 是否包含隐藏文件
+        :param include_card_type: 是否包含卡牌类型（将尽可能使用缓存，避免重新解析）
+        """
+        result = self.walk(include_hidden)
+        if include_card_type:
+            self._fill_card_types(result.tree, result.stats)
+        return result.tree
+
+    def _fill_card_types(self, items: List[Dict[str, Any]], stats: Dict[str, os.stat_result],
+                         read_missing: bool = True):
+        """为树中的card节点填充card_type（优先使用缓存；read_missing为False时不读取文件）"""
+        for item in items:
+            if item['type'] == 'directory':
+                self._fill_card_types(item['children'], stats, read_missing)
+            elif item['type'] == 'card' and not item.get('card_type'):
+                abs_path = os.path.join(self.workspace_root, item['path'])
+                cached = self.cache_manager.get_cached_card_type(abs_path, stats.get(item['path']))
+                if cached:
+                    item['card_type'] = cached
+                elif read_missing:
+                    result = self._extract_card_type_with_error(abs_path)
+                    item['card_type'] = result.get('card_type')
+                    if result.get('error'):
+                        item['error'] = result['error']
+
+    def scan_card_types_async(self, callback):
+        """异步扫描card_type字段(广度优先)"""
+        result = self.walk(refresh=True)
+        total = len(result.card_files)
+
+        for i, rel_path in enumerate(result.card_files):
+            file_path = os.path.join(self.workspace_root, rel_path)
+            card_result = self._extract_card_type_with_error(file_path)
+            stat_info = result.stats.get(rel_path)
+
+            # 更新缓存
+            if not card_result.get('error'):
+                self.cache_manager.update_cache(file_path, card_result.get('card_type'), stat_info)
+
+            # 回调推送数据
+            callback({
+                'data': {
+                    'path': rel_path,
+                    'card_type': card_result.get('card_type'),
+                    'level': rel_path.count(os.sep) + 1,
+                    'mtime': stat_info.st_mtime if stat_info else 0,
+                    'size': stat_info.st_size if stat_info else 0,
+                    'error': card_result.get('error')
+                },
+                'scanned': i + 1,
+                'total': total,
+                'percentage': ((i + 1) / total * 100) if total > 0 else 0
+            })
+
+            # 批次推送(每200个文件短暂休眠，减少CPU抖动)
+            if (i + 1) % 200 == 0:
+                time.sleep(0.02)
+
+        # 扫描完成后持久化缓存
+        self.cache_manager.save_cache()
 
     def collect_card_files(self) -> List[str]:
-        """收集全部 .card 相对路径（广度层序同 _collect_json_files_by_level）"""
-        files: List[str] = []
-        for level in range(1, 6):
-            abs_files = self._collect_json_files_by_level(self.workspace_root, level)
-            for abs_path in abs_files:
-                rel = os.path.relpath(abs_path, self.workspace_root)
-                files.append(rel)
-        return files
+        """收集全部 .card 相对路径（广度优先层序，复用本次遍历结果）"""
+        return list(self.walk().card_files)
+
+    def get_walk_stat(self, rel_path: str) -> Optional[os.stat_result]:
+        """返回最近一次遍历得到的stat结果（未遍历或不存在时为None）"""
+        for result in self._walk_results.values():
+            stat_info = result.stats.get(rel_path)
+            if stat_info is not None:
+                return stat_info
+        return None
 
     def scan_card_types_async_with_queue(self, queue: List[str], callback):
         """按照给定队列顺序扫描（相对路径队列）"""
@@ -476,28 +1125,26 @@ class WorkspaceScanner:
             abs_path = os.path.join(self.workspace_root, rel_path)
             result = self._extract_card_type_with_error(abs_path)
 
-            # 更新缓存（仅当无错误时）
-            if not result.get('error'):
-                self.cache_manager.update_cache(abs_path, result.get('card_type'))
+            # 元数据（优先复用遍历时的stat）
+            stat_info = self.get_walk_stat(rel_path)
+            if stat_info is None:
+                try:
+                    stat_info = os.stat(abs_path)
+                except OSError:
+                    stat_info = None
 
-            # 元数据
-            try:
-                stat_info = os.stat(abs_path)
-                mtime = stat_info.st_mtime
-                size = stat_info.st_size
-            except OSError:
-                mtime = 0
-                size = 0
+            # 更新缓存（仅当无错误时）
+            if not result.get('error') and stat_info is not None:
+                self.cache_manager.update_cache(abs_path, result.get('card_type'), stat_info)
 
             scanned += 1
-            level = min(5, rel_path.count(os.sep) + 1)
             callback({
                 'data': {
                     'path': rel_path,
                     'card_type': result.get('card_type'),
-                    'level': level,
-                    'mtime': mtime,
-                    'size': size,
+                    'level': rel_path.count(os.sep) + 1,
+                    'mtime': stat_info.st_mtime if stat_info else 0,
+                    'size': stat_info.st_size if stat_info else 0,
                     'error': result.get('error')
                 },
                 'scanned': scanned,
@@ -509,29 +1156,6 @@ class WorkspaceScanner:
             if scanned % 200 == 0:
                 time.sleep(0.02)
 
-    def _collect_json_files_by_level(
-        self,
-        path: str,
-        target_level: int,
-        current_level: int = 1
-    ) -> List[str]:
-        """收集指定层级的JSON文件路径"""
-        files = []
-        try:
-            with os.scandir(path) as entries:
-                for entry in entries:
-                    if entry.is_dir():
-                        files.extend(self._collect_json_files_by_level(
-                            entry.path,
-                            target_level,
-                            current_level + 1
-                        ))
-                    elif entry.name.endswith('.card') and current_level == target_level:
-                        files.append(entry.path)
-        except PermissionError:
-            pass
-        return files
-
     def _extract_card_type_with_error(self, file_path: str) -> Dict:
         """容错的card_type提取,返回结果或错误信息"""
         try:
@@ -629,8 +1253,6 @@ class WorkspaceScanner:
 
 class WorkspaceManager:
     """工作空间管理类，负责文件和目录操作"""
-    # 预编译正则表达式，提高性能
-    _TYPE_RE = re.compile(r'"type"\s*:\s*"([^"]+)"')
 
     # 系统配置字段定义 - 这些字段会保存到全局配置文件中
     SYSTEM_CONFIG_FIELDS = [
@@ -659,6 +1281,7 @@ class WorkspaceManager:
         "footer_copyright",  # 页脚版权信息
         "footer_icon_dir",  # 页脚图标目录
         "file_tree_bookmarks",  # 标签记录
+        "card_art_storage",  # 卡牌插画存储方式: 空/inline 内嵌base64, blob 内容寻址存储(.assets)
         # 可以在这里添加更多工作空间级配置字段
     ]
 
@@ -670,204 +1293,231 @@ class WorkspaceManager:
 
         self.workspace_path = os.path.abspath(workspace_path)
 
-        # 初始化卡牌生成相关管理器
-        if CARD_GENERATION_AVAILABLE:
-            try:
-                app_mode = os.environ.get('APP_MODE', 'normal')
-
-                self.font_manager = FontManager()
-                self.image_manager = ImageManager()
-                self.font_manager.add_font_folder(config_dir_manager.get_user_font_dir())
-
-                workspace_fonts_dir = os.path.join(self.workspace_path, 'fonts')
-                if os.path.exists(workspace_fonts_dir) and os.path.isdir(workspace_fonts_dir):
-                    self.font_manager.add_font_folder(workspace_fonts_dir)
-                # 设置图片工作目录
-                self.image_manager.set_working_directory(workspace_path)
-                self.creator = CardCreator(
-                    font_manager=self.font_manager,
-                    image_manager=self.image_manager,
-                    image_mode=0 if app_mode == 'normal' else 1
-                )
-
-            except Exception as e:
-                print(f"初始化字体和图像管理器失败: {e}")
-                self.font_manager = None
-                self.image_manager = None
+        # 初始化卡牌生成相关管理器（字体扫描、语言配置、文本盒缓存、图片目录扫描）
+        self._font_manager = None
+        self._image_manager = None
+        self._creator = None
+        self._card_resources_ready = False
+        self._card_resources_lock = threading.Lock()
+        if os.environ.get(STARTUP_MODE_ENV, 'lazy') == 'eager':
+            self._ensure_card_resources()
         else:
-            self.font_manager = None
-            self.image_manager = None
+            threading.Thread(
+                target=self._ensure_card_resources, name='workspace_warmup', daemon=True
+            ).start()
+
+        # 配置文件、遭遇组列表与遭遇组图标缩略图缓存（按 mtime/size 校验）
+        self._config_file_cache: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        self._encounter_groups_cache: Optional[Tuple[str, int, List[str]]] = None
+        self._encounter_icon_cache: Dict[Tuple[str, int], Tuple[int, int, bytes, str]] = {}
+        # 内容包卡牌列表缓存：相对路径 -> (mtime_ns, size, 卡牌相对路径列表)
+        self._package_cards_cache: Dict[str, Tuple[int, int, List[str]]] = {}
 
         self.config = self.get_config()
         # 初始化牌库导出器
         self.deck_exporter = DeckExporter(self)
 
         self._export_helper = None
-        self.card_lock = threading.Lock()
 
-        # 初始化缓存相关属性
-        self._card_type_cache = {}
-        self._cache_lock = threading.Lock()
-        self._cache_file_path = os.path.join(self.workspace_path, '.cache', 'card_types.json')
-        self._cache_modified = False
+        # 卡牌类型缓存（文件树、后台扫描与文件操作共用）
+        self.cache_manager = CacheManager(self.workspace_path)
 
-        # 加载缓存
-        self._load_card_type_cache()
+        # 文件树模型与文件监听（首次请求文件树时创建）
+        self._tree_model = None
+        self._tree_watcher = None
+        self._tree_model_lock = threading.Lock()
 
-    def _load_card_type_cache(self):
-        """加载卡牌类型缓存"""
-        try:
-            with self._cache_lock:
-                if os.path.exists(self._cache_file_path):
-                    with open(self._cache_file_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                        self._card_type_cache = cache_data.get('card_types', {})
-                        logger_manager.info(f"加载卡牌类型缓存: {len(self._card_type_cache)} 条记录")
-                else:
-                    # 首次运行：创建空文件，避免每次提示
-                    self._card_type_cache = {}
-                    os.makedirs(os.path.dirname(self._cache_file_path), exist_ok=True)
-                    with open(self._cache_file_path, 'w', encoding='utf-8') as f:
-                        json.dump({'card_types': {}, 'last_updated': time.time()}, f, ensure_ascii=False, indent=2)
-                    logger_manager.info("未找到缓存文件，已创建空的卡牌类型缓存")
-        except Exception as e:
-            logger_manager.error(f"加载卡牌类型缓存失败: {e}")
-            self._card_type_cache = {}
+        # 插画内容寻址存储（card_art_storage 为 blob 时保存卡牌使用）
+        self._blob_store = None
 
-    def _save_card_type_cache(self):
-        """保存卡牌类型缓存"""
-        try:
-            with self._cache_lock:
-                if self._cache_modified:
-                    # 确保缓存目录存在
-                    cache_dir = os.path.dirname(self._cache_file_path)
-                    os.makedirs(cache_dir, exist_ok=True)
-
-                    cache_data = {
-                        'card_types': self._card_type_cache,
-                        'last_updated': time.time()
-                    }
-
-                    with open(self._cache_file_path, 'w', encoding='utf-8') as f:
-                        json.dump(cache_data, f, ensure_ascii=False, indent=2)
-
-                    self._cache_modified = False
-                    logger_manager.info(f"保存卡牌类型缓存: {len(self._card_type_cache)} 条记录")
-        except Exception as e:
-            logger_manager.error(f"保存卡牌类型缓存失败: {e}")
+        # 卡牌 JSON 解析缓存（read_card 使用）
+        self._card_json_cache = None
 
-    def _get_file_hash(self, file_path: str) -> str:
-        """获取文件的哈希值，用于判断文件是否被修改"""
-        try:
-            # 使用文件大小和修改时间作为轻量级的哈希
-            stat = os.stat(file_path)
-            hash_data = f"{stat.st_size}_{stat.st_mtime}"
-            return hashlib.md5(hash_data.encode()).hexdigest()
-        except Exception:
-            return ""
+        # 卡牌元数据索引（首次使用时打开，首次查询前与磁盘同步一次）
+        self._card_index = None
+        self._card_index_synced = False
+        self._card_index_lock = threading.Lock()
 
-    def _update_card_type_cache(self, file_path: str, card_type: str):
-        """更新卡牌类型缓存"""
-        try:
-            with self._cache_lock:
-                relative_path = self._get_relative_path(file_path)
-                file_hash = self._get_file_hash(file_path)
-
-                self._card_type_cache[relative_path] = {
-                    'type': card_type,
-                    'hash': file_hash,
-                    'last_accessed': time.time()
-                }
-                self._cache_modified = True
-        except Exception as e:
-            logger_manager.error(f"更新卡牌类型缓存失败: {e}")
+    def _ensure_card_resources(self):
+        """初始化字体/图片管理器与卡牌生成器（线程安全，仅执行一次）"""
+        if self._card_resources_ready:
+            return
+        with self._card_resources_lock:
+            if self._card_resources_ready:
+                return
+            try:
+                classes = _load_card_generation_modules()
+                if classes is None:
+                    return
+                FontManager, ImageManager, CardCreator, _ = classes
+                started = time.perf_counter()
+                app_mode = os.environ.get('APP_MODE', 'normal')
 
-    def _remove_from_cache(self, file_path: str):
-        """从缓存中移除指定文件"""
-        try:
-            with self._cache_lock:
-                relative_path = self._get_relative_path(file_path)
-                if relative_path in self._card_type_cache:
-                    del self._card_type_cache[relative_path]
-                    self._cache_modified = True
-        except Exception as e:
-            logger_manager.error(f"从缓存中移除文件失败: {e}")
+                font_manager = FontManager()
+                image_manager = ImageManager()
+                font_manager.add_font_folder(config_dir_manager.get_user_font_dir())
 
-    def _remove_directory_from_cache(self, dir_path: str):
-        """从缓存中移除指定目录下的所有卡牌文件"""
-        try:
-            with self._cache_lock:
-                dir_relative_path = self._get_relative_path(dir_path)
-                if not dir_relative_path.endswith('/'):
-                    dir_relative_path += '/'
-
-                # 找到所有在该目录下的卡牌文件
-                to_remove = []
-                for relative_path in self._card_type_cache:
-                    if relative_path.startswith(dir_relative_path) and relative_path.endswith('.card'):
-                        to_remove.append(relative_path)
-
-                # 从缓存中移除
-                for path in to_remove:
-                    del self._card_type_cache[path]
-                    self._cache_modified = True
-
-                if to_remove:
-                    logger_manager.info(f"从缓存中移除目录 {dir_path} 下的 {len(to_remove)} 个卡牌文件")
-        except Exception as e:
-            logger_manager.error(f"从缓存中移除目录文件失败: {e}")
+                workspace_fonts_dir = os.path.join(self.workspace_path, 'fonts')
+                if os.path.exists(workspace_fonts_dir) and os.path.isdir(workspace_fonts_dir):
+                    font_manager.add_font_folder(workspace_fonts_dir)
+                # 设置图片工作目录
+                image_manager.set_working_directory(self.workspace_path)
+                self._creator = CardCreator(
+                    font_manager=font_manager,
+                    image_manager=image_manager,
+                    image_mode=0 if app_mode == 'normal' else 1
+                )
+                self._font_manager = font_manager
+                self._image_manager = image_manager
+                logger_manager.info("卡牌生成资源初始化完成，耗时 %.0f ms", (time.perf_counter() - started) * 1000)
 
-    def _rename_directory_in_cache(self, old_dir_path: str, new_dir_path: str):
-        """重命名缓存中指定目录下的所有卡牌文件"""
-        try:
-            with self._cache_lock:
-                old_relative_path = self._get_relative_path(old_dir_path)
-                new_relative_path = new_dir_path
-                if not old_relative_path.endswith('/'):
-                    old_relative_path += '/'
-                if not new_relative_path.endswith('/'):
-                    new_relative_path += '/'
-
-                # 找到所有需要重命名的卡牌文件
-                to_rename = {}
-                for relative_path in self._card_type_cache:
-                    if relative_path.startswith(old_relative_path) and relative_path.endswith('.card'):
-                        new_path = relative_path.replace(old_relative_path, new_relative_path, 1)
-                        to_rename[relative_path] = new_path
-
-                # 重命名缓存中的路径
-                for old_path, new_path in to_rename.items():
-                    self._card_type_cache[new_path] = self._card_type_cache[old_path]
-                    del self._card_type_cache[old_path]
-                    self._cache_modified = True
-
-                if to_rename:
-                    logger_manager.info(f"重命名缓存中目录 {old_dir_path} 下的 {len(to_rename)} 个卡牌文件")
-        except Exception as e:
-            logger_manager.error(f"重命名缓存中目录文件失败: {e}")
+            except Exception as e:
+                logger_manager.exception(f"初始化字体和图像管理器失败: {e}")
+                self._font_manager = None
+                self._image_manager = None
+            finally:
+                self._card_resources_ready = True
+
+    @property
+    def font_manager(self):
+        """字体管理器（首次访问时若后台预热尚未完成则同步等待）"""
+        self._ensure_card_resources()
+        return self._font_manager
+
+    @font_manager.setter
+    def font_manager(self, value):
+        self._font_manager = value
+
+    @property
+    def image_manager(self):
+        """图片管理器（首次访问时若后台预热尚未完成则同步等待）"""
+        self._ensure_card_resources()
+        return self._image_manager
+
+    @image_manager.setter
+    def image_manager(self, value):
+        self._image_manager = value
+
+    @property
+    def creator(self):
+        """卡牌生成器（首次访问时若后台预热尚未完成则同步等待）"""
+        self._ensure_card_resources()
+        return self._creator
+
+    @creator.setter
+    def creator(self, value):
+        self._creator = value
 
     def clear_card_type_cache(self):
         """清理卡牌类型缓存"""
-        try:
-            with self._cache_lock:
-                self._card_type_cache.clear()
-                self._cache_modified = True
-                self._save_card_type_cache()
-                logger_manager.info("卡牌类型缓存已清理")
-        except Exception as e:
-            logger_manager.error(f"清理卡牌类型缓存失败: {e}")
+        self.cache_manager.clear_cache()
+        self.cache_manager.save_cache()
+        logger_manager.info("卡牌类型缓存已清理")
 
     def __del__(self):
         """析构函数，确保在对象销毁时保存缓存"""
         try:
-            self._save_card_type_cache()
+            self.save_cache_on_exit()
         except Exception:
             # 析构函数中不应抛出异常
             pass
 
     def save_cache_on_exit(self):
         """在程序退出前保存缓存"""
-        self._save_card_type_cache()
+        cache_manager = getattr(self, 'cache_manager', None)
+        if cache_manager is not None:
+            cache_manager.save_cache()
+
+    def get_tree_model(self):
+        """获取内存文件树模型（首次调用时完整遍历一次并启动文件监听）"""
+        if self._tree_model is not None:
+            return self._tree_model
+        with self._tree_model_lock:
+            if self._tree_model is None:
+                from bin.workspace_watcher import WorkspaceTreeModel, create_watcher
+
+                model = WorkspaceTreeModel(WorkspaceScanner(self.workspace_path, cache_manager=self.cache_manager))
+                model.load()
+                self._tree_watcher = create_watcher(model)
+                self._tree_model = model
+        return self._tree_model
+
+    def stop_tree_watcher(self):
+        """停止文件监听（切换工作空间时调用）"""
+        watcher = getattr(self, '_tree_watcher', None)
+        if watcher is not None:
+            try:
+                watcher.stop()
+            except Exception as e:
+                logger_manager.warning(f"停止文件监听失败: {e}")
+            self._tree_watcher = None
+
+    def _notify_file_changed(self, *paths: str):
+        """应用内写操作完成后立即更新文件树模型与卡牌索引，无需等待监听器"""
+        model = getattr(self, '_tree_model', None)
+        card_json_cache = getattr(self, '_card_json_cache', None)
+        for path in paths:
+            if card_json_cache is not None:
+                card_json_cache.invalidate(path if os.path.isabs(path) else self._get_absolute_path(path))
+            if model is not None:
+                try:
+                    model.refresh_path(path)
+                except Exception as e:
+                    logger_manager.warning(f"更新文件树失败 {path}: {e}")
+            self._update_card_index(path)
+
+    def get_card_index(self):
+        """获取卡牌元数据索引（.cache/card_index.sqlite3）"""
+        if self._card_index is None:
+            with self._card_index_lock:
+                if self._card_index is None:
+                    from bin.card_index import CardIndex
+
+                    self._card_index = CardIndex(self.workspace_path, decode=decode_text)
+        return self._card_index
+
+    def refresh_card_index(self) -> int:
+        """与磁盘同步卡牌索引（只解析新增或变化的文件），返回重新解析的文件数"""
+        walk = self.get_tree_model().walk_result()
+        updated = self.get_card_index().sync(walk.card_files, walk.stats)
+        self._card_index_synced = True
+        return updated
+
+    def query_cards(self, filters: Optional[Dict[str, Any]] = None, search: Optional[str] = None,
+                    path_prefix: Optional[str] = None, has_back: Optional[bool] = None,
+                    sort: str = 'path', descending: bool = False,
+                    offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """
+        查询卡牌元数据（不读取卡牌文件）
+
+        参数见 CardIndex.query；首次查询前会先同步一次索引。
+        """
+        if not self._card_index_synced:
+            self.refresh_card_index()
+        return self.get_card_index().query(
+            filters=filters, search=search, path_prefix=path_prefix, has_back=has_back,
+            sort=sort, descending=descending, offset=offset, limit=limit
+        )
+
+    def _update_card_index(self, path: str):
+        """写操作后更新卡牌索引（索引尚未打开时跳过，首次查询时会整体同步）"""
+        card_index = getattr(self, '_card_index', None)
+        if card_index is None:
+            return
+        try:
+            abs_path = path if os.path.isabs(path) else self._get_absolute_path(path)
+            rel_path = self._get_relative_path(abs_path)
+            if os.path.isdir(abs_path):
+                # 新增或重命名得到的目录，下次查询前整体同步
+                self._card_index_synced = False
+            elif os.path.isfile(abs_path):
+                if rel_path.endswith('.card'):
+                    card_index.update_card(rel_path)
+            else:
+                card_index.remove(rel_path)
+                card_index.remove_prefix(rel_path)
+        except Exception as e:
+            logger_manager.warning(f"更新卡牌索引失败 {path}: {e}")
 
     def _get_relative_path(self, absolute_path: str) -> str:
         """将绝对路径转换为相对于工作目录的相对路径"""
@@ -948,134 +1598,21 @@ class WorkspaceManager:
 
         return type_mapping.get(ext, 'file')
 
-    def _get_card_type(self, item_path: str) -> str:
-        """快速读取 JSON 文件中的 'type' 字段，优先从缓存获取"""
-        try:
-            # 获取相对路径
-            relative_path = self._get_relative_path(item_path)
-
-            # 首先尝试从缓存获取
-            with self._cache_lock:
-                if relative_path in self._card_type_cache:
-                    cache_entry = self._card_type_cache[relative_path]
-
-                    # 检查文件是否被修改
-                    current_hash = self._get_file_hash(item_path)
-                    if current_hash == cache_entry.get('hash', ''):
-                        # 文件未修改，使用缓存数据
-                        cache_entry['last_accessed'] = time.time()
-                        return cache_entry.get('type', '')
-                    else:
-                        # 文件已修改，从缓存中移除
-                        del self._card_type_cache[relative_path]
-
-            # 缓存中没有或文件已修改，从文件读取
-            with open(item_path, 'r', encoding='utf-8') as f:
-                # 只读取前几 KB，足够覆盖大多数 JSON 的前部字段
-                chunk = f.read(4096)
-            match = self._TYPE_RE.search(chunk)
-            if match:
-                card_type = match.group(1)
-                # 更新缓存
-                self._update_card_type_cache(item_path, card_type)
-                return card_type
-        except Exception as e:
-            # 可根据需要打印日志或忽略
-            logger_manager.warning(f"无法读取 {item_path}: {e}")
-        return ''
-
     def _is_image_file(self, file_path: str) -> bool:
         """检查是否是图片文件"""
         return self._get_file_type(file_path) == 'image'
 
-    def _get_type_priority(self, item_type: str) -> int:
-        """获取类型优先级，数字越小优先级越高"""
-        type_priorities = {
-            'directory': 0,  # 目录最优先
-            'card': 1,
-            'image': 2,
-            'config': 3,
-            'text': 4,
-            'style': 5,
-            'data': 6,
-            'file': 7,  # 其他文件类型最低优先级
-        }
-        return type_priorities.get(item_type, 99)
-
-    def _sort_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """对文件和目录进行排序：先按类型，再按名称"""
-
-        def sort_key(item):
-            # 第一排序键：类型优先级
-            type_priority = self._get_type_priority(item.get('type', 'file'))
-            # 第二排序键：文件名（不区分大小写）
-            name = item.get('label', '').lower()
-            return (type_priority, name)
-
-        return sorted(items, key=sort_key)
-
-    def _build_tree_recursive(self, path: str, include_hidden: bool = False) -> List[Dict[str, Any]]:
-        """递归构建目录树"""
-        items = []
-
-        try:
-            for item in os.listdir(path):
-                if not include_hidden and item.startswith('.'):
-                    continue
-
-                item_path = os.path.join(path, item)
-                # 获取相对于工作目录的相对路径
-                relative_path = self._get_relative_path(item_path)
-                item_key = f"{relative_path}_{int(time.time() * 1000000)}"  # 使用相对路径+时间戳生成唯一key
-
-                if os.path.isdir(item_path):
-                    # 处理目录，递归获取子项并排序
-                    children = self._build_tree_recursive(item_path, include_hidden)
-                    children = self._sort_items(children)  # 对子项进行排序
-
-                    items.append({
-                        'label': item,
-                        'key': item_key,
-                        'type': 'directory',
-                        'path': relative_path,  # 使用相对路径
-                        'children': children
-                    })
-
-                elif os.path.isfile(item_path):
-                    # 处理文件
-                    file_type = self._get_file_type(item)
-                    item_info = {
-                        'label': item,
-                        'key': item_key,
-                        'type': file_type,
-                        'path': relative_path,  # 使用相对路径
-                    }
-
-                    # 当文件类型为 card 时，额外提取 card_type
-                    if file_type == 'card':
-                        item_info['card_type'] = self._get_card_type(item_path)
-
-                    items.append(item_info)
-
-        except PermissionError:
-            # 如果没有权限访问目录，跳过
-            pass
-        except Exception as e:
-            print(f"构建目录树失败 {path}: {e}")
-
-        # 对当前级别的项目进行排序
-        return self._sort_items(items)
-
     def get_file_tree(self, include_hidden: bool = False) -> Dict[str, Any]:
-        """获取工作目录的文件树结构"""
+        """获取工作目录的文件树结构（单次scandir遍历，节点key为相对路径）"""
         try:
             workspace_name = os.path.basename(self.workspace_path) or self.workspace_path
-            children = self._build_tree_recursive(self.workspace_path, include_hidden)
+            scanner = WorkspaceScanner(self.workspace_path, cache_manager=self.cache_manager)
+            children = scanner.scan_structure(include_hidden, include_card_type=True)
 
             # 返回工作空间根节点
             return {
                 'label': workspace_name,
-                'key': f"workspace_{int(time.time() * 1000000)}",
+                'key': 'workspace',
                 'type': 'workspace',
                 'path': '.',  # 工作目录使用相对路径 '.'
                 'children': children
@@ -1108,6 +1645,7 @@ class WorkspaceManager:
             logger_manager.info(f"创建目录: {target_path}")
             os.makedirs(target_path, exist_ok=True)
             logger_manager.info(f"目录创建成功: {target_path}")
+            self._notify_file_changed(target_path)
             return True
 
         except PermissionError as e:
@@ -1143,6 +1681,7 @@ class WorkspaceManager:
                 with open(target_path, 'w', encoding='utf-8') as f:
                     f.write(content)
                 logger_manager.info(f"文件创建成功: {target_path}")
+                self._notify_file_changed(target_path)
                 return True
             except PermissionError as e:
                 logger_manager.error(f"权限错误: {e}")
@@ -1168,25 +1707,14 @@ class WorkspaceManager:
 
             parent_dir = os.path.dirname(abs_old_path)
             new_path = os.path.join(parent_dir, new_name)
-            new_relative_path = self._get_relative_path(new_path)
 
             if os.path.exists(new_path):
                 return False  # 目标名称已存在
 
-            # 处理缓存更新
-            if os.path.isfile(abs_old_path):
-                # 重命名文件
-                if old_path.endswith('.card'):
-                    # 从缓存中移除旧路径
-                    self._remove_from_cache(old_path)
-                    if new_path.endswith('.card'):
-                        # 如果新文件仍是卡牌文件，移除缓存以便重新读取
-                        self._remove_from_cache(new_relative_path)
-            elif os.path.isdir(abs_old_path):
-                # 重命名目录，需要处理目录下所有卡牌文件的缓存
-                self._rename_directory_in_cache(old_path, new_relative_path)
-
             os.rename(abs_old_path, new_path)
+            # 文件或目录下全部卡牌的缓存条目随之迁移（mtime/size 不变，无需重新读取）
+            self.cache_manager.move(abs_old_path, new_path)
+            self._notify_file_changed(abs_old_path, new_path)
             return True
 
         except Exception as e:
@@ -1205,61 +1733,76 @@ class WorkspaceManager:
                 return False
 
             if os.path.isfile(abs_item_path):
-                # 如果是卡牌文件，从缓存中移除
-                if item_path.endswith('.card'):
-                    self._remove_from_cache(item_path)
                 os.remove(abs_item_path)
             elif os.path.isdir(abs_item_path):
-                # 如果是目录，需要清理其中所有卡牌文件的缓存
-                self._remove_directory_from_cache(item_path)
                 import shutil
                 shutil.rmtree(abs_item_path)
+            # 移除文件（或目录下全部卡牌）的缓存
+            self.cache_manager.remove(abs_item_path)
 
+            self._notify_file_changed(abs_item_path)
             return True
 
         except Exception as e:
             print(f"删除失败: {e}")
             return False
 
-    def get_file_content(self, file_path: str) -> Optional[str]:
-        """获取文本文件内容"""
+    def get_file_content(self, file_path: str, inline_art: bool = False) -> Optional[str]:
+        """
+        获取文本文件内容
+
+        :param inline_art: 为卡牌文件时将插画引用还原为 data URL（发给编辑器或导出到工作空间外时使用）
+        """
         try:
             # 确保路径在工作目录内
             if not self._is_path_in_workspace(file_path):
-                print(f"路径不在工作目录内: {file_path}")
+                logger_manager.warning("路径不在工作目录内: %s", file_path)
                 return None
 
             abs_file_path = self._get_absolute_path(file_path)
-            print(f"获取文件内容: {abs_file_path}")
-            print(f"   - 文件是否存在: {os.path.exists(abs_file_path)}")
-            print(f"   - 是否为文件: {os.path.isfile(abs_file_path)}")
+            logger_manager.debug("获取文件内容: %s", abs_file_path, category='io')
 
             if not os.path.isfile(abs_file_path):
-                print(f"文件不存在或不是文件")
+                logger_manager.warning("文件不存在或不是文件: %s", abs_file_path)
                 return None
 
-            # 尝试以不同编码读取文件
-            encodings = ['utf-8', 'utf-8-sig', 'gbk', 'gb2312']
-            last_error = None
-
-            for encoding in encodings:
-                try:
-                    with open(abs_file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    print(f"使用 {encoding} 编码成功读取文件")
-                    return content
-                except UnicodeDecodeError as e:
-                    last_error = e
-                    print(f"使用 {encoding} 编码失败: {str(e)[:50]}")
-                    continue
+            with open(abs_file_path, 'rb') as f:
+                raw = f.read()
+            try:
+                content, encoding = decode_text(raw)
+            except UnicodeDecodeError as e:
+                logger_manager.warning("所有编码尝试失败 %s，最后错误: %s", abs_file_path, e)
+                return None
+            logger_manager.debug("使用 %s 编码成功读取文件", encoding, category='io')
+            # 与文本模式读取一致：统一换行符
+            if '\r' in content:
+                content = content.replace('\r\n', '\n').replace('\r', '\n')
+            if inline_art and abs_file_path.endswith('.card'):
+                content = self._inline_card_art_content(content)
+            return content
 
-            print(f"所有编码尝试失败，最后错误: {last_error}")
+        except Exception as e:
+            logger_manager.exception("读取文件内容失败: %s", e)
             return None
 
-        except Exception as e:
-            print(f"读取文件内容失败: {e}")
-            traceback.print_exc()
+    def get_card_json_cache(self):
+        """获取卡牌 JSON 解析缓存"""
+        if getattr(self, '_card_json_cache', None) is None:
+            self._card_json_cache = CardJsonCache()
+        return self._card_json_cache
+
+    def read_card(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        读取并解析卡牌JSON（按 mtime/size 缓存解析结果）
+
+        返回的是副本，调用方可以直接修改；插画引用保持原样（渲染时由 get_card_base64 解析）。
+        路径不在工作空间内、文件不存在或内容不是JSON对象时返回None。
+        """
+        if not self._is_path_in_workspace(file_path):
+            logger_manager.warning("路径不在工作目录内: %s", file_path)
             return None
+        data = self.get_card_json_cache().read(self._get_absolute_path(file_path))
+        return data if isinstance(data, dict) else None
 
     def get_image_as_base64(self, image_path: str) -> Optional[str]:
         """
@@ -1351,6 +1894,9 @@ class WorkspaceManager:
             abs_file_path = self._get_absolute_path(file_path)
             logger_manager.info(f"保存文件内容: {abs_file_path}")
 
+            if file_path.endswith('.card') and self.uses_blob_storage():
+                content = self._externalize_card_art_content(content)
+
             # 确保父目录存在
             parent_dir = os.path.dirname(abs_file_path)
             os.makedirs(parent_dir, exist_ok=True)
@@ -1363,8 +1909,9 @@ class WorkspaceManager:
 
                 # 如果是卡牌文件，更新缓存
                 if file_path.endswith('.card'):
-                    self._remove_from_cache(file_path)  # 移除旧缓存，下次会重新读取
+                    self.cache_manager.remove(abs_file_path)  # 移除旧缓存，下次会重新读取
 
+                self._notify_file_changed(abs_file_path)
                 return True
             except PermissionError as e:
                 logger_manager.error(f"权限错误: {e}")
@@ -1395,14 +1942,16 @@ class WorkspaceManager:
 
         if picture_base64 and picture_base64.strip():
             try:
-                # 解码base64数据
-                if picture_base64.startswith('data:image/'):
-                    # 去掉data URL前缀
-                    base64_data = picture_base64.split(',', 1)[1]
+                if picture_base64.startswith('blob:'):
+                    # 内容寻址存储中的插画引用
+                    image_data = self.get_blob_store().get(picture_base64)
+                    if image_data is None:
+                        return None
+                elif picture_base64.startswith('data:'):
+                    # 去掉data URL前缀（声明的 MIME 可能不是 image/*，由 PIL 按内容识别）
+                    image_data = base64.b64decode(picture_base64.split(',', 1)[1])
                 else:
-                    base64_data = picture_base64
-
-                image_data = base64.b64decode(base64_data)
+                    image_data = base64.b64decode(picture_base64)
                 # 2. 将二进制数据读入一个内存中的字节流对象
                 image_stream = io.BytesIO(image_data)
                 # 3. 使用 PIL 的 Image.open() 从字节流中打开图片并复制到内存
@@ -1418,6 +1967,78 @@ class WorkspaceManager:
                 picture_path = full_picture_path
         return picture_path
 
+    def get_blob_store(self):
+        """获取插画内容寻址存储"""
+        if self._blob_store is None:
+            from bin.blob_store import BlobStore
+
+            self._blob_store = BlobStore(self.workspace_path)
+        return self._blob_store
+
+    def uses_blob_storage(self) -> bool:
+        """保存卡牌时是否将内嵌插画移入内容寻址存储"""
+        return (self.config or {}).get('card_art_storage') == 'blob'
+
+    def _externalize_card_art_content(self, content: str) -> str:
+        """将卡牌JSON文本中的内嵌插画替换为引用，无法解析或无需替换时原样返回"""
+        try:
+            card_json = json.loads(content)
+        except (TypeError, ValueError):
+            return content
+        if not isinstance(card_json, dict):
+            return content
+        card_json, count = self.get_blob_store().externalize_card(card_json)
+        if not count:
+            return content
+        logger_manager.debug(f"{count} 处内嵌插画已移入内容寻址存储", category='io')
+        return json.dumps(card_json, ensure_ascii=False, indent=2)
+
+    def _inline_card_art_content(self, content: str) -> str:
+        """将卡牌JSON文本中的插画引用还原为 data URL"""
+        if 'blob:sha256:' not in content:
+            return content
+        try:
+            card_json = json.loads(content)
+        except ValueError:
+            return content
+        if not isinstance(card_json, dict):
+            return content
+        card_json, count = self.get_blob_store().inline_card(card_json)
+        return json.dumps(card_json, ensure_ascii=False, indent=2) if count else content
+
+    def migrate_card_art_storage(self, mode: str) -> Dict[str, int]:
+        """
+        在内嵌与内容寻址两种插画存储方式之间迁移工作空间内全部卡牌
+
+        :param mode: 'blob' 移入存储；'inline' 还原为内嵌base64（便于拷贝或分享单个卡牌文件）
+        :return: {'scanned': 检查的卡牌数, 'migrated': 改写的卡牌数, 'failed': 失败数}
+        """
+        if mode not in ('blob', 'inline'):
+            raise ValueError(f"不支持的插画存储方式: {mode}")
+        convert = self._externalize_card_art_content if mode == 'blob' else self._inline_card_art_content
+
+        result = {'scanned': 0, 'migrated': 0, 'failed': 0}
+        for rel_path in WorkspaceScanner(self.workspace_path, cache_manager=self.cache_manager).walk().card_files:
+            result['scanned'] += 1
+            abs_path = os.path.join(self.workspace_path, rel_path)
+            try:
+                # 与 read_card 一致按 BOM/UTF-8/GBK 解码，改写后统一保存为 UTF-8
+                with open(abs_path, 'rb') as f:
+                    content, _ = decode_text(f.read())
+                converted = convert(content)
+                if converted == content:
+                    continue
+                with open(abs_path, 'w', encoding='utf-8') as f:
+                    f.write(converted)
+                result['migrated'] += 1
+                self._notify_file_changed(abs_path)
+            except Exception as e:
+                result['failed'] += 1
+                logger_manager.warning(f"迁移卡牌插画失败 {rel_path}: {e}")
+
+        logger_manager.info(f"卡牌插画存储迁移到 {mode}: {result}")
+        return result
+
     @staticmethod
     def center_crop_if_larger(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
         """
@@ -1463,9 +2084,11 @@ class WorkspaceManager:
         Returns:
             Card对象，如果生成失败返回None
         """
-        if not CARD_GENERATION_AVAILABLE:
+        classes = _load_card_generation_modules()
+        if classes is None:
             print("卡牌生成功能不可用：缺少必要的模块")
             return None
+        Card = classes[3]
 
         if not self.font_manager or not self.image_manager:
             print("字体或图像管理器未初始化")
@@ -1538,22 +2161,22 @@ class WorkspaceManager:
                     card.image = external_image
                     return card
 
+            # 语言、静默模式与图片模式按线程保存在 FontManager / CardCreator 中，并行导出时各线程独立渲染，无需持锁
             # 检测卡牌语言
             language = json_data.get('language', 'zh')
             self.font_manager.set_lang(language)
 
-            with self.card_lock:
-                # 调用process_card_json生成卡牌
-                if silence:
-                    card = self.creator.create_card_bottom_map(
-                        json_data,
-                        picture_path=self.get_card_base64(json_data)
-                    )
-                else:
-                    card = self.creator.create_card(
-                        json_data,
-                        picture_path=self.get_card_base64(json_data)
-                    )
+            # 调用process_card_json生成卡牌
+            if silence:
+                card = self.creator.create_card_bottom_map(
+                    json_data,
+                    picture_path=self.get_card_base64(json_data)
+                )
+            else:
+                card = self.creator.create_card(
+                    json_data,
+                    picture_path=self.get_card_base64(json_data)
+                )
 
             # 检测是否有遭遇组
             encounter_group = json_data.get('encounter_group', None)
@@ -1628,6 +2251,19 @@ class WorkspaceManager:
             print(f"生成卡图失败: {e}")
             return None
 
+    def render_encounter_group_number(self, card, json_data: Dict[str, Any],
+                                      encounter_group_number: str) -> List[Dict[str, Any]]:
+        """
+        按卡牌页脚样式重新排版遭遇组编号，返回文字层元数据（经典模式导出副本时使用）
+
+        Args:
+            card: generate_card_image(json_data, False) 生成的 Card 对象
+            json_data: 生成该卡牌时使用的JSON（用于确定语言）
+            encounter_group_number: 新的遭遇组编号
+        """
+        self.font_manager.set_lang(json_data.get('language', 'zh'))
+        return card.render_encounter_group_number(encounter_group_number)
+
     def generate_double_sided_card_image(self, json_data: Dict[str, Any], silence: bool = False):
         """
         生成双面卡图
@@ -1815,6 +2451,7 @@ class WorkspaceManager:
             # 保存图片
             card.image.save(save_path)
             logger_manager.info(f"卡图保存成功: {self._get_relative_path(save_path)}")
+            self._notify_file_changed(save_path)
             return True
 
         except PermissionError as e:
@@ -2020,6 +2657,7 @@ class WorkspaceManager:
                 image.save(save_path, format='PNG', optimize=True)
 
             logger_manager.info(f"图片保存成功: {self._get_relative_path(save_path)}")
+            self._notify_file_changed(save_path)
             return self._get_relative_path(save_path)
 
         except PermissionError as e:
@@ -2093,13 +2731,21 @@ class WorkspaceManager:
         return config
 
     def _load_config_file(self, file_path: str) -> Dict[str, Any]:
-        """加载配置文件"""
+        """加载配置文件（按 mtime/size 缓存解析结果，返回副本）"""
         try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
+            try:
+                stat_result = os.stat(file_path)
+            except FileNotFoundError:
                 return {}
+
+            cached = self._config_file_cache.get(file_path)
+            if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+                return copy_json(cached[2])
+
+            with open(file_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            self._config_file_cache[file_path] = (stat_result.st_mtime_ns, stat_result.st_size, config)
+            return copy_json(config)
         except Exception as e:
             print(f"加载配置文件失败 {file_path}: {e}")
             return {}
@@ -2111,6 +2757,8 @@ class WorkspaceManager:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
+            # mtime 精度较粗时同一秒内的两次保存可能无法区分，直接丢弃缓存
+            self._config_file_cache.pop(file_path, None)
             return True
         except Exception as e:
             print(f"保存配置文件失败 {file_path}: {e}")
@@ -2251,44 +2899,161 @@ class WorkspaceManager:
             print(f"保存配置文件失败: {e}")
             return False
 
-    def get_encounter_groups(self) -> List[str]:
-        """获取遭遇组列表"""
-        try:
-            # 获取配置
-            config = self.config
-            encounter_dir = config.get('encounter_groups_dir', '')
+    # 遭遇组图标缩略图的最大边长
+    ENCOUNTER_ICON_SIZE = 256
 
-            if not encounter_dir:
-                print("配置中未设置遭遇组目录")
-                return []
+    def _get_encounter_groups_dir(self) -> str:
+        """遭遇组目录（相对路径），未配置时与 ContentPackageManager 一致使用 encounter_groups"""
+        return self.config.get('encounter_groups_dir') or 'encounter_groups'
 
-            # 构建遭遇组目录的绝对路径
-            encounter_path = self._get_absolute_path(encounter_dir)
+    def _get_encounter_groups_path(self) -> str:
+        """遭遇组目录的绝对路径"""
+        return self._get_absolute_path(self._get_encounter_groups_dir())
 
+    def get_encounter_groups(self) -> List[str]:
+        """获取遭遇组列表（按目录 mtime 缓存，目录内增删或重命名文件后自动失效）"""
+        try:
+            encounter_path = self._get_encounter_groups_path()
             if not os.path.exists(encounter_path):
-                print(f"遭遇组目录不存在: {encounter_dir}")
+                print(f"遭遇组目录不存在: {encounter_path}")
                 return []
 
             if not os.path.isdir(encounter_path):
-                print(f"指定路径不是目录: {encounter_dir}")
+                print(f"指定路径不是目录: {encounter_path}")
                 return []
 
-            # 搜索所有png图片文件
-            encounter_groups = []
-            for file in os.listdir(encounter_path):
-                if file.lower().endswith('.png'):
-                    # 去掉扩展名
-                    name = os.path.splitext(file)[0]
-                    encounter_groups.append(name)
+            dir_mtime = os.stat(encounter_path).st_mtime_ns
+            cached = self._encounter_groups_cache
+            if cached and cached[0] == encounter_path and cached[1] == dir_mtime:
+                return list(cached[2])
 
-            # 按名称排序
-            encounter_groups.sort()
-            return encounter_groups
+            # 搜索所有png图片文件（去掉扩展名），按名称排序
+            encounter_groups = sorted(
+                os.path.splitext(file)[0]
+                for file in os.listdir(encounter_path)
+                if file.lower().endswith('.png')
+            )
+            self._encounter_groups_cache = (encounter_path, dir_mtime, encounter_groups)
+            return list(encounter_groups)
 
         except Exception as e:
             print(f"获取遭遇组列表失败: {e}")
             return []
 
+    def get_encounter_icon(self, encounter_group: str,
+                           size: Optional[int] = None) -> Optional[Tuple[bytes, str]]:
+        """
+        获取遭遇组图标缩略图（PNG，按源文件 mtime/size 缓存）
+
+        :param size: 缩略图最大边长，默认 ENCOUNTER_ICON_SIZE；原图更小时不放大
+        :return: (PNG数据, ETag)，图标不存在时返回None
+        """
+        encounter_path = self._get_encounter_groups_path()
+        if not encounter_group:
+            return None
+        icon_path = os.path.join(encounter_path, encounter_group + '.png')
+        if os.path.dirname(os.path.abspath(icon_path)) != os.path.abspath(encounter_path):
+            return None
+        try:
+            stat_result = os.stat(icon_path)
+        except OSError:
+            return None
+
+        size = size or self.ENCOUNTER_ICON_SIZE
+        key = (icon_path, size)
+        cached = self._encounter_icon_cache.get(key)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2], cached[3]
+
+        try:
+            with Image.open(icon_path) as image:
+                image.load()
+                if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                    image = image.convert('RGBA')
+                image.thumbnail((size, size), Image.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer, format='PNG', optimize=True)
+        except Exception as e:
+            logger_manager.warning(f"生成遭遇组图标缩略图失败 {icon_path}: {e}")
+            return None
+
+        data = buffer.getvalue()
+        etag = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}-{size}"
+        self._encounter_icon_cache[key] = (stat_result.st_mtime_ns, stat_result.st_size, data, etag)
+        return data, etag
+
+    def get_package_encounter_groups(self) -> Dict[str, Any]:
+        """
+        工作空间中全部内容包引用的遭遇组（不含图片数据，图标通过 get_encounter_icon 单独获取）
+
+        内容包文件来自文件树模型，卡牌的遭遇组来自卡牌索引（只重新解析 mtime/size 变化的卡牌），
+        内容包的卡牌列表按内容包文件的 mtime/size 缓存。
+
+        :return: {'packages': [{'package', 'encounter_groups_count'[, 'error']}],
+                  'encounter_groups': [{'name', 'relative_path'}]}（按首次出现顺序去重）
+        """
+        walk = self.get_tree_model().walk_result()
+        card_index = self.get_card_index()
+        card_index.sync(walk.card_files, walk.stats)
+        self._card_index_synced = True
+
+        pack_files = []
+        pending = deque([walk.tree])
+        while pending:
+            for item in pending.popleft():
+                if item['type'] == 'directory':
+                    pending.append(item['children'])
+                elif item['path'].endswith('.pack'):
+                    pack_files.append(item['path'])
+
+        encounter_groups_dir = self._get_encounter_groups_dir()
+        all_groups: Dict[str, Dict[str, Any]] = {}
+        packages = []
+        for pack_file in pack_files:
+            try:
+                package_groups = set()
+                for card_path in self._get_package_card_paths(pack_file):
+                    card = card_index.get_card(card_path)
+                    group = card.get('encounter_group') if card else None
+                    if not group:
+                        continue
+                    package_groups.add(group)
+                    all_groups.setdefault(group, {
+                        'name': group,
+                        'relative_path': os.path.join(encounter_groups_dir, group + '.png'),
+                    })
+                packages.append({'package': pack_file, 'encounter_groups_count': len(package_groups)})
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                logger_manager.error(f"处理内容包 {pack_file} 时出错: {e}")
+                packages.append({'package': pack_file, 'encounter_groups_count': 0, 'error': str(e)})
+
+        return {'packages': packages, 'encounter_groups': list(all_groups.values())}
+
+    def _get_package_card_paths(self, pack_file: str) -> List[str]:
+        """内容包中卡牌的相对路径（与卡牌索引一致的格式，按内容包文件 mtime/size 缓存）"""
+        pack_path = self._get_absolute_path(pack_file)
+        stat_result = os.stat(pack_path)
+        cached = self._package_cards_cache.get(pack_file)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2]
+
+        with open(pack_path, 'rb') as f:
+            package_data = json.loads(decode_text(f.read())[0])
+        card_paths = []
+        for card_info in package_data.get('cards', []):
+            filename = card_info.get('filename') if isinstance(card_info, dict) else None
+            if filename and self._is_path_in_workspace(filename):
+                card_paths.append(self._get_relative_path(self._get_absolute_path(filename)))
+        self._package_cards_cache[pack_file] = (stat_result.st_mtime_ns, stat_result.st_size, card_paths)
+        return card_paths
+
+    def get_encounter_icon_data_url(self, encounter_group: str) -> Optional[str]:
+        """遭遇组图标缩略图的 data URL"""
+        icon = self.get_encounter_icon(encounter_group)
+        if icon is None:
+            return None
+        return f"data:image/png;base64,{base64.b64encode(icon[0]).decode('ascii')}"
+
     def export_deck_image(self, deck_name: str, export_format: str = 'PNG', quality: int = 95) -> bool:
         """
         导出牌库图片
@@ -2802,6 +3567,7 @@ class WorkspaceManager:
                         front_image.save(front_filepath, format='JPEG', quality=quality, dpi=dpi_info)
                     else:
                         front_image.save(front_filepath, format='PNG', dpi=dpi_info)
+                    self._notify_file_changed(front_filepath)
                     print(f"正面已导出到: {front_filepath}")
                 else:
                     print("警告：正面图片为空")
@@ -2823,6 +3589,7 @@ class WorkspaceManager:
                         back_image.save(back_filepath, format='JPEG', quality=quality, dpi=dpi_info)
                     else:
                         back_image.save(back_filepath, format='PNG', dpi=dpi_info)
+                    self._notify_file_changed(back_filepath)
                     print(f"背面已导出到: {back_filepath}")
                 else:
                     print("警告：背面图片为空，仅导出正面")
@@ -2852,6 +3619,7 @@ class WorkspaceManager:
                 else:
                     card_image.save(export_filepath, format='PNG', dpi=dpi_info)
 
+                self._notify_file_changed(export_filepath)
                 print(f"卡牌已导出到: {export_filepath}")
                 return True
 
@@ -3037,7 +3805,7 @@ class WorkspaceManager:
                 content_package_data = json.load(f)
 
             # 创建并返回ContentPackageManager对象
-            manager = ContentPackageManager(content_package_data, self)
+            manager = ContentPackageManager(content_package_data, self, package_path=package_relative_path)
             logger_manager.info(f"成功创建内容包管理器: {package_relative_path}")
             return manager
 
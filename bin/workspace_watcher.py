@@ -0,0 +1,553 @@
+"""
+工作空间文件树模型与文件监听
+
+WorkspaceTreeModel 在内存中维护工作空间文件树（节点 key 为相对路径，多次请求之间保持不变），
+每次变化递增版本号并记录变更日志，供 /api/file-tree/changes 按 "自版本 N 以来" 返回
+新增、删除、修改的节点，前端无需重新拉取整棵树。
+
+文件变化来源：
+- 应用内的写操作（编辑器保存、导出到 export/ 等）由 WorkspaceManager 直接通知；
+- 外部修改由监听器发现：安装了 watchdog 时使用系统事件（inotify/FSEvents/ReadDirectoryChanges），
+  否则退化为定时轮询：每次只 stat 目录，目录修改时间变化时才列出该目录并提交差异；原地改写文件内容
+  不会改变目录修改时间，由间隔更长的整树遍历兜底。
+"""
+import copy
+import os
+import stat
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from bin.logger import logger_manager
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    WATCHDOG_AVAILABLE = False
+
+# 变更日志最多保留的条目数，超出后过旧的版本只能整树重新获取
+MAX_CHANGE_LOG = 5000
+# 轮询监听的默认间隔（秒）
+DEFAULT_POLL_INTERVAL = 5.0
+# watchdog 中会改变文件树的事件类型
+HANDLED_EVENT_TYPES = frozenset({'created', 'deleted', 'modified', 'moved'})
+# 轮询监听整树遍历的默认间隔（秒），用于发现不改变目录修改时间的文件内容修改
+DEFAULT_FULL_RESCAN_INTERVAL = 300.0
+
+
+class WorkspaceTreeModel:
+    """内存中的工作空间文件树，维护稳定key与版本化变更日志"""
+
+    def __init__(self, scanner, include_hidden: bool = False):
+        """
+        :param scanner: WorkspaceScanner 实例，用于遍历目录、识别文件类型与读取card_type缓存
+        """
+        self.scanner = scanner
+        self.workspace_root = scanner.workspace_root
+        self.include_hidden = include_hidden
+        self.version = 0
+        self._lock = threading.RLock()
+        self._tree: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._stats: Dict[str, os.stat_result] = {}
+        # (版本号, 相对路径, 操作, 变化前是否存在)
+        self._log = deque()
+        self._base_version = 0
+        # 工作空间根目录的修改时间（目录节点的修改时间保存在节点上）
+        self._root_mtime: Optional[float] = None
+
+    # ---------- 加载与快照 ----------
+
+    def load(self):
+        """完整遍历一次工作空间，重建文件树（变更日志清空）"""
+        root_mtime = self._stat_mtime('')
+        result = self.scanner.walk_subtree('', self.include_hidden)
+        self._fill_cached_card_types(result.tree, result.stats)
+        with self._lock:
+            self._root_mtime = root_mtime
+            self._tree = result.tree
+            self._index = {}
+            self._stats = dict(result.stats)
+            self._index_nodes(self._tree)
+            self.version += 1
+            self._log.clear()
+            self._base_version = self.version
+        logger_manager.debug(f"文件树模型已加载: {len(self._index)} 个节点 (版本 {self.version})", category='io')
+
+    def get_tree(self) -> List[Dict[str, Any]]:
+        """返回文件树的深拷贝（调用方可自由修改）"""
+        with self._lock:
+            return copy.deepcopy(self._tree)
+
+    def walk_result(self):
+        """
+        以当前模型状态构造遍历结果（目录树、广度优先.card队列、stat元数据）
+
+        供 WorkspaceScanner.seed_walk 使用，后台扫描无需再次遍历磁盘。
+        """
+        from bin.workspace_manager import WorkspaceWalkResult
+
+        with self._lock:
+            tree = copy.deepcopy(self._tree)
+            stats = dict(self._stats)
+        card_files = []
+        pending = deque([tree])
+        while pending:
+            items = pending.popleft()
+            for item in items:
+                if item['type'] == 'card':
+                    card_files.append(item['path'])
+            for item in items:
+                if item['type'] == 'directory':
+                    pending.append(item['children'])
+        return WorkspaceWalkResult(tree, card_files, stats)
+
+    # ---------- 变更 ----------
+
+    def refresh_path(self, path: str) -> bool:
+        """
+        按磁盘当前状态更新单个路径（文件或目录），返回是否产生了变化
+
+        stat、读取卡牌类型与遍历新目录都在锁外完成，锁内只应用结果；应用前该路径已被其他线程更新时
+        按最新状态重试。
+
+        :param path: 相对工作空间的路径，或工作空间内的绝对路径
+        """
+        rel_path = self._normalize(path)
+        if not rel_path or not self._is_tracked(rel_path):
+            return False
+        parent_rel = os.path.dirname(rel_path)
+
+        while True:
+            try:
+                stat_info = os.stat(os.path.join(self.workspace_root, rel_path))
+            except OSError:
+                stat_info = None
+
+            with self._lock:
+                node = self._index.get(rel_path)
+                parent_missing = bool(parent_rel) and parent_rel not in self._index
+            if stat_info is not None and parent_missing:
+                # 父目录尚未出现在树中（如首次导出时新建的 export/），整体加入父目录
+                return self.refresh_path(parent_rel)
+
+            subtree = card_result = None
+            if stat_info is not None:
+                if stat.S_ISDIR(stat_info.st_mode):
+                    if node is None or node['type'] != 'directory':
+                        subtree = self._load_subtree(rel_path, stat_info)
+                elif self.scanner._get_file_type(os.path.basename(rel_path)) == 'card' and (
+                        node is None or node['mtime'] != stat_info.st_mtime or node['size'] != stat_info.st_size):
+                    card_result = self._read_card_type(rel_path, stat_info)
+
+            with self._lock:
+                if self._index.get(rel_path) is not node or (
+                        stat_info is not None and parent_rel and parent_rel not in self._index):
+                    continue
+                return self._apply_refresh(rel_path, node, stat_info, subtree, card_result)
+
+    def _apply_refresh(self, rel_path: str, node: Optional[Dict[str, Any]], stat_info: Optional[os.stat_result],
+                       subtree: Optional[tuple], card_result: Optional[Dict[str, Any]]) -> bool:
+        """在锁内应用 refresh_path 在锁外得到的结果"""
+        if stat_info is None:
+            if node is None:
+                return False
+            self._remove_node(node)
+            self._record(rel_path, 'removed', True)
+            return True
+
+        is_dir = stat.S_ISDIR(stat_info.st_mode)
+        if node is not None and (node['type'] == 'directory') != is_dir:
+            self._remove_node(node)
+            self._record(rel_path, 'removed', True)
+            node = None
+
+        if node is None:
+            if is_dir:
+                dir_node, stats = subtree
+                self._stats.update(stats)
+                self._insert_nodes(os.path.dirname(rel_path), [dir_node])
+            else:
+                self._insert_nodes(os.path.dirname(rel_path), [self._file_node(rel_path, stat_info, card_result)])
+            self._record(rel_path, 'added', False)
+            return True
+
+        if node['mtime'] == stat_info.st_mtime and (is_dir or node['size'] == stat_info.st_size):
+            return False
+        node['mtime'] = stat_info.st_mtime
+        if not is_dir:
+            node['size'] = stat_info.st_size
+            if node['type'] == 'card':
+                self._stats[rel_path] = stat_info
+                self._set_card_type(node, card_result)
+        self._record(rel_path, 'modified', True)
+        return True
+
+    def rescan(self) -> int:
+        """完整遍历磁盘并与模型比较，只提交差异，返回变化的路径数"""
+        result = self.scanner.walk_subtree('', self.include_hidden)
+        fresh: Dict[str, Dict[str, Any]] = {}
+        self._flatten(result.tree, fresh)
+
+        with self._lock:
+            current = dict(self._index)
+        changed = [p for p in current if p not in fresh]
+        for rel_path, node in fresh.items():
+            old = current.get(rel_path)
+            if old is None or old['type'] != node['type'] or old['mtime'] != node['mtime'] \
+                    or old.get('size') != node.get('size'):
+                changed.append(rel_path)
+
+        # 先处理浅层路径：新增目录会整体加入，其子项随后判定为无变化
+        count = 0
+        for rel_path in sorted(changed, key=lambda p: p.count(os.sep)):
+            if self.refresh_path(rel_path):
+                count += 1
+        return count
+
+    def rescan_changed_dirs(self) -> int:
+        """
+        轮询用的增量检查：只 stat 模型中的目录，修改时间变化（有子项新增、删除或重命名）的目录才列出
+        并与模型比较直接子项，返回变化的路径数
+
+        原地改写文件内容不会改变所在目录的修改时间，需要定期调用 rescan 兜底。
+        """
+        with self._lock:
+            dirs = [('', self._root_mtime)] + [
+                (rel_path, node['mtime']) for rel_path, node in self._index.items() if node['type'] == 'directory'
+            ]
+
+        count = 0
+        # 先处理浅层目录：父目录中已处理的新增/删除不会在子目录重复提交
+        for dir_rel, known_mtime in sorted(dirs, key=lambda item: item[0].count(os.sep) if item[0] else -1):
+            mtime = self._stat_mtime(dir_rel)
+            if mtime is None:
+                if dir_rel and self.refresh_path(dir_rel):
+                    count += 1
+                continue
+            if mtime == known_mtime:
+                continue
+            count += self._rescan_dir(dir_rel)
+            if dir_rel:
+                if self.refresh_path(dir_rel):
+                    count += 1
+            else:
+                with self._lock:
+                    self._root_mtime = mtime
+        return count
+
+    def changes_since(self, since: int) -> Dict[str, Any]:
+        """
+        返回自版本 since 以来的变化
+
+        :return: {'version', 'reset', 'added', 'removed', 'modified'}；since 过旧（日志已截断）
+                 或大于当前版本时 reset 为 True，调用方应重新获取整棵树
+        """
+        with self._lock:
+            if since < self._base_version or since > self.version:
+                return {'version': self.version, 'reset': True, 'added': [], 'removed': [], 'modified': []}
+
+            per_path: Dict[str, Dict[str, Any]] = {}
+            for version, rel_path, op, existed_before in self._log:
+                if version <= since:
+                    continue
+                entry = per_path.setdefault(rel_path, {'existed_before': existed_before, 'ops': set()})
+                entry['ops'].add(op)
+
+            added, removed, modified = [], [], []
+            for rel_path, entry in per_path.items():
+                exists_now = rel_path in self._index
+                if entry['ops'] == {'modified'}:
+                    if exists_now:
+                        modified.append(rel_path)
+                    continue
+                if entry['existed_before']:
+                    removed.append(rel_path)
+                if exists_now:
+                    added.append(rel_path)
+
+            covered = set(added) | set(removed)
+
+            def has_covered_ancestor(rel_path: str) -> bool:
+                parent = os.path.dirname(rel_path)
+                while parent:
+                    if parent in covered:
+                        return True
+                    parent = os.path.dirname(parent)
+                return False
+
+            return {
+                'version': self.version,
+                'reset': False,
+                'added': [copy.deepcopy(self._index[p]) for p in sorted(added) if not has_covered_ancestor(p)],
+                'removed': [{'key': p, 'path': p} for p in sorted(removed) if not has_covered_ancestor(p)],
+                'modified': [
+                    {k: v for k, v in self._index[p].items() if k != 'children'}
+                    for p in sorted(modified) if not has_covered_ancestor(p)
+                ],
+            }
+
+    # ---------- 内部实现 ----------
+
+    def _stat_mtime(self, dir_rel: str) -> Optional[float]:
+        try:
+            return os.stat(os.path.join(self.workspace_root, dir_rel) if dir_rel else self.workspace_root).st_mtime
+        except OSError:
+            return None
+
+    def _rescan_dir(self, dir_rel: str) -> int:
+        """列出单个目录并与模型中的直接子项比较，只提交差异"""
+        try:
+            with os.scandir(os.path.join(self.workspace_root, dir_rel) if dir_rel else self.workspace_root) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            return 0
+
+        with self._lock:
+            if dir_rel and dir_rel not in self._index:
+                return 0
+            known = {item['label']: item for item in self._siblings(dir_rel)}
+
+        changed = [item['path'] for name, item in known.items() if name not in entries]
+        for name, entry in entries.items():
+            rel_path = os.path.join(dir_rel, name) if dir_rel else name
+            if not self._is_tracked(rel_path):
+                continue
+            item = known.get(name)
+            if item is None or item['type'] == 'directory':
+                if item is None or not entry.is_dir():
+                    changed.append(rel_path)
+                continue
+            try:
+                stat_info = entry.stat()
+            except OSError:
+                changed.append(rel_path)
+                continue
+            if stat_info.st_mtime != item['mtime'] or stat_info.st_size != item['size']:
+                changed.append(rel_path)
+        return sum(1 for rel_path in changed if self.refresh_path(rel_path))
+
+    def _normalize(self, path: str) -> str:
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.workspace_root)
+        path = os.path.normpath(path.replace('\\', '/'))
+        if path in ('.', '') or path.startswith('..'):
+            return ''
+        return path
+
+    def _is_tracked(self, rel_path: str) -> bool:
+        if self.include_hidden:
+            return True
+        return not any(part.startswith('.') for part in rel_path.split(os.sep))
+
+    def _record(self, rel_path: str, op: str, existed_before: bool):
+        self.version += 1
+        self._log.append((self.version, rel_path, op, existed_before))
+        while len(self._log) > MAX_CHANGE_LOG:
+            dropped_version = self._log.popleft()[0]
+            self._base_version = dropped_version
+
+    def _index_nodes(self, items: List[Dict[str, Any]]):
+        for item in items:
+            self._index[item['path']] = item
+            if item['type'] == 'directory':
+                self._index_nodes(item['children'])
+
+    @staticmethod
+    def _flatten(items: List[Dict[str, Any]], out: Dict[str, Dict[str, Any]]):
+        for item in items:
+            out[item['path']] = item
+            if item['type'] == 'directory':
+                WorkspaceTreeModel._flatten(item['children'], out)
+
+    def _siblings(self, parent_rel: str) -> List[Dict[str, Any]]:
+        return self._index[parent_rel]['children'] if parent_rel else self._tree
+
+    def _insert_nodes(self, parent_rel: str, nodes: List[Dict[str, Any]]):
+        siblings = self._siblings(parent_rel)
+        siblings.extend(nodes)
+        siblings[:] = self.scanner._sort_items(siblings)
+        self._index_nodes(nodes)
+
+    def _load_subtree(self, rel_path: str, stat_info: os.stat_result) -> tuple:
+        """遍历新目录（不持锁），返回 (目录节点, .card stat 元数据)"""
+        result = self.scanner.walk_subtree(rel_path, self.include_hidden)
+        self._fill_cached_card_types(result.tree, result.stats)
+        node = {
+            'label': os.path.basename(rel_path),
+            'key': rel_path,
+            'type': 'directory',
+            'path': rel_path,
+            'level': rel_path.count(os.sep) + 1,
+            'mtime': stat_info.st_mtime,
+            'size': 0,
+            'children': result.tree
+        }
+        return node, result.stats
+
+    def _file_node(self, rel_path: str, stat_info: os.stat_result,
+                   card_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        name = os.path.basename(rel_path)
+        node = {
+            'label': name,
+            'key': rel_path,
+            'type': self.scanner._get_file_type(name),
+            'path': rel_path,
+            'level': rel_path.count(os.sep) + 1,
+            'mtime': stat_info.st_mtime,
+            'size': stat_info.st_size
+        }
+        if node['type'] == 'card':
+            node['card_type'] = None
+            self._stats[rel_path] = stat_info
+            self._set_card_type(node, card_result)
+        return node
+
+    def _remove_node(self, node: Dict[str, Any]):
+        parent_rel = os.path.dirname(node['path'])
+        siblings = self._siblings(parent_rel) if (not parent_rel or parent_rel in self._index) else []
+        siblings[:] = [item for item in siblings if item is not node]
+        removed: Dict[str, Dict[str, Any]] = {}
+        self._flatten([node], removed)
+        for rel_path in removed:
+            self._index.pop(rel_path, None)
+            self._stats.pop(rel_path, None)
+
+    def _fill_cached_card_types(self, items: List[Dict[str, Any]], stats: Dict[str, os.stat_result]):
+        """只使用已验证的缓存填充card_type，不读取文件（未命中的由后台扫描补充）"""
+        cache_manager = self.scanner.cache_manager
+        for item in items:
+            if item['type'] == 'directory':
+                self._fill_cached_card_types(item['children'], stats)
+            elif item['type'] == 'card' and not item.get('card_type'):
+                stat_info = stats.get(item['path'])
+                if stat_info is not None:
+                    abs_path = os.path.join(self.workspace_root, item['path'])
+                    item['card_type'] = cache_manager.get_cached_card_type(abs_path, stat_info)
+
+    def _read_card_type(self, rel_path: str, stat_info: os.stat_result) -> Dict[str, Any]:
+        """读取卡牌文件的card_type并更新缓存（不持锁）"""
+        abs_path = os.path.join(self.workspace_root, rel_path)
+        result = self.scanner._extract_card_type_with_error(abs_path)
+        if not result.get('error'):
+            self.scanner.cache_manager.update_cache(abs_path, result.get('card_type'), stat_info)
+        return result
+
+    @staticmethod
+    def _set_card_type(node: Dict[str, Any], card_result: Optional[Dict[str, Any]]):
+        if card_result is None:
+            return
+        node['card_type'] = card_result.get('card_type')
+        if card_result.get('error'):
+            node['error'] = card_result['error']
+        else:
+            node.pop('error', None)
+
+
+class PollingWatcher:
+    """
+    轮询监听（未安装 watchdog 时的后备方案）
+
+    每个间隔只检查目录修改时间并列出变化的目录；每隔 full_rescan_interval 秒完整遍历一次，
+    发现原地改写的文件（为 0 时不做整树遍历）。
+    """
+
+    backend = 'polling'
+
+    def __init__(self, model: WorkspaceTreeModel, interval: float = DEFAULT_POLL_INTERVAL,
+                 full_rescan_interval: float = DEFAULT_FULL_RESCAN_INTERVAL):
+        self.model = model
+        self.interval = interval
+        self.full_rescan_interval = full_rescan_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='workspace_poll_watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        last_full_rescan = time.monotonic()
+        while not self._stop.wait(self.interval):
+            try:
+                if self.full_rescan_interval and time.monotonic() - last_full_rescan >= self.full_rescan_interval:
+                    changed = self.model.rescan()
+                    last_full_rescan = time.monotonic()
+                else:
+                    changed = self.model.rescan_changed_dirs()
+                if changed:
+                    logger_manager.debug(f"轮询发现 {changed} 处文件变化", category='io')
+            except Exception as e:
+                logger_manager.warning(f"轮询文件变化失败: {e}")
+
+
+class _ModelEventHandler(FileSystemEventHandler):
+    """将 watchdog 事件转为 WorkspaceTreeModel.refresh_path 调用"""
+
+    def __init__(self, model: WorkspaceTreeModel):
+        super().__init__()
+        self.model = model
+
+    def on_any_event(self, event):
+        # 只处理会改变文件树的事件（opened/closed_no_write 等由应用自身读取文件产生）
+        if event.event_type not in HANDLED_EVENT_TYPES:
+            return
+        paths = [getattr(event, 'src_path', None), getattr(event, 'dest_path', None)]
+        for path in paths:
+            if not path:
+                continue
+            if isinstance(path, bytes):
+                path = os.fsdecode(path)
+            try:
+                self.model.refresh_path(path)
+            except Exception as e:
+                logger_manager.warning(f"处理文件事件失败 {path}: {e}")
+
+
+class WatchdogWatcher:
+    """系统事件监听（watchdog：inotify / FSEvents / ReadDirectoryChangesW）"""
+
+    backend = 'watchdog'
+
+    def __init__(self, model: WorkspaceTreeModel):
+        self.model = model
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_ModelEventHandler(model), model.workspace_root, recursive=True)
+
+    def start(self):
+        self._observer.start()
+
+    def stop(self):
+        self._observer.stop()
+
+
+def create_watcher(model: WorkspaceTreeModel, backend: str = 'auto',
+                   poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    创建并启动监听器
+
+    :param backend: 'auto'（优先 watchdog）、'watchdog' 或 'polling'
+    """
+    watcher = None
+    if backend in ('auto', 'watchdog') and WATCHDOG_AVAILABLE:
+        try:
+            watcher = WatchdogWatcher(model)
+            watcher.start()
+        except Exception as e:
+            logger_manager.warning(f"系统文件监听启动失败，改用轮询: {e}")
+            watcher = None
+    if watcher is None:
+        watcher = PollingWatcher(model, poll_interval)
+        watcher.start()
+    logger_manager.info(f"工作空间文件监听已启动 ({watcher.backend}): {model.workspace_root}")
+    return watcher
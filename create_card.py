@@ -2,12 +2,14 @@ import cProfile
 import json
 import pstats
 import re
+import threading
 from typing import Union, Optional
 
 from PIL import Image, ImageEnhance
 from ResourceManager import FontManager, ImageManager
 from Card import Card
 from card_cdapter import CardAdapter
+from bin.render_metrics import render_metrics
 
 # 缩略图裁剪区域定义（从 images.ts 转换而来）
 THUMBNAIL_REGIONS = {
@@ -67,10 +69,21 @@ class CardCreator:
         """
         self.font_manager = font_manager
         self.image_manager = image_manager
-        self.image_mode = image_mode
+        # create_card 按卡牌数据临时覆盖图片模式，覆盖值按线程保存，并行渲染时互不影响
+        self._default_image_mode = image_mode
+        self._local = threading.local()
         self.transparent_encounter = transparent_encounter
         self.transparent_background = transparent_background
 
+    @property
+    def image_mode(self) -> int:
+        """当前线程的图片模式"""
+        return getattr(self._local, 'image_mode', self._default_image_mode)
+
+    @image_mode.setter
+    def image_mode(self, value: int):
+        self._local.image_mode = value
+
     def _get_text_boundary_offset(self, card_data: dict, boundary_type: str = 'body') -> Optional[dict]:
         """
         从卡牌数据中提取文本边界偏移配置
@@ -151,6 +164,7 @@ class CardCreator:
 
         return ''
 
+    @render_metrics.timed('art_open')
     def _open_picture(self, card_json: dict, picture_path: Union[str, Image.Image, None]) -> Optional[Image.Image]:
         """打开图片 - 支持路径和PIL图片对象"""
         if picture_path is None:
@@ -176,6 +190,7 @@ class CardCreator:
             print(f"Error opening image: {e}")
             return None
 
+    @render_metrics.timed('art_paste')
     def _paste_background_image(self, card: Card, picture_path: Union[str, Image.Image, None],
                                 card_data: dict, dp: Optional[Image.Image] = None) -> None:
         """
@@ -223,17 +238,17 @@ class CardCreator:
             elif card_type in ['场景卡', '密谋卡', '场景卡-大画', '密谋卡-大画'] and dp.size[1] > dp.size[0]:
                 dp = dp.rotate(90, expand=True)
 
-            card.paste_image(dp, (0, 0, card.width, card.height), 'cover')
+            card.paste_art(dp, (0, 0, card.width, card.height), 'cover')
         elif image_mode == 3:
             # 自定义模式
             paste_area = self._get_paste_area(card_type, card_data)
             if card_type in ['调查员卡']:
                 paste_area = (0, 0, 1049, 739)
-            card.paste_image_with_transform(dp, paste_area, picture_layout)
+            card.paste_art(dp, paste_area, transform_params=picture_layout)
         else:
             # 部分覆盖模式 - 根据卡牌类型确定粘贴区域
             paste_area = self._get_paste_area(card_type, card_data)
-            card.paste_image(dp, paste_area, 'cover')
+            card.paste_art(dp, paste_area, 'cover')
 
     def _get_paste_area(self, card_type: str, card_data: dict) -> tuple:
         """
@@ -2275,63 +2290,67 @@ class CardCreator:
             if 'type' not in card_json:
                 raise ValueError('卡牌类型不能为空')
 
-            card_type = card_json['type']
-
-            # 根据卡牌类型调用对应的创建方法
-            if card_type == '调查员卡':
-                return self.create_investigators_card(card_json, picture_path)
-            elif card_type == '调查员卡背':
-                return self.create_investigators_card_back(card_json, picture_path)
-            elif card_type == '大画-技能卡':
-                return self.create_skill_large_card(card_json, picture_path)
-            elif card_type == '大画-事件卡':
-                return self.create_event_large_card(card_json, picture_path)
-            elif card_type == '大画-支援卡':
-                return self.create_asset_large_card(card_json, picture_path)
-            elif card_json.get('class', '') == '弱点':
-                return self.create_weakness_back(card_json, picture_path)
-            elif card_type == '升级卡':
-                return self.create_upgrade_card(card_json, picture_path)
-            elif card_type == '故事卡':
-                return self.create_story_card(card_json, picture_path)
-            elif card_type == '行动卡':
-                return self.create_action_card(card_json, picture_path)
-            elif card_type == '冒险参考卡':
-                return self.create_scenario_card(card_json, picture_path)
-            elif card_type == '规则小卡':
-                return self.create_rule_mini_card(card_json)
-            elif card_type == '敌人卡':
-                return self.create_enemy_card(card_json, picture_path)
-            elif card_type == '诡计卡':
-                return self.create_treachery_card(card_json, picture_path)
-            elif card_type == '地点卡':
-                return self.create_location_card(card_json, picture_path)
-            elif card_type in ['场景卡-大画', '密谋卡-大画']:
-                return self.create_large_picture(card_json, picture_path)
-            elif card_type in ['场景卡', '密谋卡']:
-                if card_json.get('is_back', False):
-                    return self.create_act_back_card(card_json, picture_path)
-                return self.create_act_card(card_json, picture_path)
-            elif card_type in ['场景卡背', '密谋卡背']:
-                card_json['is_back'] = True
-                if card_type == '场景卡背':
-                    card_json['type'] = '场景卡'
-                else:
-                    card_json['type'] = '密谋卡'
-                return self.create_act_back_card(card_json, picture_path)
-            elif card_type == '特殊图片':
-                return self.create_special_pictures(card_json, picture_path)
-            elif card_type == '调查员小卡':
-                return self.create_investigator_mini_card(card_json, picture_path)
-            else:
-                if 'class' not in card_json:
-                    card_json['class'] = '中立'
-                    if 'level' not in card_json:
-                        card_json['level'] = -1
-                return self.create_player_cards(card_json, picture_path)
+            with render_metrics.span('create_card', card_type=str(card_json['type'])):
+                return self._create_card_by_type(card_json, picture_path)
         finally:
             self.image_mode = _self_image_mode
 
+    def _create_card_by_type(self, card_json: dict, picture_path: Union[str, Image.Image, None]) -> Card:
+        """根据卡牌类型调用对应的创建方法"""
+        card_type = card_json['type']
+
+        if card_type == '调查员卡':
+            return self.create_investigators_card(card_json, picture_path)
+        elif card_type == '调查员卡背':
+            return self.create_investigators_card_back(card_json, picture_path)
+        elif card_type == '大画-技能卡':
+            return self.create_skill_large_card(card_json, picture_path)
+        elif card_type == '大画-事件卡':
+            return self.create_event_large_card(card_json, picture_path)
+        elif card_type == '大画-支援卡':
+            return self.create_asset_large_card(card_json, picture_path)
+        elif card_json.get('class', '') == '弱点':
+            return self.create_weakness_back(card_json, picture_path)
+        elif card_type == '升级卡':
+            return self.create_upgrade_card(card_json, picture_path)
+        elif card_type == '故事卡':
+            return self.create_story_card(card_json, picture_path)
+        elif card_type == '行动卡':
+            return self.create_action_card(card_json, picture_path)
+        elif card_type == '冒险参考卡':
+            return self.create_scenario_card(card_json, picture_path)
+        elif card_type == '规则小卡':
+            return self.create_rule_mini_card(card_json)
+        elif card_type == '敌人卡':
+            return self.create_enemy_card(card_json, picture_path)
+        elif card_type == '诡计卡':
+            return self.create_treachery_card(card_json, picture_path)
+        elif card_type == '地点卡':
+            return self.create_location_card(card_json, picture_path)
+        elif card_type in ['场景卡-大画', '密谋卡-大画']:
+            return self.create_large_picture(card_json, picture_path)
+        elif card_type in ['场景卡', '密谋卡']:
+            if card_json.get('is_back', False):
+                return self.create_act_back_card(card_json, picture_path)
+            return self.create_act_card(card_json, picture_path)
+        elif card_type in ['场景卡背', '密谋卡背']:
+            card_json['is_back'] = True
+            if card_type == '场景卡背':
+                card_json['type'] = '场景卡'
+            else:
+                card_json['type'] = '密谋卡'
+            return self.create_act_back_card(card_json, picture_path)
+        elif card_type == '特殊图片':
+            return self.create_special_pictures(card_json, picture_path)
+        elif card_type == '调查员小卡':
+            return self.create_investigator_mini_card(card_json, picture_path)
+        else:
+            if 'class' not in card_json:
+                card_json['class'] = '中立'
+                if 'level' not in card_json:
+                    card_json['level'] = -1
+            return self.create_player_cards(card_json, picture_path)
+
 
 # 使用示例
 if __name__ == '__main__':
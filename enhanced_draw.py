@@ -11,6 +11,8 @@ from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageChops, ImageEnhan
 from typing import Tuple, Optional, List
 import numpy as np
 
+from bin.render_metrics import render_metrics
+
 # 尝试导入OpenCV（可选依赖）
 try:
     import cv2
@@ -376,6 +378,7 @@ class EnhancedDraw:
                 f"请检查参数是否正确。"
             )
 
+    @render_metrics.timed('effects')
     def text(
             self,
             position: Tuple[int, int],
@@ -453,6 +456,7 @@ class EnhancedDraw:
 
         # 性能优化：不在这里合成到主图像，等待get_image()时再合成
 
+    @render_metrics.timed('effects')
     def text_batch(
             self,
             items: List[Tuple[Tuple[int, int], str, ImageFont.FreeTypeFont,
@@ -532,6 +536,7 @@ class EnhancedDraw:
                     text_color = (*fill[:3], int(fill[3] * opacity / 100))
                 text_draw.text(pos, text, font=font, fill=text_color)
 
+    @render_metrics.timed('effects')
     def get_image(self) -> Image.Image:
         """获取绘制结果（合成所有图层）
 
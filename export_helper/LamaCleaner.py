@@ -1,20 +1,90 @@
 import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np  # 导入 numpy 用于高效的数组操作
 import requests
 from PIL import Image
+from requests.adapters import HTTPAdapter
+
+# 同时发往 lama-cleaner 的请求上限（单块 GPU 时 2~4 个即可让推理不空转）
+DEFAULT_MAX_IN_FLIGHT = 4
+# 失败重试次数与退避基数（秒），第 n 次重试前等待 backoff * 2^n
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+# (连接超时, 读取超时)，大图推理可能需要数十秒
+DEFAULT_TIMEOUT = (5, 300)
+# 视为临时故障、可以重试的状态码
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 上传 PNG 的压缩级别：无损，1 级比默认 6 级快数倍，对局域网带宽影响很小
+UPLOAD_PNG_COMPRESS_LEVEL = 1
+
+# 从浏览器抓包获得的默认参数，调用时可通过 kwargs 覆盖
+DEFAULT_FORM_DATA = {
+    'ldmSteps': 25,
+    'ldmSampler': 'plms',
+    'zitsWireframe': 'true',  # bools需要转为字符串 'true'/'false'
+    'hdStrategy': 'Crop',
+    'hdStrategyCropMargin': 196,
+    'hdStrategyCropTrigerSize': 800,
+    'hdStrategyResizeLimit': 2048,
+    'prompt': '',
+    'negativePrompt': '',
+    'croperX': 0,  # 默认值可能需要根据实际情况调整，这里设为0
+    'croperY': 0,
+    'croperHeight': 512,
+    'croperWidth': 512,
+    'useCroper': 'false',
+    'sdMaskBlur': 5,
+    'sdStrength': 0.75,
+    'sdSteps': 50,
+    'sdGuidanceScale': 7.5,
+    'sdSampler': 'uni_pc',
+    'sdSeed': -1,
+    'sdMatchHistograms': 'false',
+    'sdScale': 1,
+    'cv2Radius': 5,
+    'cv2Flag': 'INPAINT_NS',
+    'paintByExampleSteps': 50,
+    'paintByExampleGuidanceScale': 7.5,
+    'paintByExampleSeed': -1,
+    'paintByExampleMaskBlur': 5,
+    'paintByExampleMatchHistograms': 'false',
+    'p2pSteps': 50,
+    'p2pImageGuidanceScale': 1.5,
+    'p2pGuidanceScale': 7.5,
+    'controlnet_conditioning_scale': 0.4,
+    'controlnet_method': 'control_v11p_sd15_canny',
+}
 
 
 class LamaCleaner:
     """
     一个用于与 lama-cleaner HTTP API 交互的 Python 客户端。
+
+    连接通过 requests.Session 复用；同时在途的请求数受 max_in_flight 限制，
+    超出的调用会阻塞等待。submit / inpaint_batch 在后台线程中执行任务，
+    调用方可以在 GPU 推理的同时继续渲染下一张卡牌。
     """
 
-    def __init__(self, base_url: str):
+    # (base_url, max_in_flight) -> 共享实例
+    _shared_instances: Dict[Tuple[str, int], 'LamaCleaner'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, base_url: str, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 timeout=DEFAULT_TIMEOUT, session: Optional[requests.Session] = None):
         """
         初始化客户端。
 
         :param base_url: lama-cleaner 服务器的 HTTP 地址, 例如: http://localhost:8080
+        :param max_in_flight: 同时在途的请求上限
+        :param retries: 连接失败、超时或 5xx/429 时的重试次数
+        :param backoff: 退避基数（秒）
+        :param timeout: requests 超时参数，秒数或 (连接, 读取) 元组
+        :param session: 自定义会话（测试时可指向本地替身服务）
         """
         if not base_url:
             raise ValueError("base_url 不能为空")
@@ -23,6 +93,44 @@ class LamaCleaner:
         self.base_url = base_url.rstrip('/')
         self.inpaint_url = f"{self.base_url}/inpaint"
 
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session if session is not None else self._create_session(self.max_in_flight)
+
+        # 在途请求数限制
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        # 已提交未完成的后台任务上限，submit 超出时阻塞（背压）
+        self._pending = threading.BoundedSemaphore(self.max_in_flight * 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, base_url: str, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> 'LamaCleaner':
+        """
+        获取进程内共享的客户端，同一服务的多个导出任务共用连接池和在途请求上限
+
+        :param base_url: lama-cleaner 服务器的 HTTP 地址
+        :param max_in_flight: 同时在途的请求上限
+        """
+        if not base_url:
+            raise ValueError("base_url 不能为空")
+        key = (base_url.rstrip('/'), max(1, int(max_in_flight)))
+        with cls._shared_lock:
+            instance = cls._shared_instances.get(key)
+            if instance is None:
+                instance = cls._shared_instances[key] = cls(key[0], max_in_flight=key[1])
+            return instance
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def set_base_url(self, base_url: str):
         """
         设置新的 base_url 并更新相关的 URL 端点。
@@ -47,7 +155,7 @@ class LamaCleaner:
         """
         try:
             # 尝试访问服务器根路径
-            response = requests.get(self.base_url, timeout=timeout)
+            response = self.session.get(self.base_url, timeout=timeout)
             # 如果状态码是 200-299 范围内，认为服务在线
             if response.status_code < 400:
                 print(f"lama-cleaner 服务在线 (状态码: {response.status_code})")
@@ -66,6 +174,45 @@ class LamaCleaner:
             print(f"检查服务状态时发生错误: {e}")
             return False
 
+    @staticmethod
+    def _encode_png(image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=UPLOAD_PNG_COMPRESS_LEVEL)
+        return buffer.getvalue()
+
+    @staticmethod
+    def build_form_data(kwargs: Dict[str, Any]) -> Dict[str, str]:
+        """实际发送的表单参数：DEFAULT_FORM_DATA 加上调用方覆盖的参数（出血缓存也用它计算键）"""
+        form_data = {key: str(value) for key, value in DEFAULT_FORM_DATA.items()}
+        # 注意：所有值都需要是字符串类型，特别是布尔值要转为 'true'/'false'
+        for key, value in kwargs.items():
+            if isinstance(value, bool):
+                form_data[key] = str(value).lower()
+            else:
+                form_data[key] = str(value)
+        return form_data
+
+    def _post_with_retry(self, files: Dict[str, Tuple[str, bytes, str]],
+                         form_data: Dict[str, str]) -> requests.Response:
+        """在在途请求上限内发送请求，临时故障按指数退避重试"""
+        attempt = 0
+        while True:
+            try:
+                with self._in_flight:
+                    response = self.session.post(self.inpaint_url, files=files, data=form_data,
+                                                 timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+                    return response
+                reason = f"状态码 {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                reason = str(e)
+            delay = self.backoff * (2 ** attempt)
+            attempt += 1
+            print(f"lama-cleaner 请求失败（{reason}），{delay:.1f} 秒后第 {attempt} 次重试")
+            time.sleep(delay)
+
     def inpaint(self, image: Image.Image, mask: Image.Image, **kwargs) -> Image.Image:
         """
         调用 lama-cleaner 的 /inpaint 接口进行图像修复。
@@ -78,71 +225,16 @@ class LamaCleaner:
         :raises: requests.exceptions.RequestException: 如果网络请求失败。
                  ValueError: 如果服务器返回错误。
         """
-        # 将 PIL Image 对象转换为内存中的二进制数据
-        image_buffer = io.BytesIO()
-        image.save(image_buffer, format='PNG')
-        image_buffer.seek(0)  # 重置指针到文件开头
-
-        mask_buffer = io.BytesIO()
+        # 编码在占用请求名额之前完成，CPU 编码与其他请求的 GPU 推理重叠
         # lama-cleaner 需要一个单通道的灰度图作为mask
-        mask.convert('L').save(mask_buffer, format='PNG')
-        mask_buffer.seek(0)
-
-        # 准备 multipart/form-data
         files = {
-            'image': ('image.png', image_buffer, 'image/png'),
-            'mask': ('mask.png', mask_buffer, 'image/png')
+            'image': ('image.png', self._encode_png(image), 'image/png'),
+            'mask': ('mask.png', self._encode_png(mask.convert('L')), 'image/png')
         }
-
-        # 从浏览器抓包获得的默认参数
-        # 您可以在调用 inpaint 方法时通过 kwargs 来覆盖它们
-        form_data = {
-            'ldmSteps': 25,
-            'ldmSampler': 'plms',
-            'zitsWireframe': 'true',  # bools需要转为字符串 'true'/'false'
-            'hdStrategy': 'Crop',
-            'hdStrategyCropMargin': 196,
-            'hdStrategyCropTrigerSize': 800,
-            'hdStrategyResizeLimit': 2048,
-            'prompt': '',
-            'negativePrompt': '',
-            'croperX': 0,  # 默认值可能需要根据实际情况调整，这里设为0
-            'croperY': 0,
-            'croperHeight': 512,
-            'croperWidth': 512,
-            'useCroper': 'false',
-            'sdMaskBlur': 5,
-            'sdStrength': 0.75,
-            'sdSteps': 50,
-            'sdGuidanceScale': 7.5,
-            'sdSampler': 'uni_pc',
-            'sdSeed': -1,
-            'sdMatchHistograms': 'false',
-            'sdScale': 1,
-            'cv2Radius': 5,
-            'cv2Flag': 'INPAINT_NS',
-            'paintByExampleSteps': 50,
-            'paintByExampleGuidanceScale': 7.5,
-            'paintByExampleSeed': -1,
-            'paintByExampleMaskBlur': 5,
-            'paintByExampleMatchHistograms': 'false',
-            'p2pSteps': 50,
-            'p2pImageGuidanceScale': 1.5,
-            'p2pGuidanceScale': 7.5,
-            'controlnet_conditioning_scale': 0.4,
-            'controlnet_method': 'control_v11p_sd15_canny',
-        }
-
-        # 使用用户传入的参数更新默认值
-        # 注意：所有值都需要是字符串类型，特别是布尔值要转为 'true'/'false'
-        for key, value in kwargs.items():
-            if isinstance(value, bool):
-                form_data[key] = str(value).lower()
-            else:
-                form_data[key] = str(value)
+        form_data = self.build_form_data(kwargs)
 
         try:
-            response = requests.post(self.inpaint_url, files=files, data=form_data)
+            response = self._post_with_retry(files, form_data)
             # 确认请求是否成功
             response.raise_for_status()
 
@@ -159,6 +251,69 @@ class LamaCleaner:
             print(f"网络请求错误: {req_err}")
             raise
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # 线程数为在途上限的两倍：一半等待推理结果时，另一半可以编码下一批请求
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight * 2,
+                                                    thread_name_prefix='lama-cleaner')
+            return self._executor
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        在客户端的后台线程中执行任务（通常是一串 inpaint / outpaint_extend 调用），返回 Future。
+        已提交未完成的任务达到上限时阻塞，避免调用方一次性解码过多图片。
+        """
+        future = self.submit_held(func, *args, **kwargs)
+        future.add_done_callback(lambda _: self.release_slot())
+        return future
+
+    def submit_held(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        与 submit 相同，但任务完成后不释放槽位，调用方取走结果后必须调用 release_slot()。
+
+        按提交顺序消费结果时使用：队首任务较慢时，其后已完成、尚未被取走的结果仍占用槽位，
+        内存中的结果数量不会超过上限。
+        """
+        self._pending.acquire()
+        try:
+            return self._get_executor().submit(func, *args, **kwargs)
+        except Exception:
+            self._pending.release()
+            raise
+
+    def release_slot(self):
+        """释放 submit_held 占用的槽位"""
+        self._pending.release()
+
+    def submit_inpaint(self, image: Image.Image, mask: Image.Image, **kwargs) -> Future:
+        return self.submit(self.inpaint, image, mask, **kwargs)
+
+    def submit_outpaint_extend(self, original_image: Image.Image, target_width: int, target_height: int,
+                               **kwargs) -> Future:
+        return self.submit(self.outpaint_extend, original_image, target_width, target_height, **kwargs)
+
+    def inpaint_batch(self, items: Iterable[Tuple[Image.Image, Image.Image]], **kwargs) -> List[Image.Image]:
+        """
+        批量修复，结果顺序与输入一致。
+
+        lama-cleaner 的 /inpaint 接口每次只接受一张图，这里把多张图流水线式地并发提交，
+        保持在途请求数为上限；任一张失败时抛出其异常。
+
+        :param items: (图像, 蒙版) 序列
+        :param kwargs: 传给每次 inpaint 的 API 参数
+        """
+        futures = [self.submit_inpaint(image, mask, **kwargs) for image, mask in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """关闭后台线程与连接池"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.session.close()
+
     @staticmethod
     def _center_crop(image: Image.Image, target_width: int, target_height: int) -> Image.Image:
         """
@@ -182,10 +337,7 @@ class LamaCleaner:
         bottom = min(orig_height, top + target_height)
 
         # 执行裁剪
-        cropped_image = image.crop((left, top, right, bottom))
-        print(f"执行居中裁剪：从 {orig_width}x{orig_height} 裁剪到 {cropped_image.size[0]}x{cropped_image.size[1]}")
-
-        return cropped_image
+        return image.crop((left, top, right, bottom))
 
     def outpaint_extend(self, original_image: Image.Image, target_width: int, target_height: int,
                         **kwargs) -> Image.Image:
@@ -252,43 +404,45 @@ class LamaCleaner:
 
         # 如果目标尺寸小于原图尺寸，进行居中裁剪
         if target_width < orig_width or target_height < orig_height:
-            print(f"目标尺寸 ({target_width}x{target_height}) 小于原图尺寸 ({orig_width}x{orig_height})，执行居中裁剪")
             return LamaCleaner._center_crop(original_image, target_width, target_height)
 
-        # 如果尺寸相同，直接返回原图
+        # 如果尺寸相同，直接返回原图副本
         if target_width == orig_width and target_height == orig_height:
-            print("目标尺寸与原图相同，无需处理。")
             return original_image.copy()
 
-        # 计算需要填充的边距
-        pad_width_total = target_width - orig_width
-        pad_height_total = target_height - orig_height
-
-        # 将边距分配到两侧，处理奇数边距的情况
-        pad_left = pad_width_total // 2
-        pad_right = pad_width_total - pad_left
-        pad_top = pad_height_total // 2
-        pad_bottom = pad_height_total - pad_top
+        # np.asarray 直接包装 PIL 导出的像素缓冲区（只读），不再额外复制一份
+        padded_array = mirror_pad_array(np.asarray(original_image), target_width, target_height)
 
-        # 将 PIL Image 转换为 numpy 数组以便进行高效处理
-        image_array = np.array(original_image)
-
-        # 定义填充规则。对于彩色图(3维)和灰度图(2维)分别处理
-        if image_array.ndim == 3:  # 彩色图 (height, width, channels)
-            pad_spec = ((pad_top, pad_bottom), (pad_left, pad_right), (0, 0))
-        elif image_array.ndim == 2:  # 灰度图 (height, width)
-            pad_spec = ((pad_top, pad_bottom), (pad_left, pad_right))
-        else:
-            raise ValueError(f"不支持的图像维度: {image_array.ndim}。只支持彩色和灰度图。")
+        # 将处理后的 numpy 数组转换回 PIL Image
+        return Image.fromarray(padded_array)
 
-        # 使用 numpy.pad 进行镜像填充 ('reflect' 模式)
-        # print(f"使用镜像延伸方式进行扩展：从 {orig_width}x{orig_height} 扩展到 {target_width}x{target_height}")
-        padded_array = np.pad(image_array, pad_width=pad_spec, mode='reflect')
 
-        # 将处理后的 numpy 数组转换回 PIL Image
-        result_image = Image.fromarray(padded_array)
+def mirror_pad_array(image_array: np.ndarray, target_width: int, target_height: int) -> np.ndarray:
+    """
+    将 (高, 宽[, 通道]) 数组居中镜像填充到目标尺寸（'reflect' 模式，不重复边缘像素）。
+    奇数边距时右侧/下侧多 1 像素。输出数组是唯一的整图分配。
 
-        return result_image
+    :param image_array: 彩色 (H, W, C) 或灰度 (H, W) 数组，尺寸不大于目标尺寸
+    :return: 填充后的新数组
+    """
+    orig_height, orig_width = image_array.shape[:2]
+    pad_width_total = target_width - orig_width
+    pad_height_total = target_height - orig_height
+    if pad_width_total < 0 or pad_height_total < 0:
+        raise ValueError(f"目标尺寸 ({target_width}x{target_height}) 小于原图尺寸 ({orig_width}x{orig_height})")
+
+    # 将边距分配到两侧，处理奇数边距的情况
+    pad_left = pad_width_total // 2
+    pad_top = pad_height_total // 2
+    pad_spec = [(pad_top, pad_height_total - pad_top), (pad_left, pad_width_total - pad_left)]
+
+    # 定义填充规则。对于彩色图(3维)和灰度图(2维)分别处理
+    if image_array.ndim == 3:
+        pad_spec.append((0, 0))
+    elif image_array.ndim != 2:
+        raise ValueError(f"不支持的图像维度: {image_array.ndim}。只支持彩色和灰度图。")
+
+    return np.pad(image_array, pad_width=pad_spec, mode='reflect')
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ export_helper - 高级导出功能模块
 主要组件:
 - main.py: 导出助手主程序入口
 - LamaCleaner.py: AI出血和图像清理功能
+- bleed_cache.py: LaMa 出血结果磁盘缓存
 
 特性:
 - AI驱动的图像出血处理
@@ -23,7 +24,9 @@ __author__ = "Arkham Horror DIY Team"
 
 # 导出主要组件以便外部访问
 from .LamaCleaner import LamaCleaner
+from .bleed_cache import BleedCache
 
 __all__ = [
-    'LamaCleaner'
+    'LamaCleaner',
+    'BleedCache'
 ]
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+出血结果磁盘缓存
+
+以 (输入像素摘要, 操作, 目标尺寸, 出血模型, LaMa 参数) 为键，把 lama-cleaner 的扩图/修复结果
+保存为 PNG。修改错字后重新导出内容包、或以不同 DPI 导出时，底图未变化的卡牌不再请求 LaMa。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+# 默认容量上限，超出后按最近使用时间淘汰
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# 每写入多少个条目检查一次容量
+PRUNE_INTERVAL = 32
+
+
+def image_digest(image: Image.Image) -> str:
+    """像素摘要（包含模式与尺寸）"""
+    digest = hashlib.sha256(f'{image.mode}:{image.size[0]}x{image.size[1]}:'.encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class BleedCache:
+    """出血结果缓存（线程安全，写入使用临时文件 + os.replace）"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(image: Image.Image, operation: str, target_size, model: str,
+                 params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        :param operation: 操作名（如 outpaint、corner），同一输入不同操作互不影响
+        :param target_size: 目标尺寸 (宽, 高)
+        :param params: 影响结果的其他参数（LaMa 表单参数等）
+        """
+        meta = json.dumps({
+            'operation': operation,
+            'target': list(target_size),
+            'model': model,
+            'params': params or {},
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(f'{image_digest(image)}|{meta}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.png')
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        path = self._path(key)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                result = img.copy()
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # 更新 mtime 作为最近使用时间
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, image: Image.Image):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-', suffix='.png')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, format='PNG')
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"写入出血缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._puts_since_prune += 1
+            should_prune = self._puts_since_prune >= PRUNE_INTERVAL
+            if should_prune:
+                self._puts_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """超出容量时删除最久未使用的条目，返回删除数量"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.png') or name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, path))
+                total += stat_result.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -1,10 +1,50 @@
 import os
 import glob
+import contextlib
+import contextvars
+import logging
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
 from PIL import Image, ImageDraw
 from LamaCleaner import LamaCleaner
 import numpy as np
 
+# 逐图处理日志：多张图片在后台线程中并发处理，每条日志带上图片标识，避免输出交错后无法分辨
+logger = logging.getLogger('export_helper.batch')
+_current_image = contextvars.ContextVar('current_image', default='-')
+
+
+class _ImageIdFilter(logging.Filter):
+    """为日志记录补充当前处理的图片标识（image_id）"""
+
+    def filter(self, record):
+        record.image_id = _current_image.get()
+        return True
+
+
+logger.addFilter(_ImageIdFilter())
+
+
+@contextlib.contextmanager
+def image_log_context(image_id):
+    """在该上下文内（当前线程）输出的日志都带有 image_id"""
+    token = _current_image.set(image_id)
+    try:
+        yield
+    finally:
+        _current_image.reset(token)
+
+
+def configure_logging(level=logging.INFO):
+    """命令行运行时输出逐图日志：时间 [图片标识] 消息"""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s [%(image_id)s] %(message)s', '%H:%M:%S'))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
 
 def get_image_files(directory):
     """
@@ -51,7 +91,7 @@ def preprocess_image_for_target_size(image, target_width, target_height):
     :return: (processed_image, needs_outpaint, crop_info)
     """
     current_width, current_height = image.size
-    print(f"  预处理分析: 当前尺寸 {current_width}x{current_height} -> 目标尺寸 {target_width}x{target_height}")
+    logger.info(f"预处理分析: 当前尺寸 {current_width}x{current_height} -> 目标尺寸 {target_width}x{target_height}")
 
     # 检查是否需要裁剪
     needs_crop_width = current_width > target_width
@@ -82,17 +122,17 @@ def preprocess_image_for_target_size(image, target_width, target_height):
         bottom = top + crop_height
 
         processed_image = processed_image.crop((left, top, right, bottom))
-        print(f"  执行居中裁剪: {current_width}x{current_height} -> {crop_width}x{crop_height}")
-        print(f"  裁剪区域: left={left}, top={top}, right={right}, bottom={bottom}")
+        logger.info(f"执行居中裁剪: {current_width}x{current_height} -> {crop_width}x{crop_height}")
+        logger.info(f"裁剪区域: left={left}, top={top}, right={right}, bottom={bottom}")
 
     # 检查是否还需要出血
     final_width, final_height = processed_image.size
     needs_outpaint = (final_width < target_width) or (final_height < target_height)
 
     if needs_outpaint:
-        print(f"  仍需出血: {final_width}x{final_height} -> {target_width}x{target_height}")
+        logger.info(f"仍需出血: {final_width}x{final_height} -> {target_width}x{target_height}")
     else:
-        print(f"  无需出血: 已达到目标尺寸 {final_width}x{final_height}")
+        logger.info(f"无需出血: 已达到目标尺寸 {final_width}x{final_height}")
 
     return processed_image, needs_outpaint, crop_info
 
@@ -121,7 +161,7 @@ def create_corner_mask(image_size, original_size, corner='top-left', scale_facto
     top_bleed = y_offset  # 顶部出血高度
     bottom_bleed = target_height - (y_offset + orig_height)  # 底部出血高度
 
-    print(f"  出血区域分析: 左={left_bleed}px, 右={right_bleed}px, 顶={top_bleed}px, 底={bottom_bleed}px")
+    logger.info(f"出血区域分析: 左={left_bleed}px, 右={right_bleed}px, 顶={top_bleed}px, 底={bottom_bleed}px")
 
     # 创建黑色背景蒙版 (黑色=不修复)
     mask = Image.new('L', image_size, color=0)
@@ -153,8 +193,8 @@ def create_corner_mask(image_size, original_size, corner='top-left', scale_facto
             fill=255
         )
 
-        print(
-            f"  创建左上角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x, 圆角:{corner_radius}px)")
+        logger.info(
+            f"创建左上角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x, 圆角:{corner_radius}px)")
 
     elif corner == 'top-right' and right_bleed > 0 and top_bleed > 0:
         # 右上角
@@ -180,8 +220,8 @@ def create_corner_mask(image_size, original_size, corner='top-left', scale_facto
             fill=255
         )
 
-        print(
-            f"  创建右上角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
+        logger.info(
+            f"创建右上角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
 
     elif corner == 'bottom-left' and left_bleed > 0 and bottom_bleed > 0:
         # 左下角
@@ -207,8 +247,8 @@ def create_corner_mask(image_size, original_size, corner='top-left', scale_facto
             fill=255
         )
 
-        print(
-            f"  创建左下角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
+        logger.info(
+            f"创建左下角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
 
     elif corner == 'bottom-right' and right_bleed > 0 and bottom_bleed > 0:
         # 右下角
@@ -235,11 +275,11 @@ def create_corner_mask(image_size, original_size, corner='top-left', scale_facto
             fill=255
         )
 
-        print(
-            f"  创建右下角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
+        logger.info(
+            f"创建右下角蒙版: {mask_width}x{mask_height} (基础:{base_mask_width}x{base_mask_height}, 扩大倍数:{scale_factor}x)")
 
     else:
-        print(f"  跳过 {corner}: 该角落无出血区域")
+        logger.info(f"跳过 {corner}: 该角落无出血区域")
 
     return mask
 
@@ -259,7 +299,7 @@ def secondary_inpaint_optimization(cleaner, outpainted_image, original_size, cor
     current_image = outpainted_image.copy()
     image_size = current_image.size
 
-    print(f"  开始二次修复优化，处理角落: {corners_to_fix}, 扩大倍数: {scale_factor}x")
+    logger.info(f"开始二次修复优化，处理角落: {corners_to_fix}, 扩大倍数: {scale_factor}x")
 
     for corner in corners_to_fix:
         try:
@@ -276,24 +316,24 @@ def secondary_inpaint_optimization(cleaner, outpainted_image, original_size, cor
             white_pixels = np.sum(mask_array > 128)  # 计算白色像素数量
 
             if white_pixels == 0:
-                print(f"  跳过 {corner}: 无出血区域需要修复")
+                logger.info(f"跳过 {corner}: 无出血区域需要修复")
                 continue
 
-            print(f"  {corner} 蒙版有效像素: {white_pixels} 个")
+            logger.info(f"{corner} 蒙版有效像素: {white_pixels} 个")
 
             # 保存调试蒙版（可选，用于调试）
             # corner_mask.save(f"debug_mask_{corner}.png")
 
             # 使用lama-cleaner进行二次修复
-            print(f"  正在修复 {corner} 角落...")
+            logger.info(f"正在修复 {corner} 角落...")
             current_image = cleaner.inpaint(
                 image=current_image,
                 mask=corner_mask
             )
-            print(f"  ✓ {corner} 角落修复完成")
+            logger.info(f"✓ {corner} 角落修复完成")
 
         except Exception as e:
-            print(f"  ❌ {corner} 角落修复失败: {e}")
+            logger.warning(f"❌ {corner} 角落修复失败: {e}")
             continue
 
     return current_image
@@ -314,7 +354,7 @@ def ensure_exact_target_size(image, target_width, target_height):
     if current_width == target_width and current_height == target_height:
         return image
 
-    print(f"  最终尺寸调整: {current_width}x{current_height} -> {target_width}x{target_height}")
+    logger.info(f"最终尺寸调整: {current_width}x{current_height} -> {target_width}x{target_height}")
 
     # 如果尺寸不匹配，创建目标尺寸的画布并居中放置
     result_image = Image.new('RGB', (target_width, target_height), color='white')
@@ -344,6 +384,112 @@ def ensure_exact_target_size(image, target_width, target_height):
     return result_image
 
 
+def process_single_image(cleaner, image_path, target_width, target_height, use_lama,
+                         enable_secondary_fix, corners_to_fix, scale_factor, image_id=None):
+    """
+    处理单张图片：预处理、出血、二次修复、尺寸校正
+
+    :param image_id: 日志中的图片标识，默认为文件名
+    :return: (processed_image, method_used, processing_steps)
+    """
+    with image_log_context(image_id or os.path.basename(image_path)):
+        return _process_single_image(cleaner, image_path, target_width, target_height, use_lama,
+                                     enable_secondary_fix, corners_to_fix, scale_factor)
+
+
+def _process_single_image(cleaner, image_path, target_width, target_height, use_lama,
+                          enable_secondary_fix, corners_to_fix, scale_factor):
+    # 加载原始图片并复制到内存
+    with Image.open(image_path) as img:
+        original_image = img.copy()
+    original_size = original_image.size
+    logger.info(f"原始尺寸: {original_size[0]}x{original_size[1]}")
+
+    # 步骤0：预处理 - 处理裁剪和检查是否需要出血
+    preprocessed_image, needs_outpaint, crop_info = preprocess_image_for_target_size(
+        original_image, target_width, target_height)
+
+    # 更新处理后的尺寸信息
+    processed_size = preprocessed_image.size
+    processing_steps = []
+
+    if crop_info['cropped_width'] or crop_info['cropped_height']:
+        processing_steps.append("crop")
+
+    # 步骤1：如果需要出血，根据服务状态选择处理方法
+    if needs_outpaint:
+        processing_steps.append("outpaint")
+
+        if use_lama:
+            # 使用lama-cleaner进行出血
+            processed_image = cleaner.outpaint_extend(
+                original_image=preprocessed_image,
+                target_width=target_width,
+                target_height=target_height,
+            )
+            method_used = "lama"
+        else:
+            # 使用镜像延伸方法
+            processed_image = cleaner.outpaint_mirror_extend(
+                original_image=preprocessed_image,
+                target_width=target_width,
+                target_height=target_height
+            )
+            method_used = "mirror"
+
+        logger.info(f"✓ 出血处理完成，方法: {method_used}")
+    else:
+        # 不需要出血，直接使用预处理的图片
+        processed_image = preprocessed_image
+        method_used = "direct"
+        logger.info(f"✓ 无需出血，直接使用预处理结果")
+
+    # 步骤2：如果启用二次修复且使用lama方法且进行了出血，进行角落优化
+    if enable_secondary_fix and use_lama and needs_outpaint:
+        processing_steps.append("optimize")
+        logger.info(f"开始二次修复优化...")
+        processed_image = secondary_inpaint_optimization(
+            cleaner=cleaner,
+            outpainted_image=processed_image,
+            original_size=processed_size,  # 使用预处理后的尺寸作为原始尺寸
+            corners_to_fix=corners_to_fix,
+            scale_factor=scale_factor
+        )
+        method_used += "_optimized"
+        logger.info(f"✓ 二次修复优化完成")
+
+    # 步骤3：确保最终尺寸精确匹配目标
+    processed_image = ensure_exact_target_size(processed_image, target_width, target_height)
+
+    return processed_image, method_used, processing_steps
+
+
+def save_processed_image(processed_image, image_path, output_dir, method_used, processing_steps,
+                         target_width, target_height):
+    """按处理步骤生成文件名并保存图片"""
+    # 生成输出文件名
+    input_filename = Path(image_path).stem
+    input_extension = Path(image_path).suffix.lower()
+
+    # 如果原始文件不是PNG，统一输出为PNG以保证质量
+    if input_extension not in ['.png']:
+        output_extension = '.png'
+    else:
+        output_extension = input_extension
+
+    # 添加处理步骤信息到文件名
+    steps_info = "_".join(processing_steps) if processing_steps else "nochange"
+    output_filename = f"{input_filename}_{method_used}_{steps_info}_{target_width}x{target_height}{output_extension}"
+    output_path = os.path.join(output_dir, output_filename)
+
+    # 保存处理后的图片
+    processed_image.save(output_path, quality=95, optimize=True)
+
+    logger.info(f"✓ 成功处理并保存到: {output_filename}")
+    logger.info(f"最终尺寸: {processed_image.size[0]}x{processed_image.size[1]}")
+    logger.info(f"处理步骤: {' -> '.join(processing_steps) if processing_steps else '无需处理'}")
+
+
 def process_images_batch(input_directory, target_width, target_height, lama_cleaner_url="http://localhost:8080",
                          enable_secondary_fix=True, corners_to_fix=['top-left'], scale_factor=1.5):
     """
@@ -403,102 +549,56 @@ def process_images_batch(input_directory, target_width, target_height, lama_clea
     print(f"✓ 输出目录: {output_dir}")
 
     # 5. 批量处理图片
+    # 使用 lama-cleaner 时，出血与二次修复在客户端后台线程中并发执行（在途请求数受客户端限制），
+    # 主线程按顺序取回结果并保存，GPU 推理与图片解码、编码重叠。
+    # 任务槽位在主线程取走结果后才释放：队首任务较慢时，其后已完成的结果也计入上限，不会在内存中堆积
     success_count = 0
     error_count = 0
+    total = len(image_files)
+    pending = deque()
+
+    def collect(entry):
+        nonlocal success_count, error_count
+        image_id, image_path, future, holds_slot = entry
+        with image_log_context(image_id):
+            try:
+                processed_image, method_used, processing_steps = future.result()
+                save_processed_image(processed_image, image_path, output_dir, method_used, processing_steps,
+                                     target_width, target_height)
+                success_count += 1
+            except Exception as e:
+                logger.error(f"❌ 处理失败: {e}")
+                error_count += 1
+            finally:
+                if holds_slot:
+                    cleaner.release_slot()
 
-    for i, image_path in enumerate(image_files, 1):
-        try:
-            print(f"\n[{i}/{len(image_files)}] 处理: {os.path.basename(image_path)}")
-
-            # 加载原始图片并复制到内存
-            with Image.open(image_path) as img:
-                original_image = img.copy()
-            original_size = original_image.size
-            print(f"  原始尺寸: {original_size[0]}x{original_size[1]}")
-
-            # 步骤0：预处理 - 处理裁剪和检查是否需要出血
-            preprocessed_image, needs_outpaint, crop_info = preprocess_image_for_target_size(
-                original_image, target_width, target_height)
-
-            # 更新处理后的尺寸信息
-            processed_size = preprocessed_image.size
-            processing_steps = []
-
-            if crop_info['cropped_width'] or crop_info['cropped_height']:
-                processing_steps.append("crop")
-
-            # 步骤1：如果需要出血，根据服务状态选择处理方法
-            if needs_outpaint:
-                processing_steps.append("outpaint")
-
-                if use_lama:
-                    # 使用lama-cleaner进行出血
-                    processed_image = cleaner.outpaint_extend(
-                        original_image=preprocessed_image,
-                        target_width=target_width,
-                        target_height=target_height,
-                    )
-                    method_used = "lama"
-                else:
-                    # 使用镜像延伸方法
-                    processed_image = cleaner.outpaint_mirror_extend(
-                        original_image=preprocessed_image,
-                        target_width=target_width,
-                        target_height=target_height
-                    )
-                    method_used = "mirror"
-
-                print(f"  ✓ 出血处理完成，方法: {method_used}")
-            else:
-                # 不需要出血，直接使用预处理的图片
-                processed_image = preprocessed_image
-                method_used = "direct"
-                print(f"  ✓ 无需出血，直接使用预处理结果")
-
-            # 步骤2：如果启用二次修复且使用lama方法且进行了出血，进行角落优化
-            if enable_secondary_fix and use_lama and needs_outpaint:
-                processing_steps.append("optimize")
-                print(f"  开始二次修复优化...")
-                processed_image = secondary_inpaint_optimization(
-                    cleaner=cleaner,
-                    outpainted_image=processed_image,
-                    original_size=processed_size,  # 使用预处理后的尺寸作为原始尺寸
-                    corners_to_fix=corners_to_fix,
-                    scale_factor=scale_factor
-                )
-                method_used += "_optimized"
-                print(f"  ✓ 二次修复优化完成")
-
-            # 步骤3：确保最终尺寸精确匹配目标
-            processed_image = ensure_exact_target_size(processed_image, target_width, target_height)
-
-            # 生成输出文件名
-            input_filename = Path(image_path).stem
-            input_extension = Path(image_path).suffix.lower()
-
-            # 如果原始文件不是PNG，统一输出为PNG以保证质量
-            if input_extension not in ['.png']:
-                output_extension = '.png'
+    try:
+        for i, image_path in enumerate(image_files, 1):
+            image_id = f"{i}/{total} {os.path.basename(image_path)}"
+            with image_log_context(image_id):
+                logger.info("开始处理")
+            job_args = (cleaner, image_path, target_width, target_height, use_lama,
+                        enable_secondary_fix, corners_to_fix, scale_factor, image_id)
+            if use_lama:
+                # 槽位用尽时 submit_held 阻塞，直到主线程取走队首结果
+                pending.append((image_id, image_path, cleaner.submit_held(process_single_image, *job_args), True))
             else:
-                output_extension = input_extension
-
-            # 添加处理步骤信息到文件名
-            steps_info = "_".join(processing_steps) if processing_steps else "nochange"
-            output_filename = f"{input_filename}_{method_used}_{steps_info}_{target_width}x{target_height}{output_extension}"
-            output_path = os.path.join(output_dir, output_filename)
-
-            # 保存处理后的图片
-            processed_image.save(output_path, quality=95, optimize=True)
-
-            print(f"  ✓ 成功处理并保存到: {output_filename}")
-            print(f"  最终尺寸: {processed_image.size[0]}x{processed_image.size[1]}")
-            print(f"  处理步骤: {' -> '.join(processing_steps) if processing_steps else '无需处理'}")
-            success_count += 1
-
-        except Exception as e:
-            print(f"  ❌ 处理失败: {e}")
-            error_count += 1
-            continue
+                future = Future()
+                try:
+                    future.set_result(process_single_image(*job_args))
+                except Exception as e:
+                    future.set_exception(e)
+                pending.append((image_id, image_path, future, False))
+
+            # 按顺序保存已完成的结果
+            while pending and pending[0][2].done():
+                collect(pending.popleft())
+
+        while pending:
+            collect(pending.popleft())
+    finally:
+        cleaner.close()
 
     # 6. 输出处理结果统计
     print(f"\n=== 批量处理完成 ===")
@@ -532,6 +632,8 @@ def main():
 
     # ===========================================
 
+    configure_logging()
+
     # 检查输入目录是否存在
     if not os.path.exists(INPUT_DIRECTORY):
         print(f"❌ 输入目录不存在: {INPUT_DIRECTORY}")
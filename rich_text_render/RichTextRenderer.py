@@ -9,6 +9,7 @@ from typing import List, Optional, TYPE_CHECKING
 from PIL import Image, ImageDraw, ImageColor
 
 from ResourceManager import FontManager, ImageManager
+from bin.render_metrics import render_metrics
 from enhanced_draw import EnhancedDraw
 
 if TYPE_CHECKING:
@@ -612,6 +613,7 @@ class RichTextRenderer:
         low = min_font_size
         high = options.font_size
         best_vbox = None
+        trials = 0
 
         # print(f"开始二分查找最佳字体大小，范围: [{low}, {high}], 行距倍率: {self.line_spacing_multiplier}")
 
@@ -621,6 +623,7 @@ class RichTextRenderer:
                 break
 
             # 尝试使用当前字体大小进行渲染模拟
+            trials += 1
             fits, vbox_instance = self._try_render_with_font_size(
                 text, polygon_vertices, padding, options, mid_size
             )
@@ -644,6 +647,7 @@ class RichTextRenderer:
         else:
             print("查找结束。未找到任何可行的字体大小。")
 
+        render_metrics.observe_count('text_fit_trials', trials)
         return best_vbox
 
     # ==================== 修改 _try_render_with_font_size 方法 ====================
@@ -1026,6 +1030,7 @@ class RichTextRenderer:
         return True, virtual_text_box
 
     # ==================== 修改 draw_complex_text 方法 ====================
+    @render_metrics.timed('text')
     def draw_complex_text(self, text: str, polygon_vertices: List[Tuple[int, int]],
                           padding: int, options: DrawOptions,
                           draw_debug_frame: bool = False,
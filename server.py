@@ -9,6 +9,7 @@ import time
 import traceback
 from typing import Optional
 from functools import wraps
+from urllib.parse import quote
 
 from PIL import Image
 from flask import Flask, jsonify, request, send_from_directory, Response
@@ -131,6 +132,8 @@ def _handle_directory_selection(selected_directory: Optional[str]):
         quick_start.add_recent_directory(selected_directory)
         # 创建工作空间实例
         try:
+            if current_workspace:
+                current_workspace.stop_tree_watcher()
             current_workspace = WorkspaceManager(selected_directory)
             logger_manager.info(f"工作空间创建成功: {selected_directory}")
             return jsonify(create_response(
@@ -413,6 +416,8 @@ def open_workspace():
         pass
 
     # 创建工作空间实例
+    if current_workspace:
+        current_workspace.stop_tree_watcher()
     current_workspace = WorkspaceManager(directory)
 
     # 添加到最近记录
@@ -446,7 +451,14 @@ def get_file_tree():
         from bin.workspace_manager import WorkspaceScanner
 
         # 创建扫描器并快速返回目录结构(不含card_type)
-        scanner = WorkspaceScanner(current_workspace.workspace_path)
+        scanner = WorkspaceScanner(current_workspace.workspace_path, card_index=current_workspace.get_card_index(),
+                                   cache_manager=current_workspace.cache_manager)
+        tree_version = None
+        if not include_hidden:
+            # 使用监听维护的内存文件树，避免每次请求都遍历磁盘（先取版本号，之后的变化可通过增量接口获取）
+            tree_model = current_workspace.get_tree_model()
+            tree_version = tree_model.version
+            scanner.seed_walk(tree_model.walk_result())
         # 根据模式生成结构
         structure = scanner.scan_structure(include_hidden, include_card_type)
 
@@ -455,7 +467,7 @@ def get_file_tree():
             workspace_name = os.path.basename(current_workspace.workspace_path) or current_workspace.workspace_path
             file_tree = {
                 'label': workspace_name,
-                'key': f"workspace_{int(time.time() * 1000000)}",
+                'key': 'workspace',
                 'type': 'workspace',
                 'path': '.',
                 'children': structure
@@ -466,6 +478,7 @@ def get_file_tree():
                 data={
                     "fileTree": file_tree,
                     "status": "snapshot",
+                    "version": tree_version,
                     "timestamp": time.time()
                 }
             ))
@@ -477,7 +490,7 @@ def get_file_tree():
         workspace_name = os.path.basename(current_workspace.workspace_path) or current_workspace.workspace_path
         file_tree = {
             'label': workspace_name,
-            'key': f"workspace_{int(time.time() * 1000000)}",
+            'key': 'workspace',
             'type': 'workspace',
             'path': '.',
             'children': structure
@@ -489,6 +502,7 @@ def get_file_tree():
                 "fileTree": file_tree,
                 "scanId": scan_id,
                 "status": "scanning",
+                "version": tree_version,
                 "timestamp": time.time()
             }
         ))
@@ -501,24 +515,147 @@ def get_file_tree():
         ))
 
 
-@app.route('/api/workspace/scan-progress/<scan_id>', methods=['GET'])
+@app.route('/api/file-tree/changes', methods=['GET'])
 @handle_api_error
-def get_scan_progress(scan_id):
-    """获取扫描进度(轮询接口)"""
-    global scan_tracker
+def get_file_tree_changes():
+    """获取自指定版本以来的文件树变化(新增/删除/修改的节点)"""
+    error_response = check_workspace()
+    if error_response:
+        return error_response
+
+    try:
+        since = int(request.args.get('since', ''))
+    except ValueError:
+        return jsonify(create_response(
+            code=400,
+            msg="缺少或无效的参数: since"
+        ))
+
+    tree_model = current_workspace.get_tree_model()
+    changes = tree_model.changes_since(since)
+
+    # 版本过旧（变更日志已截断）时返回完整文件树
+    if changes['reset']:
+        workspace_name = os.path.basename(current_workspace.workspace_path) or current_workspace.workspace_path
+        changes['fileTree'] = {
+            'label': workspace_name,
+            'key': 'workspace',
+            'type': 'workspace',
+            'path': '.',
+            'children': tree_model.get_tree()
+        }
+
+    changes['timestamp'] = time.time()
+    return jsonify(create_response(
+        msg="获取文件树变化成功",
+        data=changes
+    ))
+
 
+@app.route('/api/file-tree/children', methods=['GET'])
+@handle_api_error
+def get_file_tree_children():
+    """懒加载文件树: 分页获取某个目录的子项(只遍历该目录，耗时与工作空间大小无关)"""
     error_response = check_workspace()
     if error_response:
         return error_response
 
-    progress = scan_tracker.get_progress(scan_id)
+    try:
+        offset = int(request.args.get('offset', '0'))
+        limit = int(request.args.get('limit', '200'))
+        depth = int(request.args.get('depth', '1'))
+    except ValueError:
+        return jsonify(create_response(
+            code=400,
+            msg="无效的参数: offset、limit 或 depth"
+        ))
+    limit = max(1, min(limit, 1000))
+    depth = max(1, min(depth, 3))
+
+    dir_path = request.args.get('path', '.')
+    include_hidden = request.args.get('include_hidden', 'false').lower() == 'true'
 
-    if 'error' in progress:
+    from bin.workspace_manager import WorkspaceScanner
+
+    scanner = WorkspaceScanner(current_workspace.workspace_path, cache_manager=current_workspace.cache_manager)
+    result = scanner.list_directory(dir_path, include_hidden, offset=offset, limit=limit, depth=depth)
+    if result is None:
         return jsonify(create_response(
             code=404,
-            msg=f"扫描任务未找到: {scan_id}"
+            msg=f"目录不存在: {dir_path}"
         ))
 
+    # 文件树模型已加载时附带版本号，之后可通过增量接口获取变化
+    tree_model = getattr(current_workspace, '_tree_model', None)
+    result['version'] = tree_model.version if tree_model is not None else None
+    result['timestamp'] = time.time()
+    return jsonify(create_response(
+        msg="获取目录子项成功",
+        data=result
+    ))
+
+
+@app.route('/api/cards', methods=['GET'])
+@handle_api_error
+def query_cards():
+    """按元数据查询卡牌(分页，基于卡牌索引，不读取卡牌文件)"""
+    error_response = check_workspace()
+    if error_response:
+        return error_response
+
+    from bin.card_index import FILTER_COLUMNS
+
+    # 精确匹配字段，可重复传参表示匹配任一值，如 ?encounter_group=A&encounter_group=B
+    filters = {}
+    for key in FILTER_COLUMNS:
+        values = request.args.getlist(key)
+        if values:
+            filters[key] = values
+
+    has_back = request.args.get('has_back')
+    if has_back is not None:
+        has_back = has_back.lower() == 'true'
+
+    try:
+        offset = int(request.args.get('offset', '0'))
+        limit = int(request.args.get('limit', '100'))
+    except ValueError:
+        return jsonify(create_response(
+            code=400,
+            msg="无效的分页参数: offset 或 limit"
+        ))
+    limit = max(1, min(limit, 1000))
+
+    if request.args.get('refresh', 'false').lower() == 'true':
+        current_workspace.refresh_card_index()
+
+    result = current_workspace.query_cards(
+        filters=filters,
+        search=request.args.get('q'),
+        path_prefix=request.args.get('path'),
+        has_back=has_back,
+        sort=request.args.get('sort', 'path'),
+        descending=request.args.get('order', 'asc').lower() == 'desc',
+        offset=offset,
+        limit=limit
+    )
+
+    return jsonify(create_response(
+        msg="查询卡牌成功",
+        data=result
+    ))
+
+
+@app.route('/api/workspace/scan-progress/<scan_id>', methods=['GET'])
+@handle_api_error
+def get_scan_progress(scan_id):
+    """获取扫描进度(轮询接口)"""
+    global scan_tracker
+
+    error_response = check_workspace()
+    if error_response:
+        return error_response
+
     # 支持自定义返回增量条目数量，默认 200，最大 1000
     try:
         limit = int(request.args.get('limit', '200'))
@@ -526,12 +663,29 @@ def get_scan_progress(scan_id):
         limit = 200
     limit = max(1, min(limit, 1000))
 
+    # cursor 为上次返回的 next_cursor，指定时只返回此后新产生的结果；不指定时返回最近 limit 条
+    cursor = request.args.get('cursor')
+    try:
+        cursor = int(cursor) if cursor is not None else None
+    except ValueError:
+        cursor = 0
+
+    progress = scan_tracker.get_progress(scan_id, cursor=cursor, limit=limit)
+
+    if 'error' in progress:
+        return jsonify(create_response(
+            code=404,
+            msg=f"扫描任务未找到: {scan_id}"
+        ))
+
     return jsonify(create_response(
         msg="获取扫描进度成功",
         data={
             "status": progress.get('status'),
             "progress": progress.get('progress'),
-            "data": progress.get('data', [])[-limit:],
+            "data": progress.get('data', []),
+            "next_cursor": progress.get('next_cursor'),
+            "has_more": progress.get('has_more', False),
             "timestamp": time.time()
         }
     ))
@@ -592,11 +746,16 @@ def refresh_cache():
             pass
 
         # 创建扫描器并清除缓存
-        scanner = WorkspaceScanner(current_workspace.workspace_path)
+        scanner = WorkspaceScanner(current_workspace.workspace_path, card_index=current_workspace.get_card_index(),
+                                   cache_manager=current_workspace.cache_manager)
         scanner.cache_manager.clear_cache()
         scanner.cache_manager.save_cache()
 
-        # 快速返回目录结构
+        # 与磁盘完整比对一次内存文件树，并复用其结果返回目录结构
+        tree_model = current_workspace.get_tree_model()
+        tree_model.rescan()
+        tree_version = tree_model.version
+        scanner.seed_walk(tree_model.walk_result())
         structure = scanner.scan_structure(include_hidden=False)
 
         # 启动新的扫描任务
@@ -606,7 +765,7 @@ def refresh_cache():
         workspace_name = os.path.basename(current_workspace.workspace_path) or current_workspace.workspace_path
         file_tree = {
             'label': workspace_name,
-            'key': f"workspace_{int(time.time() * 1000000)}",
+            'key': 'workspace',
             'type': 'workspace',
             'path': '.',
             'children': structure
@@ -618,6 +777,7 @@ def refresh_cache():
                 "fileTree": file_tree,
                 "scanId": scan_id,
                 "status": "refreshing",
+                "version": tree_version,
                 "timestamp": time.time()
             }
         ))
@@ -779,7 +939,8 @@ def get_file_content():
 
     logger_manager.debug(f"获取文件内容: {file_path}")
 
-    content = current_workspace.get_file_content(file_path)
+    # 编辑器需要完整的 data URL，插画引用在此还原
+    content = current_workspace.get_file_content(file_path, inline_art=True)
 
     if content is not None:
         return jsonify(create_response(
@@ -827,6 +988,38 @@ def save_file_content():
         )), 500
 
 
+@app.route('/api/workspace/card-art-storage', methods=['POST'])
+@handle_api_error
+def set_card_art_storage():
+    """切换卡牌插画存储方式(blob: 内容寻址存储; inline: 内嵌base64)，并可迁移已有卡牌"""
+    error_response = check_workspace()
+    if error_response:
+        return error_response
+
+    data = request.get_json() or {}
+    mode = data.get('mode')
+    if mode not in ('blob', 'inline'):
+        return jsonify(create_response(
+            code=400,
+            msg="mode 只支持 blob 或 inline"
+        )), 400
+
+    if not current_workspace.save_config({'card_art_storage': mode}):
+        return jsonify(create_response(
+            code=500,
+            msg="保存配置失败"
+        )), 500
+
+    result = {'scanned': 0, 'migrated': 0, 'failed': 0}
+    if data.get('migrate', True):
+        result = current_workspace.migrate_card_art_storage(mode)
+
+    return jsonify(create_response(
+        msg="插画存储方式已更新",
+        data={"mode": mode, **result}
+    ))
+
+
 @app.route('/api/image-content', methods=['GET'])
 @handle_api_error
 def get_image_content():
@@ -907,6 +1100,38 @@ def get_status():
     ))
 
 
+@app.route('/api/metrics', methods=['GET'])
+@handle_api_error
+def get_render_metrics():
+    """获取渲染/导出阶段耗时统计（?format=prometheus 返回 Prometheus 文本格式）"""
+    from bin.render_metrics import render_metrics
+
+    if request.args.get('format', 'json') == 'prometheus':
+        return Response(render_metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    return jsonify(create_response(
+        msg="获取渲染统计成功",
+        data=render_metrics.snapshot()
+    ))
+
+
+@app.route('/api/metrics', methods=['POST'])
+@handle_api_error
+def update_render_metrics():
+    """开启/关闭渲染统计或清空已有数据"""
+    from bin.render_metrics import render_metrics
+
+    data = request.get_json() or {}
+    if 'enabled' in data:
+        render_metrics.set_enabled(bool(data['enabled']))
+    if data.get('reset', False):
+        render_metrics.reset()
+    logger_manager.info(f"渲染统计已{'开启' if render_metrics.enabled else '关闭'}")
+    return jsonify(create_response(
+        msg="更新渲染统计设置成功",
+        data={"enabled": render_metrics.enabled}
+    ))
+
+
 # ================= 卡牌生成相关接口 =================
 
 @app.route('/api/generate-card', methods=['POST'])
@@ -1004,11 +1229,13 @@ def generate_card():
     # 将图片转换为base64返回
     import io
     import base64
+    from bin.render_metrics import render_metrics
 
-    img_buffer = io.BytesIO()
-    card_image = card_image.convert('RGB')
-    card_image.save(img_buffer, format='JPEG', quality=95)
-    img_str = base64.b64encode(img_buffer.getvalue()).decode()
+    with render_metrics.span('encode', card_type=str(json_data.get('type', ''))):
+        img_buffer = io.BytesIO()
+        card_image = card_image.convert('RGB')
+        card_image.save(img_buffer, format='JPEG', quality=95)
+        img_str = base64.b64encode(img_buffer.getvalue()).decode()
 
     # 构建响应数据
     response_data = {
@@ -1018,10 +1245,11 @@ def generate_card():
 
     # 如果有背面图片，也转换为base64并添加到响应中
     if back_image is not None:
-        back_buffer = io.BytesIO()
-        back_image = back_image.convert('RGB')
-        back_image.save(back_buffer, format='JPEG', quality=95)
-        back_str = base64.b64encode(back_buffer.getvalue()).decode()
+        with render_metrics.span('encode', card_type=str(json_data.get('back', {}).get('type', ''))):
+            back_buffer = io.BytesIO()
+            back_image = back_image.convert('RGB')
+            back_image.save(back_buffer, format='JPEG', quality=95)
+            back_str = base64.b64encode(back_buffer.getvalue()).decode()
         response_data["back_image"] = f"data:image/jpeg;base64,{back_str}"
 
     logger_manager.info(f"卡图生成成功: {card_name}")
@@ -1267,10 +1495,43 @@ def get_encounter_groups():
 
     logger_manager.debug("获取遭遇组列表")
     encounter_groups = current_workspace.get_encounter_groups()
-    return jsonify(create_response(
+    response = jsonify(create_response(
         msg="获取遭遇组列表成功",
         data={"encounter_groups": encounter_groups}
     ))
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/api/encounter-groups/icon', methods=['GET'])
+@handle_api_error
+def get_encounter_group_icon():
+    """获取遭遇组图标缩略图(PNG，带ETag，未变化时返回304)"""
+    error_response = check_workspace()
+    if error_response:
+        return error_response
+
+    name = request.args.get('name', '')
+    try:
+        size = int(request.args.get('size', '0')) or None
+    except ValueError:
+        size = None
+    if size is not None:
+        size = max(16, min(size, 1024))
+
+    icon = current_workspace.get_encounter_icon(name, size)
+    if icon is None:
+        return jsonify(create_response(
+            code=404,
+            msg=f"遭遇组图标不存在: {name}"
+        )), 404
+
+    data, etag = icon
+    response = Response(data, mimetype='image/png')
+    response.set_etag(etag)
+    # 每次使用前向服务器确认（命中时只返回304）
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @app.route('/api/content-package/encounter-groups', methods=['POST'])
@@ -1345,7 +1606,12 @@ def get_content_package_encounter_groups():
 @app.route('/api/content-package/all-encounter-groups', methods=['GET'])
 @handle_api_error
 def get_all_content_package_encounter_groups():
-    """获取工作空间中所有内容包的遭遇组图片"""
+    """
+    获取工作空间中所有内容包的遭遇组
+
+    只返回名称、相对路径与图标地址（icon_url），图标由 /api/encounter-groups/icon 单独获取并缓存；
+    内容包来自文件树模型，卡牌遭遇组来自卡牌索引，未变化的内容包与卡牌不会重新读取。
+    """
     error_response = check_workspace()
     if error_response:
         return error_response
@@ -1354,79 +1620,35 @@ def get_all_content_package_encounter_groups():
     logger_manager.info(f"获取工作空间中所有内容包的遭遇组: {workspace_path}")
 
     try:
-        # 查找所有.pack文件
-        content_packages = []
-        for root, dirs, files in os.walk(workspace_path):
-            for file in files:
-                if file.endswith('.pack'):
-                    relative_path = os.path.relpath(os.path.join(root, file), workspace_path)
-                    content_packages.append(relative_path)
-
-        if not content_packages:
+        result = current_workspace.get_package_encounter_groups()
+        package_results = result['packages']
+        if not package_results:
             logger_manager.warning("未找到任何内容包文件")
             return jsonify(create_response(
                 code=16005,
                 msg="未找到任何内容包文件"
             )), 404
 
-        logger_manager.info(f"找到 {len(content_packages)} 个内容包文件")
-
-        # 合并所有遭遇组
-        all_encounter_groups = {}
-        package_results = []
-
-        for pack_file in content_packages:
-            try:
-                # 读取内容包文件
-                pack_path = current_workspace._get_absolute_path(pack_file)
-                with open(pack_path, 'r', encoding='utf-8') as f:
-                    package_data = json.load(f)
-
-                # 创建内容包管理器
-                from bin.content_package_manager import ContentPackageManager
-                package_manager = ContentPackageManager(package_data, current_workspace)
+        result_encounter_groups = result['encounter_groups']
+        for group in result_encounter_groups:
+            group['icon_url'] = f"/api/encounter-groups/icon?name={quote(group['name'])}"
 
-                # 获取遭遇组
-                encounter_groups = package_manager.get_encounter_groups_from_package()
+        logger_manager.info(
+            f"{len(package_results)} 个内容包，总共获取到 {len(result_encounter_groups)} 个唯一遭遇组")
 
-                # 合并到总结果中（去重）
-                for group in encounter_groups:
-                    group_name = group['name']
-                    if group_name not in all_encounter_groups:
-                        all_encounter_groups[group_name] = group
-
-                package_results.append({
-                    "package": pack_file,
-                    "encounter_groups_count": len(encounter_groups),
-                    "logs": package_manager.logs.copy()
-                })
-
-                logger_manager.info(f"内容包 {pack_file} 找到 {len(encounter_groups)} 个遭遇组")
-
-            except Exception as e:
-                logger_manager.error(f"处理内容包 {pack_file} 时出错: {e}")
-                package_results.append({
-                    "package": pack_file,
-                    "encounter_groups_count": 0,
-                    "error": str(e)
-                })
-                continue
-
-        # 转换为列表
-        result_encounter_groups = list(all_encounter_groups.values())
-
-        logger_manager.info(f"总共获取到 {len(result_encounter_groups)} 个唯一遭遇组")
-
-        return jsonify(create_response(
+        response = jsonify(create_response(
             msg="获取所有内容包遭遇组成功",
             data={
                 "workspace_path": workspace_path,
                 "total_encounter_groups": len(result_encounter_groups),
                 "encounter_groups": result_encounter_groups,
                 "package_results": package_results,
-                "packages_processed": len(content_packages)
+                "packages_processed": len(package_results)
             }
         ))
+        # 内容未变化时返回304，webview 直接使用缓存的结果
+        response.add_etag()
+        return response.make_conditional(request)
 
     except Exception as e:
         logger_manager.exception(f"获取所有内容包遭遇组失败: {e}")
@@ -67,6 +67,7 @@ OPTIONS = {
         'httpx',
         'httpcore',
         'h11',
+        'watchdog',
     ],
 
     'includes': [
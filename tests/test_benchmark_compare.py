@@ -0,0 +1,65 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import corpus
+from benchmarks.bench_render import compare
+
+
+def _report():
+    return {
+        "render": {
+            "a.card": {"status": "ok", "median_ms": 100.0, "layout_trials": 5},
+            "b.card": {"status": "ok", "median_ms": 10.0, "layout_trials": 5},
+        },
+        "export": {
+            "cards": {"a.card": {"status": "ok", "median_ms": 200.0}},
+            "cards_per_second": 5.0,
+        },
+        "pnp": {"cards_per_second": 1.0},
+        "meta": {"peak_rss_mb": 300.0},
+    }
+
+
+class BenchmarkCompareTests(unittest.TestCase):
+    def test_identical_reports_have_no_regressions(self):
+        self.assertEqual(compare(_report(), _report()), [])
+
+    def test_latency_regression_needs_relative_and_absolute_delta(self):
+        current = _report()
+        current["render"]["a.card"]["median_ms"] = 130.0  # +30%, +30ms
+        current["render"]["b.card"]["median_ms"] = 14.0  # +40%, 只有 4ms
+
+        regressions = compare(current, _report(), threshold=0.2, min_delta_ms=5.0)
+
+        self.assertEqual([(r["card"], r["metric"]) for r in regressions], [("a.card", "median_ms")])
+
+    def test_layout_trials_and_throughput_regressions(self):
+        current = _report()
+        current["render"]["b.card"]["layout_trials"] = 6
+        current["pnp"]["cards_per_second"] = 0.5
+        current["export"]["cards"]["a.card"]["status"] = "error"
+
+        metrics = {(r["section"], r["metric"]) for r in compare(current, _report())}
+
+        self.assertIn(("render", "layout_trials"), metrics)
+        self.assertIn(("pnp", "cards_per_second"), metrics)
+        self.assertIn(("export", "status"), metrics)
+
+    def test_corpus_covers_every_dispatched_card_type(self):
+        types = {corpus.load_card(name).get("type") for name in corpus.list_corpus()}
+        expected = {
+            "技能卡", "事件卡", "支援卡", "调查员卡", "调查员卡背", "调查员小卡",
+            "大画-技能卡", "大画-事件卡", "大画-支援卡", "升级卡", "故事卡", "行动卡",
+            "冒险参考卡", "规则小卡", "敌人卡", "诡计卡", "地点卡", "场景卡", "密谋卡",
+            "场景卡背", "密谋卡背", "场景卡-大画", "密谋卡-大画", "特殊图片",
+        }
+        self.assertTrue(expected.issubset(types), expected - types)
+
+
+if __name__ == "__main__":
+    unittest.main()
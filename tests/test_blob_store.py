@@ -0,0 +1,100 @@
+import base64
+import importlib.util
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+
+
+def _load_blob_store_module():
+    module_name = "blob_store_under_test"
+    module_path = Path(__file__).resolve().parents[1] / "bin" / "blob_store.py"
+
+    bin_package = types.ModuleType("bin")
+    bin_package.__path__ = []
+    sys.modules.setdefault("bin", bin_package)
+
+    logger_module = types.ModuleType("bin.logger")
+    logger_module.logger_manager = types.SimpleNamespace(
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        debug=lambda *args, **kwargs: None,
+    )
+    sys.modules.setdefault("bin.logger", logger_module)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+PNG_DATA_URL = "data:image/png;base64," + base64.b64encode(PNG_BYTES).decode("ascii")
+
+
+class BlobStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_blob_store_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.store = self.module.BlobStore(self.tmpdir.name)
+
+    def test_externalize_and_inline_round_trip_with_dedup(self):
+        card = {
+            "type": "地点卡",
+            "picture_base64": PNG_DATA_URL,
+            "back": {"picture_base64": PNG_DATA_URL, "name": "背面"},
+            "external_image": "data:image/png;base64,AAAA",
+        }
+
+        stored, count = self.store.externalize_card(card)
+
+        self.assertEqual(count, 2)
+        self.assertTrue(self.module.is_blob_ref(stored["picture_base64"]))
+        self.assertEqual(stored["picture_base64"], stored["back"]["picture_base64"])
+        # 过小的内嵌图片保持原样，原对象不被修改
+        self.assertEqual(stored["external_image"], card["external_image"])
+        self.assertEqual(card["picture_base64"], PNG_DATA_URL)
+        blob_files = [f for _, _, files in os.walk(self.store.blob_dir) for f in files]
+        self.assertEqual(len(blob_files), 1)
+
+        inlined, restored = self.store.inline_card(stored)
+        self.assertEqual(restored, 2)
+        self.assertEqual(inlined, card)
+
+    def test_invalid_or_missing_refs_are_left_alone(self):
+        self.assertIsNone(self.store.get("blob:sha256:../../etc/passwd"))
+        missing = "blob:sha256:" + "0" * 64
+        self.assertIsNone(self.store.get(missing))
+
+        card, count = self.store.inline_card({"picture_base64": missing})
+        self.assertEqual((card["picture_base64"], count), (missing, 0))
+
+    def test_raw_base64_is_stored_as_bytes(self):
+        ref = self.store.externalize_card({"picture_base64": base64.b64encode(PNG_BYTES).decode()})[0]["picture_base64"]
+
+        self.assertEqual(self.store.get(ref), PNG_BYTES)
+        self.assertTrue(self.store.to_data_url(ref).startswith("data:image/png;base64,"))
+
+    def test_corrupt_payload_stays_inline(self):
+        corrupt = PNG_DATA_URL[:-8] + "!!!!" + PNG_DATA_URL[-4:]
+        card, count = self.store.externalize_card({"picture_base64": corrupt})
+
+        self.assertEqual((card["picture_base64"], count), (corrupt, 0))
+        self.assertFalse(os.path.exists(self.store.blob_dir))
+
+    def test_declared_mime_is_restored(self):
+        svg = b"<svg xmlns='http://www.w3.org/2000/svg'>" + b" " * 4096 + b"</svg>"
+        svg_url = "data:image/svg+xml;base64," + base64.b64encode(svg).decode("ascii")
+        stored, _ = self.store.externalize_card({"picture_base64": svg_url})
+
+        self.assertEqual(self.store.to_data_url(stored["picture_base64"]), svg_url)
+        self.assertEqual(self.store.inline_card(stored)[0]["picture_base64"], svg_url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+def _load_card_index_module():
+    module_name = "card_index_under_test"
+    module_path = Path(__file__).resolve().parents[1] / "bin" / "card_index.py"
+
+    bin_package = types.ModuleType("bin")
+    bin_package.__path__ = []
+    sys.modules.setdefault("bin", bin_package)
+
+    logger_module = types.ModuleType("bin.logger")
+    logger_module.logger_manager = types.SimpleNamespace(
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        debug=lambda *args, **kwargs: None,
+    )
+    sys.modules.setdefault("bin.logger", logger_module)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+class CardIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_card_index_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self.cards = {
+            "a.card": {"type": "技能卡", "name": "Vicious Blow", "class": "守护者", "language": "en"},
+            os.path.join("night", "ghoul.card"): {
+                "type": "敌人卡", "name": "食尸鬼", "encounter_group": "午夜假面",
+                "card_number": "12", "quantity": "3", "language": "zh",
+            },
+            os.path.join("night", "agenda.card"): {
+                "version": "2.0", "type": "密谋卡", "name": "子夜", "encounter_group": "午夜假面",
+                "back": {"type": "密谋卡背"},
+            },
+        }
+        for rel_path, data in self.cards.items():
+            self._write(rel_path, data)
+        self.index = self.module.CardIndex(self.root)
+        self.addCleanup(self.index.close)
+
+    def _write(self, rel_path, data):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_sync_only_parses_new_or_changed_files(self):
+        self.assertEqual(self.index.sync(self.cards), 3)
+        self.assertEqual(self.index.sync(self.cards), 0)
+
+        self._write("a.card", {"type": "事件卡", "name": "Changed name"})
+        with mock.patch("builtins.open", wraps=open) as opened:
+            self.assertEqual(self.index.sync(self.cards), 1)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(self.index.get_card("a.card")["type"], "事件卡")
+
+        remaining = [p for p in self.cards if p != "a.card"]
+        self.index.sync(remaining)
+        self.assertIsNone(self.index.get_card("a.card"))
+
+    def test_query_filters_search_and_pagination(self):
+        self.index.sync(self.cards)
+
+        result = self.index.query(filters={"encounter_group": ["午夜假面"]}, sort="name", limit=1)
+        self.assertEqual(result["total"], 2)
+        self.assertEqual([item["name"] for item in result["items"]], ["子夜"])
+        self.assertEqual(self.index.query(filters={"encounter_group": "午夜假面"}, sort="name",
+                                          offset=1)["items"][0]["quantity"], 3)
+
+        self.assertEqual(self.index.query(search="blow")["items"][0]["path"], "a.card")
+        self.assertEqual(self.index.query(search="%")["total"], 0)
+        self.assertEqual(self.index.query(has_back=True)["items"][0]["version"], "2.0")
+        self.assertEqual(self.index.query(path_prefix="night/")["total"], 2)
+        self.assertEqual(self.index.distinct_values("encounter_group"), ["午夜假面"])
+
+    def test_update_remove_prefix_and_invalid_json(self):
+        with open(os.path.join(self.root, "broken.card"), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.index.update_card("broken.card")
+        self.index.update_card("a.card", card_json={"type": "事件卡"})
+
+        self.assertIsNotNone(self.index.get_card("broken.card")["error"])
+        self.assertEqual(self.index.get_card("a.card")["type"], "事件卡")
+
+        self.index.sync(self.cards)
+        self.index.remove_prefix("night")
+        self.assertEqual([item["path"] for item in self.index.query()["items"]], ["a.card"])
+
+    def test_bom_and_custom_decoded_cards_are_indexed(self):
+        with open(os.path.join(self.root, "bom.card"), "w", encoding="utf-8-sig") as f:
+            json.dump({"type": "技能卡", "name": "带BOM"}, f, ensure_ascii=False)
+        with open(os.path.join(self.root, "gbk.card"), "w", encoding="gbk") as f:
+            json.dump({"type": "事件卡", "name": "国标编码"}, f, ensure_ascii=False)
+
+        self.index.sync(["bom.card", "gbk.card"])
+        self.assertEqual(self.index.get_card("bom.card")["name"], "带BOM")
+        self.assertIsNotNone(self.index.get_card("gbk.card")["error"])
+
+        def decode(raw):
+            try:
+                return raw.decode("utf-8"), "utf-8"
+            except UnicodeDecodeError:
+                return raw.decode("gbk"), "gbk"
+
+        index = self.module.CardIndex(self.root, decode=decode)
+        self.addCleanup(index.close)
+        index.update_card("gbk.card")
+        self.assertEqual(index.get_card("gbk.card")["name"], "国标编码")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import base64
+import io
+import os
+import sys
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image
+
+import server
+from bin import workspace_manager as workspace_manager_module
+from bin.content_package_manager import ContentPackageManager
+from bin.workspace_manager import CacheManager, WorkspaceManager
+
+# 其他测试会在 sys.modules 中留下 PIL、flask、bin 等桩模块，setUp 中恢复为真实模块
+_REAL_MODULES = dict(sys.modules)
+
+
+class EncounterGroupBase64Tests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        os.makedirs(os.path.join(self.tmpdir.name, 'encounter_groups'))
+        Image.new('RGB', (600, 400), (10, 20, 30)).save(
+            os.path.join(self.tmpdir.name, 'encounter_groups', '午夜假面.png'))
+
+        self.workspace = object.__new__(WorkspaceManager)
+        self.workspace.workspace_path = self.tmpdir.name
+        # 未配置遭遇组目录时使用默认的 encounter_groups
+        self.workspace.config = {}
+
+    def test_full_resolution_icon_from_default_directory(self):
+        manager = ContentPackageManager({}, self.workspace)
+        data_url = manager._get_encounter_group_base64('午夜假面')
+
+        self.assertTrue(data_url.startswith('data:image/png;base64,'))
+        with Image.open(io.BytesIO(base64.b64decode(data_url.split(',', 1)[1]))) as image:
+            self.assertEqual(image.size, (600, 400))
+
+
+class AllPackageEncounterGroupsRouteTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _REAL_MODULES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, 'encounter_groups'))
+        Image.new('RGB', (600, 400)).save(os.path.join(self.root, 'encounter_groups', '午夜假面.png'))
+        for name, group in (('ghoul.card', '午夜假面'), ('cult.card', '邪教'), ('skill.card', None)):
+            with open(os.path.join(self.root, name), 'w', encoding='utf-8') as f:
+                json.dump({'type': '敌人卡', 'name': name, 'encounter_group': group}, f, ensure_ascii=False)
+        self._write_pack('a.pack', ['ghoul.card', 'skill.card'])
+        self._write_pack('b.pack', ['cult.card', 'ghoul.card'])
+
+        workspace = object.__new__(WorkspaceManager)
+        workspace.workspace_path = self.root
+        workspace.config = {}
+        workspace.cache_manager = CacheManager(self.root)
+        workspace._tree_model = None
+        workspace._tree_watcher = None
+        workspace._tree_model_lock = threading.Lock()
+        workspace._card_index = None
+        workspace._card_index_synced = False
+        workspace._card_index_lock = threading.Lock()
+        workspace._encounter_icon_cache = {}
+        workspace._package_cards_cache = {}
+        self.addCleanup(lambda: workspace._card_index and workspace._card_index.close())
+        self.addCleanup(workspace.stop_tree_watcher)
+
+        patcher = mock.patch.object(server, 'current_workspace', workspace)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = server.app.test_client()
+
+    def _write_pack(self, name, cards):
+        with open(os.path.join(self.root, name), 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'name': name}, 'cards': [{'filename': card} for card in cards]}, f)
+
+    def test_groups_are_listed_without_inline_icons_and_packs_are_not_reread(self):
+        response = self.client.get('/api/content-package/all-encounter-groups')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertEqual([group['name'] for group in data['encounter_groups']], ['午夜假面', '邪教'])
+        self.assertNotIn('base64', data['encounter_groups'][0])
+        self.assertEqual(sorted(r['encounter_groups_count'] for r in data['package_results']), [1, 2])
+
+        with mock.patch.object(workspace_manager_module, 'decode_text') as decode:
+            again = self.client.get('/api/content-package/all-encounter-groups',
+                                    headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+        decode.assert_not_called()
+
+    def test_icon_url_resolves_without_configured_directory(self):
+        data = self.client.get('/api/content-package/all-encounter-groups').get_json()['data']
+        icon_url = data['encounter_groups'][0]['icon_url']
+
+        response = self.client.get(icon_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/png')
+        with Image.open(io.BytesIO(response.data)) as image:
+            self.assertEqual(image.size, (WorkspaceManager.ENCOUNTER_ICON_SIZE, 171))
+        self.assertEqual(self.client.get('/api/encounter-groups/icon?name=邪教').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
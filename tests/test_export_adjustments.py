@@ -0,0 +1,65 @@
+import math
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from ExportHelper import ExportHelper
+
+
+def _legacy_adjust(image, saturation=1.0, brightness=1.0, gamma=1.0):
+    """改写前的实现（两次 ImageEnhance + float32 伽马），作为对照"""
+    if not math.isclose(saturation, 1.0):
+        image = ImageEnhance.Color(image).enhance(saturation)
+    if not math.isclose(brightness, 1.0):
+        image = ImageEnhance.Brightness(image).enhance(brightness)
+    if not math.isclose(gamma, 1.0):
+        img_array = np.power(np.array(image, dtype=np.float32) / 255.0, gamma)
+        img_array = (np.clip(img_array, 0, 1) * 255).astype(np.uint8)
+        image = Image.fromarray(img_array)
+    return image
+
+
+class ImageAdjustmentTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.sources = [
+            Image.fromarray(rng.integers(0, 256, (600, 37, 3), dtype=np.uint8), 'RGB'),
+            Image.fromarray(rng.integers(0, 256, (300, 41, 4), dtype=np.uint8), 'RGBA'),
+        ]
+
+    def _diff(self, actual, expected):
+        self.assertEqual(actual.mode, expected.mode)
+        self.assertEqual(actual.size, expected.size)
+        return np.abs(np.asarray(actual, dtype=np.int16) - np.asarray(expected, dtype=np.int16)).max()
+
+    def test_identity_returns_input(self):
+        image = self.sources[0]
+        self.assertIs(ExportHelper._apply_image_adjustments(image), image)
+
+    def test_brightness_and_gamma_match_legacy_exactly(self):
+        for source in self.sources:
+            for brightness, gamma in ((1.2, 1.0), (0.8, 1.0), (1.0, 0.7), (1.0, 2.2), (1.15, 0.9)):
+                with self.subTest(mode=source.mode, brightness=brightness, gamma=gamma):
+                    actual = ExportHelper._apply_image_adjustments(source, brightness=brightness, gamma=gamma)
+                    expected = _legacy_adjust(source, brightness=brightness, gamma=gamma)
+                    self.assertEqual(self._diff(actual, expected), 0)
+
+    def test_saturation_matches_legacy_exactly(self):
+        for source in self.sources:
+            for saturation, brightness, gamma in ((1.3, 1.0, 1.0), (0.5, 1.1, 0.9), (0.0, 1.0, 1.0), (2.0, 0.9, 1.2)):
+                with self.subTest(mode=source.mode, saturation=saturation, brightness=brightness, gamma=gamma):
+                    actual = ExportHelper._apply_image_adjustments(
+                        source, saturation=saturation, brightness=brightness, gamma=gamma)
+                    expected = _legacy_adjust(source, saturation=saturation, brightness=brightness, gamma=gamma)
+                    self.assertEqual(self._diff(actual, expected), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image
+
+from ExportHelper import ExportHelper, ExportSize
+from export_helper.bleed_cache import BleedCache
+
+
+class _FakeWorkspaceManager:
+    def __init__(self, workspace_path):
+        self.workspace_path = workspace_path
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+
+
+class BleedCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _make_helper(self, bleed_model="LaMa模型出血", dpi=300, lama_baseurl="http://localhost:8080"):
+        params = {
+            "size": ExportSize.POKER_SIZE.value,
+            "dpi": dpi,
+            "bleed": 2,
+            "bleed_model": bleed_model,
+        }
+        workspace_manager = _FakeWorkspaceManager(self.tmpdir.name)
+        workspace_manager.config["lama_baseurl"] = lama_baseurl
+        helper = ExportHelper(params, workspace_manager)
+        helper.lama_cleaner = mock.Mock()
+        helper.lama_cleaner.outpaint_extend.side_effect = (
+            lambda original_image, target_width, target_height, **kwargs: Image.new("RGB", (target_width, target_height), (9, 9, 9))
+        )
+        return helper
+
+    def test_lama_outpaint_is_reused_across_exports(self):
+        base = Image.new("RGB", (739, 1049), (200, 10, 10))
+
+        first = self._make_helper()
+        result = first._call_lama_cleaner(base, 768, 1087)
+        # 另一次导出（不同 DPI）中相同的底图不再请求 LaMa
+        second = self._make_helper(dpi=600)
+        cached = second._call_lama_cleaner(base.copy(), 768, 1087)
+
+        first.lama_cleaner.outpaint_extend.assert_called_once()
+        second.lama_cleaner.outpaint_extend.assert_not_called()
+        self.assertEqual(cached.tobytes(), result.tobytes())
+
+        base.putpixel((0, 0), (0, 0, 0))
+        second._call_lama_cleaner(base, 768, 1087)
+        second._call_lama_cleaner(base, 800, 1100)
+        self.assertEqual(second.lama_cleaner.outpaint_extend.call_count, 2)
+
+    def test_lama_server_and_form_data_are_part_of_the_key(self):
+        base = Image.new("RGB", (739, 1049), (200, 10, 10))
+        self._make_helper()._call_lama_cleaner(base, 768, 1087)
+
+        other_server = self._make_helper(lama_baseurl="http://192.168.1.2:8080/")
+        other_server._call_lama_cleaner(base, 768, 1087)
+        other_server.lama_cleaner.outpaint_extend.assert_called_once()
+
+        helper = self._make_helper()
+        compute = mock.Mock(return_value=Image.new("RGB", (768, 1087)))
+        # 与默认值相同的覆盖参数发送的表单一致，命中默认参数的缓存
+        helper._cached_lama("outpaint", base, (768, 1087), compute, lama_kwargs={"ldmSteps": 25})
+        compute.assert_not_called()
+        helper._cached_lama("outpaint", base, (768, 1087), compute, lama_kwargs={"ldmSteps": 50})
+        compute.assert_called_once_with(ldmSteps=50)
+
+    def test_mirror_bleed_does_not_use_cache(self):
+        helper = self._make_helper(bleed_model="镜像出血")
+        self.assertIsNone(helper.bleed_cache)
+
+    def test_prune_removes_least_recently_used_entries(self):
+        cache = BleedCache(os.path.join(self.tmpdir.name, "bleed"), max_bytes=0)
+        image = Image.new("RGB", (4, 4))
+        keys = [BleedCache.make_key(image, "outpaint", (8, 8 + i), "LAMA") for i in range(3)]
+        for key in keys:
+            cache.put(key, image)
+        self.assertIsNotNone(cache.get(keys[0]))
+
+        cache.max_bytes = os.path.getsize(cache._path(keys[0]))
+        os.utime(cache._path(keys[1]), (0, 0))
+        os.utime(cache._path(keys[2]), (1, 1))
+
+        self.assertEqual(cache.prune(), 2)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -34,7 +34,7 @@ class CardBackDpiScalingTests(unittest.TestCase):
         return ExportHelper(params, _FakeWorkspaceManager())
 
     def _bleeding_intermediate(self, helper):
-        """模拟 _bleeding 在无文字层卡背上的中间产物（按默认 300 DPI 计算的尺寸）。"""
+        """模拟 _bleed_card 在无文字层卡背上的中间产物（按默认 300 DPI 计算的尺寸）。"""
         base_w, base_h = helper.calculate_pixel_dimensions(
             dpi=300, bleed=helper.bleed, size=helper.size
         )
@@ -0,0 +1,76 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image
+
+from Card import ENCOUNTER_NUMBER_ROLE
+from ExportHelper import ExportHelper, ExportSize
+
+FONT_PATH = str(PROJECT_ROOT / 'fonts' / 'ArnoPro-Regular.ttf')
+
+
+class _FakeFontManager:
+    def get_font_path(self, font_name):
+        return FONT_PATH
+
+    def get_font(self, font_name, font_size):
+        return None
+
+
+class _FakeCreator:
+    def __init__(self):
+        self.font_manager = _FakeFontManager()
+
+
+class _FakeWorkspaceManager:
+    def __init__(self):
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+        self.creator = _FakeCreator()
+
+
+def _text(text, x, y, **extra):
+    item = {"text": text, "x": x, "y": y, "offset_x": 0, "offset_y": 0, "font": "ArnoPro",
+            "font_size": 20, "color": (255, 255, 255), "border_width": 0, "opacity": 100, "effects": None}
+    item.update(extra)
+    return item
+
+
+class EncounterCopiesTests(unittest.TestCase):
+    def _make_helper(self, bleed_mode="裁剪"):
+        params = {"size": ExportSize.POKER_SIZE.value, "dpi": 600, "bleed": 2,
+                  "bleed_mode": bleed_mode, "bleed_model": "镜像出血"}
+        return ExportHelper(params, _FakeWorkspaceManager())
+
+    def _check_copies_match_full_draw(self, helper, style):
+        base = Image.new("RGB", (797, 1097), (40, 60, 80))
+        shared = [_text("Rotting Remains", 200, 100), _text("Illus. Someone", 40, 1021, **style)]
+        encounter_layers = [
+            [_text(number, 559, 1030, role=ENCOUNTER_NUMBER_ROLE, **style)]
+            for number in ("11/20", "12/20", "13/20")
+        ]
+        copies = helper._draw_text_layer_copies(base, shared + encounter_layers[0], encounter_layers)
+
+        self.assertEqual(len(copies), 3)
+        for copy, layer in zip(copies, encounter_layers):
+            expected = helper._draw_text_layer(base, shared + layer)
+            self.assertEqual(copy.size, expected.size)
+            self.assertEqual(copy.tobytes(), expected.tobytes())
+        self.assertNotEqual(copies[0].tobytes(), copies[1].tobytes())
+
+    def test_plain_number_is_stamped_on_shared_base(self):
+        for bleed_mode in ("裁剪", "拉伸"):
+            with self.subTest(bleed_mode=bleed_mode):
+                self._check_copies_match_full_draw(self._make_helper(bleed_mode), {})
+
+    def test_number_with_effects_redraws_text_layer(self):
+        style = {"opacity": 75, "effects": [{"type": "stroke", "size": 2, "opacity": 63, "color": (165, 157, 153)}]}
+        self._check_copies_match_full_draw(self._make_helper(), style)
+
+
+if __name__ == '__main__':
+    unittest.main()
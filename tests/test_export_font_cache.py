@@ -0,0 +1,69 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import ImageFont
+
+import ExportHelper as export_helper_module
+from ExportHelper import ExportHelper, ExportSize
+
+FONT_PATH = str(PROJECT_ROOT / 'fonts' / 'ArnoPro-Regular.ttf')
+
+
+class _FakeFontManager:
+    def get_font_path(self, font_name):
+        return FONT_PATH if font_name == 'ArnoPro' else None
+
+    def get_font(self, font_name, font_size):
+        return None
+
+
+class _FakeCreator:
+    def __init__(self):
+        self.font_manager = _FakeFontManager()
+
+
+class _FakeWorkspaceManager:
+    def __init__(self):
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+        self.creator = _FakeCreator()
+
+
+class ExportFontCacheTests(unittest.TestCase):
+    def setUp(self):
+        export_helper_module.clear_export_font_cache()
+        self.addCleanup(export_helper_module.clear_export_font_cache)
+
+    def _make_helper(self):
+        params = {"size": ExportSize.POKER_SIZE.value, "dpi": 600, "bleed": 2}
+        return ExportHelper(params, _FakeWorkspaceManager())
+
+    def test_fonts_are_shared_across_helpers(self):
+        with mock.patch.object(export_helper_module.ImageFont, 'truetype',
+                               wraps=ImageFont.truetype) as truetype:
+            first = self._make_helper()._load_font('ArnoPro', 48)
+            second = self._make_helper()._load_font('ArnoPro', 48)
+            self._make_helper()._load_font('ArnoPro', 24)
+
+        self.assertIs(first, second)
+        self.assertEqual(truetype.call_count, 2)
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(export_helper_module, 'EXPORT_FONT_CACHE_LIMIT', 2):
+            helper = self._make_helper()
+            for size in (10, 11, 12):
+                helper._load_font('ArnoPro', size)
+            self.assertEqual(list(export_helper_module._export_font_cache),
+                             [(FONT_PATH, 11), (FONT_PATH, 12)])
+
+    def test_missing_font_keeps_font_manager_result(self):
+        self.assertIsNone(self._make_helper()._load_font('Missing', 12))
+
+
+if __name__ == '__main__':
+    unittest.main()
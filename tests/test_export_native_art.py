@@ -0,0 +1,90 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+from PIL import Image
+
+from Card import Card
+from ExportHelper import ExportHelper, ExportSize
+
+
+class _FakeWorkspaceManager:
+    def __init__(self):
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+
+
+def _make_card(width=739, height=1049):
+    card = Card.__new__(Card)
+    card.width, card.height = width, height
+    card.image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    card.art_placement = None
+    return card
+
+
+def _make_art(width=2956, height=2420):
+    """细密的棋盘格插画：放大后的 300 DPI 版本与原图直接缩小的版本差异明显"""
+    yy, xx = np.mgrid[0:height, 0:width]
+    pixels = np.where(((xx // 2 + yy // 2) % 2)[..., None] == 0, 30, 220).astype(np.uint8)
+    return Image.fromarray(np.repeat(pixels, 3, axis=2), 'RGB')
+
+
+class NativeArtTests(unittest.TestCase):
+    def _make_helper(self, dpi, native_art=True):
+        params = {
+            "size": ExportSize.POKER_SIZE.value,
+            "dpi": dpi,
+            "bleed": 2,
+            "bleed_model": "镜像出血",
+            "native_art": native_art,
+        }
+        return ExportHelper(params, _FakeWorkspaceManager())
+
+    def test_art_layer_at_unit_scale_matches_card(self):
+        for params in (None, {'scale': 0.3, 'offset': {'x': 12, 'y': -7}, 'crop': {'left': 40}}):
+            card = _make_card()
+            card.paste_art(_make_art(), (0, 456, 739, 593), 'cover', transform_params=params)
+            self.assertEqual(card.render_art_layer().tobytes(), card.image.tobytes())
+
+    def test_native_art_replaces_only_uncovered_art(self):
+        card = _make_card()
+        card.paste_art(_make_art(), (0, 456, 739, 593), 'cover')
+        # 牌框覆盖插画上半部分
+        card.image.paste((200, 0, 0, 255), (0, 400, 739, 700))
+
+        helper = self._make_helper(600)
+        bled_map, offset = helper._bleed_card({'use_external_image': 1}, card.image)
+        result = helper._draw_text_layer(bled_map, [], card, offset)
+        legacy = self._make_helper(600, native_art=False)._draw_text_layer(bled_map, [], card, offset)
+
+        scale_x = result.width / bled_map.width
+        scale_y = result.height / bled_map.height
+        native = card.render_art_layer(scale_x, scale_y)
+        left, top = round(offset[0] * scale_x), round(offset[1] * scale_y)
+
+        # 插画中部：与原图直接缩放的插画一致
+        inner = (left + 200, top + 1700, left + 1200, top + 2000)
+        art_box = (200, 1700, 1200, 2000)
+        self.assertEqual(result.crop(inner).convert('RGB').tobytes(),
+                         native.crop(art_box).convert('RGB').tobytes())
+        self.assertNotEqual(legacy.crop(inner).tobytes(), result.crop(inner).tobytes())
+        # 牌框区域：保持放大后的底图
+        frame = (left + 200, top + 900, left + 1200, top + 1300)
+        self.assertEqual(result.crop(frame).tobytes(), legacy.crop(frame).tobytes())
+
+    def test_export_at_base_dpi_is_unchanged(self):
+        card = _make_card()
+        card.paste_art(_make_art(), (0, 456, 739, 593), 'cover')
+        native = self._make_helper(300)
+        legacy = self._make_helper(300, native_art=False)
+        bled_map, offset = native._bleed_card({'use_external_image': 1}, card.image)
+        self.assertEqual(native._draw_text_layer(bled_map, [], card, offset).tobytes(),
+                         legacy._draw_text_layer(bled_map, [], card, offset).tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ResourceManager import FontManager
+
+
+class FontManagerThreadStateTests(unittest.TestCase):
+    def test_language_and_silence_are_per_thread(self):
+        font_manager = FontManager()
+        font_manager.set_lang('zh')
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def render(lang):
+            font_manager.set_lang(lang)
+            font_manager.silence = lang == 'en'
+            # 两个线程都设置完成后再读取，确认不会互相覆盖
+            barrier.wait(5)
+            seen[lang] = (font_manager.lang, font_manager.silence)
+
+        threads = [threading.Thread(target=render, args=(lang,)) for lang in ('en', 'pl')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(seen, {'en': ('en', True), 'pl': ('pl', False)})
+        self.assertEqual((font_manager.lang, font_manager.silence), ('zh', False))
+
+
+if __name__ == '__main__':
+    unittest.main()
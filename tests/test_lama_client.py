@@ -0,0 +1,203 @@
+import io
+import sys
+import threading
+import time
+import unittest
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+from PIL import Image
+
+from export_helper.LamaCleaner import LamaCleaner
+
+
+class _StandInLama:
+    """本地 lama-cleaner 替身：把蒙版白色区域填成纯红，记录并发数"""
+
+    def __init__(self, fail_first=0, delay=0.0):
+        self.fail_first = fail_first
+        self.delay = delay
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                message = BytesParser(policy=HTTP).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('latin-1') + body)
+                form = {part.get_param('name', header='content-disposition'): part.get_content()
+                        for part in message.iter_parts()}
+                with stand_in.lock:
+                    stand_in.requests += 1
+                    should_fail = stand_in.requests <= stand_in.fail_first
+                    stand_in.active += 1
+                    stand_in.max_active = max(stand_in.max_active, stand_in.active)
+                time.sleep(stand_in.delay)
+                # 响应前先减计数，客户端收到响应后立即发出的下一个请求不会被重复计入
+                with stand_in.lock:
+                    stand_in.active -= 1
+                if should_fail:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                image = Image.open(io.BytesIO(form['image'])).convert('RGB')
+                mask = Image.open(io.BytesIO(form['mask'])).convert('L')
+                image.paste((255, 0, 0), mask=mask)
+                buffer = io.BytesIO()
+                image.save(buffer, format='PNG')
+                body = buffer.getvalue()
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class LamaClientTests(unittest.TestCase):
+    def _start(self, **kwargs):
+        stand_in = _StandInLama(**kwargs)
+        self.addCleanup(stand_in.close)
+        return stand_in
+
+    def test_outpaint_extend_fills_masked_border(self):
+        stand_in = self._start()
+        cleaner = LamaCleaner(stand_in.url, backoff=0)
+        self.addCleanup(cleaner.close)
+
+        result = cleaner.outpaint_extend(Image.new('RGB', (20, 30), (0, 0, 255)), 24, 34)
+
+        self.assertEqual(result.size, (24, 34))
+        self.assertEqual(result.getpixel((0, 0)), (255, 0, 0))
+        self.assertEqual(result.getpixel((12, 17)), (0, 0, 255))
+
+    def test_retries_transient_server_errors(self):
+        stand_in = self._start(fail_first=2)
+        cleaner = LamaCleaner(stand_in.url, retries=2, backoff=0)
+        self.addCleanup(cleaner.close)
+
+        result = cleaner.inpaint(Image.new('RGB', (8, 8)), Image.new('L', (8, 8), 255))
+
+        self.assertEqual(stand_in.requests, 3)
+        self.assertEqual(result.getpixel((4, 4)), (255, 0, 0))
+
+    def test_batch_is_ordered_and_bounded(self):
+        stand_in = self._start(delay=0.05)
+        cleaner = LamaCleaner(stand_in.url, max_in_flight=2, backoff=0)
+        self.addCleanup(cleaner.close)
+
+        items = []
+        for i in range(6):
+            mask = Image.new('L', (4, 4), 0)
+            mask.putpixel((0, 0), 255)
+            items.append((Image.new('RGB', (4, 4), (0, i, 0)), mask))
+        results = cleaner.inpaint_batch(items)
+
+        self.assertEqual([r.getpixel((3, 3)) for r in results], [(0, i, 0) for i in range(6)])
+        self.assertEqual(stand_in.requests, 6)
+        self.assertEqual(stand_in.max_active, 2)
+
+    def test_held_slots_are_released_by_the_consumer(self):
+        cleaner = LamaCleaner('http://127.0.0.1:9', max_in_flight=1)
+        self.addCleanup(cleaner.close)
+
+        # 上限为 2 个槽位：已完成但未被取走的结果仍占用槽位
+        futures = [cleaner.submit_held(lambda i=i: i) for i in range(2)]
+        self.assertEqual([f.result() for f in futures], [0, 1])
+        submitted = threading.Event()
+
+        def submit_third():
+            futures.append(cleaner.submit_held(lambda: 2))
+            submitted.set()
+
+        thread = threading.Thread(target=submit_third, daemon=True)
+        thread.start()
+        self.assertFalse(submitted.wait(0.2))
+
+        cleaner.release_slot()
+        self.assertTrue(submitted.wait(5))
+        thread.join(5)
+        self.assertEqual(futures[2].result(), 2)
+
+    def test_shared_client_is_reused(self):
+        first = LamaCleaner.shared('http://127.0.0.1:9/', max_in_flight=3)
+        second = LamaCleaner.shared('http://127.0.0.1:9', max_in_flight=3)
+        self.assertIs(first, second)
+        self.assertEqual(first.max_in_flight, 3)
+
+
+def _legacy_mirror_extend(image, target_width, target_height):
+    """改写前的镜像出血实现，作为逐像素对照"""
+    width, height = image.size
+    if target_width < width or target_height < height:
+        if target_width >= width and target_height >= height:
+            return image.copy()
+        left = max(0, (width - target_width) // 2)
+        top = max(0, (height - target_height) // 2)
+        return image.crop((left, top, min(width, left + target_width), min(height, top + target_height)))
+    if (target_width, target_height) == (width, height):
+        return image.copy()
+    pad_left = (target_width - width) // 2
+    pad_top = (target_height - height) // 2
+    array = np.array(image)
+    spec = [(pad_top, target_height - height - pad_top), (pad_left, target_width - width - pad_left)]
+    if array.ndim == 3:
+        spec.append((0, 0))
+    return Image.fromarray(np.pad(array, pad_width=spec, mode='reflect'))
+
+
+class MirrorExtendTests(unittest.TestCase):
+    def test_matches_legacy_output_bit_exactly(self):
+        rng = np.random.default_rng(7)
+        sources = [
+            Image.fromarray(rng.integers(0, 256, (1049, 739, 3), dtype=np.uint8), 'RGB'),
+            Image.fromarray(rng.integers(0, 256, (40, 30, 4), dtype=np.uint8), 'RGBA'),
+            Image.fromarray(rng.integers(0, 256, (40, 30), dtype=np.uint8), 'L'),
+        ]
+        for source in sources:
+            width, height = source.size
+            targets = [
+                (width + 29, height + 38),  # 标准出血（奇数边距）
+                (width, height),
+                (width - 7, height - 4),  # 居中裁剪
+                (width - 3, height + 10),  # 一边裁剪一边扩展
+                (width * 3, height * 3),  # 边距大于原图
+            ]
+            for target in targets:
+                with self.subTest(mode=source.mode, target=target):
+                    expected = _legacy_mirror_extend(source, *target)
+                    actual = LamaCleaner.outpaint_mirror_extend(source, *target)
+                    self.assertEqual(actual.mode, expected.mode)
+                    self.assertEqual(actual.size, expected.size)
+                    self.assertEqual(actual.tobytes(), expected.tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
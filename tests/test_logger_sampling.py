@@ -0,0 +1,106 @@
+import importlib.util
+import logging
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+def _load_logger_module(log_dir: str):
+    module_name = "logger_under_test"
+    module_path = Path(__file__).resolve().parents[1] / "bin" / "logger.py"
+
+    config_directory_manager = types.ModuleType("bin.config_directory_manager")
+    config_directory_manager.config_dir_manager = types.SimpleNamespace(get_logs_dir=lambda: log_dir)
+
+    with mock.patch.dict(sys.modules, {"bin.config_directory_manager": config_directory_manager}):
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        assert spec and spec.loader
+        spec.loader.exec_module(module)
+    return module
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class _Unformattable:
+    """格式化即失败：用于证明被过滤的日志不会触发参数格式化。"""
+
+    def __str__(self):
+        raise AssertionError("被过滤的日志不应格式化参数")
+
+
+class LoggerSamplingTests(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        module = self.module = _load_logger_module(self._tmpdir.name)
+        module.LoggerManager._instance = None
+        module.LoggerManager._logger = None
+        module.LoggerManager._category_loggers = None
+        self.manager = module.LoggerManager()
+
+        self.root = self.manager.get_logger()
+        self._original_handlers = list(self.root.handlers)
+        for handler in self._original_handlers:
+            handler.close()
+        self.root.handlers = []
+        self.handler = _ListHandler()
+        self.root.addHandler(self.handler)
+
+    def tearDown(self):
+        self.root.removeHandler(self.handler)
+        self._tmpdir.cleanup()
+
+    def _messages(self):
+        return [record.getMessage() for record in self.handler.records]
+
+    def test_lazy_args_are_formatted_only_when_emitted(self):
+        self.manager.debug("命中 %s", _Unformattable(), category="render")
+        self.assertEqual(self.handler.records, [])
+
+        self.manager.info("命中 %s (大小: %s)", "标题字体", 32)
+        self.assertEqual(self._messages(), ["命中 标题字体 (大小: 32)"])
+
+    def test_category_level_can_be_lowered(self):
+        self.manager.debug("渲染 %d", 1, category="render")
+        self.manager.set_category_level("render", "DEBUG")
+        self.manager.debug("渲染 %d", 2, category="render")
+
+        self.assertEqual(self._messages(), ["渲染 2"])
+        self.assertEqual(self.handler.records[0].name, "Arkham.render")
+
+    def test_every_samples_one_of_n(self):
+        for i in range(10):
+            self.manager.info("采样 %d", i, every=4)
+
+        self.assertEqual(self._messages(), ["采样 0", "采样 4", "采样 8"])
+
+    def test_interval_throttles_and_reports_suppressed_count(self):
+        with mock.patch("time.monotonic", side_effect=[0.0, 1.0, 2.0, 11.0]):
+            for i in range(4):
+                self.manager.info("缺图 %s", i, key="missing", interval=10.0)
+
+        self.assertEqual(self._messages(), ["缺图 0", "缺图 3 (已抑制 2 条)"])
+
+    def test_sampling_state_is_bounded(self):
+        with mock.patch.object(self.module, "SAMPLE_KEY_LIMIT", 8):
+            for i in range(50):
+                self.manager.info("采样", key=f"k{i}", every=2)
+                self.manager.info("限流", key=f"t{i}", interval=1.0)
+
+        self.assertEqual(len(self.manager._sample_counts), 8)
+        self.assertEqual(len(self.manager._throttle_state), 8)
+        self.assertIn("k49", self.manager._sample_counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
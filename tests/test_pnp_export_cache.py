@@ -0,0 +1,187 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image
+
+from bin.pnp_export_cache import DEFAULT_MAX_AGE, render_fingerprint
+from bin.pnp_exporter import PNPExporter
+
+
+class _FakeWorkspaceManager:
+    def __init__(self, workspace_path, cards):
+        self.workspace_path = workspace_path
+        self.config = {"encounter_groups_dir": "groups"}
+        self.cards = cards
+
+    def read_card(self, card_path):
+        card = self.cards.get(card_path)
+        return dict(card) if card is not None else None
+
+    def _get_absolute_path(self, path):
+        return os.path.join(self.workspace_path, path)
+
+
+class _FakeExportHelper:
+    """正面颜色编码卡牌编号与名称长度，所有卡牌共用同一卡背"""
+
+    def __init__(self, workspace_manager):
+        self.workspace_manager = workspace_manager
+        self.rendered = []
+
+    def export_card_auto(self, card_path):
+        card = self.workspace_manager.read_card(card_path)
+        self.rendered.append(card_path)
+        return {
+            'front': Image.new('RGB', (30, 42), (int(card['card_number']), len(card['name']), 0)),
+            'back': Image.new('RGB', (30, 42), (0, 0, 255)),
+        }
+
+
+class PNPExportCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.workspace = self.tmpdir.name
+        os.makedirs(os.path.join(self.workspace, 'art'))
+        os.makedirs(os.path.join(self.workspace, 'groups'))
+        Image.new('RGB', (4, 4)).save(os.path.join(self.workspace, 'art', 'a.png'))
+        Image.new('RGB', (4, 4)).save(os.path.join(self.workspace, 'groups', 'Cult.png'))
+        self.cards = {
+            '1.card': {'name': 'A', 'card_number': '1', 'quantity': 2, 'picture_path': 'art/a.png'},
+            '2.card': {'name': 'B', 'card_number': '2', 'quantity': 1, 'encounter_group': 'Cult'},
+            '3.card': {'name': 'C', 'card_number': '3', 'quantity': 1},
+        }
+
+    def _export(self, mode='single_card', **params):
+        workspace = _FakeWorkspaceManager(self.workspace, self.cards)
+        exporter = PNPExporter(dict({'pnp_workers': 2}, **params), workspace, cache_name='packs/demo.pack')
+        exporter.export_helper = _FakeExportHelper(workspace)
+        output_path = os.path.join(self.workspace, 'out.pdf')
+        result = exporter.export_pnp([{'filename': name} for name in self.cards], output_path, mode=mode)
+        self.assertTrue(result['success'], result.get('error'))
+        return sorted(exporter.export_helper.rendered), result
+
+    def _cache_files(self, sub_dir):
+        root = Path(self.workspace, '.cache', 'pnp_cache')
+        return sorted(p.name for p in root.glob(f'*/{sub_dir}/*'))
+
+    def _age_cache(self, seconds):
+        """将缓存中全部文件的修改时间提前"""
+        for path in Path(self.workspace, '.cache', 'pnp_cache').rglob('*'):
+            if path.is_file():
+                mtime = path.stat().st_mtime - seconds
+                os.utime(path, (mtime, mtime))
+
+    def test_unchanged_cards_are_not_rendered_again(self):
+        first, _ = self._export()
+        pdf = Path(self.workspace, 'out.pdf').read_bytes()
+        second, result = self._export()
+
+        self.assertEqual(first, ['1.card', '2.card', '3.card'])
+        self.assertEqual(second, [])
+        self.assertIn('导出缓存: 3 张卡牌未变化，重新渲染 0 张', result['logs'])
+        # 3 张正面 + 1 张共用卡背
+        self.assertEqual(len(self._cache_files('streams')), 4)
+        self.assertEqual(Path(self.workspace, 'out.pdf').read_bytes().count(b'/Subtype /Image'),
+                         pdf.count(b'/Subtype /Image'))
+
+    def test_only_changed_cards_are_rendered_and_stale_entries_removed(self):
+        self._export()
+        entries = self._cache_files('entries')
+        self._age_cache(60)
+        self.cards['3.card']['name'] = 'Changed'
+        self.cards['1.card']['quantity'] = 5
+        rendered, _ = self._export()
+
+        self.assertEqual(rendered, ['3.card'])
+        self.assertEqual(len(self._cache_files('entries')), 3)
+        self.assertEqual(len(set(entries) - set(self._cache_files('entries'))), 1)
+        self.assertEqual(len(self._cache_files('streams')), 4)
+
+    def test_referenced_asset_changes_invalidate_card(self):
+        self._export()
+        for path in ('art/a.png', 'groups/Cult.png'):
+            full_path = os.path.join(self.workspace, path)
+            stat_result = os.stat(full_path)
+            os.utime(full_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10 ** 9))
+        rendered, _ = self._export()
+
+        self.assertEqual(rendered, ['1.card', '2.card'])
+
+    def test_render_params_invalidate_and_encoding_params_do_not(self):
+        self._export(dpi=300)
+        self.assertEqual(self._export(dpi=300, pnp_workers=1)[0], [])
+        self.assertEqual(len(self._export(dpi=600)[0]), 3)
+
+    def test_other_param_sets_are_kept_until_they_expire(self):
+        self._export(dpi=300)
+        self._age_cache(60)
+        self._export(dpi=600)
+        self.assertEqual(self._export(dpi=300)[0], [])
+        self.assertEqual(len(self._cache_files('entries')), 6)
+
+        self._age_cache(DEFAULT_MAX_AGE + 60)
+        self._export(dpi=300)
+        self.assertEqual(len(self._cache_files('entries')), 3)
+        self.assertEqual(self._export(dpi=300)[0], [])
+
+    def test_render_fingerprint_change_invalidates_and_removes_entries(self):
+        self._export()
+        entries = self._cache_files('entries')
+        self._age_cache(60)
+        with mock.patch('bin.pnp_exporter.render_fingerprint', return_value='other-renderer'):
+            rendered, _ = self._export()
+
+        self.assertEqual(len(rendered), 3)
+        self.assertFalse(set(entries) & set(self._cache_files('entries')))
+
+    def test_render_fingerprint_tracks_resource_files(self):
+        fonts = os.path.join(self.workspace, 'fonts')
+        os.makedirs(fonts)
+        Path(fonts, 'a.ttf').write_bytes(b'font')
+        first = render_fingerprint([fonts])
+        self.assertEqual(render_fingerprint([fonts]), first)
+        Path(fonts, 'a.ttf').write_bytes(b'font v2')
+        self.assertNotEqual(render_fingerprint([fonts]), first)
+
+    def test_files_used_by_a_running_export_are_not_collected(self):
+        self._export()
+        self._age_cache(60)
+        # 另一个导出在这些条目写入之后开始且仍在进行
+        runs_dir = next(Path(self.workspace, '.cache', 'pnp_cache').glob('*')) / 'runs'
+        runs_dir.mkdir(exist_ok=True)
+        marker = runs_dir / 'other-run'
+        marker.touch()
+        mtime = time.time() - 90
+        os.utime(marker, (mtime, mtime))
+        self.cards['3.card']['name'] = 'Changed'
+        self._export()
+
+        self.assertEqual(len(self._cache_files('entries')), 4)
+        self.assertEqual(self._cache_files('runs'), ['other-run'])
+
+    def test_images_mode_uses_cached_png(self):
+        self._export(mode='images')
+        rendered, _ = self._export(mode='images')
+
+        self.assertEqual(rendered, [])
+        self.assertEqual(len(self._cache_files('images')), 4)
+        self.assertEqual(len(list(Path(self.workspace).glob('out_*/*.png'))), 8)
+
+    def test_cache_can_be_disabled(self):
+        self._export(pnp_cache=False)
+        self.assertEqual(len(self._export(pnp_cache=False)[0]), 3)
+        self.assertEqual(self._cache_files('entries'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
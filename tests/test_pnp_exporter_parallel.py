@@ -0,0 +1,118 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image
+
+from bin.pnp_exporter import PNPExporter
+
+
+class _FakeWorkspaceManager:
+    def __init__(self, workspace_path, cards):
+        self.workspace_path = workspace_path
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+        self.cards = cards
+
+    def read_card(self, card_path):
+        card = self.cards.get(card_path)
+        return dict(card) if card is not None else None
+
+
+class _FakeExportHelper:
+    """按卡牌编号决定渲染耗时（后面的卡先完成），颜色编码卡牌编号与遭遇组编号"""
+
+    def __init__(self, workspace_manager):
+        self.workspace_manager = workspace_manager
+        self.lock = threading.Lock()
+        self.rendered = 0
+        self.calls = 0
+
+    def export_card_auto(self, card_path):
+        return self.export_card_copies(card_path, None)[0]
+
+    def export_card_copies(self, card_path, encounter_group_numbers):
+        card = self.workspace_manager.read_card(card_path)
+        if card.get('broken'):
+            raise RuntimeError('渲染失败')
+        time.sleep(0.02 * (5 - int(card['card_number']) % 5))
+        with self.lock:
+            self.rendered += 1
+            self.calls += 1
+        if encounter_group_numbers is None:
+            encounter_group_numbers = [str(card.get('encounter_group_number', '0'))]
+        back = Image.new('RGB', (6, 8), (0, 0, 255))
+        return [{
+            'front': Image.new('RGB', (6, 8), (int(card['card_number']), int(number.split('/')[0].split('-')[0]), 0)),
+            'back': back,
+        } for number in encounter_group_numbers]
+
+
+class PNPParallelExportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _make_exporter(self, cards, **params):
+        workspace = _FakeWorkspaceManager(self.tmpdir.name, cards)
+        exporter = PNPExporter(dict({'pnp_workers': 3, 'pnp_max_in_flight': 4}, **params), workspace)
+        exporter.export_helper = _FakeExportHelper(workspace)
+        exporter.logs_seen = []
+        exporter.log_callback = exporter.logs_seen.append
+        return exporter
+
+    def test_results_are_written_in_order_with_bounded_backlog(self):
+        cards = {f'{i}.card': {'name': f'Card {i}', 'card_number': str(i), 'quantity': 2} for i in range(1, 11)}
+        exporter = self._make_exporter(cards)
+        original_save = exporter._save_card_images
+        backlog = []
+
+        def save(*args):
+            backlog.append(exporter.export_helper.rendered - len(backlog))
+            return original_save(*args)
+
+        exporter._save_card_images = save
+        results = exporter._export_card_images([{'filename': name} for name in cards], self.tmpdir.name)
+
+        self.assertEqual([r['card_number'] for r in results], [str(i) for i in range(1, 11)])
+        self.assertLessEqual(max(backlog), exporter.max_in_flight)
+        for result in results:
+            with Image.open(result['front_path']) as front:
+                self.assertEqual(front.getpixel((0, 0))[0], int(result['card_number']))
+        successes = [log for log in exporter.logs_seen if log.startswith('✓')]
+        self.assertEqual(successes, [f'✓ 成功导出双面卡牌: Card {i}' for i in range(1, 11)])
+
+    def test_failed_card_is_skipped(self):
+        cards = {
+            'a.card': {'name': 'A', 'card_number': '1'},
+            'b.card': {'name': 'B', 'card_number': '2', 'broken': True},
+            'c.card': {'name': 'C', 'card_number': '3'},
+        }
+        exporter = self._make_exporter(cards)
+        results = exporter._export_card_images([{'filename': name} for name in cards], self.tmpdir.name)
+
+        self.assertEqual([r['card_name'] for r in results], ['A', 'C'])
+        self.assertTrue(any('导出卡牌 B 失败' in log for log in exporter.logs_seen))
+
+    def test_classic_mode_renders_card_once_for_all_copies(self):
+        cards = {'a.card': {'name': 'A', 'card_number': '1', 'quantity': 3, 'encounter_group_number': '4-6/9'}}
+        exporter = self._make_exporter(cards, encounter_group_mode='classic')
+        results = exporter._export_card_images([{'filename': 'a.card'}], self.tmpdir.name)
+
+        self.assertEqual([r['card_data']['encounter_group_number'] for r in results], ['4/9', '5/9', '6/9'])
+        self.assertEqual([r['quantity'] for r in results], [1, 1, 1])
+        for result, expected in zip(results, (4, 5, 6)):
+            with Image.open(result['front_path']) as front:
+                self.assertEqual(front.getpixel((0, 0))[1], expected)
+        self.assertEqual(exporter.export_helper.calls, 1)
+        self.assertEqual(len({r['front_path'] for r in results}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import re
+import sys
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image, ImageFile  # noqa: F401  ImageFile 由 Image.tobytes 延迟导入
+
+from bin.pnp_exporter import PNPExporter
+from bin import pnp_image_store
+from bin.pnp_image_store import PDFImageStore
+
+# 其他测试会用桩模块替换 sys.modules["PIL"]，这里保留真实模块以便在 setUp 中恢复
+_PIL_MODULES = {name: module for name, module in sys.modules.items() if name == "PIL" or name.startswith("PIL.")}
+
+
+class _RealPILTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _PIL_MODULES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class _FakeWorkspaceManager:
+    def __init__(self, workspace_path, cards):
+        self.workspace_path = workspace_path
+        self.config = {"lama_baseurl": "http://localhost:8080"}
+        self.cards = cards
+
+    def read_card(self, card_path):
+        card = self.cards.get(card_path)
+        return dict(card) if card is not None else None
+
+    def _get_absolute_path(self, path):
+        return str(Path(self.workspace_path) / path)
+
+
+class _FakeExportHelper:
+    """正面颜色编码卡牌编号，所有卡牌共用同一卡背"""
+
+    def __init__(self, workspace_manager):
+        self.workspace_manager = workspace_manager
+        self.dpi = 300
+
+    def export_card_auto(self, card_path):
+        card = self.workspace_manager.read_card(card_path)
+        return {
+            'front': Image.new('RGB', (60, 84), (int(card['card_number']), 0, 0)),
+            'back': Image.new('RGB', (60, 84), (0, 0, 255)),
+        }
+
+
+def _image_streams(pdf_bytes):
+    """返回 PDF 中全部图片对象的 (滤镜, 数据)"""
+    streams = []
+    for match in re.finditer(rb'<<([^>]*?/Subtype /Image[^>]*?)>>\s*stream\r?\n', pdf_bytes):
+        length = int(re.search(rb'/Length (\d+)', match.group(1)).group(1))
+        data = pdf_bytes[match.end():match.end() + length]
+        streams.append((re.search(rb'/Filter \[ /(\w+) \]', match.group(1)).group(1).decode(), data))
+    return streams
+
+
+class PDFImageStoreTests(_RealPILTestCase):
+    def test_identical_images_are_encoded_once(self):
+        store = PDFImageStore()
+        first = store.add(Image.new('RGB', (4, 4), (0, 0, 255)))
+        second = store.add(Image.new('RGB', (4, 4), (0, 0, 255)))
+        third = store.add(Image.new('RGB', (4, 4), (0, 255, 0)))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.reused, 1)
+        self.assertEqual(store.size(first), (4, 4))
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            PDFImageStore(image_format='webp')
+
+    def test_reportlab_internals_used_by_direct_draw_exist(self):
+        # 升级 reportlab（requirements 固定版本）后此测试失败，说明直接登记图片流的快速路径已失效
+        for owner, name in pnp_image_store.REPORTLAB_INTERNALS:
+            self.assertTrue(hasattr(owner, name), f"reportlab 缺少 {getattr(owner, '__name__', owner)}.{name}")
+        self.assertTrue(pnp_image_store._probe_direct_draw())
+
+
+class PNPPdfImageTests(_RealPILTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _export(self, mode, **params):
+        cards = {f'{i}.card': {'name': f'Card {i}', 'card_number': str(i), 'quantity': 2} for i in range(1, 4)}
+        workspace = _FakeWorkspaceManager(self.tmpdir.name, cards)
+        exporter = PNPExporter(dict({'pnp_workers': 2}, **params), workspace)
+        exporter.export_helper = _FakeExportHelper(workspace)
+        exporter.export_helper.bleed = type('Bleed', (), {'value': 2})()
+        output_path = str(Path(self.tmpdir.name) / 'out.pdf')
+        result = exporter.export_pnp([{'filename': name} for name in cards], output_path, mode=mode)
+        self.assertTrue(result['success'], result.get('error'))
+        return Path(output_path).read_bytes()
+
+    def test_shared_back_is_one_xobject_in_both_pdf_modes(self):
+        for mode in ('single_card', 'print_sheet'):
+            with self.subTest(mode=mode):
+                streams = _image_streams(self._export(mode))
+                # 3 张正面 + 1 张共用卡背，每张卡 2 份副本
+                self.assertEqual(len(streams), 4)
+                self.assertEqual({f for f, _ in streams}, {'FlateDecode'})
+                pixels = {zlib.decompress(data) for _, data in streams}
+                self.assertIn(Image.new('RGB', (60, 84), (0, 0, 255)).tobytes(), pixels)
+
+    def test_jpeg_streams_are_embedded_directly(self):
+        streams = _image_streams(self._export('single_card', pnp_image_format='jpeg', pnp_jpeg_quality=80))
+        self.assertEqual(len(streams), 4)
+        for image_filter, data in streams:
+            self.assertEqual(image_filter, 'DCTDecode')
+            self.assertTrue(data.startswith(b'\xff\xd8\xff'))
+
+    def test_falls_back_to_draw_image_without_reportlab_internals(self):
+        with mock.patch.object(pnp_image_store, 'direct_draw_supported', return_value=False):
+            for image_format, image_filter in (('flate', b'/FlateDecode'), ('jpeg', b'/DCTDecode')):
+                with self.subTest(image_format=image_format):
+                    pdf = self._export('single_card', pnp_image_format=image_format)
+                    # drawImage 按像素内容去重，共用卡背仍只有一个图片对象
+                    self.assertEqual(pdf.count(b'/Subtype /Image'), 4)
+                    self.assertIn(image_filter, pdf)
+
+    def test_images_mode_keeps_png_files(self):
+        cards = {'1.card': {'name': 'A', 'card_number': '1', 'quantity': 1}}
+        workspace = _FakeWorkspaceManager(self.tmpdir.name, cards)
+        exporter = PNPExporter({'pnp_workers': 1}, workspace)
+        exporter.export_helper = _FakeExportHelper(workspace)
+        result = exporter.export_pnp([{'filename': '1.card'}], 'pack', mode='images')
+
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(len(list(Path(self.tmpdir.name).glob('pack_*/*.png'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
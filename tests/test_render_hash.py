@@ -0,0 +1,64 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image, ImageFile  # noqa: F401  ImageFile 由 Image.tobytes 延迟导入
+
+from benchmarks.render_hash import image_digest, pixel_diff, save_diff_image, text_layer_digest
+
+# 其他测试会用桩模块替换 sys.modules["PIL"]，这里保留真实模块以便在 setUp 中恢复
+_PIL_MODULES = {name: module for name, module in sys.modules.items() if name == "PIL" or name.startswith("PIL.")}
+
+
+class RenderHashTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _PIL_MODULES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_image_digest_includes_size_and_mode(self):
+        rgb = Image.new("RGB", (4, 2), (10, 20, 30))
+        self.assertEqual(image_digest(rgb), image_digest(rgb.copy()))
+        self.assertNotEqual(image_digest(rgb), image_digest(Image.new("RGB", (2, 4), (10, 20, 30))))
+        self.assertNotEqual(image_digest(rgb), image_digest(rgb.convert("RGBA")))
+
+    def test_text_layer_digest_replaces_images_with_pixel_digest(self):
+        layer = [
+            {"text": "Fast", "x": 1.5, "y": 2, "color": (0, 0, 0), "effects": None},
+            {"type": "image", "image": Image.new("RGBA", (3, 3)), "x": 0, "y": 0},
+        ]
+        same = [dict(item) for item in layer]
+        same[1]["image"] = Image.new("RGBA", (3, 3))
+        self.assertEqual(text_layer_digest(layer), text_layer_digest(same))
+
+        moved = [dict(item) for item in layer]
+        moved[0]["x"] = 1.0
+        self.assertNotEqual(text_layer_digest(layer), text_layer_digest(moved))
+        self.assertIsNone(text_layer_digest(None))
+
+    def test_pixel_diff_and_diff_image(self):
+        reference = Image.new("RGB", (10, 10), (100, 100, 100))
+        current = reference.copy()
+        current.putpixel((0, 0), (110, 100, 100))
+
+        diff = pixel_diff(reference, current)
+        self.assertEqual(diff["max_channel_diff"], 10)
+        self.assertAlmostEqual(diff["changed_ratio"], 0.01)
+        self.assertTrue(pixel_diff(reference, Image.new("RGB", (5, 5)))["size_mismatch"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = str(Path(tmpdir) / "diff" / "card.png")
+            save_diff_image(reference, current, path)
+            with Image.open(path) as saved:
+                self.assertEqual(saved.size, (30, 10))
+                self.assertEqual(saved.getpixel((20, 0)), (80, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
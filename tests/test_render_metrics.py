@@ -0,0 +1,84 @@
+import importlib.util
+import unittest
+from unittest import mock
+from pathlib import Path
+
+
+def _load_render_metrics_module():
+    module_name = "render_metrics_under_test"
+    module_path = Path(__file__).resolve().parents[1] / "bin" / "render_metrics.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+class RenderMetricsTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_render_metrics_module()
+        self.metrics = self.module.RenderMetrics(enabled=True)
+
+    def test_disabled_span_records_nothing(self):
+        metrics = self.module.RenderMetrics(enabled=False)
+        with metrics.span("create_card", card_type="技能卡"):
+            pass
+        metrics.observe_count("text_fit_trials", 5)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["stages"], [])
+        self.assertEqual(snapshot["counts"], [])
+
+    def test_nested_spans_inherit_card_type(self):
+        with self.metrics.span("create_card", card_type="敌人卡"):
+            with self.metrics.span("text"):
+                self.metrics.observe_count("text_fit_trials", 4)
+        with self.metrics.span("encode"):
+            pass
+
+        stages = {(item["stage"], item["card_type"]): item for item in self.metrics.snapshot()["stages"]}
+        self.assertEqual(stages[("create_card", "敌人卡")]["count"], 1)
+        self.assertEqual(stages[("text", "敌人卡")]["count"], 1)
+        self.assertIn(("encode", ""), stages)
+
+        counts = self.metrics.snapshot()["counts"]
+        self.assertEqual(counts[0]["name"], "text_fit_trials")
+        self.assertEqual(counts[0]["card_type"], "敌人卡")
+        self.assertEqual(counts[0]["sum"], 4)
+
+    def test_nested_phases_do_not_overlap(self):
+        clock = [0.0, 1.0, 1.5, 4.0, 4.5, 10.0]
+        with mock.patch.object(self.module.time, "perf_counter", side_effect=clock):
+            with self.metrics.span("create_card", card_type="地点卡"):
+                with self.metrics.span("art_paste"):
+                    with self.metrics.span("compose"):
+                        pass
+
+        stages = {item["stage"]: item["sum"] for item in self.metrics.snapshot()["stages"]}
+        self.assertEqual(stages["create_card"], 10.0)
+        self.assertEqual(stages["compose"], 2.5)
+        # art_paste 只记录扣除 compose 后的自身耗时
+        self.assertEqual(stages["art_paste"], 1.0)
+
+    def test_timed_decorator_and_prometheus_output(self):
+        @self.metrics.timed("footer")
+        def draw_footer():
+            return "ok"
+
+        self.assertEqual(draw_footer(), "ok")
+        self.metrics.observe("export_bleed", 0.3, card_type="地点卡")
+
+        text = self.metrics.to_prometheus()
+        self.assertIn("# TYPE arkham_render_stage_seconds histogram", text)
+        self.assertIn('arkham_render_stage_seconds_bucket{stage="export_bleed",card_type="地点卡",le="0.25"} 0', text)
+        self.assertIn('arkham_render_stage_seconds_bucket{stage="export_bleed",card_type="地点卡",le="0.5"} 1', text)
+        self.assertIn('arkham_render_stage_seconds_count{stage="footer",card_type=""} 1', text)
+
+    def test_reset_clears_histograms(self):
+        self.metrics.observe("compose", 0.01)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot()["stages"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
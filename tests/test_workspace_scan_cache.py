@@ -0,0 +1,481 @@
+import base64
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+def _load_workspace_manager_module():
+    module_name = "workspace_manager_scan_cache_under_test"
+    module_path = Path(__file__).resolve().parents[1] / "bin" / "workspace_manager.py"
+
+    pil_module = types.ModuleType("PIL")
+    pil_module.Image = types.SimpleNamespace(Image=type("Image", (), {}))
+    sys.modules.setdefault("PIL", pil_module)
+
+    bin_package = types.ModuleType("bin")
+    bin_package.__path__ = []
+    sys.modules.setdefault("bin", bin_package)
+
+    config_directory_manager = types.ModuleType("bin.config_directory_manager")
+    config_directory_manager.config_dir_manager = types.SimpleNamespace(
+        get_user_font_dir=lambda: ""
+    )
+    sys.modules.setdefault("bin.config_directory_manager", config_directory_manager)
+
+    deck_exporter = types.ModuleType("bin.deck_exporter")
+    deck_exporter.DeckExporter = type("DeckExporter", (), {})
+    sys.modules.setdefault("bin.deck_exporter", deck_exporter)
+
+    logger_module = types.ModuleType("bin.logger")
+    logger_module.logger_manager = types.SimpleNamespace(
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        exception=lambda *args, **kwargs: None,
+        debug=lambda *args, **kwargs: None,
+    )
+    sys.modules.setdefault("bin.logger", logger_module)
+
+    tts_card_converter = types.ModuleType("bin.tts_card_converter")
+    tts_card_converter.TTSCardConverter = type("TTSCardConverter", (), {})
+    sys.modules.setdefault("bin.tts_card_converter", tts_card_converter)
+
+    content_package_manager = types.ModuleType("bin.content_package_manager")
+    content_package_manager.ContentPackageManager = type("ContentPackageManager", (), {})
+    sys.modules.setdefault("bin.content_package_manager", content_package_manager)
+
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+class WorkspaceScanCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, "sub"))
+        self._write_card("a.card", "技能卡")
+        self._write_card(os.path.join("sub", "b.card"), "事件卡")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_card(self, rel_path, card_type, extra=""):
+        with open(os.path.join(self.root, rel_path), "w", encoding="utf-8") as f:
+            json.dump({"type": card_type, "name": extra}, f, ensure_ascii=False)
+
+    def _run_scan(self):
+        tracker = object.__new__(self.module.ScanProgressTracker)
+        tracker._lock = self.module.threading.Lock()
+        scanner = self.module.WorkspaceScanner(self.root)
+        queue = scanner.collect_card_files()
+        tracker._scans = {"scan": {
+            "status": "scanning",
+            "progress": {"total": 0, "scanned": 0, "percentage": 0.0},
+            "data": [],
+            "queue": self.module.ScanQueue(queue),
+            "error_count": 0,
+        }}
+        updates = []
+        extract = mock.Mock(wraps=scanner._extract_card_type_with_error)
+        scanner._extract_card_type_with_error = extract
+        tracker._run_scan("scan", scanner, updates.append, lambda: None)
+        return updates, extract
+
+    def test_second_scan_reuses_cache_in_single_bulk_update(self):
+        first_updates, first_extract = self._run_scan()
+        self.assertEqual(first_extract.call_count, 2)
+        self.assertTrue(all("data" in u for u in first_updates))
+        self.assertTrue(os.path.exists(os.path.join(self.root, ".cache", "file_cache.json")))
+
+        updates, extract = self._run_scan()
+
+        extract.assert_not_called()
+        self.assertEqual(len(updates), 1)
+        items = {item["path"]: item["card_type"] for item in updates[0]["items"]}
+        self.assertEqual(items, {"a.card": "技能卡", os.path.join("sub", "b.card"): "事件卡"})
+        self.assertEqual(updates[0]["scanned"], 2)
+
+    def test_changed_file_is_reread(self):
+        self._run_scan()
+        self._write_card("a.card", "事件卡", extra="longer content")
+
+        updates, extract = self._run_scan()
+
+        extract.assert_called_once_with(os.path.join(self.root, "a.card"))
+        self.assertEqual(updates[-1]["data"]["card_type"], "事件卡")
+        self.assertEqual(updates[-1]["scanned"], 2)
+
+    def test_legacy_entry_without_size_is_validated_by_mtime(self):
+        cache = self.module.CacheManager(self.root)
+        path = os.path.join(self.root, "a.card")
+        cache._cache["files"]["a.card"] = {"card_type": "技能卡", "mtime": os.stat(path).st_mtime}
+
+        self.assertEqual(cache.get_cached_card_type(path), "技能卡")
+
+
+class WorkspaceWalkTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _touch(self, rel_path):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"type": "技能卡"}')
+
+    def test_single_walk_builds_tree_and_breadth_first_queue_without_depth_limit(self):
+        deep = os.path.join(*["d%d" % i for i in range(7)])
+        self._touch(os.path.join(deep, "deep.card"))
+        self._touch(os.path.join("b", "mid.card"))
+        self._touch("top.card")
+        self._touch(os.path.join(".hidden", "skip.card"))
+
+        scanner = self.module.WorkspaceScanner(self.root)
+        with mock.patch.object(self.module.os, "scandir", wraps=os.scandir) as scandir:
+            tree = scanner.scan_structure()
+            queue = scanner.collect_card_files()
+        # 每个可见目录只打开一次: 根 + b + d0..d6
+        self.assertEqual(scandir.call_count, 9)
+
+        self.assertEqual(queue, ["top.card", os.path.join("b", "mid.card"), os.path.join(deep, "deep.card")])
+        self.assertEqual([item["label"] for item in tree], ["b", "d0", "top.card"])
+
+        node = tree[1]
+        while node["type"] == "directory":
+            node = node["children"][0]
+        self.assertEqual(node["path"], os.path.join(deep, "deep.card"))
+        self.assertEqual(node["level"], 8)
+        self.assertIsNotNone(scanner.get_walk_stat(node["path"]))
+
+    def test_manager_file_tree_uses_single_walk_with_stable_keys(self):
+        self._touch(os.path.join("b", "mid.card"))
+        self._touch("top.card")
+        manager = object.__new__(self.module.WorkspaceManager)
+        manager.workspace_path = self.root
+        manager.cache_manager = self.module.CacheManager(self.root)
+
+        with mock.patch.object(self.module.os, "scandir", wraps=os.scandir) as scandir:
+            tree = manager.get_file_tree()
+        self.assertEqual(scandir.call_count, 2)
+
+        self.assertEqual(tree["key"], "workspace")
+        self.assertEqual([item["key"] for item in tree["children"]], ["b", "top.card"])
+        self.assertEqual(tree["children"][1]["card_type"], "技能卡")
+        self.assertEqual(manager.get_file_tree(), tree)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "需要符号链接支持")
+    def test_symlink_cycle_is_walked_once(self):
+        self._touch(os.path.join("a", "x.card"))
+        try:
+            os.symlink(self.root, os.path.join(self.root, "a", "loop"))
+        except OSError:
+            self.skipTest("无法创建符号链接")
+
+        scanner = self.module.WorkspaceScanner(self.root)
+
+        self.assertEqual(scanner.collect_card_files(), [os.path.join("a", "x.card")])
+
+
+    def test_list_directory_pages_one_level_and_uses_cached_card_types_only(self):
+        for name in ("a", "b", "c"):
+            self._touch(os.path.join(name, "sub", "x.card"))
+        self._touch("top.card")
+        self._touch("other.card")
+        os.makedirs(os.path.join(self.root, "empty"))
+        scanner = self.module.WorkspaceScanner(self.root)
+        scanner.cache_manager.update_cache(os.path.join(self.root, "top.card"), "技能卡")
+
+        with mock.patch.object(scanner, "_extract_card_type_with_error") as extract:
+            first = scanner.list_directory(".", limit=3)
+            second = scanner.list_directory("", offset=3, limit=3)
+        extract.assert_not_called()
+
+        self.assertEqual([item["label"] for item in first["items"]], ["a", "b", "c"])
+        self.assertTrue(all(item["lazy"] and item["has_children"] for item in first["items"]))
+        self.assertEqual((first["total"], first["has_more"]), (6, True))
+        self.assertEqual([item["label"] for item in second["items"]], ["empty", "other.card", "top.card"])
+        self.assertFalse(second["items"][0]["has_children"])
+        self.assertEqual([item.get("card_type") for item in second["items"][1:]], [None, "技能卡"])
+        self.assertFalse(second["has_more"])
+
+        nested = scanner.list_directory("a", depth=2)
+        sub = nested["items"][0]
+        self.assertNotIn("lazy", sub)
+        self.assertEqual([child["path"] for child in sub["children"]], [os.path.join("a", "sub", "x.card")])
+        self.assertIsNone(scanner.list_directory(".."))
+        self.assertIsNone(scanner.list_directory("top.card"))
+
+
+class ScanQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+
+    def test_pop_order_and_prefix_prioritization(self):
+        queue = self.module.ScanQueue(["a.card", "x/1.card", "y/2.card", "x/sub/3.card", "xy/4.card"])
+
+        promoted = queue.prioritize(["./x/"])
+        self.assertEqual(promoted, 2)
+        queue.prioritize(["y\\2.card"])
+        queue.discard({"a.card"})
+
+        self.assertEqual(list(queue), ["y/2.card", "x/1.card", "x/sub/3.card", "xy/4.card"])
+        popped = []
+        while True:
+            path = queue.pop()
+            if path is None:
+                break
+            popped.append(path)
+        self.assertEqual(popped, ["y/2.card", "x/1.card", "x/sub/3.card", "xy/4.card"])
+        self.assertEqual(len(queue), 0)
+
+    def test_repeated_prioritize_does_not_requeue_and_prunes_index(self):
+        queue = self.module.ScanQueue(["x/1.card", "x/2.card", "y/3.card"])
+
+        for _ in range(5):
+            self.assertEqual(queue.prioritize(["x"]), 2)
+        queue.prioritize(["y"])
+        self.assertEqual(len(queue._priority), 3)
+        self.assertEqual(list(queue), ["y/3.card", "x/1.card", "x/2.card"])
+
+        self.assertEqual(queue.pop(), "y/3.card")
+        queue.discard({"x/2.card"})
+        # 已取出（扫描中）或已移除的文件不再被提升，也不再留在前缀索引中
+        self.assertEqual(queue.prioritize(["y", "x/2.card"]), 0)
+        self.assertEqual(set(queue._prefix_index), {"x", "x/1.card"})
+        self.assertEqual(queue.pop(), "x/1.card")
+        self.assertIsNone(queue.pop())
+        self.assertEqual(queue._prefix_index, {})
+
+    def test_progress_cursor_returns_only_new_results(self):
+        tracker = object.__new__(self.module.ScanProgressTracker)
+        tracker._lock = self.module.threading.Lock()
+        tracker._scans = {"scan": {
+            "status": "scanning",
+            "progress": {"total": 5, "scanned": 3, "percentage": 60.0},
+            "data": [{"path": "%d.card" % i} for i in range(3)],
+            "queue": self.module.ScanQueue(),
+            "error_count": 0,
+        }}
+
+        first = tracker.get_progress("scan", cursor=0, limit=2)
+        self.assertEqual([d["path"] for d in first["data"]], ["0.card", "1.card"])
+        self.assertTrue(first["has_more"])
+
+        tracker._scans["scan"]["data"].append({"path": "3.card"})
+        second = tracker.get_progress("scan", cursor=first["next_cursor"], limit=10)
+        self.assertEqual([d["path"] for d in second["data"]], ["2.card", "3.card"])
+        self.assertEqual(second["next_cursor"], 4)
+        self.assertEqual(tracker.get_progress("scan", cursor=4)["data"], [])
+
+        legacy = tracker.get_progress("scan", limit=1)
+        self.assertEqual([d["path"] for d in legacy["data"]], ["3.card"])
+        self.assertIn("error", tracker.get_progress("missing"))
+
+
+class CardJsonCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.manager = object.__new__(self.module.WorkspaceManager)
+        self.manager.workspace_path = self.root
+        self.path = os.path.join(self.root, "a.card")
+        self._write({"name": "a", "back": {"name": "b"}})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, data, encoding="utf-8"):
+        with open(self.path, "w", encoding=encoding) as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def test_art_migration_reads_bom_and_gbk_cards(self):
+        self._write({"name": "甲", "picture_base64": "INLINE"}, encoding="utf-8-sig")
+        with open(os.path.join(self.root, "b.card"), "w", encoding="gbk") as f:
+            json.dump({"name": "乙", "picture_base64": "INLINE"}, f, ensure_ascii=False)
+        self.manager.cache_manager = mock.Mock()
+        self.manager._notify_file_changed = lambda path: None
+        self.manager._externalize_card_art_content = lambda content: content.replace("INLINE", "REF")
+
+        result = self.manager.migrate_card_art_storage("blob")
+
+        self.assertEqual(result, {"scanned": 2, "migrated": 2, "failed": 0})
+        for name, expected in (("a.card", "甲"), ("b.card", "乙")):
+            with open(os.path.join(self.root, name), encoding="utf-8") as f:
+                self.assertEqual(json.load(f), {"name": expected, "picture_base64": "REF"})
+
+    def test_any_data_url_is_decoded_before_opening(self):
+        opened = []
+
+        class _Image:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def copy(self):
+                return "image"
+
+        def fake_open(stream):
+            opened.append(stream.read())
+            return _Image()
+
+        payload = b"\x89PNG\r\n\x1a\nfake"
+        data_url = "data:application/octet-stream;base64," + base64.b64encode(payload).decode("ascii")
+        with mock.patch.object(self.module, "Image", types.SimpleNamespace(open=fake_open)):
+            self.assertEqual(self.manager.get_card_base64({"picture_base64": data_url}), "image")
+        self.assertEqual(opened, [payload])
+
+    def test_parsed_card_is_cached_and_copied_on_read(self):
+        first = self.manager.read_card("a.card")
+        first["back"]["name"] = "modified"
+
+        with mock.patch("builtins.open", side_effect=AssertionError("cache miss")):
+            second = self.manager.read_card("a.card")
+
+        self.assertEqual(second, {"name": "a", "back": {"name": "b"}})
+        self.assertEqual(self.manager.get_card_json_cache().stats()["hits"], 1)
+
+    def test_rewritten_file_is_reparsed(self):
+        self.manager.read_card("a.card")
+        self._write({"name": "新名字"}, encoding="utf-8-sig")
+        os.utime(self.path, ns=(0, 1))
+
+        self.assertEqual(self.manager.read_card("a.card"), {"name": "新名字"})
+
+    def test_decode_text_falls_back_to_gbk(self):
+        self.assertEqual(self.module.decode_text("卡牌".encode("gbk")), ("卡牌", "gbk"))
+        self.assertEqual(self.module.decode_text(b"\xef\xbb\xbf{}"), ("{}", "utf-8-sig"))
+
+
+class JournaledCacheManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        os.makedirs(os.path.join(self.root, "dir"))
+        for rel_path in ("a.card", os.path.join("dir", "b.card")):
+            with open(os.path.join(self.root, rel_path), "w", encoding="utf-8") as f:
+                f.write('{"type": "技能卡"}')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _manager(self):
+        return self.module.CacheManager(self.root)
+
+    def test_saves_append_to_journal_and_replay_on_load(self):
+        os.makedirs(os.path.join(self.root, ".cache"))
+        with open(os.path.join(self.root, ".cache", "card_types.json"), "w") as f:
+            f.write("{}")
+        cache = self._manager()
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".cache", "card_types.json")))
+        cache.update_cache(os.path.join(self.root, "a.card"), "技能卡")
+        cache.save_cache()
+        snapshot = Path(cache.cache_file).read_bytes()
+
+        cache.update_cache(os.path.join(self.root, "dir", "b.card"), "事件卡")
+        cache.move(os.path.join(self.root, "dir"), os.path.join(self.root, "moved"))
+        cache.remove(os.path.join(self.root, "a.card"))
+        cache.save_cache()
+
+        self.assertEqual(Path(cache.cache_file).read_bytes(), snapshot)
+        os.rename(os.path.join(self.root, "dir"), os.path.join(self.root, "moved"))
+        reloaded = self._manager()
+        self.assertIsNone(reloaded.get_cached_card_type(os.path.join(self.root, "a.card")))
+        self.assertEqual(reloaded.get_cached_card_type(os.path.join(self.root, "moved", "b.card")), "事件卡")
+        self.assertEqual(len(reloaded), 1)
+
+    def test_torn_tail_and_stale_journal_are_ignored(self):
+        cache = self._manager()
+        cache.update_cache(os.path.join(self.root, "a.card"), "技能卡")
+        cache.save_cache()
+        cache.update_cache(os.path.join(self.root, "dir", "b.card"), "事件卡")
+        cache.save_cache()
+        with open(cache.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"op":"clear"')
+
+        reloaded = self._manager()
+        self.assertEqual(len(reloaded), 2)
+        self.assertTrue(reloaded.dirty)
+
+        reloaded.save_cache()
+        with open(reloaded.journal_file, "w", encoding="utf-8") as f:
+            f.write('{"generation": 0}\n{"op":"clear"}\n')
+        self.assertEqual(len(self._manager()), 2)
+
+    def test_journal_is_compacted_past_threshold(self):
+        cache = self._manager()
+        cache.JOURNAL_COMPACT_MIN = 3
+        cache.save_cache()
+        path = os.path.join(self.root, "a.card")
+        for _ in range(4):
+            cache.update_cache(path, "技能卡")
+            cache.save_cache()
+
+        with open(cache.journal_file, encoding="utf-8") as f:
+            self.assertLessEqual(len(f.readlines()), 4)
+        self.assertEqual(self._manager().get_cached_card_type(path), "技能卡")
+
+
+class WorkspaceConfigCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.module = _load_workspace_manager_module()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        self.manager = object.__new__(self.module.WorkspaceManager)
+        self.manager.workspace_path = self.root
+        self.manager._config_file_cache = {}
+        self.manager._encounter_groups_cache = None
+        self.manager.config = {"encounter_groups_dir": "groups"}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_config_file_is_parsed_once_until_saved(self):
+        path = os.path.join(self.root, "config.json")
+        self.assertTrue(self.manager._save_config_file(path, {"encounter_groups_dir": "a"}))
+
+        first = self.manager._load_config_file(path)
+        first["encounter_groups_dir"] = "modified"
+        with mock.patch.object(self.module.json, "load", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.manager._load_config_file(path), {"encounter_groups_dir": "a"})
+
+        self.manager._save_config_file(path, {"encounter_groups_dir": "b"})
+        self.assertEqual(self.manager._load_config_file(path), {"encounter_groups_dir": "b"})
+        self.assertEqual(self.manager._load_config_file(os.path.join(self.root, "missing.json")), {})
+
+    def test_encounter_groups_are_cached_until_directory_changes(self):
+        groups_dir = os.path.join(self.root, "groups")
+        os.makedirs(groups_dir)
+        for name in ("b.png", "a.PNG", "notes.txt"):
+            open(os.path.join(groups_dir, name), "wb").close()
+
+        self.assertEqual(self.manager.get_encounter_groups(), ["a", "b"])
+        with mock.patch.object(self.module.os, "listdir", side_effect=AssertionError("cache miss")):
+            self.assertEqual(self.manager.get_encounter_groups(), ["a", "b"])
+
+        open(os.path.join(groups_dir, "c.png"), "wb").close()
+        stat_result = os.stat(groups_dir)
+        os.utime(groups_dir, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1000))
+        self.assertEqual(self.manager.get_encounter_groups(), ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import bin
+from bin import workspace_manager as workspace_manager_module
+from bin.startup_profiler import StartupProfiler
+
+# 其他测试会用桩模块替换 sys.modules["bin"] 等，setUp 中恢复为真实模块
+_REAL_MODULES = dict(sys.modules)
+
+
+class _FakeFontManager:
+    created = 0
+    gate = None
+    error = None
+
+    def __init__(self):
+        type(self).created += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        self.folders = []
+
+    def add_font_folder(self, path):
+        self.folders.append(path)
+
+
+class _FakeImageManager:
+    def set_working_directory(self, path):
+        self.working_directory = path
+
+
+class _FakeCardCreator:
+    def __init__(self, font_manager, image_manager, image_mode):
+        self.font_manager = font_manager
+        self.image_manager = image_manager
+
+
+class WorkspaceResourceStartupTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _REAL_MODULES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        _FakeFontManager.created = 0
+        _FakeFontManager.gate = None
+        _FakeFontManager.error = None
+        classes = (_FakeFontManager, _FakeImageManager, _FakeCardCreator, object)
+        patcher = mock.patch.object(workspace_manager_module, '_load_card_generation_modules', return_value=classes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create(self, mode):
+        with mock.patch.dict(os.environ, {workspace_manager_module.STARTUP_MODE_ENV: mode}):
+            return workspace_manager_module.WorkspaceManager(self.tmpdir.name)
+
+    def test_eager_mode_initializes_resources_in_constructor(self):
+        manager = self._create('eager')
+
+        self.assertTrue(manager._card_resources_ready)
+        self.assertIsInstance(manager._font_manager, _FakeFontManager)
+        self.assertIs(manager.creator.font_manager, manager.font_manager)
+        self.assertEqual(manager.image_manager.working_directory, manager.workspace_path)
+        self.assertEqual(_FakeFontManager.created, 1)
+
+    def test_property_access_blocks_until_background_warm_up_finishes(self):
+        _FakeFontManager.gate = threading.Event()
+        manager = self._create('lazy')
+        self.assertFalse(manager._card_resources_ready)
+
+        result = []
+        reader = threading.Thread(target=lambda: result.append(manager.font_manager))
+        reader.start()
+        reader.join(0.2)
+        self.assertTrue(reader.is_alive())
+        self.assertEqual(result, [])
+
+        _FakeFontManager.gate.set()
+        reader.join(5)
+        self.assertIsInstance(result[0], _FakeFontManager)
+        self.assertIs(manager.font_manager, result[0])
+        self.assertEqual(_FakeFontManager.created, 1)
+
+    def test_warm_up_failure_is_logged_and_resources_stay_unavailable(self):
+        _FakeFontManager.error = RuntimeError('字体目录损坏')
+        with mock.patch.object(workspace_manager_module, 'logger_manager') as logger:
+            manager = self._create('lazy')
+            self.assertIsNone(manager.creator)
+
+        self.assertIsNone(manager.font_manager)
+        self.assertIsNone(manager.image_manager)
+        logger.exception.assert_called_once()
+        self.assertIn('字体目录损坏', logger.exception.call_args[0][0])
+
+
+class BinLazyExportTests(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(sys.modules, _REAL_MODULES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_exports_resolve_on_access_and_are_cached(self):
+        bin.__dict__.pop('DeckExporter', None)
+        from bin.deck_exporter import DeckExporter
+
+        self.assertIs(bin.DeckExporter, DeckExporter)
+        self.assertIs(bin.__dict__['DeckExporter'], DeckExporter)
+        with self.assertRaises(AttributeError):
+            bin.NotExported
+
+    def test_importing_a_submodule_does_not_load_other_components(self):
+        code = ("import sys, bin.config_directory_manager; "
+                "print(any(name in sys.modules for name in ('bin.file_manager', 'bin.deck_exporter')))")
+        output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+class StartupReportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        Path(self.tmpdir.name, 'startup_probe_outer.py').write_text('import startup_probe_inner\n')
+        Path(self.tmpdir.name, 'startup_probe_inner.py').write_text('VALUE = sum(range(1000))\n')
+        sys.path.insert(0, self.tmpdir.name)
+        self.addCleanup(sys.path.remove, self.tmpdir.name)
+        for name in ('startup_probe_outer', 'startup_probe_inner'):
+            self.addCleanup(sys.modules.pop, name, None)
+
+    def test_report_lists_nested_imports_and_first_window(self):
+        profiler = StartupProfiler().install()
+        self.addCleanup(profiler.uninstall)
+        importlib.import_module('startup_probe_outer')
+        profiler.mark_first_window()
+        profiler.uninstall()
+
+        self.assertNotIn(profiler, sys.meta_path)
+        outer_self, outer_cumulative = profiler.timings['startup_probe_outer']
+        inner_self, inner_cumulative = profiler.timings['startup_probe_inner']
+        self.assertGreaterEqual(outer_cumulative, inner_cumulative)
+        self.assertAlmostEqual(outer_self + inner_cumulative, outer_cumulative, places=6)
+
+        report = profiler.format_report().splitlines()
+        self.assertEqual(report[0], '启动耗时报告')
+        self.assertTrue(report[1].startswith('首个窗口显示: '))
+        self.assertTrue(any(line.endswith('| startup_probe_outer') for line in report))
+        self.assertTrue(any(line.endswith('| startup_probe_inner') for line in report))
+
+
+if __name__ == '__main__':
+    unittest.main()
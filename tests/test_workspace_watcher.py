@@ -0,0 +1,198 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+def _load_module(module_name, relative_path):
+    module_path = Path(__file__).resolve().parents[1] / relative_path
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(module)
+    return module
+
+
+def _install_stubs():
+    pil_module = types.ModuleType("PIL")
+    pil_module.Image = types.SimpleNamespace(Image=type("Image", (), {}))
+    sys.modules.setdefault("PIL", pil_module)
+
+    bin_package = types.ModuleType("bin")
+    bin_package.__path__ = []
+    sys.modules.setdefault("bin", bin_package)
+
+    config_directory_manager = types.ModuleType("bin.config_directory_manager")
+    config_directory_manager.config_dir_manager = types.SimpleNamespace(
+        get_user_font_dir=lambda: ""
+    )
+    sys.modules.setdefault("bin.config_directory_manager", config_directory_manager)
+
+    deck_exporter = types.ModuleType("bin.deck_exporter")
+    deck_exporter.DeckExporter = type("DeckExporter", (), {})
+    sys.modules.setdefault("bin.deck_exporter", deck_exporter)
+
+    logger_module = types.ModuleType("bin.logger")
+    logger_module.logger_manager = types.SimpleNamespace(
+        info=lambda *args, **kwargs: None,
+        warning=lambda *args, **kwargs: None,
+        error=lambda *args, **kwargs: None,
+        exception=lambda *args, **kwargs: None,
+        debug=lambda *args, **kwargs: None,
+    )
+    sys.modules.setdefault("bin.logger", logger_module)
+
+    tts_card_converter = types.ModuleType("bin.tts_card_converter")
+    tts_card_converter.TTSCardConverter = type("TTSCardConverter", (), {})
+    sys.modules.setdefault("bin.tts_card_converter", tts_card_converter)
+
+    content_package_manager = types.ModuleType("bin.content_package_manager")
+    content_package_manager.ContentPackageManager = type("ContentPackageManager", (), {})
+    sys.modules.setdefault("bin.content_package_manager", content_package_manager)
+
+
+class WorkspaceTreeModelTests(unittest.TestCase):
+    def setUp(self):
+        _install_stubs()
+        self.workspace_module = _load_module("workspace_manager_watcher_under_test", "bin/workspace_manager.py")
+        self.watcher_module = _load_module("workspace_watcher_under_test", "bin/workspace_watcher.py")
+        patcher = mock.patch.dict(sys.modules, {"bin.workspace_manager": self.workspace_module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.root = self.tmpdir.name
+        self._write("a.card", {"type": "技能卡"})
+        self._write(os.path.join("set", "b.card"), {"type": "敌人卡"})
+
+        scanner = self.workspace_module.WorkspaceScanner(self.root)
+        self.model = self.watcher_module.WorkspaceTreeModel(scanner)
+        self.model.load()
+
+    def _write(self, rel_path, data):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
+
+    def test_keys_are_stable_relative_paths(self):
+        first = self.model.get_tree()
+        self.model.load()
+        second = self.model.get_tree()
+
+        self.assertEqual([n["key"] for n in first], [n["key"] for n in second])
+        self.assertEqual(first[0]["children"][0]["key"], os.path.join("set", "b.card"))
+
+    def test_changes_since_reports_added_modified_and_removed(self):
+        version = self.model.version
+        self._write("a.card", {"type": "事件卡", "name": "changed"})
+        self.model.refresh_path("a.card")
+        # 首次导出：export/ 目录与文件一起出现，只报告新增的目录节点
+        export_path = self._write(os.path.join("export", "a.png"), {})
+        self.model.refresh_path(export_path)
+        os.remove(os.path.join(self.root, "set", "b.card"))
+        self.model.refresh_path(os.path.join("set", "b.card"))
+
+        changes = self.model.changes_since(version)
+
+        self.assertFalse(changes["reset"])
+        self.assertEqual([n["path"] for n in changes["added"]], ["export"])
+        self.assertEqual(changes["added"][0]["children"][0]["path"], os.path.join("export", "a.png"))
+        self.assertEqual([n["path"] for n in changes["removed"]], [os.path.join("set", "b.card")])
+        modified = {n["path"]: n for n in changes["modified"]}
+        self.assertEqual(modified["a.card"]["card_type"], "事件卡")
+        self.assertEqual(self.model.changes_since(changes["version"])["added"], [])
+
+    def test_add_then_remove_cancels_out(self):
+        version = self.model.version
+        path = self._write("tmp.card", {"type": "技能卡"})
+        self.model.refresh_path(path)
+        os.remove(path)
+        self.model.refresh_path(path)
+
+        changes = self.model.changes_since(version)
+
+        self.assertEqual((changes["added"], changes["removed"], changes["modified"]), ([], [], []))
+
+    def test_rescan_applies_only_external_differences(self):
+        version = self.model.version
+        self._write(os.path.join("set", "c.card"), {"type": "地点卡"})
+        self._write(os.path.join(".cache", "ignored.json"), {})
+
+        self.model.rescan()
+        changes = self.model.changes_since(version)
+
+        self.assertEqual([n["path"] for n in changes["added"]], [os.path.join("set", "c.card")])
+        self.assertEqual(changes["added"][0]["card_type"], "地点卡")
+        self.assertIn(os.path.join("set", "c.card"), self.model.walk_result().card_files)
+
+    def test_incremental_poll_lists_only_changed_directories(self):
+        version = self.model.version
+        with mock.patch.object(self.watcher_module.os, "scandir", wraps=os.scandir) as scandir:
+            self.assertEqual(self.model.rescan_changed_dirs(), 0)
+            self.assertEqual(scandir.call_count, 0)
+
+            self._write(os.path.join("set", "c.card"), {"type": "地点卡"})
+            os.remove(os.path.join(self.root, "set", "b.card"))
+            self.model.rescan_changed_dirs()
+        # 只列出修改时间变化的 set/ 目录
+        self.assertEqual([call.args[0] for call in scandir.call_args_list], [os.path.join(self.root, "set")])
+
+        changes = self.model.changes_since(version)
+        self.assertEqual([n["path"] for n in changes["added"]], [os.path.join("set", "c.card")])
+        self.assertEqual([n["path"] for n in changes["removed"]], [os.path.join("set", "b.card")])
+
+        new_dir = self._write(os.path.join("new", "d.card"), {"type": "技能卡"})
+        self.model.rescan_changed_dirs()
+        self.assertIn(os.path.relpath(new_dir, self.root), self.model.walk_result().card_files)
+        self.assertEqual(self.model.rescan_changed_dirs(), 0)
+
+    def test_disk_reads_happen_outside_the_model_lock(self):
+        scanner = self.model.scanner
+        held = []
+
+        def check(original):
+            def wrapper(*args, **kwargs):
+                held.append(self.model._lock._is_owned())
+                return original(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(scanner, "_extract_card_type_with_error",
+                               check(scanner._extract_card_type_with_error)), \
+                mock.patch.object(scanner, "walk_subtree", check(scanner.walk_subtree)):
+            self.assertTrue(self.model.refresh_path(self._write("a.card", {"type": "地点卡", "name": "改"})))
+            self.assertTrue(self.model.refresh_path(os.path.dirname(
+                self._write(os.path.join("new", "d.card"), {"type": "技能卡"}))))
+
+        self.assertEqual(held, [False, False])
+        self.assertEqual(self.model._index["a.card"]["card_type"], "地点卡")
+        self.assertIn(os.path.join("new", "d.card"), self.model.walk_result().card_files)
+
+    def test_event_handler_ignores_events_that_do_not_change_the_tree(self):
+        handler = self.watcher_module._ModelEventHandler(self.model)
+        path = os.path.join(self.root, "a.card")
+        with mock.patch.object(self.model, "refresh_path") as refresh:
+            for event_type in ("opened", "closed_no_write", "closed", "modified", "moved"):
+                handler.on_any_event(types.SimpleNamespace(event_type=event_type, src_path=path,
+                                                           dest_path=path + ".bak" if event_type == "moved" else ""))
+
+        self.assertEqual([call.args[0] for call in refresh.call_args_list], [path, path, path + ".bak"])
+
+    def test_stale_version_requests_reset(self):
+        with mock.patch.object(self.watcher_module, "MAX_CHANGE_LOG", 1):
+            version = self.model.version
+            for name in ("x.card", "y.card"):
+                self.model.refresh_path(self._write(name, {"type": "技能卡"}))
+
+            self.assertTrue(self.model.changes_since(version)["reset"])
+
+
+if __name__ == "__main__":
+    unittest.main()